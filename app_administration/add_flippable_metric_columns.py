@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Add Persisted Assessment Columns to Flippable Table
+===================================================
+
+Adds vote_gap, dem_absenteeism, assessment and best_pathway columns (with
+indexes) to the flippable table and backfills them from the existing vote
+columns. The web views read these columns directly instead of re-classifying
+every race in Python.
+
+rebuild_flippable_dva_fixed.py and add_municipal_to_flippable.py keep the
+columns current on every load; this script is only needed once for existing
+databases, or to re-classify after the rules in flippable_utils.py change.
+
+Usage:
+    python3 add_flippable_metric_columns.py [--county COUNTY]
+"""
+
+import argparse
+import os
+import sys
+from sqlalchemy import create_engine
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(
+        description='Add and backfill persisted assessment columns on the flippable table'
+    )
+    parser.add_argument(
+        '--county',
+        help='Only backfill a specific county (e.g., FORSYTH)',
+        type=str
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+
+    with engine.begin() as conn:
+        print("🔧 Ensuring assessment columns and indexes exist...")
+        if ensure_flippable_metric_columns(conn):
+            print("   ✅ Added assessment columns")
+        else:
+            print("   ✅ Assessment columns already exist")
+
+        print("🔄 Backfilling assessment columns...")
+        updated = refresh_flippable_metrics(conn, county=args.county)
+        print(f"   ✅ Updated {updated} flippable races")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Add Content Metadata Columns to Maps Table
+==========================================
+
+Adds the content metadata (content_hash, content_size, has_content) and
+precompressed storage (map_compressed, content_encoding) columns to the maps
+table and backfills the metadata from the stored HTML. The web app serves
+content_hash as the map ETag, and the /static-content listing reads the
+metadata columns instead of loading every map body.
+
+With --compress, maps stored as plain HTML are converted to the precompressed
+storage mode (map_compressed + content_encoding) that the raw map endpoints
+send directly with Content-Encoding.
+
+The Map model keeps the columns current on every write (including
+load_maps.py); this script is only needed once for existing databases.
+
+Usage:
+    python3 add_map_content_columns.py [--batch-size N] [--compress]
+"""
+
+import argparse
+import os
+import sys
+from sqlalchemy import create_engine, inspect, text, Boolean, Integer, LargeBinary, String
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from models import Map
+from compression_utils import compress, decompress, preferred_encoding
+
+# Columns added to maps: name -> (SQLAlchemy type compiled for the target dialect, DDL suffix)
+CONTENT_COLUMNS = {
+    'content_hash': (String(64), ''),
+    'content_size': (Integer(), ''),
+    'has_content': (Boolean(), ' NOT NULL DEFAULT FALSE'),
+    'map_compressed': (LargeBinary(), ''),
+    'content_encoding': (String(10), ''),
+}
+
+
+def ensure_content_columns(conn):
+    """Add any missing content metadata columns. Returns the names added."""
+    existing = {col['name'] for col in inspect(conn).get_columns('maps')}
+    added = []
+    for column, (column_type, suffix) in CONTENT_COLUMNS.items():
+        if column not in existing:
+            ddl_type = column_type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE maps ADD COLUMN {column} {ddl_type}{suffix}"))
+            added.append(column)
+    return added
+
+
+def backfill_content_columns(engine, batch_size):
+    """Compute metadata for maps that don't have it yet, one batch at a time."""
+    updated = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text('''
+                SELECT id, map, map_compressed, content_encoding FROM maps
+                WHERE content_size IS NULL
+                ORDER BY id
+                LIMIT :batch_size
+            '''), {'batch_size': batch_size}).fetchall()
+
+            if not rows:
+                return updated
+
+            for map_id, content, compressed, encoding in rows:
+                if compressed is not None:
+                    content = decompress(compressed, encoding).decode('utf-8')
+                conn.execute(text('''
+                    UPDATE maps
+                    SET content_hash = :content_hash, content_size = :content_size,
+                        has_content = :has_content
+                    WHERE id = :id
+                '''), {
+                    'content_hash': Map.compute_content_hash(content),
+                    'content_size': len(content.encode('utf-8')) if content else 0,
+                    'has_content': bool(content),
+                    'id': map_id,
+                })
+            updated += len(rows)
+            print(f"   ... {updated} maps updated")
+
+
+def compress_stored_maps(engine, batch_size):
+    """Convert plain-HTML maps to precompressed storage, one batch at a time."""
+    encoding = preferred_encoding()
+    converted = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text('''
+                SELECT id, map FROM maps
+                WHERE map_compressed IS NULL AND map IS NOT NULL AND map <> ''
+                ORDER BY id
+                LIMIT :batch_size
+            '''), {'batch_size': batch_size}).fetchall()
+
+            if not rows:
+                return converted
+
+            for map_id, content in rows:
+                conn.execute(text('''
+                    UPDATE maps
+                    SET map_compressed = :data, content_encoding = :encoding,
+                        content_hash = :content_hash, map = NULL
+                    WHERE id = :id
+                '''), {
+                    'data': compress(content, encoding),
+                    'encoding': encoding,
+                    'content_hash': Map.compute_content_hash(content),
+                    'id': map_id,
+                })
+            converted += len(rows)
+            print(f"   ... {converted} maps compressed ({encoding})")
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(
+        description='Add and backfill content metadata columns on the maps table'
+    )
+    parser.add_argument(
+        '--batch-size',
+        help='Number of maps to process per transaction (default: 50)',
+        type=int,
+        default=50
+    )
+    parser.add_argument(
+        '--compress',
+        help='Convert plain-HTML maps to precompressed storage',
+        action='store_true'
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+
+    print("🔧 Ensuring content metadata columns exist...")
+    with engine.begin() as conn:
+        added = ensure_content_columns(conn)
+    if added:
+        print(f"   ✅ Added columns: {', '.join(added)}")
+    else:
+        print("   ✅ Content metadata columns already exist")
+
+    print("🔄 Backfilling content metadata...")
+    updated = backfill_content_columns(engine, args.batch_size)
+    print(f"   ✅ Updated {updated} maps")
+
+    if args.compress:
+        print("🗜️  Compressing stored maps...")
+        converted = compress_stored_maps(engine, args.batch_size)
+        print(f"   ✅ Compressed {converted} maps")
+
+
+if __name__ == '__main__':
+    main()
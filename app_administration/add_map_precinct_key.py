@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Add Canonical Precinct Key to Maps Table
+========================================
+
+Adds the precinct_key column (the zero-padded precinct from
+normalize_precinct_id), backfills it, and creates the unique index on
+(state, county, precinct_key) that map lookups use. With the key in place a
+map view resolves in one index probe instead of trying padded and unpadded
+precinct formats in turn.
+
+If the same location is stored twice (e.g. precinct '74' and '074'), the
+duplicates are listed and the index is not created; remove the extra rows
+and run the script again.
+
+Usage:
+    python3 add_map_precinct_key.py
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, inspect, text
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from models import Map
+
+INDEX_NAME = 'uq_maps_state_county_precinct_key'
+
+
+def main():
+    """Main execution."""
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+
+    with engine.begin() as conn:
+        print("🔧 Ensuring precinct_key column exists...")
+        columns = {col['name'] for col in inspect(conn).get_columns('maps')}
+        if 'precinct_key' not in columns:
+            conn.execute(text("ALTER TABLE maps ADD COLUMN precinct_key VARCHAR(100)"))
+            print("   ✅ Added precinct_key column")
+        else:
+            print("   ✅ precinct_key column already exists")
+
+        print("🔄 Backfilling precinct keys...")
+        rows = conn.execute(text("SELECT id, precinct FROM maps")).fetchall()
+        for map_id, precinct in rows:
+            conn.execute(text("UPDATE maps SET precinct_key = :precinct_key WHERE id = :id"), {
+                'precinct_key': Map.make_precinct_key(precinct),
+                'id': map_id,
+            })
+        print(f"   ✅ Updated {len(rows)} maps")
+
+        duplicates = conn.execute(text('''
+            SELECT state, county, precinct_key, COUNT(*) AS map_count
+            FROM maps
+            WHERE precinct_key IS NOT NULL
+            GROUP BY state, county, precinct_key
+            HAVING COUNT(*) > 1
+            ORDER BY state, county, precinct_key
+        ''')).fetchall()
+
+    if duplicates:
+        print(f"❌ Found {len(duplicates)} locations with more than one map:")
+        for row in duplicates:
+            print(f"   {row.state} {row.county} precinct {row.precinct_key}: {row.map_count} maps")
+        print("   Remove the extra rows, then run this script again to create the unique index.")
+        sys.exit(1)
+
+    with engine.begin() as conn:
+        print("📇 Creating unique lookup index...")
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON maps (state, county, precinct_key)"
+        ))
+        print(f"   ✅ {INDEX_NAME} ready")
+
+
+if __name__ == '__main__':
+    main()
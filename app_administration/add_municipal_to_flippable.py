@@ -35,6 +35,9 @@ except ImportError:
         print("Run from project root or set DATABASE_URL environment variable")
         sys.exit(1)
 
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+from data_versions import bump_data_version, FLIPPABLE
+
 
 class MunicipalFlippableAdder:
     """Adds municipal races to flippable table with proxy DVA."""
@@ -75,6 +78,16 @@ class MunicipalFlippableAdder:
             else:
                 print("   ✅ race_type column already exists")
     
+    def ensure_metric_columns(self):
+        """Add the persisted assessment columns if they don't exist."""
+        print("🔧 Ensuring assessment columns exist...")
+        
+        with self.engine.begin() as conn:
+            if ensure_flippable_metric_columns(conn):
+                print("   ✅ Added vote_gap, dem_absenteeism, assessment and best_pathway columns")
+            else:
+                print("   ✅ Assessment columns already exist")
+    
     def clear_existing_municipal(self, county=None):
         """Clear existing municipal races from flippable table."""
         print("🗑️  Clearing existing municipal races...")
@@ -92,6 +105,7 @@ class MunicipalFlippableAdder:
                     WHERE race_type = 'municipal'
                 """))
             
+            bump_data_version(conn, FLIPPABLE)
             conn.commit()
             print(f"   ✅ Deleted {result.rowcount} existing municipal race records")
     
@@ -241,6 +255,7 @@ class MunicipalFlippableAdder:
                     )
                     {where_clause}
                 """))
+                bump_data_version(conn, FLIPPABLE)
                 print(f"🗑️  Cleared {result.rowcount} existing municipal races\n")
         
         contests = self.get_municipal_contests(county)
@@ -318,6 +333,12 @@ class MunicipalFlippableAdder:
                     })
                 
                     added += 1
+            
+            # dva_pct_needed is filled in by the trigger, so classify after inserting
+            if not dry_run and added > 0:
+                refreshed = refresh_flippable_metrics(conn, county)
+                print(f"🔄 Refreshed assessment columns for {refreshed} flippable races")
+                bump_data_version(conn, FLIPPABLE)
         
         # Print summary
         print(f"\n{'='*70}")
@@ -392,6 +413,7 @@ def main():
     # Ensure race_type column exists
     if not args.dry_run:
         adder.ensure_race_type_column()
+        adder.ensure_metric_columns()
     
     # Add municipal races (clear_existing handled within method)
     adder.add_municipal_races(
@@ -13,7 +13,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User
-from main import create_app
+from db_app import create_db_app
 
 def backup_users():
     """Backup all users from the database to a JSON file."""
@@ -21,7 +21,7 @@ def backup_users():
     print("=" * 50)
     
     # Create Flask app context
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Worker Boot Report
+==================
+
+Measures what a fresh web worker pays before serving its first request:
+wall time to import main and run create_app(), the slowest imports (from
+python -X importtime), resident memory after boot, and which heavy optional
+packages (Dash, plotly, pandas, numpy, sklearn) were loaded. Run it in a clean
+interpreter after dependency or startup changes and compare with the last run;
+--json output is meant for keeping a history.
+
+Usage:
+    python3 boot_report.py [--top 15] [--request /login] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that should only load when the pages that need them are hit
+HEAVY_MODULES = ['dash', 'plotly', 'pandas', 'numpy', 'sklearn', 'matplotlib']
+
+# Runs in the measured interpreter; prints one JSON line on stdout
+_BOOT_SCRIPT = '''
+import json, sys, time
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+report = {'rss_start_kb': rss_kb()}
+start = time.perf_counter()
+import main
+report['import_main_ms'] = round((time.perf_counter() - start) * 1000, 1)
+start = time.perf_counter()
+app = main.create_app()
+report['create_app_ms'] = round((time.perf_counter() - start) * 1000, 1)
+report['rss_boot_kb'] = rss_kb()
+report['heavy_modules_at_boot'] = sorted(m for m in HEAVY if m in sys.modules)
+
+paths = PATHS
+if paths:
+    client = app.test_client()
+    report['requests'] = []
+    for path in paths:
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        report['requests'].append({'path': path, 'status': status,
+                                   'ms': round((time.perf_counter() - start) * 1000, 1)})
+    report['rss_after_requests_kb'] = rss_kb()
+    report['heavy_modules_after_requests'] = sorted(m for m in HEAVY if m in sys.modules)
+
+print(json.dumps(report))
+'''
+
+
+def parse_importtime(stderr, top=15):
+    """
+    Return the slowest top-level imports from python -X importtime output.
+
+    Args:
+        stderr: The interpreter's stderr
+        top: Number of imports to return
+
+    Returns:
+        List of dicts (module, cumulative_ms, self_ms), slowest first
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        # Nested imports are indented under their parent; keep the top level only
+        if name[1:2] == ' ':
+            continue
+        imports.append({'module': name.strip(), 'cumulative_ms': round(cumulative_us / 1000, 1),
+                        'self_ms': round(self_us / 1000, 1)})
+    imports.sort(key=lambda item: item['cumulative_ms'], reverse=True)
+    return imports[:top]
+
+
+def measure_boot(request_paths=(), top=15, env=None):
+    """
+    Boot the app in a fresh interpreter and report timings, memory and imports.
+
+    Args:
+        request_paths: Paths to GET with the test client after boot
+        top: Number of slowest imports to include
+        env: Environment for the child interpreter (defaults to os.environ)
+
+    Returns:
+        Report dict
+    """
+    script = (_BOOT_SCRIPT
+              .replace('HEAVY', repr(HEAVY_MODULES))
+              .replace('PATHS', repr(list(request_paths))))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"App failed to boot:\n{result.stderr[-4000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['slowest_imports'] = parse_importtime(result.stderr, top)
+    return report
+
+
+def print_report(report):
+    """Print a report in a readable form."""
+    print("🚀 WORKER BOOT REPORT")
+    print("=" * 50)
+    print(f"import main:   {report['import_main_ms']:>8.1f} ms")
+    print(f"create_app():  {report['create_app_ms']:>8.1f} ms")
+    print(f"RSS at start:  {report['rss_start_kb'] / 1024:>8.1f} MB")
+    print(f"RSS after boot:{report['rss_boot_kb'] / 1024:>8.1f} MB")
+    heavy = report['heavy_modules_at_boot']
+    print(f"Heavy modules loaded at boot: {', '.join(heavy) if heavy else 'none'}")
+
+    for request_info in report.get('requests', []):
+        print(f"GET {request_info['path']}: {request_info['status']} in {request_info['ms']:.1f} ms")
+    if 'rss_after_requests_kb' in report:
+        print(f"RSS after requests: {report['rss_after_requests_kb'] / 1024:.1f} MB")
+        heavy = report['heavy_modules_after_requests']
+        print(f"Heavy modules loaded after requests: {', '.join(heavy) if heavy else 'none'}")
+
+    print(f"\n🐢 Slowest top-level imports:")
+    for item in report['slowest_imports']:
+        print(f"   {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description='Report web worker cold start time, memory and imports')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to show')
+    parser.add_argument('--request', action='append', default=[], metavar='PATH',
+                        help='GET this path after boot (repeatable)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = measure_boot(args.request, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,14 +10,14 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User
-from main import create_app
+from db_app import create_db_app
 
 def main():
     """Check existing test users."""
     print("📊 EXISTING TEST USERS REPORT")
     print("=" * 50)
     
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
@@ -11,14 +11,14 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User
-from main import create_app
+from db_app import create_db_app
 
 def main():
     """Delete all test users."""
     print("🗑️  TEST USER CLEANUP SCRIPT")
     print("=" * 40)
     
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
@@ -16,7 +16,7 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User, Map
-from main import create_app
+from db_app import create_db_app
 
 def get_forsyth_precincts():
     """Get all unique precincts in FORSYTH county from the maps table."""
@@ -130,7 +130,7 @@ def main():
     print("=" * 60)
     
     # Create Flask app context
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
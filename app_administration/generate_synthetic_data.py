@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Generate Synthetic NC-Scale Data
+================================
+
+Fills a scratch database with realistic synthetic data at North Carolina
+scale (100 counties, about 2,700 precincts, five general elections, maps of
+about 300 KB, website users) and writes a matching precinct clustering
+results CSV. The same --seed and --scale always produce the same data, so
+benchmark runs against different commits are comparable.
+
+The benchmark accounts bench_admin and bench_county live in the county with
+the most precincts; all synthetic users share the --password.
+
+Never run this against production. It refuses to write into a database that
+already has candidate_vote_results rows unless --replace is given, and
+--replace deletes the users, maps and election tables it fills.
+
+Usage:
+    python3 generate_synthetic_data.py --database-url postgresql://localhost/precinct_bench
+    python3 generate_synthetic_data.py --database-url sqlite:///bench.db --scale 0.1 --replace
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path to import project modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description='Generate synthetic NC-scale data for load testing')
+    parser.add_argument('--database-url', required=True,
+                        help='Scratch database to fill (never production)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Fraction of full NC scale (1.0 = about 2,700 precincts)')
+    parser.add_argument('--seed', type=int, default=2024, help='Random seed')
+    parser.add_argument('--map-size', type=int, default=300,
+                        help='Approximate map HTML size in KB')
+    parser.add_argument('--map-encoding', default='gzip', choices=['gzip', 'br', 'zstd', 'none'],
+                        help='Content-Encoding maps are stored with')
+    parser.add_argument('--users-per-county', type=int, default=25, help='Website users per county')
+    parser.add_argument('--password', default='synthetic-password',
+                        help='Password of every synthetic user')
+    parser.add_argument('--clustering-csv', default=os.path.join(PROJECT_ROOT, 'synthetic_clustering_results.csv'),
+                        help='Where to write the precinct clustering results CSV')
+    parser.add_argument('--replace', action='store_true',
+                        help='Delete existing rows in the tables being filled first')
+    args = parser.parse_args()
+
+    # Build the engine directly: app configuration (and .env) may point at production
+    from sqlalchemy import create_engine
+    from werkzeug.security import generate_password_hash
+    from models import db
+    from synthetic_data_utils import load_synthetic_data
+
+    engine = create_engine(args.database_url)
+    print(f"🏗️  Generating synthetic data in {engine.url.render_as_string(hide_password=True)} "
+          f"(scale {args.scale}, seed {args.seed})")
+    start = time.time()
+    db.metadata.create_all(engine)
+    try:
+        with engine.begin() as conn:
+            summary = load_synthetic_data(
+                conn,
+                password_hash=generate_password_hash(args.password),
+                scale=args.scale,
+                seed=args.seed,
+                map_bytes=args.map_size * 1024,
+                map_encoding=None if args.map_encoding == 'none' else args.map_encoding,
+                users_per_county=args.users_per_county,
+                clustering_csv=args.clustering_csv,
+                replace=args.replace,
+                progress=lambda message: print(f"   {message}"),
+            )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for table, count in summary.items():
+        print(f"✓ {table}: {count:,}")
+    print(f"✓ Clustering results written to {args.clustering_csv}")
+    print(f"✓ Done in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
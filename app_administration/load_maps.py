@@ -7,10 +7,15 @@ and loads them into the NC database maps table. The precinct number is extracted
 from the first three characters of the filename, and all maps are set to 
 county='FORSYTH' and state='NC'.
 
+Maps are stored precompressed (brotli/zstd when installed, otherwise gzip) so
+the web app can send them with Content-Encoding instead of compressing or
+shipping raw HTML on every request. Use --uncompressed to store plain HTML.
+
 Usage:
-    python load_maps.py
+    python load_maps.py [--uncompressed]
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -22,6 +27,8 @@ sys.path.insert(0, str(project_root))
 
 from config import Config
 from models import db, Map
+from compression_utils import preferred_encoding
+from data_versions import bump_data_version, MAPS
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -69,9 +76,12 @@ def load_html_file(filepath):
     with open(filepath, 'r', encoding='utf-8') as file:
         return file.read()
 
-def load_maps_into_database():
+def load_maps_into_database(compressed=True):
     """
     Scan the static_html directory and load all HTML files into the maps table.
+    
+    Args:
+        compressed (bool): Store maps precompressed rather than as plain HTML
     """
     # Path to the static_html directory (restored from git)
     html_dir = project_root / 'static_html'
@@ -112,12 +122,12 @@ def load_maps_into_database():
             existing_map = session.query(Map).filter_by(
                 state='NC',
                 county='FORSYTH',
-                precinct=precinct
+                precinct_key=Map.make_precinct_key(precinct)
             ).first()
             
             if existing_map:
                 # Update existing map
-                existing_map.map = html_content
+                existing_map.set_content(html_content, compressed=compressed)
                 print(f"Updated map for precinct {precinct} from {html_file.name}")
                 updated_count += 1
             else:
@@ -125,9 +135,9 @@ def load_maps_into_database():
                 new_map = Map(
                     state='NC',
                     county='FORSYTH',
-                    precinct=precinct,
-                    map=html_content
+                    precinct=precinct
                 )
+                new_map.set_content(html_content, compressed=compressed)
                 session.add(new_map)
                 print(f"Loaded new map for precinct {precinct} from {html_file.name}")
                 loaded_count += 1
@@ -139,6 +149,8 @@ def load_maps_into_database():
     
     # Commit all changes
     try:
+        if loaded_count or updated_count:
+            bump_data_version(session, MAPS)
         session.commit()
         print(f"\nDatabase updated successfully!")
         print(f"Maps loaded: {loaded_count}")
@@ -182,14 +194,20 @@ def list_current_maps():
 
 def main():
     """Main function to load maps and display results."""
+    parser = argparse.ArgumentParser(description='Load precinct map HTML files into the maps table')
+    parser.add_argument('--uncompressed', action='store_true',
+                        help='Store plain HTML instead of precompressed maps')
+    args = parser.parse_args()
+    
     print("Map Loading Script for NC Database")
     print("=" * 40)
     print(f"HTML Directory: {project_root / 'static_html'}")
     print(f"Target: NC Database - Forsyth County")
+    print(f"Storage: {'plain HTML' if args.uncompressed else preferred_encoding() + ' precompressed'}")
     print()
     
     # Load maps into database
-    success = load_maps_into_database()
+    success = load_maps_into_database(compressed=not args.uncompressed)
     
     if success:
         # List current maps for verification
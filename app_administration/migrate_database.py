@@ -14,13 +14,13 @@ Make sure to backup your database before running this migration!
 import os
 import sys
 from datetime import datetime
-from main import create_app
+from db_app import create_db_app
 from models import db
 
 def run_migration():
     """Run database migration to add updated_at column to maps table."""
     
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
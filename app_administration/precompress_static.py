@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Precompress Static Assets
+=========================
+
+Build step for static/: writes .br/.zst/.gz copies of compressible files
+(CSS, JS, SVG, JSON, ...) at maximum compression and a content-hash manifest
+(static/.asset-manifest.json). The web app then serves the precompressed copy
+matching the client's Accept-Encoding, and url_for('static', ...) adds
+?v=<hash> so browsers can cache those URLs for a year.
+
+Run after every deploy that changes static/. Files changed after the last
+build are still served, just uncompressed and without far-future caching.
+
+Usage:
+    python3 precompress_static.py [--static-dir DIR] [--min-size 1024]
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import project modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from compression_utils import available_encodings
+from services.response_compression import VARIANT_EXTENSIONS, build_static_assets
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description='Precompress static assets and write the asset manifest')
+    parser.add_argument('--static-dir', default=os.path.join(PROJECT_ROOT, 'static'),
+                        help='Static folder (default: static/)')
+    parser.add_argument('--min-size', type=int, default=1024,
+                        help='Smallest file in bytes worth precompressing')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.static_dir):
+        print(f"❌ Static folder not found: {args.static_dir}")
+        sys.exit(1)
+
+    print(f"📦 Precompressing {args.static_dir} ({', '.join(available_encodings())})")
+    manifest = build_static_assets(args.static_dir, min_size=args.min_size)
+
+    original_total = compressed_total = 0
+    for filename, entry in sorted(manifest.items()):
+        if not entry['encodings']:
+            continue
+        sizes = []
+        for encoding in entry['encodings']:
+            size = os.path.getsize(os.path.join(args.static_dir, filename + VARIANT_EXTENSIONS[encoding]))
+            sizes.append(f"{encoding} {size:,}")
+        original_total += entry['size']
+        compressed_total += os.path.getsize(
+            os.path.join(args.static_dir, filename + VARIANT_EXTENSIONS[entry['encodings'][0]]))
+        print(f"   {filename}: {entry['size']:,} bytes -> {', '.join(sizes)}")
+
+    precompressed = sum(1 for entry in manifest.values() if entry['encodings'])
+    print(f"✓ {len(manifest)} files in manifest, {precompressed} precompressed")
+    if original_total:
+        print(f"✓ {original_total:,} bytes -> {compressed_total:,} bytes with the best encoding")
+
+
+if __name__ == '__main__':
+    main()
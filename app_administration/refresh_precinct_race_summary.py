@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Refresh Precinct Race Summary
+=============================
+
+Creates the precinct_race_summary table if needed and rebuilds it from
+candidate_vote_results. The clustering insights (race win percentage and
+election date range) read this table instead of aggregating the vote results
+on every page view, so run this script after every load or restore of
+candidate_vote_results.
+
+Usage:
+    python3 refresh_precinct_race_summary.py [--county COUNTY]
+"""
+
+import argparse
+import os
+import sys
+from sqlalchemy import create_engine
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from race_summary_utils import ensure_precinct_race_summary_table, refresh_precinct_race_summary
+from data_versions import bump_data_version, VOTE_RESULTS
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(
+        description='Rebuild the precinct_race_summary table from candidate_vote_results'
+    )
+    parser.add_argument(
+        '--county',
+        help='Only refresh a specific county (e.g., FORSYTH)',
+        type=str
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+
+    with engine.begin() as conn:
+        print("🔧 Ensuring precinct_race_summary table exists...")
+        ensure_precinct_race_summary_table(conn)
+        print("   ✅ precinct_race_summary ready")
+
+        print("🔄 Summarizing vote results by precinct...")
+        written = refresh_precinct_race_summary(conn, county=args.county)
+        print(f"   ✅ Wrote {written} precinct summaries")
+        bump_data_version(conn, VOTE_RESULTS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Replay Production Traffic
+=========================
+
+Parses flask.log and gunicorn access logs into the request mix per route and
+user role, then replays that mix against a local instance at a configurable
+concurrency and reports throughput, latency percentiles and error rates per
+endpoint. Only GET and HEAD requests are replayed, and never /logout.
+
+Replayed requests log in as real accounts. Regular user traffic is spread
+over the seeded test users from create_test_users.py (test001, test002, ...
+with password <username>!123); county and admin traffic needs --county-login
+and --admin-login, and is left out of the replay without them. Logs don't
+record roles, so each client's role is inferred from the pages it loaded
+(see traffic_replay_utils).
+
+Run the target with FLASK_ENV=development (secure cookies are not sent over
+plain http) and RATELIMIT_ENABLED=false, or the per-IP rate limits answer
+most of the replay with 429s. Never point this at production.
+
+Usage:
+    python3 replay_traffic.py ../flask.log /var/log/gunicorn/access.log --mix-only
+    python3 replay_traffic.py access.log --save-mix mix.json --mix-only
+    python3 replay_traffic.py --mix mix.json --base-url http://127.0.0.1:5000 --concurrency 16 --duration 60
+    python3 replay_traffic.py access.log --requests 5000 --county-login bench_county:secret --json report.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+# Add parent directory to path to import project modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+CSRF_TOKEN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+def test_user_logins(count):
+    """Credentials of the first seeded test users (see create_test_users.py)."""
+    return [(f'test{number:03d}', f'test{number:03d}!123') for number in range(1, count + 1)]
+
+
+def parse_login(value):
+    """USERNAME:PASSWORD argument."""
+    username, sep, password = value.partition(':')
+    if not sep or not username:
+        raise argparse.ArgumentTypeError('expected USERNAME:PASSWORD')
+    return username, password
+
+
+def log_in(base_url, username, password, timeout):
+    """Log in through the login form; return the session cookies, or None if the login failed."""
+    import requests
+
+    session = requests.Session()
+    page = session.get(f'{base_url}/login', timeout=timeout)
+    match = CSRF_TOKEN.search(page.text)
+    form = {'username': username, 'password': password}
+    if match:
+        form['csrf_token'] = match.group(1)
+    response = session.post(f'{base_url}/login', data=form, allow_redirects=False, timeout=timeout)
+    if response.status_code != 302 or '/login' in response.headers.get('Location', ''):
+        return None
+    return session.cookies.get_dict()
+
+
+def build_url_map():
+    """The app's URL map, from an app built with the testing configuration."""
+    os.environ['FLASK_ENV'] = 'testing'
+    from main import create_app
+    return create_app().url_map
+
+
+def main():
+    """Main execution."""
+    parser = argparse.ArgumentParser(description='Replay the logged traffic mix against a local instance')
+    parser.add_argument('logs', nargs='*', help='flask.log and/or gunicorn access logs')
+    parser.add_argument('--mix', help='Load a traffic mix saved with --save-mix instead of parsing logs')
+    parser.add_argument('--save-mix', help='Write the traffic mix to this JSON file')
+    parser.add_argument('--mix-only', action='store_true', help='Print the traffic mix and exit')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='Instance to replay against')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent workers')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests to replay')
+    parser.add_argument('--duration', type=float,
+                        help='Seconds to run, cycling through the drawn requests (overrides --requests)')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for drawing requests')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--test-users', type=int, default=5,
+                        help='Seeded test users (test001...) that regular user traffic is spread over')
+    parser.add_argument('--county-login', type=parse_login, action='append', default=[],
+                        metavar='USERNAME:PASSWORD', help='County coordinator account (repeatable)')
+    parser.add_argument('--admin-login', type=parse_login, action='append', default=[],
+                        metavar='USERNAME:PASSWORD', help='Admin account (repeatable)')
+    parser.add_argument('--exclude-endpoint', action='append', default=[],
+                        help='Endpoint not to replay (repeatable; logout is always excluded)')
+    parser.add_argument('--json', help='Write the summary to this JSON file')
+    args = parser.parse_args()
+
+    from traffic_replay_utils import (DEFAULT_EXCLUDED_ENDPOINTS, build_traffic_mix, format_mix, format_summary,
+                                      plan_requests, read_access_logs, run_replay, summarize_results)
+
+    if args.mix:
+        with open(args.mix) as f:
+            mix = json.load(f)
+    elif args.logs:
+        print(f"📦 Parsing {len(args.logs)} log file(s)...")
+        exclude = DEFAULT_EXCLUDED_ENDPOINTS | set(args.exclude_endpoint)
+        mix = build_traffic_mix(read_access_logs(args.logs), build_url_map(), exclude_endpoints=exclude)
+    else:
+        parser.error('give access logs or --mix')
+
+    if not mix['requests']:
+        print("❌ No replayable requests found")
+        sys.exit(1)
+    print(format_mix(mix))
+    if args.save_mix:
+        with open(args.save_mix, 'w') as f:
+            json.dump(mix, f, indent=2)
+        print(f"✓ Traffic mix saved to {args.save_mix}")
+    if args.mix_only:
+        return
+
+    import requests
+
+    base_url = args.base_url.rstrip('/')
+    logins = {
+        'user': test_user_logins(args.test_users),
+        'county': args.county_login,
+        'admin': args.admin_login,
+    }
+    accounts = {'anonymous': [{}]}
+    print(f"\n🔑 Logging in to {base_url}...")
+    for role, credentials in logins.items():
+        cookies = []
+        for username, password in credentials:
+            session_cookies = log_in(base_url, username, password, args.timeout)
+            if session_cookies is None:
+                print(f"   ❌ Could not log in as {username}")
+            else:
+                cookies.append(session_cookies)
+        if cookies:
+            accounts[role] = cookies
+            print(f"   ✓ {role}: {len(cookies)} account(s)")
+
+    skipped_roles = sorted({group['role'] for group in mix['groups']} - set(accounts))
+    if skipped_roles:
+        print(f"   ⚠️  No accounts for {', '.join(skipped_roles)}; that traffic is left out")
+
+    plan = plan_requests(mix, args.requests, seed=args.seed, roles=accounts)
+    if not plan:
+        print("❌ Nothing to replay")
+        sys.exit(1)
+
+    # One requests.Session per worker and role; a worker always uses the same account
+    sessions = {}
+
+    def send(worker, role, target):
+        session = sessions.get((worker, role))
+        if session is None:
+            session = requests.Session()
+            role_accounts = accounts[role]
+            session.cookies.update(role_accounts[worker % len(role_accounts)])
+            sessions[(worker, role)] = session
+        response = session.get(f'{base_url}{target}', allow_redirects=False, timeout=args.timeout)
+        return response.status_code
+
+    how_long = f"{args.duration:g}s" if args.duration else f"{len(plan)} requests"
+    print(f"\n🏗️  Replaying {how_long} at concurrency {args.concurrency}...")
+    results, elapsed = run_replay(plan, send, concurrency=args.concurrency, duration=args.duration)
+    summary = summarize_results(results, elapsed)
+
+    print(f"\n📊 {len(results)} requests in {elapsed:.1f}s\n")
+    print(format_summary(summary))
+    for error, count in summary['transport_errors'].items():
+        print(f"   ❌ {count}x {error}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'base_url': base_url, 'concurrency': args.concurrency, 'seed': args.seed,
+                       'summary': summary}, f, indent=2)
+        print(f"\n✓ Summary saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
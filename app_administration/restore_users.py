@@ -13,7 +13,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import db, User
-from main import create_app
+from db_app import create_db_app
 
 def list_available_backups():
     """List all available backup files and let user choose."""
@@ -105,7 +105,7 @@ def restore_users(users_data, clear_existing=True):
     print("=" * 50)
     
     # Create Flask app context
-    app = create_app()
+    app = create_db_app()
     
     with app.app_context():
         try:
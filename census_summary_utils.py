@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Census Tract Cluster Summary Utilities
+======================================
+
+This module turns census tract clustering results into the compact per-county
+summary served by the demographic clustering page: tract counts and ranges,
+cluster sizes and centroids for each clustering dimension, silhouette scores
+and the high-opportunity counts used for targeting. census_tract_clustering.py
+writes the summary next to its results CSV, so the web app only reads a small
+JSON file instead of aggregating the tract data on every page view.
+
+Usage:
+    from census_summary_utils import build_county_summaries, write_summary_artifact
+
+    summaries = build_county_summaries(rows, silhouette_scores)
+    write_summary_artifact(summaries, 'census_tract_clustering_summary.json')
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+SUMMARY_FILENAME = 'census_tract_clustering_summary.json'
+
+STATE_NAMES = {'NC': 'North Carolina'}
+
+# Tracts above this quantile of a county count as high-opportunity
+HIGH_OPPORTUNITY_QUANTILE = 0.8
+
+# Clustering dimension -> (cluster column, centroid metric, centroid key, scale, digits)
+DIMENSIONS = {
+    'population_housing': ('population_cluster', 'total_population', 'avg_pop', 1, 0),
+    'economic': ('economic_cluster', 'median_income', 'avg_income', 1, 0),
+    'education': ('education_cluster', 'education_rate', 'education_rate', 100, 1),
+    'geographic': ('geographic_cluster', 'latitude', 'latitude', 1, 3),
+}
+
+# Cluster descriptions by centroid rank: (highest, upper half, lower half, lowest)
+DESCRIPTIONS = {
+    'population_housing': ('Highest population', 'Higher population', 'Lower population', 'Lowest population'),
+    'economic': ('Highest income', 'Upper-middle income', 'Lower-middle income', 'Lowest income'),
+    'education': ('Most educated', 'Higher education rate', 'Lower education rate', 'Least educated'),
+    'geographic': ('Northernmost area', 'Northern area', 'Southern area', 'Southernmost area'),
+}
+
+TARGETING_STRATEGIES = {
+    'education': {
+        'category': 'High-Education Areas',
+        'strategy': 'Policy-focused messaging, detailed position papers',
+        'demographics': 'Likely engaged voters, responsive to complex issues',
+    },
+    'income': {
+        'category': 'High-Income Areas',
+        'strategy': 'Economic stability messaging, tax policy focus',
+        'demographics': 'Homeowners, established community members',
+    },
+    'remote_work': {
+        'category': 'Remote Work Hotspots',
+        'strategy': 'Technology policy, work-life balance issues',
+        'demographics': 'Professional class, flexible schedules',
+    },
+}
+
+
+def _number(value: Any) -> Optional[float]:
+    """Return value as a float, or None for blanks and NaN."""
+    if value is None or value == '':
+        return None
+    number = float(value)
+    return None if number != number else number
+
+
+def _values(rows: List[Dict[str, Any]], column: str) -> List[float]:
+    return [v for v in (_number(row.get(column)) for row in rows) if v is not None]
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _quantile(values: List[float], q: float) -> Optional[float]:
+    """Linearly interpolated quantile (pandas' default)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _above_quantile(rows: List[Dict[str, Any]], column: str) -> List[Dict[str, Any]]:
+    """Rows strictly above the county's high-opportunity quantile for column."""
+    threshold = _quantile(_values(rows, column), HIGH_OPPORTUNITY_QUANTILE)
+    if threshold is None:
+        return []
+    return [row for row in rows if (_number(row.get(column)) or 0) > threshold]
+
+
+def _describe(rank: int, count: int, is_largest: bool, descriptions) -> str:
+    """Plain-language description of a cluster from its centroid rank (0 = highest)."""
+    highest, upper, lower, lowest = descriptions
+    if count == 1:
+        description = 'All tracts'
+    elif rank == 0:
+        description = highest
+    elif rank == count - 1:
+        description = lowest
+    elif rank < count / 2:
+        description = upper
+    else:
+        description = lower
+    return f'{description} (largest cluster)' if is_largest else description
+
+
+def _dimension_summary(rows, cluster_column, metric, key, scale, digits, descriptions, silhouette):
+    clusters = {}
+    for row in rows:
+        cluster_id = _number(row.get(cluster_column))
+        if cluster_id is not None:
+            clusters.setdefault(int(cluster_id), []).append(row)
+    if not clusters:
+        return None
+
+    centroids = {}
+    for cluster_id, members in clusters.items():
+        centroid = _mean(_values(members, metric))
+        centroids[cluster_id] = None if centroid is None else round(centroid * scale, digits)
+
+    ranked = sorted(clusters, key=lambda cid: -(centroids[cid] if centroids[cid] is not None else float('-inf')))
+    largest = max(clusters, key=lambda cid: len(clusters[cid]))
+
+    distribution = []
+    for cluster_id in sorted(clusters):
+        centroid = centroids[cluster_id]
+        distribution.append({
+            'id': cluster_id,
+            'tracts': len(clusters[cluster_id]),
+            key: int(centroid) if digits == 0 and centroid is not None else centroid,
+            'description': _describe(ranked.index(cluster_id), len(clusters),
+                                     cluster_id == largest, descriptions),
+        })
+
+    return {
+        'clusters': len(clusters),
+        'silhouette_score': None if silhouette is None else round(silhouette, 3),
+        'distribution': distribution,
+    }
+
+
+def build_county_summary(county: str, rows: List[Dict[str, Any]],
+                         silhouette_scores: Optional[Dict[str, float]] = None,
+                         analysis_date: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Summarize one county's census tract clustering results.
+
+    Args:
+        county: County name (as stored in the results)
+        rows: The county's result rows (dicts keyed by results CSV column)
+        silhouette_scores: Optional dimension -> silhouette score for this county
+        analysis_date: When the clustering was run (defaults to now)
+
+    Returns:
+        Summary dict in the shape the demographic clustering template expects
+    """
+    silhouette_scores = silhouette_scores or {}
+    analysis_date = analysis_date or datetime.now()
+    populations = _values(rows, 'total_population')
+    incomes = _values(rows, 'median_income')
+    state = rows[0].get('state') if rows else None
+
+    summary = {
+        'overview': {
+            'total_tracts': len(rows),
+            'county': county.title(),
+            'state': STATE_NAMES.get(state, state),
+            'population_range': {'min': int(min(populations, default=0)), 'max': int(max(populations, default=0))},
+            'income_range': {'min': int(min(incomes, default=0)), 'max': int(max(incomes, default=0))},
+            'analysis_date': f"{analysis_date:%B} {analysis_date.day}, {analysis_date.year}",
+        },
+    }
+
+    for dimension, (cluster_column, metric, key, scale, digits) in DIMENSIONS.items():
+        summary[dimension] = _dimension_summary(rows, cluster_column, metric, key, scale, digits,
+                                                DESCRIPTIONS[dimension], silhouette_scores.get(dimension))
+
+    # Flag the dimension with the clearest separation
+    scored = [d for d in DIMENSIONS if summary[d] and summary[d]['silhouette_score'] is not None]
+    best = max(scored, key=lambda d: summary[d]['silhouette_score']) if scored else None
+    for dimension in DIMENSIONS:
+        if summary[dimension]:
+            summary[dimension]['best'] = dimension == best
+
+    high_income = _above_quantile(rows, 'median_income')
+    remote_work = _above_quantile(rows, 'remote_work_rate')
+    high_education = _above_quantile(rows, 'education_rate')
+    high_density = _above_quantile(rows, 'population_density')
+
+    strategies = []
+    education = summary['education']
+    if education:
+        top = max(education['distribution'], key=lambda c: c['education_rate'] or 0)
+        strategies.append(dict(TARGETING_STRATEGIES['education'], tracts=top['tracts'], rate=top['education_rate']))
+    economic = summary['economic']
+    if economic:
+        top = max(economic['distribution'], key=lambda c: c['avg_income'] or 0)
+        strategies.append(dict(TARGETING_STRATEGIES['income'], tracts=top['tracts'], income=top['avg_income']))
+    if remote_work:
+        strategies.append(dict(TARGETING_STRATEGIES['remote_work'], tracts=len(remote_work)))
+
+    summary['strategic_insights'] = {
+        'high_opportunity': {
+            'high_income_tracts': len(high_income),
+            'remote_work_hotspots': len(remote_work),
+            'highly_educated_areas': len(high_education),
+            'high_density_tracts': len(high_density),
+        },
+        'targeting_strategies': strategies,
+    }
+    return summary
+
+
+def build_county_summaries(rows: Iterable[Dict[str, Any]],
+                           silhouette_scores: Optional[Dict[str, Dict[str, float]]] = None,
+                           analysis_date: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize census tract clustering results for every county.
+
+    Args:
+        rows: Result rows (dicts keyed by results CSV column)
+        silhouette_scores: Optional county -> {dimension: score}
+        analysis_date: When the clustering was run (defaults to now)
+
+    Returns:
+        Dict of upper-case county name -> summary
+    """
+    silhouette_scores = silhouette_scores or {}
+    by_county = {}
+    for row in rows:
+        county = str(row.get('county') or '').strip()
+        if county:
+            by_county.setdefault(county, []).append(row)
+    return {
+        county.upper(): build_county_summary(county, county_rows,
+                                             silhouette_scores.get(county) or silhouette_scores.get(county.upper()),
+                                             analysis_date)
+        for county, county_rows in by_county.items()
+    }
+
+
+def write_summary_artifact(summaries: Dict[str, Dict[str, Any]], filename: str = SUMMARY_FILENAME) -> None:
+    """
+    Atomically write the summary artifact so readers never see a partial file.
+
+    Args:
+        summaries: Output of build_county_summaries()
+        filename: Artifact path
+    """
+    artifact = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'counties': summaries,
+    }
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(artifact, f, indent=2, sort_keys=True)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filename)
+    except Exception:
+        os.unlink(temp_path)
+        raise
@@ -28,6 +28,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
+from census_summary_utils import SUMMARY_FILENAME, build_county_summaries, write_summary_artifact
+from data_versions import bump_data_version, CLUSTERING
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -157,6 +159,7 @@ class CensusTractClusteringAnalysis:
         self.population_clusters = {
             'model': kmeans,
             'features': features,
+            'scaled': scaled_data,
             'silhouette': silhouette,
             'calinski': calinski
         }
@@ -210,6 +213,7 @@ class CensusTractClusteringAnalysis:
         self.economic_clusters = {
             'model': kmeans,
             'features': features,
+            'scaled': scaled_data,
             'silhouette': silhouette,
             'calinski': calinski
         }
@@ -263,6 +267,7 @@ class CensusTractClusteringAnalysis:
         self.education_clusters = {
             'model': kmeans,
             'features': features,
+            'scaled': scaled_data,
             'silhouette': silhouette,
             'calinski': calinski
         }
@@ -313,6 +318,7 @@ class CensusTractClusteringAnalysis:
         self.geographic_clusters = {
             'model': kmeans,
             'features': features,
+            'scaled': scaled_data,
             'silhouette': silhouette,
             'calinski': calinski
         }
@@ -479,6 +485,49 @@ class CensusTractClusteringAnalysis:
         export_data.to_csv(filename, index=False)
         
         print(f"✅ Exported {len(export_data)} census tracts with {len(cluster_columns)} clustering results")
+    
+    def county_silhouette_scores(self):
+        """Silhouette score of each clustering dimension within each county.
+        
+        Clusters are fit across all loaded tracts; a county gets a score for a
+        dimension only when its tracts fall into at least two clusters.
+        """
+        dimensions = {
+            'population_housing': ('population_cluster', self.population_clusters),
+            'economic': ('economic_cluster', self.economic_clusters),
+            'education': ('education_cluster', self.education_clusters),
+            'geographic': ('geographic_cluster', self.geographic_clusters),
+        }
+        scores = {}
+        for county, group in self.census_data.groupby('county'):
+            mask = (self.census_data['county'] == county).values
+            county_scores = {}
+            for dimension, (column, results) in dimensions.items():
+                if not results:
+                    continue
+                labels = group[column]
+                if 2 <= labels.nunique() < len(labels):
+                    county_scores[dimension] = float(silhouette_score(results['scaled'][mask], labels))
+            scores[county] = county_scores
+        return scores
+    
+    def export_summary(self, filename=SUMMARY_FILENAME):
+        """Export the per-county summary served by the demographic clustering page."""
+        print(f"\n💾 Exporting county summaries to {filename}...")
+        
+        if self.census_data is None:
+            print("❌ No data to export. Run load_census_data() first.")
+            return
+        
+        summaries = build_county_summaries(self.census_data.to_dict('records'),
+                                           self.county_silhouette_scores())
+        write_summary_artifact(summaries, filename)
+        
+        # Tell the web workers to reload the census results and summary
+        with self.engine.begin() as conn:
+            bump_data_version(conn, CLUSTERING)
+        
+        print(f"✅ Exported summaries for {len(summaries)} counties")
 
 
 def main():
@@ -508,10 +557,12 @@ def main():
     
     # Export results
     analyzer.export_results()
+    analyzer.export_summary()
     
     print("\n✅ Census tract clustering analysis complete!")
     print("\nNext steps:")
     print("- Review census_tract_clustering_results.csv for detailed data")
+    print("- Open /demographic-clustering to see each county's summary")
     print("- Use clusters to understand demographic patterns")
     print("- Target specific demographic profiles for campaigns")
     print("- Analyze geographic clustering for regional strategies")
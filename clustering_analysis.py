@@ -33,6 +33,7 @@ from models import db
 from dotenv import load_dotenv
 from sqlalchemy import text
 from precinct_utils import normalize_precinct_id, normalize_precinct_join
+from data_versions import bump_data_version, CLUSTERING
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -588,6 +589,11 @@ class PrecinctClusteringAnalysis:
             data = self.comprehensive_results['data']
             data.to_csv(filename, index=False)
             print(f"✅ Exported {len(data)} precincts with comprehensive clustering")
+            
+            # Tell the web workers to drop their cached copy of the results
+            with self.app.app_context():
+                bump_data_version(db.session, CLUSTERING)
+                db.session.commit()
         else:
             print("❌ No comprehensive results to export. Run create_comprehensive_clusters() first.")
         
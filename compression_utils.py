@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+HTTP Compression Utilities
+==========================
+
+This module centralizes the Content-Encoding formats used for precompressed
+content (precinct maps stored in the database, built static assets) and for
+compressing responses on the fly. gzip is always available; brotli and zstd
+are used when the optional `brotli` / `zstandard` packages are installed.
+
+Usage:
+    from compression_utils import compress, decompress, preferred_encoding, accepts_encoding
+
+    encoding = preferred_encoding()
+    data = compress(html, encoding)
+    html = decompress(data, encoding).decode('utf-8')
+
+    # Per-request: fast levels, encoding negotiated from Accept-Encoding
+    encoding = negotiate_encoding(request.accept_encodings)
+    body = compress(body, encoding, level=DYNAMIC_LEVELS[encoding])
+"""
+
+import gzip
+from typing import List, Optional, Union
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+ZSTD_LEVEL = 19
+
+# Levels for compressing responses per request, where latency matters more
+# than the last few percent of size
+DYNAMIC_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+
+def available_encodings() -> List[str]:
+    """Return the encodings this process can produce, best compression first."""
+    encodings = []
+    if BROTLI_AVAILABLE:
+        encodings.append('br')
+    if ZSTD_AVAILABLE:
+        encodings.append('zstd')
+    encodings.append('gzip')
+    return encodings
+
+
+def preferred_encoding() -> str:
+    """Return the best available encoding for storing precompressed content."""
+    return available_encodings()[0]
+
+
+def compress(data: Union[str, bytes], encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress data with a Content-Encoding format.
+
+    Args:
+        data: Text (encoded as UTF-8) or bytes to compress
+        encoding: 'br', 'zstd' or 'gzip'
+        level: Compression level/quality (defaults to the maximum-ratio
+            storage level for the encoding)
+
+    Returns:
+        Compressed bytes
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    if encoding == 'gzip':
+        # mtime=0 keeps the output deterministic for identical input
+        return gzip.compress(data, compresslevel=level or GZIP_LEVEL, mtime=0)
+    if encoding == 'br' and BROTLI_AVAILABLE:
+        return brotli.compress(data, quality=level or BROTLI_QUALITY)
+    if encoding == 'zstd' and ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=level or ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Reverse compress() for the given encoding."""
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'br' and BROTLI_AVAILABLE:
+        return brotli.decompress(data)
+    if encoding == 'zstd' and ZSTD_AVAILABLE:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def accepts_encoding(accept_encodings, encoding: Optional[str]) -> bool:
+    """
+    Check whether a client accepts an encoding.
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+        encoding: Content-Encoding to check
+
+    Returns:
+        True if the client lists the encoding with a non-zero quality
+    """
+    if not encoding:
+        return False
+    return accept_encodings.quality(encoding) > 0
+
+
+def negotiate_encoding(accept_encodings, encodings: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Pick the Content-Encoding to send a client.
+
+    Args:
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+        encodings: Candidate encodings in server preference order
+            (defaults to available_encodings())
+
+    Returns:
+        The candidate with the highest client quality (ties go to the
+        server's order), or None if the client accepts none of them
+    """
+    best, best_quality = None, 0
+    for encoding in available_encodings() if encodings is None else encodings:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
@@ -3,6 +3,7 @@ Flask application configuration settings.
 """
 
 import os
+import tempfile
 from datetime import timedelta
 
 
@@ -34,6 +35,10 @@ class Config:
     PERMANENT_SESSION_LIFETIME = timedelta(hours=4)  # 4 hour sessions
     SESSION_TIMEOUT_MINUTES = 30  # Session timeout after 30 minutes of inactivity
     SESSION_WARNING_MINUTES = 5   # Warn user 5 minutes before timeout
+    # Record activity at most once per this many seconds; in between, requests
+    # leave the session (and its cookie) unchanged
+    SESSION_ACTIVITY_GRANULARITY_SECONDS = int(os.environ.get('SESSION_ACTIVITY_GRANULARITY_SECONDS', 60))
+    SESSION_REFRESH_EACH_REQUEST = False  # Only send the session cookie when it changes
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
@@ -48,6 +53,31 @@ class Config:
     
     # Application Specific Settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
+    MAP_CACHE_MAX_BYTES = int(os.environ.get('MAP_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # Per-process map HTML cache budget
+    DATA_VERSION_POLL_SECONDS = float(os.environ.get('DATA_VERSION_POLL_SECONDS', 5))  # data_versions re-read interval without LISTEN
+    DOC_SEARCH_INDEX_PATH = os.environ.get('DOC_SEARCH_INDEX_PATH')  # Defaults to instance/doc_search.db
+    RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True').lower() == 'true'
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024))  # Smaller bodies are sent as-is
+    STATIC_ASSET_MAX_AGE = int(os.environ.get('STATIC_ASSET_MAX_AGE', 365 * 24 * 3600))  # For versioned (?v=hash) static URLs
+    
+    # Per-request SQL/render timing (Server-Timing header) and slow-query log
+    REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'False').lower() == 'true'
+    REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', 1.0))  # Fraction of requests timed
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 250))
+    SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH')  # Defaults to instance/slow_queries.log
+    
+    # Prometheus metrics at /metrics (admins or localhost); workers share totals in a SQLite file
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_MULTIPROCESS = os.environ.get('METRICS_MULTIPROCESS', 'True').lower() == 'true'
+    METRICS_DB_PATH = os.environ.get('METRICS_DB_PATH')  # Defaults to instance/metrics.db
+    METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+    
+    # On-demand profiling of single requests carrying an admin-issued signed token
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'False').lower() == 'true'  # Opt-in outside development
+    PROFILER_DIR = os.environ.get('PROFILER_DIR')  # Defaults to instance/profiles
+    PROFILER_MAX_PROFILES = int(os.environ.get('PROFILER_MAX_PROFILES', 50))  # Oldest profiles are dropped
+    PROFILER_TOKEN_MAX_AGE = int(os.environ.get('PROFILER_TOKEN_MAX_AGE', 3600))  # Seconds a profile link stays valid
+    PROFILER_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILER_SAMPLE_INTERVAL_MS', 2))
     
     # Default Admin User Configuration
     DEFAULT_ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
@@ -55,7 +85,8 @@ class Config:
     DEFAULT_ADMIN_PASSWORD = os.environ.get('SECRET', '!1OkslCZtBBPCHRG!')  # Use SECRET env var
     
     # Rate Limiting Configuration
-    RATELIMIT_STORAGE_URL = "memory://"  # Use in-memory storage for rate limiting
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() == 'true'  # Off only for local load tests
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', "memory://")  # Per-process in-memory storage
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"  # Default rate limits
     
     # PostgreSQL is the only database on hosting platform
@@ -72,6 +103,8 @@ class DevelopmentConfig(Config):
     # Less secure cookies for development
     SESSION_COOKIE_SECURE = False
     REMEMBER_COOKIE_SECURE = False
+    REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'True').lower() == 'true'
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'True').lower() == 'true'
     FLASK_PORT = int(os.environ.get('FLASK_PORT', 5000))
 
 class ProductionConfig(Config):
@@ -100,6 +133,11 @@ class ProductionConfig(Config):
     
     # Stricter rate limits for production
     RATELIMIT_DEFAULT = "100 per day, 20 per hour"  # Stricter than development
+    # Counters shared by all gunicorn workers on the host (services/rate_limit_storage.py)
+    RATELIMIT_STORAGE_URL = os.environ.get(
+        'RATELIMIT_STORAGE_URL',
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), 'precinct_ratelimit.db')}"
+    )
 
 
 class TestingConfig(Config):
@@ -119,6 +157,9 @@ class TestingConfig(Config):
     
     # Shorter session times for testing
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=5)
+    
+    # Metrics stay in-process so test runs don't write instance/metrics.db
+    METRICS_MULTIPROCESS = False
 
 
 # Configuration dictionary
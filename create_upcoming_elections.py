@@ -6,12 +6,12 @@ Focuses on Forsyth County and statewide elections through November 2026.
 
 from datetime import date
 from models import db, UpcomingElection
-from main import create_app
+from db_app import create_db_app
 
 def create_upcoming_elections_table():
     """Create the upcoming_elections table and populate with election data."""
     
-    app = create_app()
+    app = create_db_app()
     """Create the upcoming_elections table and populate with election data."""
     
     with app.app_context():
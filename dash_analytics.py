@@ -80,11 +80,15 @@ def get_analytics_data(flask_app, user_id=None):
     
     return analytics_data
 
-def create_dash_app(flask_app):
-    """Create and configure the Dash app."""
+def create_dash_app(flask_app, server=None):
+    """Create and configure the Dash app.
+    
+    Database queries run in flask_app's context; the Dash routes are registered
+    on server (flask_app itself if not given).
+    """
     dash_app = dash.Dash(
         __name__,
-        server=flask_app,
+        server=server or flask_app,
         url_base_pathname='/dash/analytics/',
         external_stylesheets=[
             'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',
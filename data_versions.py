@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Data Version Registry
+=====================
+
+This module records when a dataset the web app caches has been rewritten.
+Every writer (ETL, load and rebuild scripts) bumps the dataset's row in the
+data_versions table inside the same transaction as its data changes. On
+PostgreSQL the bump also sends a NOTIFY on the data_versions channel, which
+is delivered at commit. Web workers invalidate their caches from these
+versions (services/data_version_registry.py).
+
+Usage:
+    from data_versions import bump_data_version, FLIPPABLE
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM flippable"))
+        ...
+        bump_data_version(conn, FLIPPABLE)
+"""
+
+from sqlalchemy import text
+from typing import Dict
+
+# Datasets with a version row
+FLIPPABLE = 'flippable'
+MAPS = 'maps'
+CLUSTERING = 'clustering'
+VOTE_RESULTS = 'vote_results'
+
+DATASETS = [FLIPPABLE, MAPS, CLUSTERING, VOTE_RESULTS]
+
+# PostgreSQL LISTEN/NOTIFY channel; the payload is the dataset name
+NOTIFY_CHANNEL = 'data_versions'
+
+
+def _dialect_name(conn) -> str:
+    """Dialect name for a Connection or Session."""
+    bind = conn.get_bind() if hasattr(conn, 'get_bind') else conn
+    return bind.dialect.name
+
+
+def ensure_data_versions_table(conn) -> None:
+    """
+    Create the data_versions table if it does not exist.
+
+    Args:
+        conn: SQLAlchemy connection or session (caller controls the transaction)
+    """
+    conn.execute(text('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            dataset VARCHAR(50) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL
+        )
+    '''))
+
+
+def bump_data_version(conn, dataset: str) -> int:
+    """
+    Increment a dataset's version as part of the caller's transaction.
+
+    Args:
+        conn: SQLAlchemy connection or session (caller controls the transaction)
+        dataset: One of DATASETS
+
+    Returns:
+        The new version number
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+
+    ensure_data_versions_table(conn)
+    version = conn.execute(text('''
+        INSERT INTO data_versions (dataset, version, updated_at)
+        VALUES (:dataset, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT (dataset) DO UPDATE SET
+            version = data_versions.version + 1,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING version
+    '''), {'dataset': dataset}).scalar()
+
+    if _dialect_name(conn) == 'postgresql':
+        # Delivered to listeners only when the transaction commits
+        conn.execute(text("SELECT pg_notify(:channel, :dataset)"),
+                     {'channel': NOTIFY_CHANNEL, 'dataset': dataset})
+    return version
+
+
+def get_data_versions(conn) -> Dict[str, int]:
+    """
+    Read all dataset versions.
+
+    Args:
+        conn: SQLAlchemy connection or session
+
+    Returns:
+        Dict of dataset -> version (datasets never bumped are absent)
+    """
+    rows = conn.execute(text("SELECT dataset, version FROM data_versions")).fetchall()
+    return {dataset: version for dataset, version in rows}
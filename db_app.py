@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Minimal Flask App for Scripts
+=============================
+
+Admin and maintenance scripts only need an application context for database
+access. create_db_app() builds a Flask app with the configuration and
+SQLAlchemy and nothing else - no Flask-Admin, limiter, routes or Dash - so
+scripts don't pay the web app's import and startup cost.
+
+Schema creation is an explicit step (init_database(), run by init_db.py and
+`flask --app main init-db`); neither create_app() nor create_db_app() touches
+the schema.
+
+Usage:
+    from db_app import create_db_app
+    from models import db, User
+
+    app = create_db_app()
+    with app.app_context():
+        print(User.query.count())
+"""
+
+from dotenv import load_dotenv
+
+# Config reads the environment at import time
+load_dotenv()
+
+from flask import Flask
+
+from config import get_config
+from models import db, User
+
+
+def create_db_app():
+    """Flask app with configuration and SQLAlchemy only."""
+    app = Flask(__name__)
+    app.config.from_object(get_config())
+    db.init_app(app)
+    return app
+
+
+def init_database(app):
+    """
+    Create any missing tables and a default admin user if there are no users.
+
+    Args:
+        app: Flask app (from create_app() or create_db_app())
+    """
+    with app.app_context():
+        db.create_all()
+        print("Database tables created successfully.")
+
+        if User.query.count() == 0:
+            admin_user = User(
+                username=app.config['DEFAULT_ADMIN_USERNAME'],
+                email=app.config['DEFAULT_ADMIN_EMAIL'],
+                password=app.config['DEFAULT_ADMIN_PASSWORD'],
+                phone='555-ADMIN',  # Required field
+                role='Administrator',  # Required field
+                is_admin=True
+            )
+            db.session.add(admin_user)
+            db.session.commit()
+            print(f"Created default admin user: {app.config['DEFAULT_ADMIN_USERNAME']}")
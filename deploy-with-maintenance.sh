@@ -22,6 +22,21 @@ echo "📋 Step 3: Installing dependencies..."
 ssh dg_precinct_root "cd /home/precinct/precinct && source venv/bin/activate && pip install -r requirements.txt --quiet"
 echo "✓ Dependencies installed"
 
+# Create any new tables (the web app no longer does this at startup)
+echo "📋 Step 3b: Updating database schema..."
+ssh dg_precinct_root "cd /home/precinct/precinct && source venv/bin/activate && python init_db.py"
+echo "✓ Database schema updated"
+
+# Rebuild the per-precinct race summary the clustering insights read
+echo "📋 Step 3c: Refreshing precinct race summary..."
+ssh dg_precinct_root "cd /home/precinct/precinct && source venv/bin/activate && python app_administration/refresh_precinct_race_summary.py"
+echo "✓ Precinct race summary refreshed"
+
+# Precompress static assets and refresh the cache-busting manifest
+echo "📋 Step 3d: Precompressing static assets..."
+ssh dg_precinct_root "cd /home/precinct/precinct && source venv/bin/activate && python app_administration/precompress_static.py"
+echo "✓ Static assets precompressed"
+
 # Restart the application
 echo "📋 Step 4: Restarting application..."
 ssh dg_precinct_root "sudo systemctl restart precinct"
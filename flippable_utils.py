@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Flippable Race Assessment Utilities
+===================================
+
+This module is the single definition of the flippable race assessment
+(SLAM DUNK / HIGHLY FLIPPABLE / COMPETITIVE / STRETCH GOAL) and best pathway
+(DVA / Traditional) rules. The values are computed in SQL and persisted in the
+flippable table so the web views can filter and count on indexed columns
+instead of re-classifying every race in Python on each page view.
+
+Usage:
+    from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+
+    with engine.begin() as conn:
+        ensure_flippable_metric_columns(conn)
+        refresh_flippable_metrics(conn, county='FORSYTH')
+"""
+
+from sqlalchemy import inspect, text
+from typing import Any, Dict, Optional
+
+# Assessment categories in display order
+SLAM_DUNK = "🎯 SLAM DUNK"
+HIGHLY_FLIPPABLE = "✅ HIGHLY FLIPPABLE"
+COMPETITIVE = "🟡 COMPETITIVE"
+STRETCH_GOAL = "🔴 STRETCH GOAL"
+
+ASSESSMENT_CATEGORIES = [SLAM_DUNK, HIGHLY_FLIPPABLE, COMPETITIVE, STRETCH_GOAL]
+
+EFFORT_LEVELS = {
+    SLAM_DUNK: "Weekend volunteer effort",
+    HIGHLY_FLIPPABLE: "Month-long focused campaign",
+    COMPETITIVE: "Season-long strategic effort",
+    STRETCH_GOAL: "Multi-cycle investment",
+}
+
+# Columns persisted on the flippable table: name -> DDL type
+METRIC_COLUMNS = {
+    'vote_gap': 'INTEGER',
+    'dem_absenteeism': 'INTEGER',
+    'assessment': 'VARCHAR(40)',
+    'best_pathway': 'VARCHAR(20)',
+}
+
+# Indexes supporting the /flippable and /flippable-analysis filters and rollups
+METRIC_INDEXES = {
+    'ix_flippable_assessment': '(assessment)',
+    'ix_flippable_county_assessment': '(county, assessment)',
+    'ix_flippable_vote_gap': '(vote_gap)',
+}
+
+# Aggregate columns shared by the /flippable-analysis rollups. Category labels
+# are bound as parameters (FLIPPABLE_ROLLUP_PARAMS) rather than inlined.
+_ROLLUP_KEYS = {
+    SLAM_DUNK: 'slam_dunk',
+    HIGHLY_FLIPPABLE: 'highly_flippable',
+    COMPETITIVE: 'competitive',
+    STRETCH_GOAL: 'stretch_goal',
+}
+
+FLIPPABLE_ROLLUP_PARAMS = {key: category for category, key in _ROLLUP_KEYS.items()}
+
+FLIPPABLE_ROLLUP_COLUMNS = ',\n                   '.join(
+    [f"SUM(CASE WHEN assessment = :{key} THEN 1 ELSE 0 END) AS {key}" for key in _ROLLUP_KEYS.values()] + [
+        "COUNT(*) AS total_races",
+        "COALESCE(SUM(vote_gap), 0) AS total_vote_gap",
+        "AVG(CASE WHEN dva_pct_needed < 999 THEN dva_pct_needed END) AS avg_dva",
+        "COUNT(CASE WHEN dva_pct_needed < 999 THEN 1 END) AS dva_count",
+    ]
+)
+
+
+def flippable_rollup_query(where_clause: str = '', dialect: str = 'postgresql') -> str:
+    """
+    Build the /flippable-analysis rollup: one row per precinct, per county and overall.
+
+    Rows carry is_total (overall row) and is_county (county or overall row)
+    flags. PostgreSQL computes all three levels in one pass with GROUPING
+    SETS; other databases (SQLite in tests) get the equivalent UNION ALL.
+
+    Args:
+        where_clause: Optional WHERE clause applied at every level
+        dialect: SQLAlchemy dialect name of the connection
+
+    Returns:
+        SQL text; bind FLIPPABLE_ROLLUP_PARAMS (plus the where_clause parameters)
+    """
+    if dialect == 'postgresql':
+        return f'''
+            SELECT county, precinct,
+                   GROUPING(county) AS is_total, GROUPING(precinct) AS is_county,
+                   {FLIPPABLE_ROLLUP_COLUMNS}
+            FROM flippable
+            {where_clause}
+            GROUP BY GROUPING SETS ((county, precinct), (county), ())
+        '''
+    levels = [
+        ('county, precinct', '0 AS is_total, 0 AS is_county', 'GROUP BY county, precinct'),
+        ('county, NULL AS precinct', '0 AS is_total, 1 AS is_county', 'GROUP BY county'),
+        ('NULL AS county, NULL AS precinct', '1 AS is_total, 1 AS is_county', ''),
+    ]
+    return '\n            UNION ALL'.join(f'''
+            SELECT {keys}, {flags},
+                   {FLIPPABLE_ROLLUP_COLUMNS}
+            FROM flippable
+            {where_clause}
+            {group_by}''' for keys, flags, group_by in levels)
+
+
+def empty_assessment_counts() -> Dict[str, int]:
+    """Return a zeroed assessment count dict in display order."""
+    return {category: 0 for category in ASSESSMENT_CATEGORIES}
+
+
+def flippable_rollup_summary(row) -> Dict[str, Any]:
+    """
+    Convert a row selected with FLIPPABLE_ROLLUP_COLUMNS into a summary dict.
+
+    Returns:
+        Dict keyed by assessment category plus total_races, total_vote_gap,
+        avg_dva (rounded, or 'N/A' without DVA data) and dva_count
+    """
+    summary = {category: int(getattr(row, key) or 0) for category, key in _ROLLUP_KEYS.items()}
+    summary['total_races'] = int(row.total_races or 0)
+    summary['total_vote_gap'] = int(row.total_vote_gap or 0)
+    summary['avg_dva'] = round(float(row.avg_dva), 1) if row.dva_count else 'N/A'
+    summary['dva_count'] = int(row.dva_count or 0)
+    return summary
+
+
+def flippable_metric_sql(dem: str = 'dem_votes', oppo: str = 'oppo_votes',
+                         gov: str = 'gov_votes', dva: str = 'dva_pct_needed') -> Dict[str, str]:
+    """
+    Build the SQL expressions for the persisted flippable metrics.
+
+    Args:
+        dem: Column/expression holding Democratic votes
+        oppo: Column/expression holding opposition votes
+        gov: Column/expression holding governor (baseline) Democratic votes
+        dva: Column/expression holding DVA percentage needed
+
+    Returns:
+        Dict mapping metric column name to a SQL expression
+    """
+    dem = f"COALESCE({dem}, 0)"
+    oppo = f"COALESCE({oppo}, 0)"
+    gov = f"COALESCE({gov}, 0)"
+    dva = f"COALESCE({dva}, 999.9)"
+
+    vote_gap = f"(({oppo} + 1) - {dem})"
+    dem_absenteeism = f"(CASE WHEN {gov} > {dem} THEN {gov} - {dem} ELSE 0 END)"
+
+    assessment = f"""(CASE
+            WHEN {vote_gap} <= 25 OR ({dem_absenteeism} > 0 AND {dva} <= 15) THEN '{SLAM_DUNK}'
+            WHEN {vote_gap} <= 100 OR ({dem_absenteeism} > 0 AND {dva} <= 35) THEN '{HIGHLY_FLIPPABLE}'
+            WHEN {vote_gap} <= 300 OR ({dem_absenteeism} > 0 AND {dva} <= 60) THEN '{COMPETITIVE}'
+            ELSE '{STRETCH_GOAL}'
+        END)"""
+
+    best_pathway = f"""(CASE
+            WHEN {vote_gap} <= 100 AND {dem_absenteeism} > 0 AND {dva} <= 50
+                 AND {dva} < ({vote_gap} * 100.0 / (CASE WHEN {oppo} > 1 THEN {oppo} ELSE 1 END))
+            THEN 'DVA'
+            ELSE 'Traditional'
+        END)"""
+
+    return {
+        'vote_gap': vote_gap,
+        'dem_absenteeism': dem_absenteeism,
+        'assessment': assessment,
+        'best_pathway': best_pathway,
+    }
+
+
+def ensure_flippable_metric_columns(conn) -> bool:
+    """
+    Add the persisted metric columns and their indexes to flippable if missing.
+
+    Args:
+        conn: SQLAlchemy connection (caller controls the transaction)
+
+    Returns:
+        True if any column was added
+    """
+    existing = {col['name'] for col in inspect(conn).get_columns('flippable')}
+
+    added = False
+    for column, column_type in METRIC_COLUMNS.items():
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE flippable ADD COLUMN {column} {column_type}"))
+            added = True
+
+    for index_name, columns in METRIC_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON flippable {columns}"))
+
+    return added
+
+
+def refresh_flippable_metrics(conn, county: Optional[str] = None) -> int:
+    """
+    Recompute the persisted metric columns from the vote columns.
+
+    Args:
+        conn: SQLAlchemy connection (caller controls the transaction)
+        county: Optional county to limit the refresh to
+
+    Returns:
+        Number of rows updated
+    """
+    expressions = flippable_metric_sql()
+    assignments = ',\n            '.join(f"{column} = {expr}" for column, expr in expressions.items())
+
+    query = f"UPDATE flippable SET\n            {assignments}"
+    params = {}
+    if county:
+        query += "\n        WHERE UPPER(county) = UPPER(:county)"
+        params['county'] = county
+
+    result = conn.execute(text(query), params)
+    return result.rowcount
@@ -1,11 +1,15 @@
 import os
 import re
+import threading
+import time
+import importlib.util
+import mimetypes
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from flask import Flask, render_template, request, redirect, url_for, flash, abort, session, jsonify, send_file, send_from_directory, current_app
+from flask import Flask, render_template, request, redirect, url_for, flash, abort, session, jsonify, send_file, send_from_directory, current_app, make_response, Response, g
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_admin import Admin, AdminIndexView, expose, BaseView
 from flask_admin.contrib.sqla import ModelView
@@ -14,18 +18,30 @@ from flask_limiter.util import get_remote_address
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField, BooleanField, TextAreaField
 from wtforms.validators import DataRequired, Length, Email
-from sqlalchemy import text
+from sqlalchemy import func, text
 from models import db, User, Map
 from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
 from config import get_config
 from security import add_security_headers
-from precinct_utils import normalize_precinct_id, normalize_precinct_join, create_precinct_lookup
-import markdown
-try:
-    from dash_analytics import create_dash_app
-    DASH_AVAILABLE = True
-except ImportError:
-    DASH_AVAILABLE = False
+from precinct_utils import normalize_precinct_id
+from services.document_cache import document_cache
+from services.doc_catalog import doc_catalog
+from services.map_cache import MapContentCache
+from services.data_version_registry import data_version_registry
+from data_versions import MAPS, CLUSTERING
+from services.map_variants import MAP_VARIANT_VERSIONS, MAP_VIEW_INJECTIONS, build_map_variant
+from services.response_compression import StaticAssets, compress_response
+from services.request_timing import RequestTiming
+from services.request_profiler import (RequestProfiler, ARTIFACTS, PROFILE_MODES, PROFILE_PARAM,
+                                       make_profile_token, profile_store, top_frames)
+from services.metrics import (metrics, pool_gauges, TimedQueuePool, REQUEST_DURATION,
+                              RATE_LIMIT_REJECTIONS)
+from compression_utils import DYNAMIC_LEVELS, accepts_encoding, compress, decompress, negotiate_encoding
+from flippable_utils import (empty_assessment_counts, EFFORT_LEVELS, FLIPPABLE_ROLLUP_PARAMS,
+                             flippable_rollup_query, flippable_rollup_summary)
+# Dash, plotly and pandas are only imported when /dash/analytics is first requested
+DASH_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ('dash', 'plotly', 'pandas'))
 # Security features implemented:
 # ✅ HSTS (HTTP Strict Transport Security) - max-age=31536000; includeSubDomains
 # ✅ CSP (Content Security Policy) - comprehensive XSS protection
@@ -34,6 +50,13 @@ except ImportError:
 # ✅ Referrer-Policy and Permissions-Policy implemented
 # TODO: research Auth0 for MFA
 
+# Markdown extensions used when rendering cached documents
+MOTD_MARKDOWN_EXTENSIONS = ('extra', 'nl2br', 'sane_lists')
+STRATEGY_MARKDOWN_EXTENSIONS = ('extra', 'codehilite')
+
+# Chunk size for streamed downloads
+CSV_STREAM_CHUNK_SIZE = 64 * 1024
+
 class LoginForm(FlaskForm):
     """Login form for user authentication."""
     username = StringField('Username', validators=[DataRequired(), Length(min=4, max=25)])
@@ -99,26 +122,7 @@ class DocumentationView(BaseView):
     @expose('/')
     def index(self):
         """List all documentation files."""
-        doc_dir = os.path.join(current_app.root_path, 'doc')
-        docs = []
-        
-        if os.path.exists(doc_dir):
-            for filename in os.listdir(doc_dir):
-                if filename.endswith('.md') or filename.endswith('.txt'):
-                    filepath = os.path.join(doc_dir, filename)
-                    if os.path.isfile(filepath):
-                        stat_info = os.stat(filepath)
-                        last_modified = datetime.fromtimestamp(stat_info.st_mtime)
-                        
-                        docs.append({
-                            'filename': filename,
-                            'display_name': filename.replace('_', ' ').replace('.md', '').replace('.txt', '').title(),
-                            'last_modified': last_modified,
-                            'size': stat_info.st_size,
-                            'extension': os.path.splitext(filename)[1]
-                        })
-        
-        docs.sort(key=lambda x: x['filename'])
+        docs = doc_catalog.entries()
         return self.render('admin/documentation.html', docs=docs)
     
     @expose('/view/<filename>')
@@ -171,6 +175,8 @@ class DocumentationView(BaseView):
             try:
                 with open(filepath, 'w', encoding='utf-8') as f:
                     f.write(content)
+                document_cache.invalidate(filepath)
+                doc_catalog.refresh_file(filename)
                 flash(f'File {filename} updated successfully!', 'success')
                 return redirect(url_for('.view_file', filename=filename))
             except Exception as e:
@@ -230,6 +236,8 @@ class DocumentationView(BaseView):
                     else:
                         try:
                             os.rename(old_filepath, new_filepath)
+                            document_cache.invalidate(old_filepath)
+                            doc_catalog.rename_file(filename, new_filename)
                             flash(f'File renamed from "{filename}" to "{new_filename}" successfully!', 'success')
                             return redirect(url_for('.view_file', filename=new_filename))
                         except Exception as e:
@@ -254,12 +262,86 @@ class DocumentationView(BaseView):
         
         try:
             os.remove(filepath)
+            document_cache.invalidate(filepath)
+            doc_catalog.remove_file(filename)
             flash(f'File "{filename}" deleted successfully!', 'success')
         except Exception as e:
             flash(f'Error deleting file: {str(e)}', 'danger')
         
         return redirect(url_for('.index'))
 
+class ProfileView(BaseView):
+    """Flask-Admin view for issuing request profile links and browsing the saved profiles."""
+
+    def is_accessible(self):
+        return current_user.is_authenticated and current_user.is_admin
+
+    def inaccessible_callback(self, name, **kwargs):
+        return redirect(url_for('login'))
+
+    @expose('/', methods=['GET', 'POST'])
+    def index(self):
+        """List saved profiles; on POST, issue a signed link that profiles one request."""
+        profile_link = None
+        if request.method == 'POST':
+            target = urlsplit(request.form.get('path', '').strip())
+            mode = request.form.get('mode', PROFILE_MODES[0])
+            if not target.path.startswith('/') or target.netloc or mode not in PROFILE_MODES:
+                flash('Enter a path on this site, such as /flippable-analysis', 'danger')
+            else:
+                token = make_profile_token(current_app.secret_key, target.path, mode, current_user.username)
+                query = parse_qsl(target.query) + [(PROFILE_PARAM, token)]
+                profile_link = f'{target.path}?{urlencode(query)}'
+
+        return self.render('admin/profiles.html',
+                         profiles=profile_store(current_app).list(),
+                         profile_link=profile_link,
+                         modes=PROFILE_MODES,
+                         token_minutes=current_app.config['PROFILER_TOKEN_MAX_AGE'] // 60,
+                         enabled=current_app.config['PROFILER_ENABLED'])
+
+    @expose('/view/<profile_id>')
+    def view_profile(self, profile_id):
+        """Show a profile's request metadata and hottest frames."""
+        store = profile_store(current_app)
+        profile = store.get(profile_id)
+        if profile is None:
+            abort(404)
+
+        frames, summary = [], None
+        folded_path = store.artifact_path(profile_id, 'folded')
+        if folded_path:
+            with open(folded_path, encoding='utf-8') as f:
+                frames = top_frames(f.read())
+        summary_path = store.artifact_path(profile_id, 'txt')
+        if summary_path:
+            with open(summary_path, encoding='utf-8') as f:
+                summary = f.read()
+
+        return self.render('admin/view_profile.html',
+                         profile=profile,
+                         frames=frames,
+                         summary=summary,
+                         artifacts=ARTIFACTS)
+
+    @expose('/download/<profile_id>/<artifact>')
+    def download(self, profile_id, artifact):
+        """Download one artifact of a profile."""
+        path = profile_store(current_app).artifact_path(profile_id, artifact)
+        if path is None:
+            abort(404)
+        return send_file(path, mimetype=ARTIFACTS[artifact][0], as_attachment=True,
+                         download_name=f'profile-{profile_id}.{artifact}')
+
+    @expose('/delete/<profile_id>', methods=['POST'])
+    def delete_profile(self, profile_id):
+        """Delete a saved profile."""
+        if profile_store(current_app).delete(profile_id):
+            flash('Profile deleted', 'success')
+        else:
+            flash('Profile not found', 'warning')
+        return redirect(url_for('.index'))
+
 def create_app():
     """Application factory."""
     app = Flask(__name__)
@@ -268,9 +350,89 @@ def create_app():
     config_class = get_config()
     app.config.from_object(config_class)
     
+    # Pool checkout waits are recorded for pooled (non-SQLite) databases
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        engine_options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    
     # Initialize extensions
     db.init_app(app)
     
+    # Compress responses last (after_request handlers run in reverse order of
+    # registration), so headers and bodies set by later hooks are included.
+    # Maps already stored compressed and static files are skipped.
+    @app.after_request
+    def compress_responses(response):
+        if app.config['RESPONSE_COMPRESSION_ENABLED']:
+            compress_response(response, request.accept_encodings, app.config['RESPONSE_COMPRESSION_MIN_SIZE'])
+        return response
+    
+    # Static files: precompressed copies and a content-hash manifest come from
+    # app_administration/precompress_static.py. url_for('static') adds ?v=<hash>
+    # for files in the manifest, and those URLs are cached by browsers for a year.
+    static_assets = StaticAssets(app.static_folder)
+    
+    @app.url_defaults
+    def version_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            version = static_assets.version(values['filename'])
+            if version:
+                values['v'] = version
+    
+    def serve_static(filename):
+        """Serve a static file, preferring a precompressed copy the client accepts."""
+        version = static_assets.version(filename)
+        versioned = version is not None and request.args.get('v') == version
+        max_age = app.config['STATIC_ASSET_MAX_AGE'] if versioned else None
+        
+        variant, encoding = static_assets.variant(filename, request.accept_encodings)
+        if variant:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(app.static_folder, variant, mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_from_directory(app.static_folder, filename, max_age=max_age)
+        if version is not None:
+            response.vary.add('Accept-Encoding')
+        if versioned:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        return response
+    
+    app.view_functions['static'] = serve_static
+    
+    # Query count, DB/render time (Server-Timing header) and slow-query log
+    RequestTiming(app)
+    
+    # Single requests carrying an admin-issued profile token are profiled (see ProfileView)
+    RequestProfiler(app)
+    
+    # Latency histograms, rate limit rejections, pool and cache stats served at
+    # /metrics; workers on a host share totals through METRICS_DB_PATH
+    if app.config['METRICS_ENABLED'] and app.config['METRICS_MULTIPROCESS']:
+        metrics.configure(app.config['METRICS_DB_PATH'] or os.path.join(app.instance_path, 'metrics.db'),
+                          app.config['METRICS_FLUSH_SECONDS'])
+    with app.app_context():
+        default_engine = db.engine
+    metrics.set_collector('db_pool', lambda: pool_gauges(default_engine))
+    
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is not None and app.config['METRICS_ENABLED']:
+            endpoint = request.endpoint or 'unmatched'
+            metrics.observe(REQUEST_DURATION, time.perf_counter() - start,
+                            {'endpoint': endpoint, 'method': request.method,
+                             'status': f'{response.status_code // 100}xx'})
+            if response.status_code == 429:
+                metrics.inc(RATE_LIMIT_REJECTIONS, {'endpoint': endpoint})
+        return response
+    
     # Flask-Limiter setup
     # For tests, conditionally disable rate limiting completely
     if app.config.get('RATELIMIT_ENABLED', True):
@@ -292,6 +454,8 @@ def create_app():
                 return decorator
             def init_app(self, app):
                 pass
+            def exempt(self, f):
+                return f
             def __getattr__(self, name):
                 # Return a dummy method for any other limiter attributes/methods
                 def dummy(*args, **kwargs):
@@ -321,25 +485,33 @@ def create_app():
         return User.query.get(int(user_id))
     
     # Message of the Day helper function
+    motd_path = os.path.join(app.root_path, 'motd.md')
+    
     def get_motd():
-        """Read and return the message of the day from motd.md file, rendered as HTML."""
+        """Return the message of the day from motd.md rendered as HTML (cached until the file changes)."""
         try:
-            motd_path = os.path.join(app.root_path, 'motd.md')
-            if os.path.exists(motd_path):
-                with open(motd_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        # Convert Markdown to HTML
-                        html_content = markdown.markdown(
-                            content,
-                            extensions=['extra', 'nl2br', 'sane_lists']
-                        )
-                        return html_content
-            return None
+            # An empty motd.md means no message
+            return document_cache.render(motd_path, MOTD_MARKDOWN_EXTENSIONS) or None
         except Exception as e:
             app.logger.warning(f'Error reading MOTD file: {str(e)}')
             return None
     
+    # Ballot matching strategy documents - full version for admin/county users, public otherwise
+    strategy_paths = {
+        'full': os.path.join(app.root_path, 'doc', '_BALLOT_MATCHING_STRATEGY.md'),
+        'public': os.path.join(app.root_path, 'doc', '_BALLOT_MATCHING_STRATEGY_PUBLIC.md'),
+    }
+    
+    def get_strategy_path(user):
+        """Return the ballot matching strategy document path for a user's role."""
+        if user.is_authenticated and (user.is_admin or user.is_county):
+            return strategy_paths['full']
+        return strategy_paths['public']
+    
+    # Warm the rendered-document cache so the first requests don't pay for Markdown rendering
+    document_cache.warm([(motd_path, MOTD_MARKDOWN_EXTENSIONS)] +
+                        [(path, STRATEGY_MARKDOWN_EXTENSIONS) for path in strategy_paths.values()])
+    
     # Map helper functions
     def create_error_page(error_title, error_message):
         """Create a standardized error page for map loading issues."""
@@ -440,32 +612,88 @@ def create_app():
 </body>
 </html>'''
 
-    def get_map_content_for_user(user):
-        """Get map content for a user from the database."""
-        if not user or not user.state or not user.county or not user.precinct:
-            return None
+    # Documentation listing and search index (shared SQLite file in the instance folder)
+    os.makedirs(app.instance_path, exist_ok=True)
+    doc_catalog.configure(os.path.join(app.root_path, 'doc'),
+                          app.config.get('DOC_SEARCH_INDEX_PATH') or os.path.join(app.instance_path, 'doc_search.db'))
+    
+    # Process-wide cache of map HTML keyed on (state, county, precinct, updated_at)
+    map_cache = MapContentCache(app.config['MAP_CACHE_MAX_BYTES'])
+    
+    # Drop cached data as soon as the load/ETL scripts bump its data version
+    with app.app_context():
+        data_version_registry.init_engine(db.engine, poll_interval=app.config['DATA_VERSION_POLL_SECONDS'])
+    data_version_registry.on_change(MAPS, lambda dataset, version: map_cache.clear())
+    data_version_registry.on_change(CLUSTERING, lambda dataset, version: invalidate_clustering_datasets())
+    
+    def invalidate_clustering_datasets():
+        from services.clustering_service import (precinct_clustering_dataset, census_clustering_dataset,
+                                                 census_clustering_summary)
+        precinct_clustering_dataset.invalidate()
+        census_clustering_dataset.invalidate()
+        census_clustering_summary.invalidate()
+    
+    def load_map_payload(map_record):
+        """Return the map as stored: compressed bytes (content_encoding set) or HTML text.
+        
+        The content columns may be deferred; they are read from the database only on
+        a cache miss. Returns None if the map has no content.
+        """
+        key = (map_record.state, map_record.county, map_record.precinct,
+               map_record.updated_at, map_record.content_encoding)
+        payload = map_cache.get(key)
+        if payload is None:
+            payload = map_record.map_compressed if map_record.content_encoding else map_record.map
+            if not payload:
+                return None
+            map_cache.put(key, payload)
+        return payload
+    
+    def load_map_content(map_record, description):
+        """Return (content, is_map) for a map record whose HTML column may be deferred.
         
+        The HTML is read from the database only on a cache miss. is_map is False
+        when an error page is returned instead of the stored map.
+        """
         try:
-            map_record = Map.get_map_for_user(user)
-            if not map_record or not map_record.map:
-                return None
+            content = load_map_payload(map_record)
+            if content is None:
+                return None, False
+            if map_record.content_encoding:
+                content = decompress(content, map_record.content_encoding).decode('utf-8')
             
             # Check if map field contains a filename reference (which is an error - should be full HTML content)
-            if map_record.map.endswith('.html') and len(map_record.map) < 50:
-                app.logger.error(f'Database contains filename reference {map_record.map} for user {user.username} - should contain full HTML content')
+            if content.endswith('.html') and len(content) < 50:
+                app.logger.error(f'Database contains filename reference {content} for {description} - should contain full HTML content')
                 return create_error_page("Database Error", 
-                    f"Map content missing from database for user {user.username}. Only filename reference found.")
+                    f"Map content missing from database for {description}. Only filename reference found."), False
             
             # Map field should contain full HTML content stored directly in the database
-            return map_record.map
+            return content, True
             
         except Exception as e:
-            app.logger.error(f'Database error retrieving map for user {user.username}: {str(e)}')
+            app.logger.error(f'Database error retrieving map for {description}: {str(e)}')
             return create_error_page("Database Error", 
+                "Failed to retrieve map from database. Please try again or contact support."), False
+    
+    def find_map_for_user(user):
+        """Look up a user's map record without loading its HTML. Returns (map_record, error_page)."""
+        if not user or not user.state or not user.county or not user.precinct:
+            return None, None
+        
+        try:
+            return Map.get_map_for_user(user, with_content=False), None
+        except Exception as e:
+            app.logger.error(f'Database error retrieving map for user {user.username}: {str(e)}')
+            return None, create_error_page("Database Error", 
                 "Failed to retrieve map from database. Please try again or contact support.")
     
-    def get_map_content_by_filename(filename):
-        """Get map content by filename using current user's state/county context."""
+    def find_map_by_filename(filename):
+        """Look up a map record by filename using current user's state/county context.
+        
+        The HTML is not loaded. Returns (map_record, error_page); both are None for
+        filenames that are not precinct map names.
+        """
         try:
             # Extract precinct number from filename (e.g., "999.html" -> "999")
             if filename.endswith('.html'):
@@ -474,56 +702,137 @@ def create_app():
                 # Use current user's state and county to find the correct map
                 if not current_user or not current_user.state or not current_user.county:
                     app.logger.error(f'Cannot lookup map {filename} - user has no state/county context')
-                    return create_error_page("Access Error", 
+                    return None, create_error_page("Access Error", 
                         "Your state/county information is not set. Please contact an administrator.")
                 
-                # Normalize precinct number for flexible database lookup
-                padded_precinct, unpadded_precinct = normalize_precinct_id(precinct)
-                if not padded_precinct:
+                # Normalize precinct number for the canonical precinct_key lookup
+                if not Map.make_precinct_key(precinct):
                     app.logger.error(f'Invalid precinct format in filename: {filename}')
-                    return create_error_page("Invalid Request", 
+                    return None, create_error_page("Invalid Request", 
                         f"Invalid precinct format in filename: {filename}")
                 
-                # Try finding map with both padded and unpadded precinct formats
-                map_record = Map.query.filter_by(
-                    state=current_user.state,
-                    county=current_user.county,
-                    precinct=padded_precinct
-                ).first()
-                
-                # If not found with padded format, try unpadded
-                if not map_record:
-                    map_record = Map.query.filter_by(
-                        state=current_user.state,
-                        county=current_user.county,
-                        precinct=unpadded_precinct
-                    ).first()
-                
-                if map_record and map_record.map:
-                    # If it's stored HTML content, return it
-                    if not map_record.map.endswith('.html') or len(map_record.map) > 50:
-                        app.logger.info(f'Serving map {filename} from database (full content) for {map_record.state} {map_record.county} Precinct {map_record.precinct}')
-                        return map_record.map
-                    
-                    # If it's a filename reference, this is an error - should contain full HTML content
-                    app.logger.error(f'Database contains filename reference {map_record.map} for {filename} in {current_user.state} {current_user.county} - should contain full HTML content')
-                    return create_error_page("Database Error", 
-                        f"Map content missing from database for {filename}. Only filename reference found.")
+                # Single index probe on (state, county, precinct_key)
+                map_record = Map.get_map_by_location(current_user.state, current_user.county,
+                                                     precinct, with_content=False)
+                if map_record:
+                    return map_record, None
                 
                 # Map not found for this state/county/precinct combination
                 app.logger.error(f'Map {filename} not found in database for {current_user.state} {current_user.county}')
-                return create_error_page("Map Not Found", 
+                return None, create_error_page("Map Not Found", 
                     f"Map {filename} not found for {current_user.state} {current_user.county}.")
             
         except Exception as e:
             app.logger.error(f'Database error retrieving map by filename {filename}: {str(e)}')
-            return create_error_page("Database Error", 
+            return None, create_error_page("Database Error", 
                 "Failed to retrieve map from database. Please try again or contact support.")
         
         # No fallback to static files - all content must come from database
         app.logger.error(f'Invalid filename format: {filename}')
+        return None, None
+    
+    def resolve_map_view(lookup, description, variant, passthrough=False):
+        """Resolve a (map_record, error_page) lookup for a raw map endpoint.
+        
+        Returns (content, etag, early_response). early_response is a 304 when the
+        client's copy is current, in which case the map HTML is never loaded. With
+        passthrough=True (endpoints serving the map unmodified) it is instead the
+        precompressed bytes when the client accepts the stored encoding. etag is
+        only set when content is the stored map rather than an error page.
+        
+        Variants listed in MAP_VIEW_INJECTIONS get their controls spliced in once
+        per map version. The result is cached per negotiated Content-Encoding,
+        compressed when the client accepts an encoding, and sent as an
+        early_response with that encoding set, so repeat views neither copy nor
+        recompress the document.
+        """
+        map_record, error_page = lookup
+        if map_record is None:
+            if error_page is not None and variant in MAP_VIEW_INJECTIONS:
+                error_page = build_map_variant(error_page, variant)
+            return error_page, None, None
+        
+        encoded = passthrough and accepts_encoding(request.accept_encodings, map_record.content_encoding)
+        variant_encoding = None
+        if variant in MAP_VIEW_INJECTIONS and app.config['RESPONSE_COMPRESSION_ENABLED']:
+            variant_encoding = negotiate_encoding(request.accept_encodings)
+        etag = map_etag(map_record, variant, map_record.content_encoding if encoded else variant_encoding)
+        not_modified = map_not_modified(etag)
+        if not_modified:
+            return None, etag, not_modified
+        
+        if encoded:
+            payload = load_map_payload(map_record)
+            if payload is not None:
+                return None, etag, encoded_map_response(payload, etag, map_record.content_encoding)
+        
+        if variant in MAP_VIEW_INJECTIONS:
+            key = (map_record.state, map_record.county, map_record.precinct,
+                   map_record.updated_at, variant, variant_encoding)
+            data = map_cache.get(key)
+            if data is not None:
+                if variant_encoding:
+                    return None, etag, encoded_map_response(data, etag, variant_encoding)
+                return data, etag, None
+        
+        content, is_map = load_map_content(map_record, description)
+        if content is None or variant not in MAP_VIEW_INJECTIONS:
+            return content, etag if is_map else None, None
+        
+        content = build_map_variant(content, variant)
+        if not is_map:
+            return content, None, None
+        
+        data = content.encode('utf-8')
+        if variant_encoding:
+            data = compress(data, variant_encoding, level=DYNAMIC_LEVELS[variant_encoding])
+        map_cache.put(key, data)
+        if variant_encoding:
+            return None, etag, encoded_map_response(data, etag, variant_encoding)
+        return data, etag, None
+    
+    def map_etag(map_record, variant, encoding=None):
+        """Strong ETag for one rendering of a map.
+        
+        Built from the stored content hash, the view variant, the version of
+        the variant's injected controls and the Content-Encoding sent.
+        """
+        if map_record is None or not map_record.content_hash:
+            return None
+        etag = f'{map_record.content_hash}-{variant}'
+        if variant in MAP_VARIANT_VERSIONS:
+            etag = f'{etag}-{MAP_VARIANT_VERSIONS[variant]}'
+        if encoding:
+            etag = f'{etag}-{encoding}'
+        return etag
+    
+    def map_not_modified(etag):
+        """Return a 304 response if the client already has this map version, else None."""
+        # Weak comparison: compressed responses carry the ETag as W/"..."
+        if etag and request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
         return None
     
+    def map_response(content, etag):
+        """Build a map HTML response, tagging it for browser revalidation when it is the stored map."""
+        response = make_response(content)
+        if etag:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Accept-Encoding')
+        return response
+    
+    def encoded_map_response(data, etag, encoding):
+        """Map response for already compressed HTML; compress_responses leaves it alone."""
+        response = map_response(data, etag)
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+    
     def user_can_access_map(user, filename_or_precinct):
         """Check if user can access a specific map."""
         if user.is_admin:
@@ -579,6 +888,13 @@ def create_app():
         if request.endpoint == 'maintenance':
             return redirect(url_for('index'))
     
+    @app.before_request
+    def check_data_versions():
+        """Invalidate caches whose dataset was rewritten since the last check."""
+        if request.path.startswith('/static/'):
+            return None
+        data_version_registry.check()
+    
     # Block suspicious user agents and rapid requests
     @app.before_request
     def block_suspicious_requests():
@@ -596,33 +912,49 @@ def create_app():
                 abort(403)  # Forbidden
     
     # Session timeout handling
+    def session_expired(last_activity, now):
+        """Return True if more than SESSION_TIMEOUT_MINUTES have passed since last_activity."""
+        timeout_minutes = app.config.get('SESSION_TIMEOUT_MINUTES', 30)
+        return (now - last_activity).total_seconds() > (timeout_minutes * 60)
+    
     @app.before_request
     def check_session_timeout():
         """Check for session timeout and update last activity."""
+        # Status polls only read the session: they don't count as activity and
+        # shouldn't load the user or re-sign the session cookie
+        if request.endpoint == 'session_status':
+            return None
+        
         if current_user.is_authenticated:
             now = datetime.utcnow()
             last_activity = session.get('last_activity')
             
             if last_activity:
                 last_activity = datetime.fromisoformat(last_activity)
-                timeout_minutes = app.config.get('SESSION_TIMEOUT_MINUTES', 30)
                 
                 # Check if session has timed out
-                if (now - last_activity).total_seconds() > (timeout_minutes * 60):
+                if session_expired(last_activity, now):
                     logout_user()
                     session.clear()
                     flash('Your session has expired due to inactivity. Please log in again.', 'warning')
                     return redirect(url_for('login'))
             
-            # Update last activity timestamp
-            session['last_activity'] = now.isoformat()
-            session.permanent = True
+            # Only rewrite the timestamp once it has moved by more than the
+            # granularity, so most requests leave the session cookie untouched
+            granularity = app.config.get('SESSION_ACTIVITY_GRANULARITY_SECONDS', 60)
+            if not last_activity or (now - last_activity).total_seconds() >= granularity:
+                session['last_activity'] = now.isoformat()
+            if not session.permanent:
+                session.permanent = True
     
     @app.route('/api/session-status')
-    @login_required
     def session_status():
-        """API endpoint to check session status for client-side warnings."""
-        if not current_user.is_authenticated:
+        """API endpoint to check session status for client-side warnings.
+        
+        Answers from the session cookie alone (no user reload, no session write);
+        the next regular request enforces the timeout.
+        """
+        if '_user_id' not in session:
             return jsonify({'status': 'expired'}), 401
             
         now = datetime.utcnow()
@@ -630,6 +962,9 @@ def create_app():
         
         if last_activity:
             last_activity = datetime.fromisoformat(last_activity)
+            if session_expired(last_activity, now):
+                return jsonify({'status': 'expired'}), 401
+            
             timeout_minutes = app.config.get('SESSION_TIMEOUT_MINUTES', 30)
             warning_minutes = app.config.get('SESSION_WARNING_MINUTES', 5)
             
@@ -656,32 +991,32 @@ def create_app():
     @app.route('/documentation')
     def documentation():
         """Display available documentation from doc directory."""
-        doc_dir = os.path.join(app.root_path, 'doc')
-        docs = []
-        
-        if os.path.exists(doc_dir):
-            for filename in os.listdir(doc_dir):
-                if filename.endswith('.md') or filename.endswith('.txt'):
-                    # Only show files that start with an uppercase letter (public visibility)
-                    if filename[0].isupper():
-                        filepath = os.path.join(doc_dir, filename)
-                        if os.path.isfile(filepath):
-                            # Get file stats for last modified date
-                            stat_info = os.stat(filepath)
-                            last_modified = datetime.fromtimestamp(stat_info.st_mtime)
-                            
-                            docs.append({
-                                'filename': filename,
-                                'display_name': filename.replace('_', ' ').replace('.md', '').replace('.txt', '').title(),
-                                'last_modified': last_modified,
-                                'size': stat_info.st_size
-                            })
-        
-        # Sort by filename
-        docs.sort(key=lambda x: x['filename'])
+        # Only files that start with an uppercase letter are public
+        docs = doc_catalog.entries(public_only=True)
         
         return render_template('documentation.html', docs=docs)
     
+    @app.route('/documentation/search')
+    def search_documentation():
+        """Ranked full-text search over the public documentation files."""
+        query = request.args.get('q', '').strip()
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 50)
+        except ValueError:
+            limit = 20
+        
+        results = []
+        if query:
+            try:
+                results = doc_catalog.search(query, public_only=True, limit=limit)
+            except Exception as e:
+                app.logger.error(f'Documentation search failed for {query!r}: {str(e)}')
+                return jsonify({'error': 'Search is temporarily unavailable'}), 503
+        
+        for result in results:
+            result['url'] = url_for('show_documentation', filename=result['filename'])
+        return jsonify({'query': query, 'results': results})
+    
     @app.route('/documentation/<filename>')
     def show_documentation(filename):
         """Display specific documentation file."""
@@ -763,33 +1098,13 @@ def create_app():
     def ballot_matching_strategy_content():
         """Return just the HTML content for the ballot matching strategy modal."""
         try:
-            # Determine which version to show based on user role
-            if current_user.is_authenticated and (current_user.is_admin or current_user.is_county):
-                # Full version with examples for admin and county users
-                filename = '_BALLOT_MATCHING_STRATEGY.md'
-                app.logger.info(f'Loading full strategy for user: {current_user.username} (admin={current_user.is_admin}, county={current_user.is_county})')
-            else:
-                # Simplified version without examples for regular users
-                filename = '_BALLOT_MATCHING_STRATEGY_PUBLIC.md'
-                app.logger.info(f'Loading public strategy for user: {current_user.username if current_user.is_authenticated else "anonymous"} (admin={current_user.is_admin if current_user.is_authenticated else "N/A"}, county={current_user.is_county if current_user.is_authenticated else "N/A"})')
-            
-            filepath = os.path.join('doc', filename)
-            app.logger.info(f'Looking for file: {filepath}')
+            filepath = get_strategy_path(current_user)
+            html_content = document_cache.render(filepath, STRATEGY_MARKDOWN_EXTENSIONS)
             
-            if not os.path.exists(filepath):
+            if html_content is None:
                 app.logger.error(f'File not found: {filepath}')
                 return '<div class="alert alert-danger">Strategy document not found.</div>', 404
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            app.logger.info(f'Successfully read {len(content)} characters from {filename}')
-            
-            # Convert markdown to HTML
-            html_content = markdown.markdown(content, extensions=['extra', 'codehilite'])
-            
-            app.logger.info(f'Successfully converted markdown to HTML ({len(html_content)} characters)')
-            
             return html_content
         
         except Exception as e:
@@ -806,10 +1121,29 @@ def create_app():
     )
     admin.add_view(UserModelView(User, db.session, name='Users'))
     admin.add_view(DocumentationView(name='Documentation', endpoint='doc_admin'))
+    admin.add_view(ProfileView(name='Profiles', endpoint='profile_admin'))
+    
+    # Dash Analytics Integration - built on its own Flask server on first use and
+    # proxied through these routes, so the main app's request hooks still apply
+    dash_server = {}
+    dash_server_lock = threading.Lock()
+    
+    def get_dash_server():
+        with dash_server_lock:
+            if 'server' not in dash_server:
+                from dash_analytics import create_dash_app
+                server = Flask('dash_analytics')
+                server.config.update(SECRET_KEY=app.config['SECRET_KEY'])
+                create_dash_app(app, server=server)
+                dash_server['server'] = server
+            return dash_server['server']
     
-    # Dash Analytics Integration
     if DASH_AVAILABLE:
-        dash_app = create_dash_app(app)
+        @app.route('/dash/analytics/', methods=['GET', 'POST'])
+        @app.route('/dash/analytics/<path:path>', methods=['GET', 'POST'])
+        def dash_analytics_view(path=None):
+            """Serve the Dash analytics app, importing Dash on the first request."""
+            return Response.from_app(get_dash_server().wsgi_app, request.environ, buffered=True)
     
     @app.route('/')
     @login_required
@@ -876,6 +1210,24 @@ def create_app():
         """Maintenance mode page - handled by before_request check."""
         return render_template('maintenance.html'), 503
     
+    @app.route('/metrics')
+    @limiter.exempt
+    def metrics_endpoint():
+        """Prometheus metrics for all workers on this host (admins, or a scraper on localhost)."""
+        # Behind the reverse proxy every request comes from loopback, so a
+        # forwarded request is never treated as local
+        local = (request.remote_addr in ('127.0.0.1', '::1')
+                 and 'X-Forwarded-For' not in request.headers
+                 and 'X-Real-IP' not in request.headers)
+        if not app.config['METRICS_ENABLED']:
+            abort(404)
+        if not local and not (current_user.is_authenticated and current_user.is_admin):
+            abort(403)
+        response = make_response(metrics.render())
+        response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    
     @app.route('/analysis')
     @login_required
     def analysis():
@@ -919,9 +1271,16 @@ def create_app():
             # Normalize precinct format to handle inconsistencies between tables
             padded_precinct, unpadded_precinct = normalize_precinct_id(target_precinct)
             
+            params = {
+                'county': target_county,
+                'precinct_padded': padded_precinct,
+                'precinct_unpadded': unpadded_precinct
+            }
+            
             query = text('''
             SELECT county, precinct, contest_name, election_date,
-                   dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed
+                   dem_votes, oppo_votes, vote_gap, dva_pct_needed,
+                   assessment, best_pathway
             FROM flippable 
             WHERE UPPER(county) = UPPER(:county) 
             AND (precinct = :precinct_padded OR precinct = :precinct_unpadded)
@@ -929,93 +1288,44 @@ def create_app():
             LIMIT 100
             ''')
             
-            result = db.session.execute(query, {
-                'county': target_county,
-                'precinct_padded': padded_precinct,
-                'precinct_unpadded': unpadded_precinct
-            })
-            races = result.fetchall()
+            races = db.session.execute(query, params).fetchall()
             
-            # Process races with assessment categories
-            processed_races = []
-            assessment_counts = {"🎯 SLAM DUNK": 0, "✅ HIGHLY FLIPPABLE": 0, "🟡 COMPETITIVE": 0, "🔴 STRETCH GOAL": 0}
+            # Assessment counts come from the persisted assessment column
+            counts_query = text('''
+            SELECT assessment, COUNT(*)
+            FROM flippable 
+            WHERE UPPER(county) = UPPER(:county) 
+            AND (precinct = :precinct_padded OR precinct = :precinct_unpadded)
+            GROUP BY assessment
+            ''')
             
+            assessment_counts = empty_assessment_counts()
+            for assessment, count in db.session.execute(counts_query, params):
+                if assessment in assessment_counts:
+                    assessment_counts[assessment] = count
+            
+            processed_races = []
             for race in races:
-                # Safely extract values
-                county = race[0] if race[0] else "Unknown"
-                precinct = race[1] if race[1] else "Unknown"
-                contest_name = race[2] if race[2] else "Unknown"
-                election_date = race[3] if race[3] else "Unknown"
-                dem_votes = race[4] if race[4] is not None else 0
-                oppo_votes = race[5] if race[5] is not None else 0
-                gov_votes = race[6] if race[6] is not None else 0
-                dem_margin = race[7] if race[7] is not None else 0
-                dva_pct_needed = race[8] if race[8] is not None else 999.9
-                
-                # Calculate vote gap and DVA metrics
-                vote_gap = (oppo_votes + 1) - dem_votes
-                dem_absenteeism = gov_votes - dem_votes if gov_votes > dem_votes else 0
-                
-                # Determine assessment category
-                if vote_gap <= 25 or (dem_absenteeism > 0 and dva_pct_needed <= 15):
-                    assessment = "🎯 SLAM DUNK"
-                    effort_level = "Weekend volunteer effort"
-                elif vote_gap <= 100 or (dem_absenteeism > 0 and dva_pct_needed <= 35):
-                    assessment = "✅ HIGHLY FLIPPABLE"
-                    effort_level = "Month-long focused campaign"
-                elif vote_gap <= 300 or (dem_absenteeism > 0 and dva_pct_needed <= 60):
-                    assessment = "🟡 COMPETITIVE"
-                    effort_level = "Season-long strategic effort"
-                else:
-                    assessment = "🔴 STRETCH GOAL"
-                    effort_level = "Multi-cycle investment"
-                
-                # Determine best pathway
-                if vote_gap <= 100 and dem_absenteeism > 0 and dva_pct_needed <= 50:
-                    best_pathway = "DVA" if dva_pct_needed < (vote_gap / max(oppo_votes, 1) * 100) else "Traditional"
-                else:
-                    best_pathway = "Traditional"
-                
-                assessment_counts[assessment] += 1
-                
                 processed_races.append({
-                    'county': county,
-                    'precinct': precinct,
-                    'contest_name': contest_name,
-                    'election_date': str(election_date),
-                    'dem_votes': dem_votes,
-                    'oppo_votes': oppo_votes,
-                    'vote_gap': vote_gap,
-                    'dva_pct_needed': dva_pct_needed,
-                    'assessment': assessment,
-                    'effort_level': effort_level,
-                    'best_pathway': best_pathway
+                    'county': race.county or "Unknown",
+                    'precinct': race.precinct or "Unknown",
+                    'contest_name': race.contest_name or "Unknown",
+                    'election_date': str(race.election_date or "Unknown"),
+                    'dem_votes': race.dem_votes if race.dem_votes is not None else 0,
+                    'oppo_votes': race.oppo_votes if race.oppo_votes is not None else 0,
+                    'vote_gap': race.vote_gap,
+                    'dva_pct_needed': race.dva_pct_needed if race.dva_pct_needed is not None else 999.9,
+                    'assessment': race.assessment,
+                    'effort_level': EFFORT_LEVELS.get(race.assessment),
+                    'best_pathway': race.best_pathway
                 })
             
-            # Load ballot matching strategy content based on user role
-            if current_user.is_authenticated and (current_user.is_admin or current_user.is_county):
-                strategy_filename = '_BALLOT_MATCHING_STRATEGY.md'
-            else:
-                strategy_filename = '_BALLOT_MATCHING_STRATEGY_PUBLIC.md'
-            
-            strategy_content_html = ''
-            try:
-                strategy_filepath = os.path.join('doc', strategy_filename)
-                if os.path.exists(strategy_filepath):
-                    with open(strategy_filepath, 'r', encoding='utf-8') as f:
-                        strategy_content = f.read()
-                    strategy_content_html = markdown.markdown(strategy_content, extensions=['extra', 'codehilite'])
-            except Exception as e:
-                app.logger.error(f'Error loading strategy content for flippable: {str(e)}')
-                strategy_content_html = '<div class="alert alert-danger">Error loading strategy content.</div>'
-            
             return render_template('flippable.html', 
                                  races=processed_races,
                                  assessment_counts=assessment_counts,
                                  show_back_to_analysis=from_analysis,
                                  target_county=target_county,
                                  target_precinct=target_precinct,
-                                 strategy_content=strategy_content_html,
                                  user=current_user)
             
         except Exception as e:
@@ -1042,124 +1352,30 @@ def create_app():
                 county_filter = current_user.county
                 scope_description = f"{current_user.county} County Analysis"
             
-            # Build the base query
-            base_query = '''
-            SELECT county, precinct, contest_name, election_date,
-                   dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed,
-                   COUNT(*) as race_count
-            FROM flippable 
-            '''
-            
+            where_clause = 'WHERE UPPER(county) = UPPER(:county)' if county_filter else ''
+            params = dict(FLIPPABLE_ROLLUP_PARAMS)
             if county_filter:
-                base_query += 'WHERE UPPER(county) = UPPER(:county) '
-            
-            # Get summary statistics by county and precinct
-            summary_query = base_query + '''
-            GROUP BY county, precinct, contest_name, election_date, dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed
-            ORDER BY county, precinct, dem_margin DESC
-            '''
+                params['county'] = county_filter
             
-            # Execute query
-            if county_filter:
-                result = db.session.execute(text(summary_query), {'county': county_filter})
-            else:
-                result = db.session.execute(text(summary_query))
+            # Precinct, county and overall rollups (a single pass over flippable on PostgreSQL)
+            rollup_query = flippable_rollup_query(where_clause, db.engine.dialect.name)
             
-            races = result.fetchall()
+            rows = db.session.execute(text(rollup_query), params).fetchall()
             
-            # Process races and create summaries
             county_summaries = {}
-            precinct_summaries = {}  # New: Group by county-precinct combination
-            total_assessment_counts = {"🎯 SLAM DUNK": 0, "✅ HIGHLY FLIPPABLE": 0, "🟡 COMPETITIVE": 0, "🔴 STRETCH GOAL": 0}
-            
-            for race in races:
-                county = race[0] if race[0] else "Unknown"
-                precinct = race[1] if race[1] else "Unknown"
-                contest_name = race[2] if race[2] else "Unknown"
-                election_date = race[3] if race[3] else "Unknown"
-                dem_votes = race[4] if race[4] is not None else 0
-                oppo_votes = race[5] if race[5] is not None else 0
-                gov_votes = race[6] if race[6] is not None else 0
-                dem_margin = race[7] if race[7] is not None else 0
-                dva_pct_needed = race[8] if race[8] is not None else 999.9
-                
-                # Calculate metrics
-                vote_gap = (oppo_votes + 1) - dem_votes
-                dem_absenteeism = gov_votes - dem_votes if gov_votes > dem_votes else 0
-                
-                # Determine assessment category
-                if vote_gap <= 25 or (dem_absenteeism > 0 and dva_pct_needed <= 15):
-                    assessment = "🎯 SLAM DUNK"
-                elif vote_gap <= 100 or (dem_absenteeism > 0 and dva_pct_needed <= 35):
-                    assessment = "✅ HIGHLY FLIPPABLE"
-                elif vote_gap <= 300 or (dem_absenteeism > 0 and dva_pct_needed <= 60):
-                    assessment = "🟡 COMPETITIVE"
+            precinct_summaries = []
+            total_assessment_counts = empty_assessment_counts()
+            
+            for row in rows:
+                summary = flippable_rollup_summary(row)
+                if row.is_total:
+                    total_assessment_counts = {category: summary[category] for category in total_assessment_counts}
+                elif row.is_county:
+                    county_summaries[row.county or "Unknown"] = summary
                 else:
-                    assessment = "🔴 STRETCH GOAL"
-                
-                total_assessment_counts[assessment] += 1
-                
-                # Initialize county summary if needed
-                if county not in county_summaries:
-                    county_summaries[county] = {
-                        "🎯 SLAM DUNK": 0, "✅ HIGHLY FLIPPABLE": 0, "🟡 COMPETITIVE": 0, "🔴 STRETCH GOAL": 0,
-                        'total_races': 0, 'total_vote_gap': 0, 'avg_dva': 0, 'dva_count': 0
-                    }
-                
-                county_summaries[county][assessment] += 1
-                county_summaries[county]['total_races'] += 1
-                county_summaries[county]['total_vote_gap'] += vote_gap
-                if dva_pct_needed < 999:
-                    county_summaries[county]['avg_dva'] += dva_pct_needed
-                    county_summaries[county]['dva_count'] += 1
-                
-                # Group by precinct - key is county-precinct combination
-                precinct_key = f"{county}-{precinct}"
-                if precinct_key not in precinct_summaries:
-                    precinct_summaries[precinct_key] = {
-                        'county': county,
-                        'precinct': precinct,
-                        "🎯 SLAM DUNK": 0, "✅ HIGHLY FLIPPABLE": 0, "🟡 COMPETITIVE": 0, "🔴 STRETCH GOAL": 0,
-                        'total_races': 0, 'total_vote_gap': 0, 'avg_dva': 0, 'dva_count': 0,
-                        'races': []  # Store individual races for detail view
-                    }
-                
-                precinct_summaries[precinct_key][assessment] += 1
-                precinct_summaries[precinct_key]['total_races'] += 1
-                precinct_summaries[precinct_key]['total_vote_gap'] += vote_gap
-                if dva_pct_needed < 999:
-                    precinct_summaries[precinct_key]['avg_dva'] += dva_pct_needed
-                    precinct_summaries[precinct_key]['dva_count'] += 1
-                
-                # Add individual race details
-                precinct_summaries[precinct_key]['races'].append({
-                    'contest_name': contest_name,
-                    'election_date': str(election_date),
-                    'dem_votes': dem_votes,
-                    'oppo_votes': oppo_votes,
-                    'vote_gap': vote_gap,
-                    'dva_pct_needed': round(dva_pct_needed, 1) if dva_pct_needed < 999 else 'N/A',
-                    'assessment': assessment,
-                    'dem_margin': dem_margin
-                })
-            
-            # Calculate averages for county summaries
-            for county in county_summaries:
-                if county_summaries[county]['dva_count'] > 0:
-                    county_summaries[county]['avg_dva'] = round(
-                        county_summaries[county]['avg_dva'] / county_summaries[county]['dva_count'], 1
-                    )
-                else:
-                    county_summaries[county]['avg_dva'] = 'N/A'
-            
-            # Calculate averages for precinct summaries
-            for precinct_key in precinct_summaries:
-                if precinct_summaries[precinct_key]['dva_count'] > 0:
-                    precinct_summaries[precinct_key]['avg_dva'] = round(
-                        precinct_summaries[precinct_key]['avg_dva'] / precinct_summaries[precinct_key]['dva_count'], 1
-                    )
-                else:
-                    precinct_summaries[precinct_key]['avg_dva'] = 'N/A'
+                    summary['county'] = row.county or "Unknown"
+                    summary['precinct'] = row.precinct or "Unknown"
+                    precinct_summaries.append((f"{summary['county']}-{summary['precinct']}", summary))
             
             # Sort precincts by county then precinct number (numeric sorting with zero-padded display)
             def sort_key(item):
@@ -1172,7 +1388,7 @@ def create_app():
                     precinct_num = 999999  # Put non-numeric precincts at the end
                 return (county, precinct_num)
             
-            sorted_precincts = sorted(precinct_summaries.items(), key=sort_key)
+            sorted_precincts = sorted(precinct_summaries, key=sort_key)
             
             # Zero-pad precinct numbers for display
             for precinct_key, precinct_data in sorted_precincts:
@@ -1184,35 +1400,68 @@ def create_app():
                     # Leave non-numeric precincts as-is
                     pass
             
-            # Load ballot matching strategy content based on user role
-            if current_user.is_authenticated and (current_user.is_admin or current_user.is_county):
-                strategy_filename = '_BALLOT_MATCHING_STRATEGY.md'
-            else:
-                strategy_filename = '_BALLOT_MATCHING_STRATEGY_PUBLIC.md'
-            
-            strategy_content_html = ''
-            try:
-                strategy_filepath = os.path.join('doc', strategy_filename)
-                if os.path.exists(strategy_filepath):
-                    with open(strategy_filepath, 'r', encoding='utf-8') as f:
-                        strategy_content = f.read()
-                    strategy_content_html = markdown.markdown(strategy_content, extensions=['extra', 'codehilite'])
-            except Exception as e:
-                app.logger.error(f'Error loading strategy content for flippable_analysis: {str(e)}')
-                strategy_content_html = '<div class="alert alert-danger">Error loading strategy content.</div>'
-            
             return render_template('flippable_analysis.html', 
                                  county_summaries=county_summaries,
                                  precinct_summaries=sorted_precincts,
                                  total_assessment_counts=total_assessment_counts,
                                  scope_description=scope_description,
-                                 strategy_content=strategy_content_html,
                                  user=current_user)
                                  
         except Exception as e:
             flash(f'Error loading flippable races analysis: {str(e)}', 'error')
             return redirect(url_for('index'))
     
+    @app.route('/api/flippable-analysis/races')
+    @login_required
+    def flippable_analysis_races():
+        """Return the individual races for one precinct of the flippable analysis (loaded on demand)."""
+        if not (current_user.is_admin or current_user.is_county):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        county = request.args.get('county', '').strip()
+        padded_precinct, unpadded_precinct = normalize_precinct_id(request.args.get('precinct'))
+        if not county or not padded_precinct:
+            return jsonify({'error': 'county and precinct are required'}), 400
+        
+        # County users can only drill into their own county
+        if not current_user.is_admin and county.upper() != (current_user.county or '').upper():
+            return jsonify({'error': 'Access denied'}), 403
+        
+        query = text('''
+        SELECT contest_name, election_date, dem_votes, oppo_votes,
+               vote_gap, dva_pct_needed, assessment, dem_margin
+        FROM flippable 
+        WHERE UPPER(county) = UPPER(:county) 
+        AND (precinct = :precinct_padded OR precinct = :precinct_unpadded)
+        ORDER BY dem_margin DESC
+        ''')
+        
+        try:
+            rows = db.session.execute(query, {
+                'county': county,
+                'precinct_padded': padded_precinct,
+                'precinct_unpadded': unpadded_precinct
+            }).fetchall()
+        except Exception as e:
+            app.logger.error(f'Error loading flippable races for {county} precinct {padded_precinct}: {str(e)}')
+            return jsonify({'error': 'Error loading races'}), 500
+        
+        races = []
+        for race in rows:
+            dva_pct_needed = race.dva_pct_needed if race.dva_pct_needed is not None else 999.9
+            races.append({
+                'contest_name': race.contest_name or "Unknown",
+                'election_date': str(race.election_date or "Unknown"),
+                'dem_votes': race.dem_votes if race.dem_votes is not None else 0,
+                'oppo_votes': race.oppo_votes if race.oppo_votes is not None else 0,
+                'vote_gap': race.vote_gap,
+                'dva_pct_needed': round(dva_pct_needed, 1) if dva_pct_needed < 999 else 'N/A',
+                'assessment': race.assessment,
+                'dem_margin': race.dem_margin if race.dem_margin is not None else 0
+            })
+        
+        return jsonify({'county': county, 'precinct': padded_precinct, 'races': races})
+    
     @app.route('/clustering')
     @login_required
     def clustering_analysis():
@@ -1266,125 +1515,39 @@ def create_app():
             return redirect(url_for('index'))
         
         try:
-            # Load precinct clustering data for precinct distribution analysis
-            from services.clustering_service import ClusteringService
-            clustering_service = ClusteringService()
-            county_filter = None if current_user.is_admin else current_user.county
-            precinct_loaded = clustering_service.load_precinct_clustering_data(county_filter=county_filter)
+            from services.clustering_service import (census_clustering_summary, precinct_clustering_dataset,
+                                                     precinct_cluster_distribution)
+            
+            # Admins can view any county with a summary (their own by default); county users see their own
+            county = current_user.county
+            available_counties = census_clustering_summary.counties() if current_user.is_admin else []
+            if current_user.is_admin:
+                if request.args.get('county'):
+                    county = request.args['county']
+                elif census_clustering_summary.get(county) is None and available_counties:
+                    county = available_counties[0].title()
             
             # Get scope description - demographics clustering is always county-specific
-            scope_description = f"{current_user.county} County"
+            scope_description = f"{county} County"
             
-            # Organize precincts by clustering results if data is available
-            precinct_distribution = {}
-            if precinct_loaded and clustering_service.precinct_data is not None:
-                import pandas as pd
-                df = clustering_service.precinct_data
-                
-                # Group precincts by comprehensive cluster
-                cluster_groups = df.groupby('comprehensive_cluster')
-                for cluster_id, group in cluster_groups:
-                    precinct_list = group['precinct'].tolist()
-                    avg_flippability = group['flippability_score'].mean()
-                    avg_dem_pct = group['dem_pct'].mean()
-                    
-                    precinct_distribution[cluster_id] = {
-                        'precincts': precinct_list,
-                        'count': len(precinct_list),
-                        'avg_flippability': round(avg_flippability, 2),
-                        'avg_dem_pct': round(avg_dem_pct, 1),
-                        'description': f"Cluster {cluster_id}"
-                    }
+            # Census tract clustering summary written by census_tract_clustering.py
+            clustering_data = census_clustering_summary.get(county)
             
-            # Census tract clustering data (based on the analysis document)
-            clustering_data = {
-                'overview': {
-                    'total_tracts': 94,
-                    'county': 'Forsyth',
-                    'state': 'North Carolina',
-                    'population_range': {'min': 1217, 'max': 8393},
-                    'income_range': {'min': 17076, 'max': 168125},
-                    'analysis_date': 'October 21, 2025'
-                },
-                'population_housing': {
-                    'clusters': 4,
-                    'silhouette_score': 0.285,
-                    'distribution': [
-                        {'id': 0, 'tracts': 4, 'avg_pop': 4778, 'description': 'High population areas'},
-                        {'id': 1, 'tracts': 50, 'avg_pop': 3592, 'description': 'Largest cluster'},
-                        {'id': 2, 'tracts': 18, 'avg_pop': 6416, 'description': 'Highest population density'},
-                        {'id': 3, 'tracts': 22, 'avg_pop': 3016, 'description': 'Lower population areas'}
-                    ]
-                },
-                'economic': {
-                    'clusters': 5,
-                    'silhouette_score': 0.328,
-                    'distribution': [
-                        {'id': 0, 'tracts': 16, 'avg_income': 95336, 'description': 'High-income areas'},
-                        {'id': 1, 'tracts': 34, 'avg_income': 50344, 'description': 'Largest middle-income group'},
-                        {'id': 2, 'tracts': 13, 'avg_income': 36852, 'description': 'Lower-middle income'},
-                        {'id': 3, 'tracts': 30, 'avg_income': 79481, 'description': 'Upper-middle income'},
-                        {'id': 4, 'tracts': 1, 'avg_income': 36574, 'description': 'Single low-income outlier'}
-                    ]
-                },
-                'education': {
-                    'clusters': 4,
-                    'silhouette_score': 0.469,
-                    'distribution': [
-                        {'id': 0, 'tracts': 10, 'education_rate': 52.6, 'description': 'Highly educated'},
-                        {'id': 1, 'tracts': 55, 'education_rate': 14.6, 'description': 'Largest, lower education'},
-                        {'id': 2, 'tracts': 25, 'education_rate': 30.4, 'description': 'Moderate education'},
-                        {'id': 3, 'tracts': 4, 'education_rate': 38.8, 'description': 'Above-average education'}
-                    ]
-                },
-                'geographic': {
-                    'clusters': 6,
-                    'silhouette_score': 0.332,
-                    'distribution': [
-                        {'id': 0, 'tracts': 21, 'latitude': 36.153, 'description': 'Northern area'},
-                        {'id': 1, 'tracts': 17, 'latitude': 36.098, 'description': 'South-central area'},
-                        {'id': 2, 'tracts': 3, 'latitude': 36.150, 'description': 'Small northern cluster'},
-                        {'id': 3, 'tracts': 6, 'latitude': 36.210, 'description': 'Northernmost area'},
-                        {'id': 4, 'tracts': 14, 'latitude': 36.037, 'description': 'Southern area'},
-                        {'id': 5, 'tracts': 33, 'latitude': 36.090, 'description': 'Largest geographic cluster'}
-                    ]
-                },
-                'strategic_insights': {
-                    'high_opportunity': {
-                        'high_income_tracts': 19,
-                        'remote_work_hotspots': 19,
-                        'highly_educated_areas': 19,
-                        'high_density_tracts': 19
-                    },
-                    'targeting_strategies': [
-                        {
-                            'category': 'High-Education Areas',
-                            'tracts': 10,
-                            'rate': 52.6,
-                            'strategy': 'Policy-focused messaging, detailed position papers',
-                            'demographics': 'Likely engaged voters, responsive to complex issues'
-                        },
-                        {
-                            'category': 'High-Income Areas',
-                            'tracts': 16,
-                            'income': 95000,
-                            'strategy': 'Economic stability messaging, tax policy focus',
-                            'demographics': 'Homeowners, established community members'
-                        },
-                        {
-                            'category': 'Remote Work Hotspots',
-                            'tracts': 19,
-                            'strategy': 'Technology policy, work-life balance issues',
-                            'demographics': 'Professional class, flexible schedules'
-                        }
-                    ]
-                }
-            }
+            # Precincts of the same county grouped by comprehensive cluster (computed once per dataset version)
+            precinct_distribution = {}
+            try:
+                precinct_county = county.strip().upper() if county else None
+                precinct_distribution = precinct_clustering_dataset.derived(
+                    'cluster_distribution', precinct_county, precinct_cluster_distribution)
+            except FileNotFoundError:
+                pass
             
             return render_template('demographic_clustering.html', 
                                  clustering_data=clustering_data,
                                  precinct_distribution=precinct_distribution,
                                  scope_description=scope_description,
+                                 county=county,
+                                 available_counties=available_counties,
                                  user=current_user)
                                  
         except Exception as e:
@@ -1411,83 +1574,95 @@ def create_app():
                 base_query = User.query.filter_by(state=current_user.state, county=current_user.county)
                 scope_description = f"{current_user.county} County Users"
             
-            # Get user statistics
-            total_users = base_query.count()
-            admin_users = base_query.filter_by(is_admin=True).count()
-            county_users = base_query.filter_by(is_county=True, is_admin=False).count()
+            # Role and activity counts in a single conditional-aggregation query
+            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            counts = base_query.with_entities(
+                func.count(User.id),
+                func.count(User.id).filter(User.is_admin.is_(True)),
+                func.count(User.id).filter(User.is_county.is_(True), User.is_admin.is_(False)),
+                func.count(User.id).filter(User.is_active.is_(True)),
+                func.count(User.id).filter(User.created_at >= thirty_days_ago),
+            ).one()
+            total_users, admin_users, county_users, active_users, recent_users = counts
             regular_users = total_users - admin_users - county_users
-            active_users = base_query.filter_by(is_active=True).count()
             inactive_users = total_users - active_users
             
-            # Get recent users (last 30 days)
-            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            recent_users = base_query.filter(User.created_at >= thirty_days_ago).count()
-            
-            # Get monthly signup data for chart (last 12 months)
-            monthly_signups = []
-            monthly_labels = []
-            for i in range(11, -1, -1):  # Last 12 months, newest first
-                month_start = datetime.utcnow().replace(day=1) - timedelta(days=32*i)
-                month_start = month_start.replace(day=1)
-                if i == 0:
-                    month_end = datetime.utcnow()
-                else:
-                    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                
-                month_users = base_query.filter(
-                    User.created_at >= month_start,
-                    User.created_at <= month_end
-                ).count()
-                
-                monthly_signups.append(month_users)
-                monthly_labels.append(month_start.strftime('%b %Y'))
+            # Monthly signup data for chart (last 12 calendar months, oldest first)
+            now = datetime.utcnow()
+            month_starts = []
+            for i in range(11, -1, -1):
+                year, month = divmod(now.year * 12 + now.month - 1 - i, 12)
+                month_starts.append(datetime(year, month + 1, 1))
             
-            # Get all precincts in county and user distribution
+            if db.engine.dialect.name == 'postgresql':
+                month_key = func.to_char(func.date_trunc('month', User.created_at), 'YYYY-MM')
+            else:
+                month_key = func.strftime('%Y-%m', User.created_at)
+            signups_by_month = dict(
+                base_query.filter(User.created_at >= month_starts[0])
+                .with_entities(month_key, func.count(User.id))
+                .group_by(month_key)
+                .all()
+            )
+            monthly_labels = [month_start.strftime('%b %Y') for month_start in month_starts]
+            monthly_signups = [signups_by_month.get(month_start.strftime('%Y-%m'), 0)
+                               for month_start in month_starts]
+            
+            # Users per precinct, matched to the county's precincts in the database.
+            # A user's precinct counts toward the known precinct it matches exactly,
+            # otherwise toward its zero-padded form, otherwise under its own name.
+            # Known precincts come from the precincts table, falling back to
+            # candidate_vote_results when the county has none there.
             precinct_distribution = {}
             if current_user.county:
-                # First, get all precincts that exist in the county from the precincts table
-                all_precincts_query = text('''
-                    SELECT DISTINCT precinct 
-                    FROM precincts 
-                    WHERE UPPER(county) = UPPER(:county) 
-                    ORDER BY precinct
+                precinct_query = text('''
+                    WITH known AS (
+                        SELECT DISTINCT precinct
+                        FROM precincts
+                        WHERE UPPER(county) = UPPER(:county)
+                        UNION
+                        SELECT DISTINCT precinct
+                        FROM candidate_vote_results
+                        WHERE UPPER(county) = UPPER(:county)
+                        AND NOT EXISTS (
+                            SELECT 1 FROM precincts WHERE UPPER(county) = UPPER(:county)
+                        )
+                    ),
+                    user_precincts AS (
+                        SELECT TRIM(precinct) AS precinct, COUNT(*) AS user_count
+                        FROM users
+                        WHERE state = :state
+                        AND (:scope_county IS NULL OR county = :scope_county)
+                        AND precinct IS NOT NULL AND precinct <> ''
+                        GROUP BY TRIM(precinct)
+                    ),
+                    matched AS (
+                        SELECT COALESCE(exact.precinct, padded.precinct, u.precinct) AS precinct,
+                               u.user_count
+                        FROM user_precincts u
+                        LEFT JOIN known exact ON exact.precinct = u.precinct
+                        LEFT JOIN known padded ON padded.precinct = CASE LENGTH(u.precinct)
+                            WHEN 1 THEN '00' || u.precinct
+                            WHEN 2 THEN '0' || u.precinct
+                            ELSE u.precinct
+                        END
+                    )
+                    SELECT precinct, SUM(user_count) AS user_count
+                    FROM (
+                        SELECT precinct, 0 AS user_count FROM known
+                        UNION ALL
+                        SELECT precinct, user_count FROM matched
+                    ) AS distribution
+                    GROUP BY precinct
                 ''')
-                all_precincts = db.session.execute(all_precincts_query, {'county': current_user.county}).fetchall()
-                
-                # Initialize all precincts with 0 users
-                for precinct_row in all_precincts:
-                    precinct = precinct_row[0]
-                    precinct_distribution[precinct] = 0
-                
-                # If no precincts found in precincts table, fall back to candidate_vote_results
-                if not precinct_distribution:
-                    fallback_query = text('''
-                        SELECT DISTINCT precinct 
-                        FROM candidate_vote_results 
-                        WHERE UPPER(county) = UPPER(:county) 
-                        ORDER BY precinct
-                    ''')
-                    fallback_precincts = db.session.execute(fallback_query, {'county': current_user.county}).fetchall()
-                    for precinct_row in fallback_precincts:
-                        precinct = precinct_row[0]
-                        precinct_distribution[precinct] = 0
-                
-                # Now count actual users by precinct
-                precinct_query = base_query.filter(User.precinct.isnot(None))
-                for user in precinct_query.all():
-                    if user.precinct:
-                        # Handle both padded and unpadded precinct formats
-                        user_precinct = str(user.precinct).strip()
-                        padded_precinct = user_precinct.zfill(3)
-                        
-                        # Check if user's precinct (padded or unpadded) matches any known precinct
-                        if user_precinct in precinct_distribution:
-                            precinct_distribution[user_precinct] += 1
-                        elif padded_precinct in precinct_distribution:
-                            precinct_distribution[padded_precinct] += 1
-                        else:
-                            # If precinct format doesn't match, add it anyway
-                            precinct_distribution[user_precinct] = precinct_distribution.get(user_precinct, 0) + 1
+                precinct_distribution = {
+                    precinct: int(user_count)
+                    for precinct, user_count in db.session.execute(precinct_query, {
+                        'county': current_user.county,
+                        'state': current_user.state,
+                        'scope_county': None if current_user.is_admin else current_user.county,
+                    })
+                }
             
             user_stats = {
                 'total': total_users,
@@ -1540,9 +1715,7 @@ def create_app():
     @login_required
     def download_clustering_csv():
         """Download clustering results CSV file filtered by user's county."""
-        from services.clustering_service import ClusteringService
-        import tempfile
-        from flask import after_this_request
+        from services.clustering_service import ClusteringService, precinct_clustering_dataset
         
         clustering_service = ClusteringService()
         
@@ -1557,27 +1730,23 @@ def create_app():
         if clustering_service.precinct_data is None or clustering_service.precinct_data.empty:
             abort(404, description="No clustering data available for your county")
         
-        # Create temporary CSV file with filtered data
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as temp_file:
-            clustering_service.precinct_data.to_csv(temp_file.name, index=False)
-            temp_file_path = temp_file.name
+        # Encoded CSV is cached per county against the dataset version
+        csv_data = precinct_clustering_dataset.csv_bytes(county_filter)
         
         # Determine download filename
         download_name = f"precinct_clustering_results_{county_filter}.csv" if county_filter else "precinct_clustering_results.csv"
         
-        # Clean up temporary file after sending
-        @after_this_request
-        def remove_file(response):
-            try:
-                os.remove(temp_file_path)
-            except Exception:
-                pass
-            return response
+        def generate():
+            view = memoryview(csv_data)
+            for start in range(0, len(view), CSV_STREAM_CHUNK_SIZE):
+                yield bytes(view[start:start + CSV_STREAM_CHUNK_SIZE])
         
-        return send_file(temp_file_path, 
-                        as_attachment=True, 
-                        download_name=download_name,
-                        mimetype='text/csv')
+        return Response(generate(),
+                        mimetype='text/csv',
+                        headers={
+                            'Content-Disposition': f'attachment; filename="{download_name}"',
+                            'Content-Length': str(len(csv_data)),
+                        })
     
     @app.route('/doc/<filename>')
     @login_required
@@ -1624,6 +1793,7 @@ def create_app():
             try:
                 with open(motd_path, 'w', encoding='utf-8') as f:
                     f.write(motd_content)
+                document_cache.invalidate(motd_path)
                 flash('Message of the Day updated successfully!', 'success')
             except Exception as e:
                 flash(f'Error updating MOTD: {str(e)}', 'error')
@@ -1669,12 +1839,10 @@ def create_app():
                 return redirect(url_for('index'))
             
             for nc_map in nc_maps:
-                if not nc_map.get('map_content'):
+                has_content = nc_map['has_content']
+                if not has_content:
                     app.logger.error(f'Map content missing for precinct {nc_map["precinct"]} in county {current_user.county}')
                     # Still show the map but mark it as having an error
-                    has_content = False
-                else:
-                    has_content = True
                 
                 html_files.append({
                     'name': nc_map['filename'],
@@ -1706,9 +1874,9 @@ def create_app():
                 flash('Access denied. You can only view your assigned map.', 'error')
                 return redirect(url_for('index'))
         
-        # Try to get map content from database first, then fall back to static files
-        map_content = get_map_content_by_filename(filename)
-        if not map_content:
+        # Only the lookup runs here; the iframe's raw endpoint loads the map (or its error page)
+        map_record, error_page = find_map_by_filename(filename)
+        if map_record is None and error_page is None:
             abort(404)
         
         return render_template('static_viewer.html', 
@@ -1724,8 +1892,11 @@ def create_app():
         # Allow all authenticated users to view static content
         # For non-admin users, they can only access via direct links (not browse the library)
         
-        # Try to get map content from database first, then fall back to static files
-        content = get_map_content_by_filename(filename)
+        # Try to get map content from database (answering 304 if the browser's copy is current)
+        content, etag, early_response = resolve_map_view(find_map_by_filename(filename), filename, 'raw',
+                                                         passthrough=True)
+        if early_response:
+            return early_response
         if content is None:
             # Neither database nor static file found
             error_content = create_error_page("Map Not Found", 
@@ -1733,78 +1904,25 @@ def create_app():
             return error_content, 404
         
         # Content found (either valid content or error page from database issues)
-        return content
+        return map_response(content, etag)
     
     @app.route('/view/<filename>')
     @login_required
     @limiter.limit("100 per hour")  # Limit new tab file access
     def view_file_new_tab(filename):
         """Open map file directly in new tab with close button. Available to all authenticated users."""
-        # Try to get map content from database first, then fall back to static files
-        content = get_map_content_by_filename(filename)
+        # Try to get map content from database (answering 304 if the browser's copy is current)
+        content, etag, early_response = resolve_map_view(find_map_by_filename(filename), filename, 'new-tab')
+        if early_response:
+            return early_response
         if content is None:
             # Neither database nor static file found
             error_content = create_error_page("Map Not Found", 
                 f"The requested map '{filename}' could not be found in the database or static files.")
             return error_content, 404
         
-        # Add close button and zoom controls to the content
-        try:
-            
-            # Add a close window button to the map content
-            close_button = '''
-<div style="position: fixed; top: 10px; right: 10px; z-index: 9999;">
-    <button onclick="closeWindow()" 
-       style="background: #dc3545; color: white; padding: 8px 16px; border: none; 
-              border-radius: 4px; font-family: Arial, sans-serif; font-size: 14px;
-              box-shadow: 0 2px 4px rgba(0,0,0,0.2); cursor: pointer; display: inline-block;
-              transition: background-color 0.2s;"
-       onmouseover="this.style.backgroundColor='#c82333'"
-       onmouseout="this.style.backgroundColor='#dc3545'">
-        ✕ Close Window
-    </button>
-</div>
-<script>
-function closeWindow() {
-    // Try to close the window
-    if (window.opener) {
-        window.close();
-    } else {
-        // If not opened by another window, try alternative methods
-        window.close();
-        // Fallback for browsers that don't allow window.close()
-        setTimeout(function() {
-            window.location.href = 'about:blank';
-        }, 100);
-    }
-}
-</script>
-            '''
-            
-            # Enhanced zoom controls for new tab view
-            enhanced_zoom_controls = '''
-<!-- Enhanced Zoom Controls for New Tab -->
-<div class="new-tab-zoom-controls" style="position: fixed; top: 20px; left: 20px; z-index: 9999; display: flex; flex-direction: column; gap: 8px;">
-    <div style="background: rgba(255,255,255,0.95); padding: 8px; border-radius: 8px; box-shadow: 0 4px 12px rgba(0,0,0,0.3); border: 2px solid #007bff;">
-        <div style="display: flex; flex-direction: column; gap: 4px;">
-            <button onclick="zoomIn()" style="width: 60px; height: 35px; background: #28a745; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#218838'" onmouseout="this.style.backgroundColor='#28a745'" title="Zoom In (Ctrl/Cmd + Plus)">+</button>
-            <button onclick="zoomOut()" style="width: 60px; height: 35px; background: #dc3545; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#c82333'" onmouseout="this.style.backgroundColor='#dc3545'" title="Zoom Out (Ctrl/Cmd + Minus)">−</button>
-            <button onclick="resetZoom()" style="width: 60px; height: 30px; background: #17a2b8; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 10px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#138496'" onmouseout="this.style.backgroundColor='#17a2b8'" title="Reset Zoom (Ctrl/Cmd + 0)">Reset</button>
-        </div>
-    </div>
-</div>
-            '''
-            
-            # Insert close button and zoom controls after the opening <body> tag
-            if '<body>' in content:
-                content = content.replace('<body>', '<body>' + close_button + enhanced_zoom_controls)
-            else:
-                # If no <body> tag found, add it at the beginning
-                content = close_button + enhanced_zoom_controls + content
-            
-            return content
-        except Exception as e:
-            return f'<html><body><h1>Error</h1><p>Error reading file: {str(e)}</p></body></html>', 500
+        # Close button and zoom controls are spliced in by resolve_map_view
+        return map_response(content, etag)
     
     @app.route('/user-map/<filename>')
     @login_required
@@ -1816,9 +1934,9 @@ function closeWindow() {
             flash('Access denied. You can only view your assigned map.', 'error')
             return redirect(url_for('profile'))
         
-        # Try to get map content from database first, then fall back to static files
-        map_content = get_map_content_by_filename(filename)
-        if not map_content:
+        # Only the lookup runs here; the iframe's raw endpoint loads the map (or its error page)
+        map_record, error_page = find_map_by_filename(filename)
+        if map_record is None and error_page is None:
             abort(404)
         
         return render_template('static_viewer.html', 
@@ -1835,74 +1953,15 @@ function closeWindow() {
         if not user_can_access_map(current_user, filename):
             return '<html><body><h1>Access Denied</h1><p>You can only view your assigned map.</p></body></html>', 403
         
-        # Try to get map content from database first, then fall back to static files
-        content = get_map_content_by_filename(filename)
+        # Try to get map content from database (answering 304 if the browser's copy is current)
+        content, etag, early_response = resolve_map_view(find_map_by_filename(filename), filename, 'user-raw')
+        if early_response:
+            return early_response
         if not content:
             abort(404)
         
-        # Add zoom control support to the content
-        try:
-            
-            # Add message listener for zoom controls to work with sidebar
-            zoom_message_listener = '''
-<script>
-// Message listener for sidebar zoom controls
-window.addEventListener('message', function(event) {
-    if (event.data && event.data.action) {
-        switch(event.data.action) {
-            case 'zoomIn':
-                if (window.map && window.map.zoomIn) {
-                    window.map.zoomIn();
-                }
-                break;
-            case 'zoomOut':
-                if (window.map && window.map.zoomOut) {
-                    window.map.zoomOut();
-                }
-                break;
-            case 'resetZoom':
-                if (window.map && window.map.setView) {
-                    // Reset to initial map view - you may need to adjust these coordinates
-                    window.map.setView([39.8283, -98.5795], 4); // Default US center view
-                }
-                break;
-        }
-    }
-});
-
-// Make map globally accessible for zoom controls
-document.addEventListener('DOMContentLoaded', function() {
-    // Wait for Leaflet map to be initialized
-    setTimeout(function() {
-        // Try to find the map instance
-        if (typeof map !== 'undefined') {
-            window.map = map;
-        } else {
-            // If map variable not found, try to find it in the window object
-            for (let key in window) {
-                if (window[key] && typeof window[key] === 'object' && 
-                    window[key].hasOwnProperty('_container') && 
-                    window[key]._container && window[key]._container.classList.contains('leaflet-container')) {
-                    window.map = window[key];
-                    break;
-                }
-            }
-        }
-    }, 1000);
-});
-</script>
-            '''
-            
-            # Insert message listener before closing </body> tag
-            if '</body>' in content:
-                content = content.replace('</body>', zoom_message_listener + '</body>')
-            else:
-                # If no </body> tag found, add it at the end
-                content = content + zoom_message_listener
-            
-            return content
-        except Exception as e:
-            return f'<html><body><h1>Error</h1><p>Error reading file: {str(e)}</p></body></html>', 500
+        # Zoom control message listener is spliced in by resolve_map_view
+        return map_response(content, etag)
     
     # Rate limiting error handler
     @app.errorhandler(429)
@@ -1915,24 +1974,11 @@ document.addEventListener('DOMContentLoaded', function() {
             # For unauthenticated users or users without full attributes, redirect to login
             return render_template('login.html', form=LoginForm()), 429
     
-    def init_db():
-        """Initialize database with tables and create admin user if none exists."""
-        db.create_all()
-        
-        # Create admin user if no users exist
-        if User.query.count() == 0:
-            from flask import current_app
-            admin_user = User(
-                username=current_app.config['DEFAULT_ADMIN_USERNAME'],
-                email=current_app.config['DEFAULT_ADMIN_EMAIL'],
-                password=current_app.config['DEFAULT_ADMIN_PASSWORD'],
-                phone='555-ADMIN',  # Required field
-                role='Administrator',  # Required field
-                is_admin=True
-            )
-            db.session.add(admin_user)
-            db.session.commit()
-            print(f"Created default admin user: {current_app.config['DEFAULT_ADMIN_USERNAME']}/{current_app.config['DEFAULT_ADMIN_PASSWORD']}")
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and a default admin user (run explicitly, not on boot)."""
+        from db_app import init_database
+        init_database(app)
     
     @app.route('/my-map')
     @login_required
@@ -1943,15 +1989,15 @@ document.addEventListener('DOMContentLoaded', function() {
             flash('Your location information is not complete. Please contact an administrator to update your profile.', 'warning')
             return redirect(url_for('profile'))
         
-        # Get the user's map from database
-        map_content = get_map_content_for_user(current_user)
-        if map_content is None:
-            flash(f'No map found for {current_user.state} {current_user.county} Precinct {current_user.precinct}.', 'info')
-            return redirect(url_for('index'))
-        elif 'Database Error' in map_content and '<div class="error-container">' in map_content:
+        # Check the user's map exists from its metadata; /my-map-raw loads the HTML
+        map_record, error_page = find_map_for_user(current_user)
+        if error_page is not None:
             # Database error occurred, show error message
             flash('There was an error retrieving your map from the database. Please try again or contact support.', 'error')
             return redirect(url_for('index'))
+        if map_record is None or not map_record.has_content:
+            flash(f'No map found for {current_user.state} {current_user.county} Precinct {current_user.precinct}.', 'info')
+            return redirect(url_for('index'))
         
         # Create a zero-padded filename for display purposes
         padded_precinct = current_user.precinct.zfill(3)
@@ -1969,48 +2015,18 @@ document.addEventListener('DOMContentLoaded', function() {
         if not current_user.state or not current_user.county or not current_user.precinct:
             return '<html><body><h1>Error</h1><p>Location information not available.</p></body></html>', 400
         
-        # Get the user's map from database
-        content = get_map_content_for_user(current_user)
+        # Get the user's map from database (answering 304 if the browser's copy is current)
+        content, etag, early_response = resolve_map_view(find_map_for_user(current_user),
+                                                         f'user {current_user.username}', 'my-map')
+        if early_response:
+            return early_response
         if content is None:
             error_content = create_error_page("Map Not Found", 
                 f"No map available for {current_user.state} {current_user.county} Precinct {current_user.precinct}.")
             return error_content, 404
         
-        # Add zoom control support
-        zoom_message_listener = '''
-<script>
-// Message listener for sidebar zoom controls
-window.addEventListener('message', function(event) {
-    if (event.data && event.data.action) {
-        switch(event.data.action) {
-            case 'zoomIn':
-                if (window.map && window.map.zoomIn) {
-                    window.map.zoomIn();
-                }
-                break;
-            case 'zoomOut':
-                if (window.map && window.map.zoomOut) {
-                    window.map.zoomOut();
-                }
-                break;
-            case 'resetZoom':
-                if (window.map && window.map.setView) {
-                    window.map.setView([39.8283, -98.5795], 4);
-                }
-                break;
-        }
-    }
-});
-</script>
-        '''
-        
-        # Insert zoom controls before closing </body> tag
-        if '</body>' in content:
-            content = content.replace('</body>', zoom_message_listener + '</body>')
-        else:
-            content = content + zoom_message_listener
-        
-        return content
+        # Zoom control message listener is spliced in by resolve_map_view
+        return map_response(content, etag)
 
     # File protection - block direct access to sensitive files
     @app.route('/<path:filename>')
@@ -2046,10 +2062,6 @@ window.addEventListener('message', function(event) {
         # This will result in a 404 for non-existent routes
         abort(404)
 
-    # Initialize database
-    with app.app_context():
-        init_db()
-    
     return app
 
 def main():
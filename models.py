@@ -2,8 +2,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import hashlib
 import os
+from sqlalchemy.orm import validates
 from precinct_utils import normalize_precinct_id
+from compression_utils import compress, decompress, preferred_encoding
 
 db = SQLAlchemy()
 
@@ -117,12 +120,22 @@ class Map(db.Model):
     """Map model for storing precinct map data in NC PostgreSQL database."""
     
     __tablename__ = 'maps'
+    __table_args__ = (
+        # One map per location; every lookup resolves with a single probe of this index
+        db.Index('uq_maps_state_county_precinct_key', 'state', 'county', 'precinct_key', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     state = db.Column(db.String(100), nullable=False, index=True)
     county = db.Column(db.String(100), nullable=False, index=True)
     precinct = db.Column(db.String(100), nullable=False, index=True)
-    map = db.Column(db.Text, nullable=True)  # Store HTML content
+    precinct_key = db.Column(db.String(100), nullable=True)  # Zero-padded precinct from normalize_precinct_id
+    map = db.Column(db.Text, nullable=True)  # Store HTML content (uncompressed storage mode)
+    map_compressed = db.Column(db.LargeBinary, nullable=True)  # Precompressed HTML (compressed storage mode)
+    content_encoding = db.Column(db.String(10), nullable=True)  # 'br', 'zstd' or 'gzip' for map_compressed
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the HTML, used as the HTTP ETag
+    content_size = db.Column(db.Integer, nullable=True)  # Uncompressed HTML size in bytes
+    has_content = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -137,63 +150,93 @@ class Map(db.Model):
             self.updated_at = updated_at
     
     @staticmethod
-    def get_map_for_user(user):
+    def make_precinct_key(precinct):
+        """Return the canonical (zero-padded) precinct key used for map lookups."""
+        return normalize_precinct_id(precinct)[0]
+    
+    @validates('precinct')
+    def _update_precinct_key(self, key, precinct):
+        """Keep precinct_key in step with precinct on every write."""
+        self.precinct_key = Map.make_precinct_key(precinct)
+        return precinct
+    
+    @staticmethod
+    def compute_content_hash(content):
+        """Return the SHA-256 hex digest of map HTML, or None for empty content."""
+        if not content:
+            return None
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def _set_content_metadata(self, html):
+        """Update the hash/size/presence columns that describe the map HTML."""
+        self.content_hash = Map.compute_content_hash(html)
+        self.content_size = len(html.encode('utf-8')) if html else 0
+        self.has_content = bool(html)
+    
+    @validates('map')
+    def _update_content_metadata(self, key, content):
+        """Keep the content metadata columns in step with the map HTML on every write."""
+        self._set_content_metadata(content)
+        return content
+    
+    def set_content(self, html, compressed=True):
+        """Store map HTML, precompressed with the best available encoding by default.
+        
+        Compressed maps keep map NULL and store the bytes in map_compressed so the
+        raw endpoints can send them as-is to clients that accept the encoding.
+        """
+        if compressed and html:
+            encoding = preferred_encoding()
+            self.map = None
+            self.map_compressed = compress(html, encoding)
+            self.content_encoding = encoding
+            self._set_content_metadata(html)
+        else:
+            self.map = html
+            self.map_compressed = None
+            self.content_encoding = None
+    
+    def get_content(self):
+        """Return the map HTML regardless of storage mode."""
+        if self.map_compressed is not None:
+            return decompress(self.map_compressed, self.content_encoding).decode('utf-8')
+        return self.map
+    
+    @staticmethod
+    def _lookup_query(with_content):
+        """Base query for single-map lookups, optionally leaving the HTML unloaded."""
+        if with_content:
+            return Map.query
+        return Map.query.options(db.defer(Map.map), db.defer(Map.map_compressed))
+    
+    @staticmethod
+    def get_map_for_user(user, with_content=True):
         """Get the map for a specific user based on their state, county, and precinct.
         
-        Uses normalized precinct matching to handle zero-padding inconsistencies.
+        Matches on precinct_key, so padded and unpadded precinct IDs resolve in one query.
+        Pass with_content=False to defer loading the HTML until it is accessed.
         """
         if not user.state or not user.county or not user.precinct:
             return None
         
-        # Get normalized precinct formats
-        padded_precinct, unpadded_precinct = user.get_normalized_precinct()
-        if not padded_precinct:
-            return None
-        
-        # Try padded format first
-        map_record = Map.query.filter_by(
-            state=user.state,
-            county=user.county,
-            precinct=padded_precinct
-        ).first()
-        
-        # If not found, try unpadded format
-        if not map_record:
-            map_record = Map.query.filter_by(
-                state=user.state,
-                county=user.county,
-                precinct=unpadded_precinct
-            ).first()
-        
-        return map_record
+        return Map.get_map_by_location(user.state, user.county, user.precinct, with_content)
     
     @staticmethod
-    def get_map_by_location(state, county, precinct):
+    def get_map_by_location(state, county, precinct, with_content=True):
         """Get the map for a specific location.
         
-        Uses normalized precinct matching to handle zero-padding inconsistencies.
+        Matches on precinct_key, so padded and unpadded precinct IDs resolve in one query.
+        Pass with_content=False to defer loading the HTML until it is accessed.
         """
-        # Get normalized precinct formats
-        padded_precinct, unpadded_precinct = normalize_precinct_id(precinct)
-        if not padded_precinct:
+        precinct_key = Map.make_precinct_key(precinct)
+        if not precinct_key:
             return None
         
-        # Try padded format first
-        map_record = Map.query.filter_by(
+        return Map._lookup_query(with_content).filter_by(
             state=state,
             county=county,
-            precinct=padded_precinct
+            precinct_key=precinct_key
         ).first()
-        
-        # If not found, try unpadded format
-        if not map_record:
-            map_record = Map.query.filter_by(
-                state=state,
-                county=county,
-                precinct=unpadded_precinct
-            ).first()
-        
-        return map_record
     
     @staticmethod
     def get_maps_for_county(county_name):
@@ -202,8 +245,14 @@ class Map(db.Model):
     
     @staticmethod
     def get_map_filenames_for_county(county_name):
-        """Get all map filenames for a specific county."""
-        maps = Map.get_maps_for_county(county_name)
+        """Get all map filenames for a specific county.
+        
+        Uses a projection of the metadata columns, so no map HTML is loaded.
+        """
+        maps = Map.query.with_entities(
+            Map.id, Map.state, Map.county, Map.precinct, Map.created_at,
+            Map.content_size, Map.content_hash, Map.has_content
+        ).filter_by(county=county_name).order_by(Map.precinct).all()
         
         map_files = []
         for map_obj in maps:
@@ -215,8 +264,9 @@ class Map(db.Model):
                 'county': map_obj.county,
                 'display_name': f'{map_obj.state} {map_obj.county} Precinct {map_obj.precinct}',
                 'source': 'nc_database',
-                'map_content': map_obj.map,
-                'size': len(map_obj.map) if map_obj.map else 0,
+                'has_content': bool(map_obj.has_content),
+                'content_hash': map_obj.content_hash,
+                'size': map_obj.content_size or 0,
                 'modified': map_obj.created_at,
                 'map_id': map_obj.id
             })
@@ -323,3 +373,18 @@ class UpcomingElection(db.Model):
         return f'{self.election_name} ({self.election_date})'
 
 
+class DataVersion(db.Model):
+    """Version counter per dataset, bumped by the scripts that rewrite that data.
+    
+    Web processes compare versions to decide when cached data is stale; see
+    data_versions.py (writers) and services/data_version_registry.py (readers).
+    """
+    
+    __tablename__ = 'data_versions'
+    
+    dataset = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.dataset} v{self.version}>'
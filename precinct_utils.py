@@ -16,10 +16,26 @@ Usage:
     lookup_table = create_precinct_lookup(engine)
 """
 
-import pandas as pd
-import numpy as np
+from __future__ import annotations
+
 from sqlalchemy import text
-from typing import Tuple, Optional, Dict, Any
+from typing import TYPE_CHECKING, Tuple, Optional, Dict, Any
+
+# pandas is imported inside the DataFrame helpers so the web app can use
+# normalize_precinct_id without loading it
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _is_missing(value: Any) -> bool:
+    """True for None and pandas/numpy missing scalars (NaN, NaT, pd.NA)."""
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        # pd.NA has no truth value
+        return True
 
 def normalize_precinct_id(precinct_value: Any) -> Tuple[Optional[str], Optional[str]]:
     """
@@ -38,7 +54,7 @@ def normalize_precinct_id(precinct_value: Any) -> Tuple[Optional[str], Optional[
         normalize_precinct_id("4") -> ("004", "4")
         normalize_precinct_id(None) -> (None, None)
     """
-    if pd.isna(precinct_value) or precinct_value is None:
+    if _is_missing(precinct_value):
         return None, None
     
     # Convert to string and clean
@@ -76,6 +92,8 @@ def create_precinct_lookup(engine) -> pd.DataFrame:
         DataFrame with columns: county, precinct_padded, precinct_unpadded, 
         has_spatial, has_voting, has_flippable, precinct_name
     """
+    import pandas as pd
+    
     print("🔍 Creating comprehensive precinct lookup...")
     
     # Get all unique precincts from all tables
@@ -168,6 +186,8 @@ def normalize_precinct_join(
     Returns:
         Merged DataFrame with normalized precinct matching
     """
+    import pandas as pd
+    
     print(f"🔗 Performing normalized precinct join ({len(left_df)} x {len(right_df)} rows)")
     
     # Create working copies
@@ -264,6 +284,8 @@ def create_universal_precinct_view(engine, view_name: str = 'precinct_universal'
 # Example usage functions for common patterns
 def get_precinct_74_all_formats(engine) -> Dict[str, Any]:
     """Get precinct 74 data in all available formats for debugging."""
+    import pandas as pd
+    
     result = {}
     
     # Check all possible formats
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Precinct Race Summary Utilities
+===============================
+
+This module maintains precinct_race_summary, a per-precinct rollup of
+candidate_vote_results: how many DEM-vs-REP races were contested, how many each
+party won, and the range of election dates on file. The clustering insights
+read one row by primary key instead of aggregating the vote results table on
+every page view.
+
+Precincts are keyed by county (upper case) and precinct_key: numeric precincts
+are zero-padded to three digits so '74' and '074' share a row; other precinct
+names are kept as-is.
+
+Run refresh_precinct_race_summary() whenever candidate_vote_results is loaded
+or changed (see app_administration/refresh_precinct_race_summary.py).
+
+Usage:
+    from race_summary_utils import ensure_precinct_race_summary_table, refresh_precinct_race_summary
+
+    with engine.begin() as conn:
+        ensure_precinct_race_summary_table(conn)
+        refresh_precinct_race_summary(conn, county='FORSYTH')
+"""
+
+from sqlalchemy import text
+from typing import Any, Optional
+
+
+def race_summary_precinct_key(precinct: Any) -> Optional[str]:
+    """
+    Return the precinct_key for a precinct value.
+
+    Examples:
+        race_summary_precinct_key("74") -> "074"
+        race_summary_precinct_key(" 074 ") -> "074"
+        race_summary_precinct_key("01-A") -> "01-A"
+        race_summary_precinct_key(None) -> None
+    """
+    if precinct is None:
+        return None
+    precinct_str = str(precinct).strip()
+    if not precinct_str:
+        return None
+    if precinct_str.isdigit():
+        return (precinct_str.lstrip('0') or '0').zfill(3)
+    return precinct_str
+
+
+def ensure_precinct_race_summary_table(conn) -> None:
+    """
+    Create precinct_race_summary if it does not exist.
+
+    Args:
+        conn: SQLAlchemy connection (caller controls the transaction)
+    """
+    conn.execute(text('''
+        CREATE TABLE IF NOT EXISTS precinct_race_summary (
+            county VARCHAR(100) NOT NULL,
+            precinct_key VARCHAR(100) NOT NULL,
+            total_races INTEGER NOT NULL,
+            dem_wins INTEGER NOT NULL,
+            rep_wins INTEGER NOT NULL,
+            first_election_date DATE,
+            last_election_date DATE,
+            PRIMARY KEY (county, precinct_key)
+        )
+    '''))
+
+
+def refresh_precinct_race_summary(conn, county: Optional[str] = None) -> int:
+    """
+    Rebuild precinct_race_summary rows from candidate_vote_results.
+
+    A race is a (contest_name, election_date) in a precinct; it counts toward
+    total_races when both parties received votes, and toward dem_wins/rep_wins
+    for the party with more votes. The date range covers every race on file.
+
+    Args:
+        conn: SQLAlchemy connection (caller controls the transaction)
+        county: Optional county to limit the refresh to
+
+    Returns:
+        Number of precinct rows written
+    """
+    county_filter = "WHERE UPPER(county) = UPPER(:county)" if county else ""
+    params = {'county': county} if county else {}
+
+    # Map each raw precinct spelling to its key; the rollup joins through it
+    conn.execute(text('''
+        CREATE TEMPORARY TABLE IF NOT EXISTS precinct_race_summary_keys (
+            county VARCHAR(100),
+            precinct VARCHAR(100),
+            precinct_key VARCHAR(100)
+        )
+    '''))
+    conn.execute(text('DELETE FROM precinct_race_summary_keys'))
+    raw_precincts = conn.execute(text(f'''
+        SELECT DISTINCT county, precinct FROM candidate_vote_results {county_filter}
+    '''), params).fetchall()
+    key_rows = [
+        {'county': row_county, 'precinct': precinct, 'precinct_key': race_summary_precinct_key(precinct)}
+        for row_county, precinct in raw_precincts
+        if race_summary_precinct_key(precinct) is not None
+    ]
+    if key_rows:
+        conn.execute(text('''
+            INSERT INTO precinct_race_summary_keys (county, precinct, precinct_key)
+            VALUES (:county, :precinct, :precinct_key)
+        '''), key_rows)
+
+    conn.execute(text(f"DELETE FROM precinct_race_summary {county_filter}"), params)
+    result = conn.execute(text(f'''
+        INSERT INTO precinct_race_summary (
+            county, precinct_key, total_races, dem_wins, rep_wins,
+            first_election_date, last_election_date
+        )
+        SELECT
+            county, precinct_key,
+            SUM(CASE WHEN dem_votes > 0 AND rep_votes > 0 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN dem_votes > 0 AND rep_votes > 0 AND dem_votes > rep_votes THEN 1 ELSE 0 END),
+            SUM(CASE WHEN dem_votes > 0 AND rep_votes > 0 AND rep_votes > dem_votes THEN 1 ELSE 0 END),
+            MIN(election_date), MAX(election_date)
+        FROM (
+            SELECT
+                UPPER(r.county) AS county, k.precinct_key, r.contest_name, r.election_date,
+                SUM(CASE WHEN r.choice_party = 'DEM' THEN r.total_votes ELSE 0 END) AS dem_votes,
+                SUM(CASE WHEN r.choice_party = 'REP' THEN r.total_votes ELSE 0 END) AS rep_votes
+            FROM candidate_vote_results r
+            JOIN precinct_race_summary_keys k
+              ON k.county = r.county AND k.precinct = r.precinct
+            GROUP BY UPPER(r.county), k.precinct_key, r.contest_name, r.election_date
+        ) AS race_totals
+        GROUP BY county, precinct_key
+    '''))
+    conn.execute(text('DELETE FROM precinct_race_summary_keys'))
+    return result.rowcount
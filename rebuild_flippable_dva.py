@@ -19,6 +19,8 @@ from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 from datetime import datetime
 from config import Config
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+from data_versions import bump_data_version, FLIPPABLE
 
 class FlippableDVARebuilder:
     """Rebuilds the flippable table with proper DVA criteria."""
@@ -231,45 +233,45 @@ class FlippableDVARebuilder:
                 SELECT * FROM dva_viable
                 WHERE vote_gap <= 100 OR dva_pct_needed <= 50.0  -- DVA criteria
             """))
-            
-            # Get statistics
-            result = conn.execute(text("SELECT COUNT(*) FROM temp_dva_races"))
-            total_races = result.fetchone()[0]
-            
-            result = conn.execute(text("""
-                SELECT assessment, COUNT(*) as count
-                FROM temp_dva_races
-                GROUP BY assessment
-                ORDER BY 
-                    CASE assessment
-                        WHEN '🎯 SLAM DUNK' THEN 1
-                        WHEN '✅ HIGHLY FLIPPABLE' THEN 2
-                        WHEN '🟡 COMPETITIVE' THEN 3
-                        WHEN '🔴 STRETCH GOAL' THEN 4
-                        ELSE 5
-                    END
-            """))
-            
-            assessment_breakdown = result.fetchall()
-            
-            print(f"   ✅ Found {total_races} races meeting DVA criteria")
-            print(f"   📊 Assessment breakdown:")
-            for assessment, count in assessment_breakdown:
-                print(f"      {assessment}: {count} races")
-            
-            # Show pathway breakdown
-            result = conn.execute(text("""
-                SELECT best_pathway, COUNT(*) as count
-                FROM temp_dva_races
-                GROUP BY best_pathway
-            """))
-            
-            pathway_breakdown = result.fetchall()
-            print(f"   🎯 Best pathway analysis:")
-            for pathway, count in pathway_breakdown:
-                print(f"      {pathway.title()}: {count} races")
-            
-            return total_races
+        
+        # Get statistics
+        result = conn.execute(text("SELECT COUNT(*) FROM temp_dva_races"))
+        total_races = result.fetchone()[0]
+        
+        result = conn.execute(text("""
+            SELECT assessment, COUNT(*) as count
+            FROM temp_dva_races
+            GROUP BY assessment
+            ORDER BY 
+                CASE assessment
+                    WHEN '🎯 SLAM DUNK' THEN 1
+                    WHEN '✅ HIGHLY FLIPPABLE' THEN 2
+                    WHEN '🟡 COMPETITIVE' THEN 3
+                    WHEN '🔴 STRETCH GOAL' THEN 4
+                    ELSE 5
+                END
+        """))
+        
+        assessment_breakdown = result.fetchall()
+        
+        print(f"   ✅ Found {total_races} races meeting DVA criteria")
+        print(f"   📊 Assessment breakdown:")
+        for assessment, count in assessment_breakdown:
+            print(f"      {assessment}: {count} races")
+        
+        # Show pathway breakdown
+        result = conn.execute(text("""
+            SELECT best_pathway, COUNT(*) as count
+            FROM temp_dva_races
+            GROUP BY best_pathway
+        """))
+        
+        pathway_breakdown = result.fetchall()
+        print(f"   🎯 Best pathway analysis:")
+        for pathway, count in pathway_breakdown:
+            print(f"      {pathway.title()}: {count} races")
+        
+        return total_races
     
     def rebuild_flippable_table(self, dry_run=False):
         """Rebuild the flippable table with DVA criteria."""
@@ -277,6 +279,10 @@ class FlippableDVARebuilder:
         
         with self.engine.connect() as conn:
             if not dry_run:
+                # Make sure the persisted assessment columns exist
+                if ensure_flippable_metric_columns(conn):
+                    print(f"   🔧 Added assessment columns to flippable table")
+                
                 # Clear existing flippable table
                 conn.execute(text("DELETE FROM flippable"))
                 print(f"   🗑️  Cleared existing flippable table")
@@ -321,6 +327,8 @@ class FlippableDVARebuilder:
             else:
                 # Actually insert the data
                 result = conn.execute(text(insert_query))
+                refresh_flippable_metrics(conn)
+                bump_data_version(conn, FLIPPABLE)
                 conn.commit()
                 
                 # Get final count
@@ -331,17 +339,9 @@ class FlippableDVARebuilder:
                 
                 # Show summary
                 result = conn.execute(text("""
-                    SELECT 
-                        CASE
-                            WHEN (oppo_votes - dem_votes) <= 25 THEN '🎯 SLAM DUNK'
-                            WHEN (oppo_votes - dem_votes) <= 100 THEN '✅ HIGHLY FLIPPABLE'
-                            WHEN dva_pct_needed <= 15 THEN '🎯 SLAM DUNK (DVA)'
-                            WHEN dva_pct_needed <= 35 THEN '✅ HIGHLY FLIPPABLE (DVA)'
-                            ELSE '🟡 COMPETITIVE'
-                        END as category,
-                        COUNT(*) as count
+                    SELECT assessment as category, COUNT(*) as count
                     FROM flippable
-                    GROUP BY 1
+                    GROUP BY assessment
                     ORDER BY count DESC
                 """))
                 
@@ -19,6 +19,8 @@ from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 from datetime import datetime
 from config import Config
+from flippable_utils import flippable_metric_sql, ensure_flippable_metric_columns
+from data_versions import bump_data_version, FLIPPABLE
 
 class FlippableDVARebuilder:
     """Rebuilds the flippable table with proper DVA criteria."""
@@ -128,6 +130,9 @@ class FlippableDVARebuilder:
             print("🎯 Finding races that meet DVA criteria...")
             print("   Criteria: Vote gap ≤ 100 OR DVA percentage ≤ 50%")
             
+            # Assessment and pathway use the same rules the web views read back
+            metrics = flippable_metric_sql(oppo='rep_votes')
+            
             conn.execute(text("""
                 CREATE TEMP TABLE temp_dva_races AS
                 WITH race_totals AS (
@@ -194,26 +199,13 @@ class FlippableDVARebuilder:
                 ),
                 dva_viable AS (
                     SELECT *,
-                        CASE
-                            WHEN vote_gap <= 25 THEN '🎯 SLAM DUNK'
-                            WHEN vote_gap <= 100 THEN '✅ HIGHLY FLIPPABLE'
-                            WHEN dva_pct_needed <= 15 THEN '🎯 SLAM DUNK'
-                            WHEN dva_pct_needed <= 35 THEN '✅ HIGHLY FLIPPABLE'
-                            WHEN vote_gap <= 300 OR dva_pct_needed <= 50 THEN '🟡 COMPETITIVE'
-                            ELSE '🔴 STRETCH GOAL'
-                        END as assessment,
-                        CASE
-                            WHEN vote_gap <= 100 AND dva_pct_needed <= 50 THEN
-                                CASE WHEN vote_gap <= dva_pct_needed THEN 'traditional' ELSE 'dva' END
-                            WHEN vote_gap <= 100 THEN 'traditional'
-                            WHEN dva_pct_needed <= 50 THEN 'dva'
-                            ELSE 'difficult'
-                        END as best_pathway
+                        {assessment} as assessment,
+                        {best_pathway} as best_pathway
                     FROM with_dva_calculations
                 )
                 SELECT * FROM dva_viable
                 WHERE vote_gap <= 100 OR dva_pct_needed <= 50.0  -- DVA criteria
-            """))
+            """.format(assessment=metrics['assessment'], best_pathway=metrics['best_pathway'])))
             
             # Get statistics
             result = conn.execute(text("SELECT COUNT(*) FROM temp_dva_races"))
@@ -250,12 +242,16 @@ class FlippableDVARebuilder:
             pathway_breakdown = result.fetchall()
             print(f"   🎯 Best pathway analysis:")
             for pathway, count in pathway_breakdown:
-                print(f"      {pathway.title()}: {count} races")
+                print(f"      {pathway}: {count} races")
             
             # Rebuild flippable table
             print(f"🔄 {'PREVIEW:' if dry_run else ''} Rebuilding flippable table...")
             
             if not dry_run:
+                # Make sure the persisted assessment columns exist
+                if ensure_flippable_metric_columns(conn):
+                    print(f"   🔧 Added assessment columns to flippable table")
+                
                 # Clear existing flippable table
                 conn.execute(text("DELETE FROM flippable"))
                 print(f"   🗑️  Cleared existing flippable table")
@@ -264,14 +260,16 @@ class FlippableDVARebuilder:
             insert_query = """
                 INSERT INTO flippable (
                     county, precinct, contest_name, election_date,
-                    dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed
+                    dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed,
+                    vote_gap, dem_absenteeism, assessment, best_pathway
                 )
                 SELECT 
                     county, precinct, contest_name, election_date,
                     dem_votes, rep_votes as oppo_votes, gov_votes, 
-                    (dem_votes - rep_votes) as dem_margin, dva_pct_needed
+                    (dem_votes - rep_votes) as dem_margin, dva_pct_needed,
+                    {vote_gap} as vote_gap, dem_absenteeism, assessment, best_pathway
                 FROM temp_dva_races
-            """
+            """.format(vote_gap=metrics['vote_gap'])
             
             if dry_run:
                 # Just show what would be inserted
@@ -300,6 +298,7 @@ class FlippableDVARebuilder:
             else:
                 # Actually insert the data
                 result = conn.execute(text(insert_query))
+                bump_data_version(conn, FLIPPABLE)
                 conn.commit()
                 
                 # Get final count
@@ -310,17 +309,9 @@ class FlippableDVARebuilder:
                 
                 # Show summary
                 result = conn.execute(text("""
-                    SELECT 
-                        CASE
-                            WHEN (oppo_votes - dem_votes) <= 25 THEN '🎯 SLAM DUNK'
-                            WHEN (oppo_votes - dem_votes) <= 100 THEN '✅ HIGHLY FLIPPABLE'
-                            WHEN dva_pct_needed <= 15 THEN '🎯 SLAM DUNK (DVA)'
-                            WHEN dva_pct_needed <= 35 THEN '✅ HIGHLY FLIPPABLE (DVA)'
-                            ELSE '🟡 COMPETITIVE'
-                        END as category,
-                        COUNT(*) as count
+                    SELECT assessment as category, COUNT(*) as count
                     FROM flippable
-                    GROUP BY 1
+                    GROUP BY assessment
                     ORDER BY count DESC
                 """))
                 
@@ -341,17 +332,10 @@ class FlippableDVARebuilder:
         
         result = conn.execute(text("""
             SELECT contest_name, election_date, dem_votes, oppo_votes, 
-                   (oppo_votes - dem_votes) as vote_gap, dva_pct_needed,
-                   CASE
-                       WHEN (oppo_votes - dem_votes) <= 25 THEN '🎯 SLAM DUNK'
-                       WHEN (oppo_votes - dem_votes) <= 100 THEN '✅ HIGHLY FLIPPABLE'
-                       WHEN dva_pct_needed <= 15 THEN '🎯 SLAM DUNK (DVA)'
-                       WHEN dva_pct_needed <= 35 THEN '✅ HIGHLY FLIPPABLE (DVA)'
-                       ELSE '🟡 COMPETITIVE'
-                   END as assessment
+                   vote_gap, dva_pct_needed, assessment
             FROM flippable 
             WHERE precinct = '74'
-            ORDER BY (oppo_votes - dem_votes) ASC
+            ORDER BY vote_gap ASC
         """))
         
         p74_races = result.fetchall()
@@ -2,15 +2,26 @@
 Security enhancements for Flask application to prevent common attacks.
 """
 
-from flask import request, abort, g
+from flask import request, abort, g, current_app
 from functools import wraps
-import time
-from collections import defaultdict, deque
 import re
 import logging
+from limits import RateLimitItemPerSecond
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+import services.rate_limit_storage  # noqa: F401 - registers the sqlite:// storage scheme
 
-# Rate limiting storage (in production, use Redis or database)
-rate_limit_storage = defaultdict(lambda: deque())
+# Rate limiters by storage URL; they use the same RATELIMIT_STORAGE_URL as
+# Flask-Limiter, so counters are shared across workers and idle keys expire
+_rate_limiters = {}
+
+def get_rate_limiter(storage_url):
+    """Return the sliding-window rate limiter for a limits storage URL."""
+    limiter = _rate_limiters.get(storage_url)
+    if limiter is None:
+        limiter = SlidingWindowCounterRateLimiter(storage_from_string(storage_url))
+        _rate_limiters[storage_url] = limiter
+    return limiter
 
 # Security headers
 SECURITY_HEADERS = {
@@ -72,21 +83,11 @@ def rate_limit(max_requests=60, window=60, per='ip'):
             else:
                 key = request.remote_addr
             
-            now = time.time()
-            
-            # Clean old entries
-            cutoff = now - window
-            while rate_limit_storage[key] and rate_limit_storage[key][0] < cutoff:
-                rate_limit_storage[key].popleft()
-            
-            # Check rate limit
-            if len(rate_limit_storage[key]) >= max_requests:
+            limiter = get_rate_limiter(current_app.config.get('RATELIMIT_STORAGE_URL', 'memory://'))
+            if not limiter.hit(RateLimitItemPerSecond(max_requests, window), 'rate_limit', f.__name__, key):
                 logging.warning(f"Rate limit exceeded for {key}")
                 abort(429)  # Too Many Requests
             
-            # Add current request
-            rate_limit_storage[key].append(now)
-            
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -1,7 +1,241 @@
+import logging
+import os
+import threading
+import importlib.util
 import pandas as pd
 import json
 from models import db
 from sqlalchemy import text
+from race_summary_utils import race_summary_precinct_key
+from census_summary_utils import SUMMARY_FILENAME
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Parquet sidecars need pyarrow; without it the CSV files are always used
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Parquet schema metadata key holding the (mtime_ns, size) of the CSV a sidecar was built from
+_SOURCE_VERSION_KEY = b'precinct_source_csv_version'
+
+
+def _encode_version(version):
+    return f'{version[0]}:{version[1]}'.encode('ascii')
+
+
+class ClusteringDataset:
+    """Process-wide, thread-safe cache of a clustering results file keyed on mtime.
+    
+    The file is re-read only when its mtime/size changes. Rows are pre-split by
+    county on load so requests only slice an already-loaded frame. When pyarrow
+    is installed a Parquet sidecar (same name, .parquet) is written after a CSV
+    load and preferred while it was built from the CSV's exact (mtime, size),
+    which makes cold starts in new worker processes faster. The sidecar is
+    replaced atomically, and an unreadable one falls back to the CSV.
+    
+    Frames are shared between requests and must be treated as read-only.
+    """
+    
+    def __init__(self, csv_path, county_column=None):
+        self.csv_path = csv_path
+        self.parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+        self.county_column = county_column
+        self._version = None
+        self._frame = None
+        self._by_county = {}
+        self._derived = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _stat(path):
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            return None
+        return (stat_info.st_mtime_ns, stat_info.st_size)
+    
+    def _read(self, csv_version):
+        """Read the freshest source: the Parquet sidecar if it matches the CSV, else the CSV."""
+        if PARQUET_AVAILABLE and self._stat(self.parquet_path):
+            frame = self._read_parquet(csv_version)
+            if frame is not None:
+                return frame
+        
+        frame = pd.read_csv(self.csv_path)
+        if PARQUET_AVAILABLE:
+            self._write_parquet(frame, csv_version)
+        return frame
+    
+    def _read_parquet(self, csv_version):
+        """Return the sidecar's frame if it was written from this exact CSV version, else None.
+        
+        Without a CSV the sidecar is used as is.
+        """
+        import pyarrow.parquet as pq
+        try:
+            table = pq.read_table(self.parquet_path)
+        except Exception:
+            # Corrupt or unreadable sidecar: the CSV is the source of truth
+            if csv_version is None:
+                raise
+            return None
+        metadata = table.schema.metadata or {}
+        if csv_version is not None and metadata.get(_SOURCE_VERSION_KEY) != _encode_version(csv_version):
+            return None
+        return table.to_pandas()
+    
+    def _write_parquet(self, frame, csv_version):
+        """Write the sidecar atomically, tagged with the CSV version it was built from."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tmp_path = f'{self.parquet_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[_SOURCE_VERSION_KEY] = _encode_version(csv_version)
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+            # Readers in other workers see the old sidecar or the new one, never half a file
+            os.replace(tmp_path, self.parquet_path)
+        except Exception:
+            # Read-only deployments just keep loading the CSV
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _load(self):
+        """Return (version, frame, by_county), reloading if the file changed."""
+        csv_version = self._stat(self.csv_path)
+        version = csv_version or (self._stat(self.parquet_path) if PARQUET_AVAILABLE else None)
+        if version is None:
+            raise FileNotFoundError(self.csv_path)
+        
+        with self._lock:
+            if version != self._version:
+                frame = self._read(csv_version)
+                by_county = {}
+                if self.county_column:
+                    by_county = {county: group for county, group in frame.groupby(self.county_column, sort=False)}
+                self._frame, self._by_county, self._version = frame, by_county, version
+                self._derived = {}
+            return self._version, self._frame, self._by_county
+    
+    @property
+    def version(self):
+        """Current (mtime_ns, size) of the dataset; loads it if needed."""
+        return self._load()[0]
+    
+    def get(self, county=None):
+        """Return the full frame, or the rows for one county (empty if it has none).
+        
+        Raises:
+            FileNotFoundError: If the results file doesn't exist
+        """
+        _, frame, by_county = self._load()
+        return self._slice(frame, by_county, county)
+    
+    @staticmethod
+    def _slice(frame, by_county, county):
+        if county is None:
+            return frame
+        county_frame = by_county.get(county)
+        if county_frame is None:
+            return frame.iloc[0:0]
+        return county_frame
+    
+    def derived(self, name, county, compute):
+        """Return compute(rows) for the (optionally county-filtered) rows.
+        
+        Results are cached per (name, county) against the dataset version, so
+        repeat requests for unchanged data do no pandas work.
+        """
+        version, frame, by_county = self._load()
+        key = (version, name, county)
+        with self._lock:
+            data = self._derived.get(key)
+        record_cache('clustering', data is not None)
+        if data is None:
+            data = compute(self._slice(frame, by_county, county))
+            with self._lock:
+                if self._version == version:
+                    self._derived[key] = data
+        return data
+    
+    def csv_bytes(self, county=None):
+        """Return the (optionally county-filtered) rows as UTF-8 CSV bytes (cached per version)."""
+        return self.derived('csv', county, lambda rows: rows.to_csv(index=False).encode('utf-8'))
+    
+    def invalidate(self):
+        """Drop the loaded frame so the next access re-reads the file."""
+        with self._lock:
+            self._version = None
+            self._frame = None
+            self._by_county = {}
+            self._derived = {}
+
+
+class ClusteringSummary:
+    """Process-wide cache of the per-county census clustering summary artifact.
+    
+    census_tract_clustering.py writes the artifact; it is re-read only when its
+    mtime/size changes (or after invalidate()), so serving a county's summary
+    is a dict lookup.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._version = None
+        self._counties = {}
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        version = ClusteringDataset._stat(self.path)
+        if version is None:
+            return {}
+        with self._lock:
+            if version != self._version:
+                with open(self.path) as f:
+                    self._counties = json.load(f).get('counties', {})
+                self._version = version
+            return self._counties
+    
+    def counties(self):
+        """Upper-case names of the counties with a summary."""
+        return sorted(self._load())
+    
+    def get(self, county):
+        """Return the summary for a county (any case), or None if it has none."""
+        if not county:
+            return None
+        return self._load().get(county.strip().upper())
+    
+    def invalidate(self):
+        """Drop the loaded summary so the next access re-reads the file."""
+        with self._lock:
+            self._version = None
+            self._counties = {}
+
+
+def precinct_cluster_distribution(rows):
+    """Group precinct clustering rows by comprehensive cluster for the demographic page."""
+    distribution = {}
+    for cluster_id, group in rows.groupby('comprehensive_cluster'):
+        precinct_list = group['precinct'].tolist()
+        distribution[cluster_id] = {
+            'precincts': precinct_list,
+            'count': len(precinct_list),
+            'avg_flippability': round(group['flippability_score'].mean(), 2),
+            'avg_dem_pct': round(group['dem_pct'].mean(), 1),
+            'description': f"Cluster {cluster_id}"
+        }
+    return distribution
+
+
+# Shared datasets used by every ClusteringService instance
+precinct_clustering_dataset = ClusteringDataset('precinct_clustering_results.csv', county_column='county')
+census_clustering_dataset = ClusteringDataset('census_tract_clustering_results.csv')
+census_clustering_summary = ClusteringSummary(SUMMARY_FILENAME)
+
 
 class ClusteringService:
     """Service class for handling clustering data and insights."""
@@ -11,22 +245,17 @@ class ClusteringService:
         self.census_data = None
         
     def load_precinct_clustering_data(self, county_filter=None):
-        """Load precinct clustering results from CSV, optionally filtered by county."""
+        """Load precinct clustering results (shared cache), optionally filtered by county."""
         try:
-            self.precinct_data = pd.read_csv('precinct_clustering_results.csv')
-            
-            # Apply county filter if specified
-            if county_filter:
-                self.precinct_data = self.precinct_data[self.precinct_data['county'] == county_filter]
-                
+            self.precinct_data = precinct_clustering_dataset.get(county_filter or None)
             return True
         except FileNotFoundError:
             return False
     
     def load_census_clustering_data(self):
-        """Load census tract clustering results from CSV."""
+        """Load census tract clustering results (shared cache)."""
         try:
-            self.census_data = pd.read_csv('census_tract_clustering_results.csv')
+            self.census_data = census_clustering_dataset.get()
             return True
         except FileNotFoundError:
             return False
@@ -168,16 +397,17 @@ class ClusteringService:
             return "Medium-priority organizing target"
     
     def _get_election_date_range(self):
-        """Get the range of election dates from the database."""
+        """Get the range of election dates from the precinct race summary."""
         try:
             result = db.session.execute(text("""
-                SELECT MIN(election_date) as earliest, MAX(election_date) as latest
-                FROM candidate_vote_results
+                SELECT MIN(first_election_date) as earliest, MAX(last_election_date) as latest
+                FROM precinct_race_summary
             """)).fetchone()
             
             if result and result[0] and result[1]:
-                earliest = result[0].strftime('%Y')
-                latest = result[1].strftime('%Y')
+                # DATE values come back as date objects (PostgreSQL) or ISO strings (SQLite)
+                earliest = str(result[0])[:4]
+                latest = str(result[1])[:4]
                 if earliest == latest:
                     return f"Elections from {earliest}"
                 else:
@@ -185,47 +415,35 @@ class ClusteringService:
             else:
                 return "All elections"
         except Exception:
+            db.session.rollback()
             return "All elections"
     
     def _calculate_race_win_percentage(self, user):
-        """Calculate the percentage of races won by Democrats in this precinct."""
+        """Percentage of contested races won by Democrats in the user's precinct.
+        
+        Returns None when the precinct has no summarized races, so the page
+        shows N/A rather than a 0% the vote results don't support.
+        """
         try:
-            # Handle both padded and unpadded precinct formats
-            user_precinct = str(user.precinct).strip()
-            unpadded_precinct = user_precinct.lstrip('0') or '0'
-            
             result = db.session.execute(text("""
-                WITH race_totals AS (
-                    SELECT 
-                        contest_name, election_date,
-                        SUM(CASE WHEN choice_party = 'DEM' THEN total_votes ELSE 0 END) as dem_votes,
-                        SUM(CASE WHEN choice_party = 'REP' THEN total_votes ELSE 0 END) as rep_votes
-                    FROM candidate_vote_results 
-                    WHERE (precinct = :precinct OR precinct = :unpadded_precinct) 
-                      AND county = :county 
-                      AND choice_party IN ('DEM', 'REP')
-                    GROUP BY contest_name, election_date
-                    HAVING SUM(CASE WHEN choice_party = 'DEM' THEN total_votes ELSE 0 END) > 0 
-                       AND SUM(CASE WHEN choice_party = 'REP' THEN total_votes ELSE 0 END) > 0
-                )
-                SELECT 
-                    COUNT(*) as total_races,
-                    SUM(CASE WHEN dem_votes > rep_votes THEN 1 ELSE 0 END) as dem_wins
-                FROM race_totals
+                SELECT total_races, dem_wins
+                FROM precinct_race_summary
+                WHERE county = :county AND precinct_key = :precinct_key
             """), {
-                'precinct': user_precinct, 
-                'unpadded_precinct': unpadded_precinct,
-                'county': str(user.county).upper()
+                'county': str(user.county).upper(),
+                'precinct_key': race_summary_precinct_key(user.precinct)
             }).fetchone()
-            
-            if result and result[0] and result[0] > 0:
-                total_races = result[0]
-                dem_wins = result[1]
-                return (dem_wins / total_races) * 100
-            else:
-                return 0.0
-        except Exception:
-            return 0.0
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not read precinct_race_summary (run "
+                           f"app_administration/refresh_precinct_race_summary.py): {e}")
+            return None
+        
+        if result and result[0] and result[0] > 0:
+            total_races = result[0]
+            dem_wins = result[1]
+            return (dem_wins / total_races) * 100
+        return None
     
     def get_county_insights(self, county_name):
         """Get clustering insights for specific county."""
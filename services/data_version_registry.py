@@ -0,0 +1,165 @@
+import logging
+import os
+import select
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import inspect
+
+from data_versions import NOTIFY_CHANNEL, get_data_versions
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionRegistry:
+    """Per-process copy of the data_versions table that fires callbacks on change.
+
+    Caches register a callback per dataset with on_change(). On PostgreSQL a
+    background thread LISTENs on the data_versions channel and re-reads the
+    versions as soon as a writer commits. Without a live listener (SQLite, or
+    while the listener is reconnecting), check() re-reads the table at most
+    every poll_interval seconds; the app calls it before each request.
+
+    The listener is started lazily per process, so gunicorn workers forked
+    after create_app() each get their own.
+    """
+
+    def __init__(self, poll_interval=5.0):
+        self.poll_interval = poll_interval
+        self._engine = None
+        self._versions = {}
+        self._loaded = False
+        self._callbacks = defaultdict(list)
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        self._listener = None
+        self._listener_pid = None
+        self._listening = threading.Event()
+        self._stop = threading.Event()
+
+    def init_engine(self, engine, poll_interval=None):
+        """Use engine for version reads (and LISTEN, on PostgreSQL)."""
+        self._engine = engine
+        if poll_interval is not None:
+            self.poll_interval = poll_interval
+        self._next_poll = 0.0
+
+    def on_change(self, dataset, callback):
+        """Call callback(dataset, version) whenever dataset's version changes."""
+        self._callbacks[dataset].append(callback)
+
+    def version(self, dataset):
+        """Last seen version of dataset (0 if never bumped)."""
+        return self._versions.get(dataset, 0)
+
+    @property
+    def listening(self):
+        return self._listening.is_set()
+
+    def check(self, force=False):
+        """Start the listener if needed, and poll when no listener is live.
+
+        Returns the datasets whose version changed.
+        """
+        if self._engine is None:
+            return []
+        self._ensure_listener()
+        now = time.monotonic()
+        if not force and (self.listening or now < self._next_poll):
+            return []
+        self._next_poll = now + self.poll_interval
+        return self.refresh()
+
+    def refresh(self):
+        """Re-read all versions and fire callbacks for the ones that changed."""
+        try:
+            with self._engine.connect() as conn:
+                if inspect(conn).has_table('data_versions'):
+                    versions = get_data_versions(conn)
+                else:
+                    # No writer has run yet: every dataset is at version 0, so
+                    # the first bump (which creates the table) is a change
+                    versions = {}
+        except Exception as e:
+            # Database unavailable; keep the last versions and retry later
+            logger.debug(f"Could not read data_versions: {e}")
+            return []
+
+        with self._lock:
+            first_load = not self._loaded
+            changed = [dataset for dataset, version in versions.items()
+                       if self._versions.get(dataset) != version]
+            self._versions = versions
+            self._loaded = True
+
+        if first_load:
+            # Caches filled before the first read are from the current data
+            return []
+
+        for dataset in changed:
+            for callback in self._callbacks.get(dataset, []):
+                try:
+                    callback(dataset, versions[dataset])
+                except Exception:
+                    logger.exception(f"Data version callback failed for {dataset}")
+        return changed
+
+    def _ensure_listener(self):
+        if self._engine.dialect.name != 'postgresql':
+            return
+        pid = os.getpid()
+        if self._listener_pid == pid and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener_pid == pid and self._listener.is_alive():
+                return
+            self._listening.clear()
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, name='data-version-listener', daemon=True)
+            self._listener_pid = pid
+            self._listener.start()
+
+    def _listen(self):
+        """LISTEN for version bumps, reconnecting with backoff on errors."""
+        backoff = 1
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self._engine.raw_connection()
+                raw.detach()  # long-lived; don't hold a pool slot
+                dbapi_conn = raw.dbapi_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+                # Catch anything bumped while we weren't listening
+                self.refresh()
+                self._listening.set()
+                backoff = 1
+
+                while not self._stop.is_set():
+                    if select.select([dbapi_conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    if dbapi_conn.notifies:
+                        dbapi_conn.notifies.clear()
+                        self.refresh()
+            except Exception as e:
+                logger.warning(f"Data version listener error, falling back to polling: {e}")
+            finally:
+                self._listening.clear()
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def stop(self):
+        """Stop the listener thread (if any)."""
+        self._stop.set()
+
+
+data_version_registry = DataVersionRegistry()
@@ -0,0 +1,292 @@
+import html
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DOC_EXTENSIONS = ('.md', '.txt')
+
+# Files are re-stat'ed at most this often; edits in place don't change the directory mtime
+DOC_RESTAT_SECONDS = 5.0
+
+# Snippet highlight markers; swapped for <mark> after the snippet is HTML-escaped
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+
+def display_name(filename):
+    """Title shown for a documentation file."""
+    return filename.replace('_', ' ').replace('.md', '').replace('.txt', '').title()
+
+
+def is_public(filename):
+    """Files starting with an uppercase letter are public; the rest are admin-only."""
+    return bool(filename) and filename[0].isupper()
+
+
+class DocCatalog:
+    """Process-wide catalog of doc/ files with a SQLite FTS5 search index.
+
+    The file listing is cached on the directory's mtime, so adding, renaming
+    or deleting a file is picked up on the next request. Files edited in place
+    (deploys, git pull, editors) leave the directory mtime alone, so the
+    listing is also re-stat'ed every restat_interval seconds rather than on
+    each page view. The search index lives in a SQLite file shared by all
+    workers; every sync compares each file's mtime/size with the index and
+    only re-reads files that changed. Admin edits update both the catalog and
+    the index in place.
+
+    Without FTS5 in the SQLite build, search falls back to a LIKE scan of the
+    indexed text.
+    """
+
+    def __init__(self, doc_dir=None, index_path=None, restat_interval=DOC_RESTAT_SECONDS):
+        self.doc_dir = doc_dir
+        self.index_path = index_path
+        self.restat_interval = restat_interval
+        self._dir_version = None
+        self._listed_at = None
+        self._entries = {}
+        self._fts5 = None
+        self._lock = threading.Lock()
+
+    def configure(self, doc_dir, index_path):
+        """Point the catalog at a doc directory and search index file."""
+        with self._lock:
+            self.doc_dir = doc_dir
+            self.index_path = index_path
+            self._dir_version = None
+            self._listed_at = None
+            self._entries = {}
+            self._fts5 = None
+
+    # Catalog
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            return None
+        return stat_info
+
+    def _entry(self, filename):
+        """Catalog entry for one file, or None if it isn't a documentation file."""
+        if not filename.endswith(DOC_EXTENSIONS):
+            return None
+        stat_info = self._stat(os.path.join(self.doc_dir, filename))
+        if stat_info is None or not os.path.isfile(os.path.join(self.doc_dir, filename)):
+            return None
+        return {
+            'filename': filename,
+            'display_name': display_name(filename),
+            'last_modified': datetime.fromtimestamp(stat_info.st_mtime),
+            'size': stat_info.st_size,
+            'extension': os.path.splitext(filename)[1],
+            'public': is_public(filename),
+            'mtime_ns': stat_info.st_mtime_ns,
+        }
+
+    def _load(self):
+        """Return {filename: entry}, re-listing the directory if its mtime changed or the listing is old."""
+        if not self.doc_dir:
+            return {}
+        dir_stat = self._stat(self.doc_dir)
+        if dir_stat is None:
+            return {}
+        version = dir_stat.st_mtime_ns
+        now = time.monotonic()
+        with self._lock:
+            if version == self._dir_version and now - self._listed_at < self.restat_interval:
+                return self._entries
+        entries = {}
+        for filename in os.listdir(self.doc_dir):
+            entry = self._entry(filename)
+            if entry:
+                entries[filename] = entry
+        with self._lock:
+            self._entries = entries
+            self._dir_version = version
+            self._listed_at = now
+        return entries
+
+    def entries(self, public_only=False):
+        """Catalog entries sorted by filename (public files only if public_only)."""
+        entries = sorted(self._load().values(), key=lambda entry: entry['filename'])
+        if public_only:
+            entries = [entry for entry in entries if entry['public']]
+        return entries
+
+    def get(self, filename):
+        """Catalog entry for filename, or None."""
+        return self._load().get(filename)
+
+    # Search index
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS docs (
+                filename TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                public INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        if self._fts5 is None:
+            try:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                        filename UNINDEXED, title, body, tokenize='porter unicode61'
+                    )
+                ''')
+                self._fts5 = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite FTS5 unavailable, documentation search will scan text: {e}")
+                self._fts5 = False
+        return conn
+
+    def _index_file(self, conn, entry):
+        path = os.path.join(self.doc_dir, entry['filename'])
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            body = f.read()
+        self._unindex_file(conn, entry['filename'])
+        conn.execute('INSERT INTO docs (filename, title, body, public, mtime_ns, size) VALUES (?, ?, ?, ?, ?, ?)',
+                     (entry['filename'], entry['display_name'], body, int(entry['public']),
+                      entry['mtime_ns'], entry['size']))
+        if self._fts5:
+            conn.execute('INSERT INTO docs_fts (filename, title, body) VALUES (?, ?, ?)',
+                         (entry['filename'], entry['display_name'], body))
+
+    def _unindex_file(self, conn, filename):
+        conn.execute('DELETE FROM docs WHERE filename = ?', (filename,))
+        if self._fts5:
+            conn.execute('DELETE FROM docs_fts WHERE filename = ?', (filename,))
+
+    def sync_index(self):
+        """Bring the search index up to date with the catalog, re-reading only changed files.
+
+        Returns the number of files (re)indexed or removed.
+        """
+        entries = self._load()
+        changed = 0
+        conn = self._connect()
+        try:
+            with conn:
+                indexed = {filename: (mtime_ns, size) for filename, mtime_ns, size
+                           in conn.execute('SELECT filename, mtime_ns, size FROM docs')}
+                for filename in indexed.keys() - entries.keys():
+                    self._unindex_file(conn, filename)
+                    changed += 1
+                for filename, entry in entries.items():
+                    if indexed.get(filename) != (entry['mtime_ns'], entry['size']):
+                        self._index_file(conn, entry)
+                        changed += 1
+        finally:
+            conn.close()
+        return changed
+
+    def refresh_file(self, filename):
+        """Re-stat and re-index one file after it was written in place."""
+        entry = self._entry(filename)
+        if entry is None:
+            self.remove_file(filename)
+            return
+        self._load()
+        with self._lock:
+            self._entries = dict(self._entries, **{filename: entry})
+        conn = self._connect()
+        try:
+            with conn:
+                self._index_file(conn, entry)
+        finally:
+            conn.close()
+
+    def rename_file(self, old_filename, new_filename):
+        """Move a file's catalog entry and index row after a rename."""
+        self.remove_file(old_filename)
+        self.refresh_file(new_filename)
+
+    def remove_file(self, filename):
+        """Drop a deleted file from the catalog and the index."""
+        self._load()
+        with self._lock:
+            self._entries = {name: entry for name, entry in self._entries.items() if name != filename}
+        conn = self._connect()
+        try:
+            with conn:
+                self._unindex_file(conn, filename)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _match_expression(query):
+        """FTS5 query for free text: every word must match, the last one as a prefix."""
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+        return ' '.join(terms)
+
+    @staticmethod
+    def _highlight(snippet):
+        escaped = html.escape(snippet)
+        return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+    def search(self, query, public_only=True, limit=20):
+        """
+        Search the documentation.
+
+        Args:
+            query: Free text; words are ANDed and the last word matches as a prefix
+            public_only: Only return public (uppercase) files
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with filename, display_name and an HTML snippet
+            (escaped, matches wrapped in <mark>), best match first
+        """
+        expression = self._match_expression(query or '')
+        if expression is None or not self.index_path:
+            return []
+        self.sync_index()
+
+        conn = self._connect()
+        try:
+            if self._fts5:
+                rows = conn.execute(f'''
+                    SELECT docs_fts.filename, docs_fts.title,
+                           snippet(docs_fts, 2, '{_MARK_START}', '{_MARK_END}', '…', 16)
+                    FROM docs_fts
+                    JOIN docs ON docs.filename = docs_fts.filename
+                    WHERE docs_fts MATCH ? AND (docs.public = 1 OR ? = 0)
+                    ORDER BY bm25(docs_fts, 0.0, 5.0, 1.0)
+                    LIMIT ?
+                ''', (expression, int(public_only), limit)).fetchall()
+            else:
+                words = re.findall(r'\w+', query)
+                where = ' AND '.join(['(title LIKE ? OR body LIKE ?)'] * len(words))
+                params = [value for word in words for value in (f'%{word}%', f'%{word}%')]
+                rows = [(filename, title, body[:200]) for filename, title, body in conn.execute(f'''
+                    SELECT filename, title, body FROM docs
+                    WHERE {where} AND (public = 1 OR ? = 0)
+                    ORDER BY filename
+                    LIMIT ?
+                ''', params + [int(public_only), limit])]
+        finally:
+            conn.close()
+
+        return [{'filename': filename, 'display_name': title, 'snippet': self._highlight(snippet)}
+                for filename, title, snippet in rows]
+
+
+# Shared instance used by the web application (configured in create_app)
+doc_catalog = DocCatalog()
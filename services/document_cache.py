@@ -0,0 +1,69 @@
+import os
+import threading
+import markdown
+
+from services.metrics import record_cache
+
+
+class DocumentCache:
+    """Process-wide cache of rendered Markdown documents keyed on path and mtime.
+
+    A cached entry is reused while the file's mtime and size are unchanged, so
+    edits made outside the app are picked up on the next request. Writers inside
+    the app (MOTD editor, documentation admin) also invalidate explicitly.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path, extensions):
+        return (os.path.abspath(path), tuple(extensions))
+
+    def render(self, path, extensions):
+        """Return the rendered HTML for a Markdown file ('' if it is empty), or None if it is missing."""
+        key = self._key(path, extensions)
+        try:
+            stat_info = os.stat(key[0])
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        version = (stat_info.st_mtime_ns, stat_info.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+        hit = entry is not None and entry[0] == version
+        record_cache('document', hit)
+        if hit:
+            return entry[1]
+
+        with open(key[0], 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        html_content = markdown.markdown(content, extensions=list(extensions)) if content else ''
+
+        with self._lock:
+            self._entries[key] = (version, html_content)
+        return html_content
+
+    def warm(self, documents):
+        """Pre-render (path, extensions) pairs, skipping files that don't exist."""
+        for path, extensions in documents:
+            try:
+                self.render(path, extensions)
+            except Exception:
+                pass
+
+    def invalidate(self, path=None):
+        """Drop cached renders for a path (all extension sets), or everything if path is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            abs_path = os.path.abspath(path)
+            for key in [key for key in self._entries if key[0] == abs_path]:
+                del self._entries[key]
+
+
+# Shared instance used by the web application
+document_cache = DocumentCache()
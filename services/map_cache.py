@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+from services.metrics import record_cache
+
+
+class MapContentCache:
+    """Process-wide LRU cache of map HTML bounded by total size in bytes.
+
+    Keys include the map's updated_at timestamp, so a reloaded map gets a new
+    key and the stale entry simply ages out of the LRU.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(content):
+        if isinstance(content, bytes):
+            return len(content)
+        return len(content.encode('utf-8'))
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return cached content for key (marking it most recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache('map', entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, key, content):
+        """Cache content under key, evicting least recently used entries to stay within budget."""
+        size = self._size(content)
+        if size > self.max_bytes:
+            # Never let a single oversized map flush the whole cache
+            return False
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+
+            self._entries[key] = (content, size)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return True
+
+    def clear(self):
+        """Drop all cached content."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,160 @@
+"""Injected controls for the map view endpoints, spliced into map HTML once per map version."""
+
+import hashlib
+
+# Close window button for maps opened in a new tab
+CLOSE_BUTTON_HTML = '''
+<div style="position: fixed; top: 10px; right: 10px; z-index: 9999;">
+    <button onclick="closeWindow()" 
+       style="background: #dc3545; color: white; padding: 8px 16px; border: none; 
+              border-radius: 4px; font-family: Arial, sans-serif; font-size: 14px;
+              box-shadow: 0 2px 4px rgba(0,0,0,0.2); cursor: pointer; display: inline-block;
+              transition: background-color 0.2s;"
+       onmouseover="this.style.backgroundColor='#c82333'"
+       onmouseout="this.style.backgroundColor='#dc3545'">
+        ✕ Close Window
+    </button>
+</div>
+<script>
+function closeWindow() {
+    // Try to close the window
+    if (window.opener) {
+        window.close();
+    } else {
+        // If not opened by another window, try alternative methods
+        window.close();
+        // Fallback for browsers that don't allow window.close()
+        setTimeout(function() {
+            window.location.href = 'about:blank';
+        }, 100);
+    }
+}
+</script>
+            '''
+
+# Enhanced zoom controls for new tab view
+NEW_TAB_ZOOM_CONTROLS_HTML = '''
+<!-- Enhanced Zoom Controls for New Tab -->
+<div class="new-tab-zoom-controls" style="position: fixed; top: 20px; left: 20px; z-index: 9999; display: flex; flex-direction: column; gap: 8px;">
+    <div style="background: rgba(255,255,255,0.95); padding: 8px; border-radius: 8px; box-shadow: 0 4px 12px rgba(0,0,0,0.3); border: 2px solid #007bff;">
+        <div style="display: flex; flex-direction: column; gap: 4px;">
+            <button onclick="zoomIn()" style="width: 60px; height: 35px; background: #28a745; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#218838'" onmouseout="this.style.backgroundColor='#28a745'" title="Zoom In (Ctrl/Cmd + Plus)">+</button>
+            <button onclick="zoomOut()" style="width: 60px; height: 35px; background: #dc3545; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#c82333'" onmouseout="this.style.backgroundColor='#dc3545'" title="Zoom Out (Ctrl/Cmd + Minus)">−</button>
+            <button onclick="resetZoom()" style="width: 60px; height: 30px; background: #17a2b8; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 10px; font-weight: bold; transition: background 0.2s;" onmouseover="this.style.backgroundColor='#138496'" onmouseout="this.style.backgroundColor='#17a2b8'" title="Reset Zoom (Ctrl/Cmd + 0)">Reset</button>
+        </div>
+    </div>
+</div>
+            '''
+
+# Message listener for sidebar zoom controls, plus global map lookup (user map iframe)
+USER_MAP_ZOOM_LISTENER_HTML = '''
+<script>
+// Message listener for sidebar zoom controls
+window.addEventListener('message', function(event) {
+    if (event.data && event.data.action) {
+        switch(event.data.action) {
+            case 'zoomIn':
+                if (window.map && window.map.zoomIn) {
+                    window.map.zoomIn();
+                }
+                break;
+            case 'zoomOut':
+                if (window.map && window.map.zoomOut) {
+                    window.map.zoomOut();
+                }
+                break;
+            case 'resetZoom':
+                if (window.map && window.map.setView) {
+                    // Reset to initial map view - you may need to adjust these coordinates
+                    window.map.setView([39.8283, -98.5795], 4); // Default US center view
+                }
+                break;
+        }
+    }
+});
+
+// Make map globally accessible for zoom controls
+document.addEventListener('DOMContentLoaded', function() {
+    // Wait for Leaflet map to be initialized
+    setTimeout(function() {
+        // Try to find the map instance
+        if (typeof map !== 'undefined') {
+            window.map = map;
+        } else {
+            // If map variable not found, try to find it in the window object
+            for (let key in window) {
+                if (window[key] && typeof window[key] === 'object' && 
+                    window[key].hasOwnProperty('_container') && 
+                    window[key]._container && window[key]._container.classList.contains('leaflet-container')) {
+                    window.map = window[key];
+                    break;
+                }
+            }
+        }
+    }, 1000);
+});
+</script>
+            '''
+
+# Message listener for sidebar zoom controls (my map iframe)
+MY_MAP_ZOOM_LISTENER_HTML = '''
+<script>
+// Message listener for sidebar zoom controls
+window.addEventListener('message', function(event) {
+    if (event.data && event.data.action) {
+        switch(event.data.action) {
+            case 'zoomIn':
+                if (window.map && window.map.zoomIn) {
+                    window.map.zoomIn();
+                }
+                break;
+            case 'zoomOut':
+                if (window.map && window.map.zoomOut) {
+                    window.map.zoomOut();
+                }
+                break;
+            case 'resetZoom':
+                if (window.map && window.map.setView) {
+                    window.map.setView([39.8283, -98.5795], 4);
+                }
+                break;
+        }
+    }
+});
+</script>
+        '''
+
+# View variant -> (splice position, injected HTML)
+MAP_VIEW_INJECTIONS = {
+    'new-tab': ('after_body_open', CLOSE_BUTTON_HTML + NEW_TAB_ZOOM_CONTROLS_HTML),
+    'user-raw': ('before_body_close', USER_MAP_ZOOM_LISTENER_HTML),
+    'my-map': ('before_body_close', MY_MAP_ZOOM_LISTENER_HTML),
+}
+
+# View variant -> short hash of its injected controls, part of the variant's ETag
+# so browsers drop their copies when a deploy changes the controls
+MAP_VARIANT_VERSIONS = {
+    variant: hashlib.sha256(f'{position}:{injection}'.encode('utf-8')).hexdigest()[:8]
+    for variant, (position, injection) in MAP_VIEW_INJECTIONS.items()
+}
+
+
+def build_map_variant(content, variant):
+    """Return map HTML with the controls for a view variant spliced in.
+
+    Controls go right after the opening <body> tag or right before the closing
+    </body> tag; documents without the tag get them prepended/appended.
+    """
+    position, injection = MAP_VIEW_INJECTIONS[variant]
+
+    if position == 'after_body_open':
+        offset = content.find('<body>')
+        if offset == -1:
+            return injection + content
+        offset += len('<body>')
+    else:
+        offset = content.rfind('</body>')
+        if offset == -1:
+            return content + injection
+
+    return ''.join((content[:offset], injection, content[offset:]))
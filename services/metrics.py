@@ -0,0 +1,301 @@
+import atexit
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from sqlalchemy.pool import QueuePool
+
+# Request durations in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Connection pool checkout waits in seconds
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+REQUEST_DURATION = 'http_request_duration_seconds'
+RATE_LIMIT_REJECTIONS = 'rate_limit_rejections_total'
+POOL_CHECKOUT_WAIT = 'db_pool_checkout_wait_seconds'
+POOL_CONNECTIONS = 'db_pool_connections'
+CACHE_REQUESTS = 'cache_requests_total'
+
+
+def _label_key(labels):
+    return json.dumps(labels or {}, sort_keys=True, separators=(',', ':'))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Process-wide counters, histograms and gauges with Prometheus text output.
+
+    Each process adds up its own samples in memory. With a database path set,
+    the pending deltas are flushed every flush_interval seconds into a SQLite
+    (WAL) file shared by all workers on the host, so any worker can render
+    totals for the whole server; gauges (e.g. pool connections) are stored per
+    process and rows of exited processes are dropped. Without a path the
+    registry only reports its own process, which is what tests use.
+    """
+
+    def __init__(self, path=None, flush_interval=5.0):
+        self._metrics = {}
+        self._totals = {}
+        self._pending = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_flush = 0.0
+        self.configure(path, flush_interval)
+        atexit.register(self._flush_at_exit)
+
+    def configure(self, path, flush_interval=5.0):
+        """Set (or clear) the shared database file; samples recorded so far stay pending."""
+        self.path = path
+        self.flush_interval = flush_interval
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS metric_samples (
+                        name TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        suffix TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (name, labels, suffix)
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS metric_gauges (
+                        name TEXT NOT NULL,
+                        labels TEXT NOT NULL,
+                        pid INTEGER NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (name, labels, pid)
+                    )
+                ''')
+
+    # Definitions
+
+    def counter(self, name, help_text):
+        self._metrics[name] = ('counter', help_text, None)
+
+    def histogram(self, name, help_text, buckets):
+        self._metrics[name] = ('histogram', help_text, tuple(sorted(buckets)))
+
+    def gauge(self, name, help_text):
+        self._metrics[name] = ('gauge', help_text, None)
+
+    def set_collector(self, name, collect):
+        """Register collect() -> [(gauge name, labels, value)] under name, called on flush and render."""
+        self._collectors[name] = collect
+
+    # Recording
+
+    def _add(self, name, labels, suffix, amount):
+        key = (name, _label_key(labels), suffix)
+        self._totals[key] = self._totals.get(key, 0.0) + amount
+        self._pending[key] = self._pending.get(key, 0.0) + amount
+
+    def inc(self, name, labels=None, amount=1):
+        """Increase a counter."""
+        with self._lock:
+            self._add(name, labels, '', amount)
+        self._maybe_flush()
+
+    def observe(self, name, value, labels=None):
+        """Record one histogram observation."""
+        buckets = self._metrics[name][2]
+        index = bisect.bisect_left(buckets, value)
+        bucket = repr(buckets[index]) if index < len(buckets) else '+Inf'
+        with self._lock:
+            self._add(name, labels, 'le=' + bucket, 1)
+            self._add(name, labels, 'sum', value)
+            self._add(name, labels, 'count', 1)
+        self._maybe_flush()
+
+    def _collect(self):
+        gauges = []
+        for collect in list(self._collectors.values()):
+            try:
+                gauges.extend(collect())
+            except Exception:
+                # Metrics must never break a request
+                pass
+        return gauges
+
+    # Multiprocess storage
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid() or self._local.path != self.path:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid, self._local.path = conn, os.getpid(), self.path
+        return conn
+
+    def _maybe_flush(self):
+        if self.path and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self):
+        """Write pending deltas and this process's gauges to the shared file."""
+        if not self.path:
+            return
+        self._next_flush = time.monotonic() + self.flush_interval
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        gauges = self._collect()
+        pid = os.getpid()
+        try:
+            with self._connection() as conn:
+                conn.executemany('''
+                    INSERT INTO metric_samples (name, labels, suffix, value) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (name, labels, suffix) DO UPDATE SET value = value + excluded.value
+                ''', [(name, labels, suffix, value) for (name, labels, suffix), value in pending.items()])
+                conn.execute('DELETE FROM metric_gauges WHERE pid = ?', (pid,))
+                conn.executemany('INSERT INTO metric_gauges (name, labels, pid, value) VALUES (?, ?, ?, ?)',
+                                 [(name, _label_key(labels), pid, value) for name, labels, value in gauges])
+        except sqlite3.Error:
+            # Keep the deltas for the next flush rather than losing them
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+            if self.path:
+                with self._connection() as conn:
+                    conn.execute('DELETE FROM metric_gauges WHERE pid = ?', (os.getpid(),))
+        except Exception:
+            pass
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    def _read_shared(self):
+        self.flush()
+        conn = self._connection()
+        samples = {(name, labels, suffix): value for name, labels, suffix, value
+                   in conn.execute('SELECT name, labels, suffix, value FROM metric_samples')}
+        gauges = {}
+        dead = set()
+        for name, labels, pid, value in conn.execute('SELECT name, labels, pid, value FROM metric_gauges'):
+            if pid in dead or not self._pid_alive(pid):
+                dead.add(pid)
+                continue
+            gauges[(name, labels)] = gauges.get((name, labels), 0.0) + value
+        if dead:
+            with conn:
+                conn.executemany('DELETE FROM metric_gauges WHERE pid = ?', [(pid,) for pid in dead])
+        return samples, gauges
+
+    # Output
+
+    def snapshot(self):
+        """Return (samples, gauges) for the host (shared file) or this process."""
+        if self.path:
+            return self._read_shared()
+        with self._lock:
+            samples = dict(self._totals)
+        gauges = {}
+        for name, labels, value in self._collect():
+            key = (name, _label_key(labels))
+            gauges[key] = gauges.get(key, 0.0) + value
+        return samples, gauges
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        samples, gauges = self.snapshot()
+        by_metric = {}
+        for (name, labels, suffix), value in samples.items():
+            by_metric.setdefault(name, {}).setdefault(labels, {})[suffix] = value
+        for (name, labels), value in gauges.items():
+            by_metric.setdefault(name, {}).setdefault(labels, {})[''] = value
+
+        lines = []
+        for name in sorted(by_metric):
+            kind, help_text, buckets = self._metrics.get(name, ('untyped', '', None))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for label_json in sorted(by_metric[name]):
+                labels = json.loads(label_json)
+                values = by_metric[name][label_json]
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(values.get("", 0))}')
+                    continue
+                cumulative = 0.0
+                for bucket in [repr(b) for b in buckets] + ['+Inf']:
+                    cumulative += values.get('le=' + bucket, 0.0)
+                    lines.append(f'{name}_bucket{_format_labels(labels, {"le": bucket})} {_format_value(cumulative)}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(values.get("sum", 0.0))}')
+                lines.append(f'{name}_count{_format_labels(labels)} {_format_value(values.get("count", 0.0))}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Forget everything recorded by this process (the shared file is left alone)."""
+        with self._lock:
+            self._totals = {}
+            self._pending = {}
+
+
+def record_cache(cache, hit):
+    """Count a cache lookup as a hit or miss."""
+    metrics.inc(CACHE_REQUESTS, {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+
+# Shared instance used by the web application (configured in create_app)
+metrics = MetricsRegistry()
+metrics.histogram(REQUEST_DURATION, 'Request duration by endpoint, method and status class.', LATENCY_BUCKETS)
+metrics.counter(RATE_LIMIT_REJECTIONS, 'Requests rejected with 429 Too Many Requests, by endpoint.')
+metrics.histogram(POOL_CHECKOUT_WAIT, 'Time to get a connection from the database pool.', POOL_WAIT_BUCKETS)
+metrics.gauge(POOL_CONNECTIONS, 'Database pool connections by state, summed over workers.')
+metrics.counter(CACHE_REQUESTS, 'Process cache lookups by cache and result.')
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits (including opening a new connection)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe(POOL_CHECKOUT_WAIT, time.perf_counter() - start)
+
+
+def pool_gauges(engine):
+    """Collector for an engine's QueuePool: checked-out, idle and overflow connections."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+    return [
+        (POOL_CONNECTIONS, {'state': 'checked_out'}, pool.checkedout()),
+        (POOL_CONNECTIONS, {'state': 'idle'}, pool.checkedin()),
+        (POOL_CONNECTIONS, {'state': 'overflow'}, max(pool.overflow(), 0)),
+    ]
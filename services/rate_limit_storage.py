@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+DEFAULT_MAX_KEYS = 100000
+DEFAULT_CLEANUP_INTERVAL = 30  # seconds between expired-key sweeps per process
+
+
+class SQLiteRateLimitStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit counters in a local SQLite (WAL) file shared by all workers on a host.
+
+    Registered with the limits library as the ``sqlite`` scheme, so Flask-Limiter
+    uses it with ``RATELIMIT_STORAGE_URL = 'sqlite:////path/to/ratelimit.db'``.
+    Supports the fixed-window and sliding-window-counter strategies.
+
+    Each key is one row (count, expiry time). Expired rows are swept at most every
+    ``cleanup_interval`` seconds per process, and if more than ``max_keys`` rows
+    remain the ones closest to expiry are evicted, so the file stays bounded no
+    matter how many clients are seen.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri=None, wrap_exceptions=False, max_keys=DEFAULT_MAX_KEYS,
+                 cleanup_interval=DEFAULT_CLEANUP_INTERVAL, **options):
+        path = uri.split('://', 1)[1] if uri and '://' in uri else uri
+        if path and path.startswith('/'):
+            # Same form as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute.db
+            path = path[1:]
+        if not path or path == ':memory:':
+            raise ConfigurationError('sqlite rate limit storage needs a file path shared by all workers')
+
+        self.path = path
+        self.max_keys = int(max_keys)
+        self.cleanup_interval = float(cleanup_interval)
+        self._local = threading.local()
+        self._cleanup_lock = threading.Lock()
+        self._next_cleanup = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        """Return this thread's connection (autocommit, WAL), opening it on first use.
+
+        Connections are never shared across a fork: a worker forked after the
+        storage was created opens its own.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _maybe_cleanup(self, now):
+        if now < self._next_cleanup or not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_cleanup = now + self.cleanup_interval
+            self.cleanup(now)
+        finally:
+            self._cleanup_lock.release()
+
+    def cleanup(self, now=None):
+        """Delete expired keys, then evict the soonest-expiring keys above max_keys.
+
+        Returns the number of rows removed.
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        removed = conn.execute('DELETE FROM rate_limits WHERE expires_at <= ?', (now,)).rowcount
+        excess = conn.execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0] - self.max_keys
+        if excess > 0:
+            removed += conn.execute('''
+                DELETE FROM rate_limits WHERE key IN (
+                    SELECT key FROM rate_limits ORDER BY expires_at LIMIT ?
+                )
+            ''', (excess,)).rowcount
+        return removed
+
+    def incr(self, key, expiry, amount=1):
+        """Increment key, starting a new window of expiry seconds if the old one has ended."""
+        now = time.time()
+        self._maybe_cleanup(now)
+        row = self._connection().execute('''
+            INSERT INTO rate_limits (key, count, expires_at) VALUES (:key, :amount, :expires_at)
+            ON CONFLICT (key) DO UPDATE SET
+                count = CASE WHEN rate_limits.expires_at <= :now
+                             THEN excluded.count ELSE rate_limits.count + excluded.count END,
+                expires_at = CASE WHEN rate_limits.expires_at <= :now
+                                  THEN excluded.expires_at ELSE rate_limits.expires_at END
+            RETURNING count
+        ''', {'key': key, 'amount': amount, 'expires_at': now + expiry, 'now': now}).fetchone()
+        return row[0]
+
+    def decr(self, key, amount=1):
+        """Decrement key without going below zero."""
+        row = self._connection().execute('''
+            UPDATE rate_limits SET count = MAX(count - :amount, 0)
+            WHERE key = :key AND expires_at > :now
+            RETURNING count
+        ''', {'key': key, 'amount': amount, 'now': time.time()}).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connection().execute('DELETE FROM rate_limits').rowcount
+
+    def clear(self, key):
+        self._connection().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+
+    # Sliding window counter support (same weighting as limits' MemoryStorage)
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window_info(
+            previous_key, current_key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+
+        # New windows live for two periods so they can serve as the next "previous" window
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Another worker won the race for the last slot
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def _sliding_window_info(self, previous_key, current_key, expiry, now):
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window_info(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
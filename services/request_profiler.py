@@ -0,0 +1,366 @@
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+from flask_login import current_user
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_MODES = ('sample', 'cprofile')
+
+# Artifact extension -> (download mimetype, description)
+ARTIFACTS = {
+    'folded': ('text/plain', 'Collapsed stacks (flamegraph.pl, speedscope)'),
+    'prof': ('application/octet-stream', 'cProfile stats (pstats, snakeviz)'),
+    'txt': ('text/plain', 'Top functions by cumulative time'),
+}
+
+_TOKEN_SALT = 'request-profile'
+_PROFILE_ID = re.compile(r'^\d{8}T\d{12}-[0-9a-f]{6}$')
+_TOKEN_NONCE = re.compile(r'^[0-9a-f]{16}$')
+
+
+def make_profile_token(secret_key, path, mode, issued_by):
+    """Signed single-use token that profiles one request to path (if used before it expires)."""
+    serializer = URLSafeTimedSerializer(secret_key, salt=_TOKEN_SALT)
+    return serializer.dumps({'path': path, 'mode': mode, 'by': issued_by, 'nonce': secrets.token_hex(8)})
+
+
+def read_profile_token(secret_key, token, max_age):
+    """Return the token's claims, or None if it is forged, malformed or expired."""
+    serializer = URLSafeTimedSerializer(secret_key, salt=_TOKEN_SALT)
+    try:
+        claims = serializer.loads(token, max_age=max_age)
+    except BadSignature:
+        return None
+    if not isinstance(claims, dict) or claims.get('mode') not in PROFILE_MODES:
+        return None
+    if not _TOKEN_NONCE.match(str(claims.get('nonce', ''))):
+        return None
+    return claims
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed stacks.
+
+    Counts are keyed on the root-first stack joined with ';', the input format
+    of flamegraph.pl and speedscope. Sampling runs in a daemon thread, so the
+    profiled code is never instrumented.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        """Collapsed stack text, one 'frame;frame;frame count' line per stack."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename):
+    """Trim a source path to the part after site-packages (or its last two components)."""
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.sep.join(filename.split(os.sep)[-2:])
+
+
+def top_frames(collapsed, limit=25):
+    """
+    Hottest frames of a collapsed stack profile.
+
+    Returns:
+        List of (frame, self samples, total samples), by self samples
+    """
+    self_counts = Counter()
+    total_counts = Counter()
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if not stack or not count.isdigit():
+            continue
+        frames = stack.split(';')
+        self_counts[frames[-1]] += int(count)
+        for frame in set(frames):
+            total_counts[frame] += int(count)
+    return [(frame, count, total_counts[frame]) for frame, count in self_counts.most_common(limit)]
+
+
+class ProfileStore:
+    """Bounded on-disk ring of request profiles.
+
+    Each profile is a <id>.json metadata file plus its artifacts
+    (<id>.folded, <id>.prof, <id>.txt). Ids sort by creation time, and saving
+    a profile drops the oldest ones beyond max_profiles. The metadata file is
+    written last, so a profile is only listed once it is complete; several
+    workers can share the directory.
+
+    Used token nonces are recorded as empty files under claims/, created
+    exclusively so that exactly one request (in any worker) wins a token.
+    """
+
+    def __init__(self, directory, max_profiles=50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id, extension):
+        return os.path.join(self.directory, f'{profile_id}.{extension}')
+
+    def _write(self, path, data):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, metadata, artifacts):
+        """Save a profile's artifacts ({extension: bytes}) and metadata; return its id."""
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{secrets.token_hex(3)}"
+        for extension, data in artifacts.items():
+            self._write(self._path(profile_id, extension), data)
+        metadata = dict(metadata, id=profile_id, artifacts=sorted(artifacts))
+        self._write(self._path(profile_id, 'json'), json.dumps(metadata, indent=2).encode('utf-8'))
+        self.prune()
+        return profile_id
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((name[:-5] for name in names if name.endswith('.json') and _PROFILE_ID.match(name[:-5])),
+                      reverse=True)
+
+    def list(self):
+        """Metadata of all stored profiles, newest first."""
+        profiles = []
+        for profile_id in self._ids():
+            metadata = self.get(profile_id)
+            if metadata is not None:
+                profiles.append(metadata)
+        return profiles
+
+    def get(self, profile_id):
+        """Metadata of one profile, or None."""
+        if not _PROFILE_ID.match(profile_id or ''):
+            return None
+        try:
+            with open(self._path(profile_id, 'json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def artifact_path(self, profile_id, extension):
+        """Path of a stored artifact, or None if the profile doesn't have it."""
+        metadata = self.get(profile_id)
+        if metadata is None or extension not in metadata.get('artifacts', []):
+            return None
+        path = self._path(profile_id, extension)
+        return path if os.path.exists(path) else None
+
+    def delete(self, profile_id):
+        """Remove a profile and its artifacts."""
+        if not _PROFILE_ID.match(profile_id or ''):
+            return False
+        found = False
+        for extension in ['json'] + list(ARTIFACTS):
+            try:
+                os.remove(self._path(profile_id, extension))
+                found = True
+            except FileNotFoundError:
+                pass
+        return found
+
+    def prune(self):
+        """Drop the oldest profiles beyond max_profiles."""
+        for profile_id in self._ids()[self.max_profiles:]:
+            self.delete(profile_id)
+
+    def claim_token(self, nonce, max_age):
+        """Mark a token nonce as used; False if a request already used it.
+
+        Claims older than max_age are dropped, since their tokens have expired.
+        """
+        if not _TOKEN_NONCE.match(nonce or ''):
+            return False
+        claims_dir = os.path.join(self.directory, 'claims')
+        os.makedirs(claims_dir, exist_ok=True)
+        try:
+            os.close(os.open(os.path.join(claims_dir, nonce), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+
+        expired = time.time() - max_age
+        for name in os.listdir(claims_dir):
+            path = os.path.join(claims_dir, name)
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+        return True
+
+
+def profile_store(app):
+    """The app's profile store (PROFILER_DIR, default instance/profiles)."""
+    directory = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+    return ProfileStore(directory, app.config['PROFILER_MAX_PROFILES'])
+
+
+class RequestProfiler:
+    """On-demand profiling of single requests, switched on by a signed token.
+
+    Admins issue a token for a path from the Profiles admin view (see
+    make_profile_token); a request to that path carrying the token in the
+    _profile query parameter or the X-Profile-Token header is profiled, and
+    nothing else is. Tokens are signed with SECRET_KEY, expire after
+    PROFILER_TOKEN_MAX_AGE seconds and profile a single request, so an admin
+    can hand a link to a county coordinator to profile the page as that user
+    sees it, and a link copied from a referrer or access log is worthless.
+
+    Modes:
+        sample: a sampling thread records collapsed stacks (flamegraph input);
+            the profiled code runs uninstrumented
+        cprofile: deterministic cProfile stats (.prof and a text summary)
+
+    Config:
+        PROFILER_ENABLED: Master switch (off by default outside development)
+        PROFILER_DIR: Profile directory (defaults to instance/profiles)
+        PROFILER_MAX_PROFILES: Profiles kept; older ones are dropped
+        PROFILER_TOKEN_MAX_AGE: Token lifetime in seconds
+        PROFILER_SAMPLE_INTERVAL_MS: Sampling interval
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        @app.before_request
+        def start_request_profile():
+            if not app.config['PROFILER_ENABLED']:
+                return
+            token = request.args.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+            if not token:
+                return
+            claims = read_profile_token(app.secret_key, token, app.config['PROFILER_TOKEN_MAX_AGE'])
+            if claims is None or claims.get('path') != request.path:
+                logger.warning(f'Ignoring invalid or expired profile token for {request.path}')
+                return
+            if not profile_store(app).claim_token(claims['nonce'], app.config['PROFILER_TOKEN_MAX_AGE']):
+                logger.warning(f'Ignoring already used profile token for {request.path}')
+                return
+            g.request_profile = start_profile(claims, app.config['PROFILER_SAMPLE_INTERVAL_MS'] / 1000)
+
+        @app.after_request
+        def record_profile_status(response):
+            profile = g.get('request_profile')
+            if profile is not None:
+                profile['status'] = response.status_code
+            return response
+
+        @app.teardown_request
+        def save_request_profile(exc):
+            profile = g.pop('request_profile', None)
+            if profile is None:
+                return
+            try:
+                profile_store(app).save(*finish_profile(profile, exc))
+            except Exception:
+                # Profiling must never break the request it measured
+                logger.exception('Could not save request profile')
+
+
+def start_profile(claims, interval):
+    """Start profiling the current request in the token's mode."""
+    profile = {'claims': claims, 'start': time.perf_counter(), 'started_at': datetime.utcnow()}
+    if claims['mode'] == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this process (one at a time on Python 3.12+)
+            logger.warning('cProfile busy; falling back to sampling for this request')
+            profiler = None
+        if profiler is not None:
+            profile['profiler'] = profiler
+            return profile
+    sampler = StackSampler(threading.get_ident(), interval)
+    sampler.start()
+    profile['sampler'] = sampler
+    return profile
+
+
+def finish_profile(profile, exc=None):
+    """Stop profiling; return (metadata, artifacts) for ProfileStore.save()."""
+    duration = time.perf_counter() - profile['start']
+    artifacts = {}
+    metadata = {
+        'created_at': profile['started_at'].isoformat(timespec='seconds'),
+        'method': request.method,
+        'path': request.path,
+        'query': '&'.join(f'{key}={value}' for key, value in request.args.items(multi=True)
+                          if key != PROFILE_PARAM),
+        'endpoint': request.endpoint,
+        'status': 500 if exc is not None else profile.get('status'),
+        'duration_ms': round(duration * 1000, 1),
+        'user': current_user.username if current_user and current_user.is_authenticated else None,
+        'issued_by': profile['claims'].get('by'),
+        'pid': os.getpid(),
+    }
+
+    profiler = profile.get('profiler')
+    if profiler is not None:
+        profiler.disable()
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        artifacts['prof'] = marshal.dumps(stats.stats)
+        stats.sort_stats('cumulative').print_stats(40)
+        artifacts['txt'] = summary.getvalue().encode('utf-8')
+        metadata['mode'] = 'cprofile'
+    else:
+        sampler = profile['sampler']
+        sampler.stop()
+        artifacts['folded'] = sampler.collapsed().encode('utf-8')
+        metadata.update(mode='sample', samples=sampler.samples,
+                        interval_ms=round(sampler.interval * 1000, 2))
+    return metadata, artifacts
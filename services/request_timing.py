@@ -0,0 +1,125 @@
+import logging
+import os
+import random
+import re
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Slow statements go to their own rotating file, not the application log
+slow_query_logger = logging.getLogger('precinct.slow_queries')
+slow_query_logger.propagate = False
+
+_MAX_LOGGED_STATEMENT = 2000
+
+
+class RequestTiming:
+    """Per-request query count, database time and template render time.
+
+    SQLAlchemy cursor events (registered once on the Engine class, so they
+    cover every engine and bind) add each statement's duration to the timing
+    of the request being served; template signals add render time. Sampled
+    requests get a Server-Timing header (db, render, total) and statements
+    slower than SLOW_QUERY_THRESHOLD_MS are written to a rotating log tagged
+    with the endpoint. Statement parameters are never logged.
+
+    Config:
+        REQUEST_TIMING_ENABLED: Master switch
+        REQUEST_TIMING_SAMPLE_RATE: Fraction of requests instrumented (0-1)
+        SLOW_QUERY_THRESHOLD_MS: Statements at least this slow are logged
+        SLOW_QUERY_LOG_PATH: Log file (defaults to instance/slow_queries.log)
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            before_render_template.connect(_before_render_template)
+            template_rendered.connect(_template_rendered)
+
+        @app.before_request
+        def start_request_timing():
+            if not app.config['REQUEST_TIMING_ENABLED']:
+                return
+            if random.random() >= app.config['REQUEST_TIMING_SAMPLE_RATE']:
+                return
+            log_path = app.config.get('SLOW_QUERY_LOG_PATH') or os.path.join(app.instance_path, 'slow_queries.log')
+            add_slow_query_log(log_path)
+            g.request_timing = {
+                'start': time.perf_counter(),
+                'queries': 0,
+                'db': 0.0,
+                'render': 0.0,
+                'slow_threshold': app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000,
+            }
+
+        @app.after_request
+        def add_server_timing(response):
+            timing = g.pop('request_timing', None)
+            if timing is not None:
+                total = time.perf_counter() - timing['start']
+                response.headers.add('Server-Timing', server_timing_header(timing, total))
+            return response
+
+
+def server_timing_header(timing, total):
+    """Format a request's timing as a Server-Timing header value (milliseconds)."""
+    return (f'db;dur={timing["db"] * 1000:.1f};desc="{timing["queries"]} queries", '
+            f'render;dur={timing["render"] * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}')
+
+
+def add_slow_query_log(log_path):
+    """Attach a rotating file handler for log_path to the slow-query logger (once per path)."""
+    path = os.path.abspath(log_path)
+    if any(getattr(handler, 'baseFilename', None) == path for handler in slow_query_logger.handlers):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=5 * 1024 * 1024, backupCount=5)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.INFO)
+
+
+def _current_timing():
+    if not has_request_context():
+        return None
+    return g.get('request_timing')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timing() is not None:
+        conn.info.setdefault('request_timing_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current_timing()
+    starts = conn.info.get('request_timing_start')
+    if timing is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    timing['queries'] += 1
+    timing['db'] += elapsed
+    if elapsed >= timing['slow_threshold']:
+        slow_query_logger.info('%.1fms endpoint=%s %s %s | %s', elapsed * 1000, request.endpoint,
+                               request.method, request.path,
+                               re.sub(r'\s+', ' ', statement).strip()[:_MAX_LOGGED_STATEMENT])
+
+
+def _before_render_template(sender, template, context, **extra):
+    timing = _current_timing()
+    if timing is not None:
+        timing.setdefault('render_start', []).append(time.perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    timing = _current_timing()
+    if timing is not None and timing.get('render_start'):
+        timing['render'] += time.perf_counter() - timing['render_start'].pop()
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+
+from compression_utils import DYNAMIC_LEVELS, available_encodings, compress, negotiate_encoding
+
+# Content types worth compressing; images, fonts and archives are already compressed
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml', 'text/markdown',
+    'text/javascript', 'application/javascript', 'application/json', 'application/xml',
+    'application/geo+json', 'image/svg+xml',
+])
+
+# Written into the static folder by app_administration/precompress_static.py
+MANIFEST_FILENAME = '.asset-manifest.json'
+
+# File extensions of precompressed static variants, by Content-Encoding
+VARIANT_EXTENSIONS = {'br': '.br', 'zstd': '.zst', 'gzip': '.gz'}
+
+
+def compress_response(response, accept_encodings, min_size=1024):
+    """
+    Compress a response body in place if the client and content allow it.
+
+    Streamed and file responses (direct_passthrough), responses that already
+    have a Content-Encoding (precompressed maps and static files), partial
+    and empty responses, and bodies smaller than min_size are left alone.
+
+    Args:
+        response: Flask response
+        accept_encodings: werkzeug Accept object (request.accept_encodings)
+        min_size: Smallest body in bytes worth compressing
+
+    Returns:
+        The Content-Encoding applied, or None
+    """
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return None
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return None
+
+    # Caches must key this URL on Accept-Encoding even when we don't compress
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(accept_encodings)
+    if encoding is None:
+        return None
+
+    compressed = compress(data, encoding, level=DYNAMIC_LEVELS[encoding])
+    if len(compressed) >= len(data):
+        return None
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # The representation changed; a strong ETag would now be wrong for byte ranges
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return encoding
+
+
+def _file_version(path):
+    try:
+        stat_info = os.stat(path)
+    except OSError:
+        return None
+    return (stat_info.st_mtime_ns, stat_info.st_size)
+
+
+def build_static_assets(static_dir, min_size=1024, encodings=None):
+    """
+    Precompress static files and write the asset manifest.
+
+    Every file gets a content hash (used as a cache-busting URL parameter);
+    compressible files of at least min_size also get .br/.zst/.gz siblings
+    at maximum compression, kept only when smaller than the original.
+
+    Args:
+        static_dir: Flask static folder
+        min_size: Smallest file in bytes worth precompressing
+        encodings: Encodings to build (defaults to available_encodings())
+
+    Returns:
+        The manifest dict: {relative path: {hash, mtime_ns, size, encodings}}
+    """
+    encodings = available_encodings() if encodings is None else encodings
+    variant_extensions = tuple(VARIANT_EXTENSIONS.values())
+    manifest = {}
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.') or name.endswith(variant_extensions):
+                continue
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                data = f.read()
+            stat_info = os.stat(path)
+            entry = {
+                'hash': hashlib.sha256(data).hexdigest()[:12],
+                'mtime_ns': stat_info.st_mtime_ns,
+                'size': stat_info.st_size,
+                'encodings': [],
+            }
+
+            compressible = mimetypes.guess_type(name)[0] in COMPRESSIBLE_MIMETYPES
+            for encoding, extension in VARIANT_EXTENSIONS.items():
+                variant_path = path + extension
+                if compressible and len(data) >= min_size and encoding in encodings:
+                    compressed = compress(data, encoding)
+                    if len(compressed) < len(data):
+                        with open(variant_path, 'wb') as f:
+                            f.write(compressed)
+                        entry['encodings'].append(encoding)
+                        continue
+                # Don't leave a stale variant from an earlier build behind
+                if os.path.exists(variant_path):
+                    os.remove(variant_path)
+            manifest[relative] = entry
+
+    fd, temp_path = tempfile.mkstemp(dir=static_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'files': manifest}, f, indent=2, sort_keys=True)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, os.path.join(static_dir, MANIFEST_FILENAME))
+    return manifest
+
+
+class StaticAssets:
+    """Process-wide view of the static asset manifest, re-read when it changes.
+
+    An entry is only trusted while its source file still has the mtime/size
+    recorded at build time, so a file edited after the build step is served
+    as-is (no version parameter, no precompressed variant) instead of stale.
+    """
+
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self.manifest_path = os.path.join(static_dir, MANIFEST_FILENAME)
+        self._version = None
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        version = _file_version(self.manifest_path)
+        if version is None:
+            return {}
+        with self._lock:
+            if version != self._version:
+                try:
+                    with open(self.manifest_path) as f:
+                        self._files = json.load(f).get('files', {})
+                except (OSError, ValueError):
+                    self._files = {}
+                self._version = version
+            return self._files
+
+    def entry(self, filename):
+        """Manifest entry for a static file, or None if missing or out of date."""
+        entry = self._load().get(filename)
+        if entry is None:
+            return None
+        if _file_version(os.path.join(self.static_dir, filename)) != (entry['mtime_ns'], entry['size']):
+            return None
+        return entry
+
+    def version(self, filename):
+        """Content hash to put in the file's URL, or None."""
+        entry = self.entry(filename)
+        return entry['hash'] if entry else None
+
+    def variant(self, filename, accept_encodings):
+        """Return (variant filename, encoding) of the best precompressed copy the client accepts, or (None, None)."""
+        entry = self.entry(filename)
+        if not entry:
+            return None, None
+        encoding = negotiate_encoding(accept_encodings, entry['encodings'])
+        if encoding is None:
+            return None, None
+        variant_filename = filename + VARIANT_EXTENSIONS[encoding]
+        if not os.path.isfile(os.path.join(self.static_dir, variant_filename)):
+            return None, None
+        return variant_filename, encoding
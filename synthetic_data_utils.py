@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Synthetic NC-Scale Data Utilities
+=================================
+
+Builds realistic, deterministic (seeded) data at North Carolina scale for
+load testing and benchmarks: all 100 counties, about 2,700 precincts, five
+general election cycles of candidate_vote_results, the flippable races
+derived from them, precincts, maps of about 300 KB each, website users and a
+precinct clustering results CSV.
+
+Precinct ids mix zero-padded numbers with a share of alphanumeric ids
+(e.g. '01-A') and users enter some precincts unpadded, so the normalization
+paths in the app are exercised the way production data exercises them.
+
+Never point this at a production database: load_synthetic_data() refuses to
+write into a database that already has candidate_vote_results unless
+replace=True, and replace deletes every row in the tables it fills.
+
+Usage:
+    from synthetic_data_utils import load_synthetic_data
+
+    with engine.begin() as conn:
+        summary = load_synthetic_data(conn, scale=1.0, password_hash=hash_for_all_users)
+"""
+
+import csv
+import hashlib
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+
+from compression_utils import compress
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+from precinct_utils import normalize_precinct_id
+from race_summary_utils import ensure_precinct_race_summary_table, refresh_precinct_race_summary
+
+NC_COUNTIES = [
+    'ALAMANCE', 'ALEXANDER', 'ALLEGHANY', 'ANSON', 'ASHE', 'AVERY', 'BEAUFORT', 'BERTIE', 'BLADEN',
+    'BRUNSWICK', 'BUNCOMBE', 'BURKE', 'CABARRUS', 'CALDWELL', 'CAMDEN', 'CARTERET', 'CASWELL',
+    'CATAWBA', 'CHATHAM', 'CHEROKEE', 'CHOWAN', 'CLAY', 'CLEVELAND', 'COLUMBUS', 'CRAVEN',
+    'CUMBERLAND', 'CURRITUCK', 'DARE', 'DAVIDSON', 'DAVIE', 'DUPLIN', 'DURHAM', 'EDGECOMBE',
+    'FORSYTH', 'FRANKLIN', 'GASTON', 'GATES', 'GRAHAM', 'GRANVILLE', 'GREENE', 'GUILFORD',
+    'HALIFAX', 'HARNETT', 'HAYWOOD', 'HENDERSON', 'HERTFORD', 'HOKE', 'HYDE', 'IREDELL',
+    'JACKSON', 'JOHNSTON', 'JONES', 'LEE', 'LENOIR', 'LINCOLN', 'MACON', 'MADISON', 'MARTIN',
+    'MCDOWELL', 'MECKLENBURG', 'MITCHELL', 'MONTGOMERY', 'MOORE', 'NASH', 'NEW HANOVER',
+    'NORTHAMPTON', 'ONSLOW', 'ORANGE', 'PAMLICO', 'PASQUOTANK', 'PENDER', 'PERQUIMANS', 'PERSON',
+    'PITT', 'POLK', 'RANDOLPH', 'RICHMOND', 'ROBESON', 'ROCKINGHAM', 'ROWAN', 'RUTHERFORD',
+    'SAMPSON', 'SCOTLAND', 'STANLY', 'STOKES', 'SURRY', 'SWAIN', 'TRANSYLVANIA', 'TYRRELL',
+    'UNION', 'VANCE', 'WAKE', 'WARREN', 'WASHINGTON', 'WATAUGA', 'WAYNE', 'WILKES', 'WILSON',
+    'YADKIN', 'YANCEY',
+]
+
+# Approximate precinct counts of the largest counties; the rest share the remainder
+LARGE_COUNTY_PRECINCTS = {
+    'WAKE': 210, 'MECKLENBURG': 195, 'GUILFORD': 165, 'FORSYTH': 101, 'BUNCOMBE': 80,
+    'CUMBERLAND': 77, 'DURHAM': 57, 'GASTON': 45, 'NEW HANOVER': 43, 'UNION': 52,
+}
+
+FULL_SCALE_PRECINCTS = 2700
+
+# General elections: (date, statewide contests)
+ELECTION_CYCLES = [
+    ('2016-11-08', ['US PRESIDENT', 'US SENATE', 'NC GOVERNOR', 'NC LIEUTENANT GOVERNOR', 'NC ATTORNEY GENERAL']),
+    ('2018-11-06', ['NC SUPREME COURT ASSOCIATE JUSTICE SEAT 01']),
+    ('2020-11-03', ['US PRESIDENT', 'US SENATE', 'NC GOVERNOR', 'NC LIEUTENANT GOVERNOR', 'NC ATTORNEY GENERAL']),
+    ('2022-11-08', ['US SENATE', 'NC SUPREME COURT ASSOCIATE JUSTICE SEAT 03']),
+    ('2024-11-05', ['US PRESIDENT', 'NC GOVERNOR', 'NC LIEUTENANT GOVERNOR', 'NC ATTORNEY GENERAL']),
+]
+
+# Down-ballot contests every precinct votes on each cycle
+LOCAL_CONTESTS = ['US HOUSE OF REPRESENTATIVES DISTRICT {district:02d}',
+                  'NC HOUSE OF REPRESENTATIVES DISTRICT {house:03d}',
+                  'NC STATE SENATE DISTRICT {senate:02d}',
+                  '{county} COUNTY BOARD OF COMMISSIONERS',
+                  '{county} COUNTY BOARD OF EDUCATION',
+                  '{county} COUNTY SHERIFF']
+
+DEFAULT_MAP_BYTES = 300 * 1024
+
+CLUSTERING_COLUMNS = [
+    'precinct', 'county', 'area_km2', 'perimeter_km', 'shape_complexity', 'longitude', 'latitude',
+    'precinct_political', 'total_votes_sum', 'avg_votes_per_contest', 'num_contests', 'dem_pct',
+    'rep_pct', 'other_pct', 'precinct_flippable', 'dem_votes', 'oppo_votes', 'dem_margin',
+    'dva_pct_needed', 'total_votes', 'dem_vote_pct', 'competitiveness', 'flippability_score',
+    'comprehensive_cluster',
+]
+
+
+def county_precinct_counts(scale: float = 1.0, seed: int = 2024) -> Dict[str, int]:
+    """
+    Number of precincts per county at a scale (1.0 = about 2,700 statewide).
+
+    Args:
+        scale: Fraction of full NC scale; every county keeps at least one precinct
+        seed: Random seed
+
+    Returns:
+        Dict of county -> precinct count, covering all 100 counties
+    """
+    rng = random.Random(seed)
+    remaining_counties = [county for county in NC_COUNTIES if county not in LARGE_COUNTY_PRECINCTS]
+    remaining_total = FULL_SCALE_PRECINCTS - sum(LARGE_COUNTY_PRECINCTS.values())
+    weights = {county: rng.lognormvariate(0, 0.6) for county in remaining_counties}
+    weight_total = sum(weights.values())
+
+    counts = {}
+    for county in NC_COUNTIES:
+        full = LARGE_COUNTY_PRECINCTS.get(county) or remaining_total * weights[county] / weight_total
+        counts[county] = max(1, round(full * scale))
+    return counts
+
+
+def precinct_ids(count: int, rng: random.Random) -> List[str]:
+    """Precinct ids for one county: zero-padded numbers with about 10% alphanumeric ids."""
+    ids = []
+    number = 1
+    while len(ids) < count:
+        if rng.random() < 0.1 and len(ids) + 2 <= count:
+            ids.extend([f'{number:02d}-A', f'{number:02d}-B'])
+        else:
+            ids.append(f'{number:03d}')
+        number += 1
+    return ids
+
+
+def build_precincts(scale: float = 1.0, seed: int = 2024) -> List[Dict]:
+    """
+    Precincts with stable per-precinct traits used by the other generators.
+
+    Returns:
+        List of dicts: county, precinct, precinct_name, voters, dem_lean,
+        longitude, latitude, house/senate/congressional districts
+    """
+    rng = random.Random(seed)
+    precincts = []
+    for county_index, (county, count) in enumerate(county_precinct_counts(scale, seed).items()):
+        county_lean = rng.betavariate(4, 5)
+        # Spread counties west to east across the state
+        county_longitude = -84.0 + 8.5 * county_index / len(NC_COUNTIES)
+        county_latitude = 34.2 + 2.2 * rng.random()
+        for precinct in precinct_ids(count, rng):
+            precincts.append({
+                'county': county,
+                'precinct': precinct,
+                'precinct_name': f'{county.title()} {precinct}',
+                'voters': int(rng.lognormvariate(math.log(1500), 0.5)),
+                'dem_lean': min(0.95, max(0.05, rng.gauss(county_lean, 0.12))),
+                'longitude': county_longitude + rng.uniform(-0.15, 0.15),
+                'latitude': county_latitude + rng.uniform(-0.15, 0.15),
+                'district': 1 + county_index % 14,
+                'house': 1 + (county_index * 7 + len(precincts)) % 120,
+                'senate': 1 + (county_index * 3 + len(precincts)) % 50,
+            })
+    return precincts
+
+
+def generate_vote_results(precincts: List[Dict], seed: int = 2024):
+    """
+    Yield candidate_vote_results rows for every precinct, contest and cycle.
+
+    Yields:
+        Dicts: county, precinct, contest_name, election_date, choice_party, total_votes
+    """
+    rng = random.Random(seed + 1)
+    for precinct in precincts:
+        for cycle_index, (election_date, statewide) in enumerate(ELECTION_CYCLES):
+            presidential = 'US PRESIDENT' in statewide
+            turnout = precinct['voters'] * (0.68 if presidential else 0.48) * rng.uniform(0.9, 1.1)
+            contests = statewide + [contest.format(**precinct)
+                                    for contest in LOCAL_CONTESTS]
+            for contest in contests:
+                lean = min(0.98, max(0.02, precinct['dem_lean'] + rng.gauss(0, 0.04)))
+                ballots = turnout * (1.0 if contest in statewide else rng.uniform(0.85, 0.97))
+                dem_votes = int(ballots * lean)
+                rep_votes = int(ballots * (1 - lean) * rng.uniform(0.94, 1.0))
+                # Some local races go uncontested
+                if contest not in statewide and rng.random() < 0.12:
+                    rep_votes = 0 if lean > 0.5 else rep_votes
+                    dem_votes = 0 if lean <= 0.5 else dem_votes
+                for party, votes in (('DEM', dem_votes), ('REP', rep_votes)):
+                    if votes:
+                        yield {'county': precinct['county'], 'precinct': precinct['precinct'],
+                               'contest_name': contest, 'election_date': election_date,
+                               'choice_party': party, 'total_votes': votes}
+                if contest in statewide and rng.random() < 0.3:
+                    yield {'county': precinct['county'], 'precinct': precinct['precinct'],
+                           'contest_name': contest, 'election_date': election_date,
+                           'choice_party': 'LIB', 'total_votes': int(ballots * rng.uniform(0.005, 0.03))}
+
+
+def flippable_rows(vote_rows: List[Dict]) -> List[Dict]:
+    """
+    Derive flippable rows (contested races the Democrat lost) from vote results.
+
+    gov_votes is the Democratic vote for the top statewide race of the cycle
+    in the precinct, the baseline DVA (Democratic voter absenteeism) compares
+    against.
+    """
+    races = {}
+    for row in vote_rows:
+        key = (row['county'], row['precinct'], row['contest_name'], row['election_date'])
+        race = races.setdefault(key, {'DEM': 0, 'OPPO': 0})
+        race['DEM' if row['choice_party'] == 'DEM' else 'OPPO'] += row['total_votes']
+
+    top_of_ticket = {date: statewide[0] for date, statewide in ELECTION_CYCLES}
+
+    rows = []
+    for (county, precinct, contest, election_date), race in races.items():
+        dem_votes, oppo_votes = race['DEM'], race['OPPO']
+        if not dem_votes or not oppo_votes or dem_votes >= oppo_votes:
+            continue
+        baseline = races.get((county, precinct, top_of_ticket[election_date], election_date), {})
+        gov_votes = baseline.get('DEM', dem_votes)
+        vote_gap = oppo_votes + 1 - dem_votes
+        dva_pct_needed = (vote_gap * 100.0 / (gov_votes - dem_votes)) if gov_votes > dem_votes else 999.9
+        rows.append({'county': county, 'precinct': precinct, 'contest_name': contest,
+                     'election_date': election_date, 'dem_votes': dem_votes, 'oppo_votes': oppo_votes,
+                     'gov_votes': gov_votes, 'dem_margin': dem_votes - oppo_votes,
+                     'dva_pct_needed': round(min(dva_pct_needed, 999.9), 1)})
+    return rows
+
+
+def generate_map_html(county: str, precinct: str, target_bytes: int = DEFAULT_MAP_BYTES,
+                      seed: int = 2024) -> str:
+    """
+    Folium-style map page for a precinct, padded to about target_bytes with a
+    GeoJSON boundary of random-walk coordinates (compresses like real maps).
+    """
+    rng = random.Random(f'{seed}-{county}-{precinct}')
+    longitude, latitude = -80.0 + rng.uniform(-4, 4), 35.5 + rng.uniform(-1, 1)
+    head = (f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{county.title()} County Precinct {precinct}</title>\n'
+            '<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>\n'
+            '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>\n'
+            '</head>\n<body>\n<div class="folium-map" id="map_precinct"></div>\n<script>\n'
+            f'var map_precinct = L.map("map_precinct", {{center: [{latitude:.6f}, {longitude:.6f}], zoom: 13}});\n'
+            'var boundary = {"type": "Feature", "properties": {"county": "' + county + '", "precinct": "'
+            + precinct + '"}, "geometry": {"type": "Polygon", "coordinates": [[')
+    tail = ']]}};\nL.geoJson(boundary).addTo(map_precinct);\n</script>\n</body>\n</html>\n'
+
+    points = []
+    size = len(head) + len(tail)
+    while size < target_bytes:
+        longitude += rng.uniform(-0.0004, 0.0004)
+        latitude += rng.uniform(-0.0004, 0.0004)
+        point = f'[{longitude:.7f}, {latitude:.7f}]'
+        points.append(point)
+        size += len(point) + 2
+    return head + ', '.join(points) + tail
+
+
+def clustering_rows(precincts: List[Dict], flippable: List[Dict], seed: int = 2024) -> List[Dict]:
+    """Precinct clustering results rows (same columns as precinct_clustering_results.csv)."""
+    rng = random.Random(seed + 2)
+    flippable_by_precinct = {}
+    for row in flippable:
+        stats = flippable_by_precinct.setdefault((row['county'], row['precinct']), [0, 0, 0])
+        stats[0] += 1
+        stats[1] += row['dem_votes']
+        stats[2] += row['oppo_votes']
+
+    rows = []
+    for precinct in precincts:
+        count, dem_votes, oppo_votes = flippable_by_precinct.get((precinct['county'], precinct['precinct']), (0, 0, 0))
+        total = dem_votes + oppo_votes
+        area = rng.lognormvariate(2.5, 1.0)
+        perimeter = 4 * math.sqrt(area) * rng.uniform(1.1, 2.5)
+        dem_pct = precinct['dem_lean'] * 100
+        rows.append({
+            'precinct': precinct['precinct'], 'county': precinct['county'],
+            'area_km2': round(area, 3), 'perimeter_km': round(perimeter, 3),
+            'shape_complexity': round(perimeter ** 2 / area, 3),
+            'longitude': round(precinct['longitude'], 6), 'latitude': round(precinct['latitude'], 6),
+            'precinct_political': precinct['precinct'],
+            'total_votes_sum': int(precinct['voters'] * 12), 'avg_votes_per_contest': round(precinct['voters'] * 0.55, 1),
+            'num_contests': 40, 'dem_pct': round(dem_pct, 2), 'rep_pct': round(100 - dem_pct - 2, 2), 'other_pct': 2.0,
+            'precinct_flippable': count or '', 'dem_votes': dem_votes, 'oppo_votes': oppo_votes,
+            'dem_margin': dem_votes - oppo_votes,
+            'dva_pct_needed': round(rng.uniform(5, 80), 1) if count else 0.0,
+            'total_votes': total, 'dem_vote_pct': round(dem_votes * 100.0 / total, 2) if total else 0.0,
+            'competitiveness': round(1 - abs(precinct['dem_lean'] - 0.5) * 2, 3),
+            'flippability_score': round(count / 30.0, 3),
+            'comprehensive_cluster': min(7, int(precinct['dem_lean'] * 8)),
+        })
+    return rows
+
+
+def write_clustering_csv(rows: List[Dict], path: str) -> None:
+    """Write clustering rows as a precinct clustering results CSV."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CLUSTERING_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def user_rows(precincts: List[Dict], password_hash: str, users_per_county: int = 25,
+              seed: int = 2024) -> List[Dict]:
+    """
+    Website users spread over every county, plus the benchmark accounts.
+
+    bench_admin is a statewide admin in the largest county; bench_county is a
+    county coordinator there. Some users enter their precinct unpadded.
+    """
+    rng = random.Random(seed + 3)
+    by_county = {}
+    for precinct in precincts:
+        by_county.setdefault(precinct['county'], []).append(precinct['precinct'])
+    largest, largest_precincts = benchmark_targets(precincts)
+    now = datetime.utcnow()
+
+    def user(username, county, precinct, is_admin=False, is_county=False, created_days_ago=400):
+        return {'username': username, 'email': f'{username}@example.org', 'password': f'synthetic-{username}',
+                'password_hash': password_hash, 'is_admin': is_admin, 'is_county': is_county,
+                'is_active': True, 'created_at': now - timedelta(days=created_days_ago),
+                'phone': '555-0100', 'role': 'Administrator' if is_admin else 'Precinct Leader',
+                'precinct': precinct, 'state': 'NC', 'county': county}
+
+    rows = [user('bench_admin', largest, largest_precincts[0], is_admin=True),
+            user('bench_county', largest, largest_precincts[0], is_county=True)]
+    for county, county_precincts in by_county.items():
+        for index in range(users_per_county):
+            precinct = rng.choice(county_precincts)
+            if precinct.isdigit() and rng.random() < 0.3:
+                precinct = precinct.lstrip('0') or '0'
+            rows.append(user(f'user_{county.replace(" ", "_").lower()}_{index}', county, precinct,
+                             is_county=index == 0, created_days_ago=rng.randint(0, 540)))
+            rows[-1]['is_active'] = rng.random() > 0.1
+    return rows
+
+
+def map_row(county: str, precinct: str, map_bytes: int = DEFAULT_MAP_BYTES, encoding: Optional[str] = 'gzip',
+            seed: int = 2024) -> Dict:
+    """A maps table row with the content metadata Map.set_content() would store."""
+    html = generate_map_html(county, precinct, map_bytes, seed)
+    data = html.encode('utf-8')
+    now = datetime.utcnow()
+    return {
+        'state': 'NC', 'county': county, 'precinct': precinct,
+        'precinct_key': normalize_precinct_id(precinct)[0],
+        'map': None if encoding else html,
+        'map_compressed': compress(data, encoding) if encoding else None,
+        'content_encoding': encoding,
+        'content_hash': hashlib.sha256(data).hexdigest(),
+        'content_size': len(data), 'has_content': True,
+        'created_at': now, 'updated_at': now,
+    }
+
+
+def ensure_synthetic_tables(conn) -> None:
+    """
+    Create the NC data tables the web app reads if they don't exist.
+
+    users and maps come from the application models (db.create_all()).
+    """
+    id_column = 'id SERIAL PRIMARY KEY' if conn.dialect.name == 'postgresql' else 'id INTEGER PRIMARY KEY'
+    conn.execute(text(f'''
+        CREATE TABLE IF NOT EXISTS candidate_vote_results (
+            {id_column},
+            county VARCHAR(100), precinct VARCHAR(100), contest_name VARCHAR(200),
+            election_date DATE, choice_party VARCHAR(10), total_votes INTEGER
+        )
+    '''))
+    conn.execute(text(f'''
+        CREATE TABLE IF NOT EXISTS flippable (
+            {id_column},
+            county VARCHAR(100), precinct VARCHAR(100),
+            contest_name VARCHAR(200), election_date DATE,
+            dem_votes INTEGER, oppo_votes INTEGER, gov_votes INTEGER,
+            dem_margin INTEGER, dva_pct_needed FLOAT
+        )
+    '''))
+    conn.execute(text('''
+        CREATE TABLE IF NOT EXISTS precincts (
+            county VARCHAR(100), precinct VARCHAR(100), precinct_name VARCHAR(200)
+        )
+    '''))
+    for name, columns in (('ix_cvr_county_precinct', 'candidate_vote_results (county, precinct)'),
+                          ('ix_flippable_county_precinct', 'flippable (county, precinct)'),
+                          ('ix_precincts_county', 'precincts (county)')):
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {columns}'))
+    ensure_flippable_metric_columns(conn)
+    ensure_precinct_race_summary_table(conn)
+
+
+def _insert(conn, table: str, rows: List[Dict], batch_size: int = 5000) -> int:
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    statement = text(f'INSERT INTO {table} ({", ".join(columns)}) '
+                     f'VALUES ({", ".join(":" + column for column in columns)})')
+    for start in range(0, len(rows), batch_size):
+        conn.execute(statement, rows[start:start + batch_size])
+    return len(rows)
+
+
+def load_synthetic_data(conn, password_hash: str, scale: float = 1.0, seed: int = 2024,
+                        map_bytes: int = DEFAULT_MAP_BYTES, map_encoding: Optional[str] = 'gzip',
+                        users_per_county: int = 25, clustering_csv: Optional[str] = None,
+                        replace: bool = False, progress=None) -> Dict[str, int]:
+    """
+    Fill a database with synthetic NC-scale data.
+
+    Args:
+        conn: SQLAlchemy connection (caller controls the transaction); the
+            users and maps tables must already exist
+        password_hash: Password hash stored for every synthetic user
+        scale: Fraction of full NC scale (1.0 = about 2,700 precincts)
+        seed: Random seed; the same seed and scale give the same data
+        map_bytes: Approximate size of each map's HTML
+        map_encoding: Content-Encoding maps are stored with (None = uncompressed)
+        users_per_county: Website users per county
+        clustering_csv: Also write precinct clustering results to this path
+        replace: Delete existing rows first (required if candidate_vote_results has rows)
+        progress: Optional callable(message) for status output
+
+    Returns:
+        Dict of table -> rows written
+
+    Raises:
+        ValueError: If the database already has vote results and replace is False
+    """
+    report = progress or (lambda message: None)
+    ensure_synthetic_tables(conn)
+    existing = conn.execute(text('SELECT COUNT(*) FROM candidate_vote_results')).scalar()
+    if existing and not replace:
+        raise ValueError(f'candidate_vote_results already has {existing:,} rows; refusing to add synthetic data '
+                         '(pass replace=True to delete it first)')
+    if replace:
+        table_names = set(inspect(conn).get_table_names())
+        for table in ('candidate_vote_results', 'flippable', 'precincts', 'precinct_race_summary', 'maps', 'users'):
+            if table in table_names:
+                conn.execute(text(f'DELETE FROM {table}'))
+
+    precincts = build_precincts(scale, seed)
+    summary = {'counties': len({p['county'] for p in precincts})}
+    report(f"{summary['counties']} counties, {len(precincts):,} precincts")
+
+    summary['precincts'] = _insert(conn, 'precincts', [
+        {'county': p['county'], 'precinct': p['precinct'], 'precinct_name': p['precinct_name']} for p in precincts])
+
+    vote_rows = list(generate_vote_results(precincts, seed))
+    summary['candidate_vote_results'] = _insert(conn, 'candidate_vote_results', vote_rows)
+    report(f"{summary['candidate_vote_results']:,} candidate_vote_results rows")
+
+    flippable = flippable_rows(vote_rows)
+    summary['flippable'] = _insert(conn, 'flippable', flippable)
+    refresh_flippable_metrics(conn)
+    report(f"{summary['flippable']:,} flippable races")
+
+    summary['precinct_race_summary'] = refresh_precinct_race_summary(conn)
+
+    summary['users'] = _insert(conn, 'users', user_rows(precincts, password_hash, users_per_county, seed))
+    report(f"{summary['users']:,} users")
+
+    summary['maps'] = 0
+    for index, precinct in enumerate(precincts, 1):
+        summary['maps'] += _insert(conn, 'maps', [map_row(precinct['county'], precinct['precinct'],
+                                                          map_bytes, map_encoding, seed)])
+        if index % 500 == 0:
+            report(f"{index:,} maps")
+    report(f"{summary['maps']:,} maps")
+
+    if clustering_csv:
+        write_clustering_csv(clustering_rows(precincts, flippable, seed), clustering_csv)
+        summary['clustering_rows'] = len(precincts)
+    return summary
+
+
+def benchmark_targets(precincts: List[Dict]) -> Tuple[str, List[str]]:
+    """Return (largest county, its precinct ids): where the benchmark accounts live."""
+    by_county = {}
+    for precinct in precincts:
+        by_county.setdefault(precinct['county'], []).append(precinct['precinct'])
+    largest = max(by_county, key=lambda county: len(by_county[county]))
+    return largest, by_county[largest]
@@ -6,19 +6,24 @@ This module provides:
 - Database setup/teardown
 - User fixtures for testing
 - Test client configuration
+- Query counting and query budgets
 """
 
 import os
 import tempfile
 import pytest
+from contextlib import contextmanager
 from datetime import datetime
 import sys
 
+from sqlalchemy import event
+
 # Add the parent directory to Python path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from main import create_app
 from models import db, User, Map
+from services.data_version_registry import data_version_registry
 
 
 @pytest.fixture(scope='session')
@@ -242,6 +247,12 @@ def multiple_maps(app, db_session):
     with app.app_context():
         maps = []
         for precinct_num in ['001', '002', '003', '012']:
+            # Reuse a map another fixture (e.g. sample_map) already created for this location
+            existing = Map.query.filter_by(state='NC', county='Wake', precinct_key=precinct_num).first()
+            if existing:
+                maps.append(existing)
+                continue
+            
             map_content = f'''<!DOCTYPE html>
 <html>
 <head>
@@ -314,6 +325,50 @@ def county_client(client, county_user):
     return client
 
 
+# Query counting
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed on the app's engine inside the block."""
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    # Poll data versions now so the periodic per-request poll can't land in the block
+    data_version_registry.check(force=True)
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Fail if the block executes more than max_queries SQL statements.
+    
+    Budgets are maximums for one request, so a change that adds a query per
+    row (N+1) fails instead of quietly slowing the page down.
+    """
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= max_queries, (
+        f'{len(statements)} queries, budget {max_queries}:\n' + '\n'.join(statements))
+
+
+@pytest.fixture(name='count_queries')
+def count_queries_fixture(app):
+    """count_queries() context manager (statements run inside the block)."""
+    return count_queries
+
+
+@pytest.fixture(name='query_budget')
+def query_budget_fixture(app):
+    """query_budget(n) context manager failing when a block runs more than n queries."""
+    return query_budget
+
+
 # Helper functions for tests
 
 def login_user(client, username, password):
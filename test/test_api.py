@@ -8,12 +8,28 @@ Tests cover:
 - Response format validation
 - Rate limiting compliance
 - Error handling
+- Flippable analysis rollup and on-demand precinct races
+- Query budgets
 """
 
 import pytest
 import json
+from contextlib import contextmanager
 from datetime import datetime
 
+from flask import template_rendered
+from sqlalchemy import text
+
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics, SLAM_DUNK, STRETCH_GOAL
+from models import db
+
+# Query budgets per request: status polls read only the session, extending a
+# session loads the user, and a precinct races request loads the user and runs
+# the one races query (padded and unpadded ids together)
+SESSION_STATUS_QUERIES = 0
+SESSION_EXTEND_QUERIES = 1
+RACES_API_QUERIES = 2
+
 
 def login_user(client, username, password='user_password_unique'):
     """Helper function to login a user with rate limiting tolerance."""
@@ -48,11 +64,12 @@ class TestSessionAPI:
         except:
             pass  # Some setups might not return JSON for 401
     
-    def test_session_status_authenticated(self, client, regular_user):
+    def test_session_status_authenticated(self, client, regular_user, query_budget):
         """Test session status endpoint with authenticated user."""
         login_user(client, regular_user.username, 'user_password_unique')
         
-        response = client.get('/api/session-status', follow_redirects=True)
+        with query_budget(SESSION_STATUS_QUERIES):
+            response = client.get('/api/session-status', follow_redirects=True)
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should return JSON with status (if not redirected or rate limited)
@@ -77,11 +94,12 @@ class TestSessionAPI:
         response = client.post('/api/extend-session')
         assert response.status_code in [302, 401]  # Accept redirect or 401
     
-    def test_session_extend_authenticated(self, client, regular_user):
+    def test_session_extend_authenticated(self, client, regular_user, query_budget):
         """Test session extension endpoint with authenticated user."""
         login_user(client, regular_user.username, 'user_password_unique')
         
-        response = client.post('/api/extend-session')
+        with query_budget(SESSION_EXTEND_QUERIES):
+            response = client.post('/api/extend-session')
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should return JSON confirmation (if not redirected or rate limited)
@@ -391,4 +409,149 @@ class TestAPIContentNegotiation:
         # Flask might set this automatically or it might be HTML redirect
         assert ('application/json' in content_type or 
                 content_type == '' or 
-                'text/html' in content_type)  # Accept HTML for redirects
\ No newline at end of file
+                'text/html' in content_type)  # Accept HTML for redirects
+
+
+FLIPPABLE_RACES = [
+    # county, precinct, contest, dem, oppo, gov, dva
+    ('WAKE', '012', 'NC HOUSE 35', 1000, 1010, 1200, 5.5),
+    ('WAKE', '12', 'COUNTY COMMISSIONER', 500, 1500, 1000, 200.2),
+    ('WAKE', '001', 'NC SENATE 18', 800, 900, 1100, 33.7),
+    ('FORSYTH', '074', 'NC HOUSE 72', 100, 180, 600, 16.2),
+]
+
+
+@pytest.fixture
+def flippable_table(app):
+    """Create and classify a small flippable table (padded and unpadded Wake precinct 12)."""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text('''
+                CREATE TABLE flippable (
+                    id INTEGER PRIMARY KEY,
+                    county VARCHAR(100), precinct VARCHAR(100),
+                    contest_name VARCHAR(200), election_date DATE,
+                    dem_votes INTEGER, oppo_votes INTEGER, gov_votes INTEGER,
+                    dem_margin INTEGER, dva_pct_needed FLOAT
+                )
+            '''))
+            for county, precinct, contest, dem, oppo, gov, dva in FLIPPABLE_RACES:
+                conn.execute(text('''
+                    INSERT INTO flippable (county, precinct, contest_name, election_date,
+                                           dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed)
+                    VALUES (:county, :precinct, :contest, '2024-11-05', :dem, :oppo, :gov, :margin, :dva)
+                '''), {'county': county, 'precinct': precinct, 'contest': contest, 'dem': dem,
+                       'oppo': oppo, 'gov': gov, 'margin': dem - oppo, 'dva': dva})
+            ensure_flippable_metric_columns(conn)
+            refresh_flippable_metrics(conn)
+        yield
+        with db.engine.begin() as conn:
+            conn.execute(text('DROP TABLE flippable'))
+
+
+@contextmanager
+def captured_analysis(app):
+    """Capture the template context of flippable_analysis.html renders."""
+    captured = []
+
+    def record(sender, template, context, **extra):
+        if template.name == 'flippable_analysis.html':
+            captured.append(context)
+
+    template_rendered.connect(record, app)
+    try:
+        yield captured
+    finally:
+        template_rendered.disconnect(record, app)
+
+
+class TestFlippableAnalysisAPI:
+    """Test the on-demand precinct race endpoint for the flippable analysis."""
+    
+    def test_precinct_races_requires_auth(self, client):
+        """Test that the precinct race endpoint requires authentication."""
+        response = client.get('/api/flippable-analysis/races?county=Wake&precinct=012')
+        assert response.status_code in [302, 401]
+    
+    def test_precinct_races_regular_user_denied(self, client, regular_user):
+        """Test that regular users cannot load precinct race details."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        response = client.get('/api/flippable-analysis/races?county=Wake&precinct=012')
+        assert response.status_code in [403, 429]
+    
+    def test_precinct_races_requires_parameters(self, client, admin_user):
+        """Test that county and precinct are required."""
+        login_user(client, admin_user.username, 'admin_password_unique')
+        
+        response = client.get('/api/flippable-analysis/races?county=Wake')
+        assert response.status_code in [400, 429]
+        if response.status_code == 400:
+            assert 'error' in response.get_json()
+    
+    def test_precinct_races_county_scope(self, client, county_user):
+        """Test that county users can only drill into their own county."""
+        login_user(client, county_user.username, 'county_password_unique')
+        
+        response = client.get('/api/flippable-analysis/races?county=Forsyth&precinct=074')
+        assert response.status_code in [403, 429]
+    
+    def test_precinct_races_padded_and_unpadded(self, client, admin_user, flippable_table, query_budget):
+        """Test that padded and unpadded precinct ids both return every race for the precinct."""
+        login_user(client, admin_user.username, 'admin_password_unique')
+        
+        for precinct in ['12', '012']:
+            with query_budget(RACES_API_QUERIES):
+                response = client.get(f'/api/flippable-analysis/races?county=wake&precinct={precinct}')
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['county'] == 'wake' and data['precinct'] == '012'
+            assert data['races'] == [
+                {'contest_name': 'NC HOUSE 35', 'election_date': '2024-11-05', 'dem_votes': 1000,
+                 'oppo_votes': 1010, 'vote_gap': 11, 'dva_pct_needed': 5.5, 'assessment': SLAM_DUNK,
+                 'dem_margin': -10},
+                {'contest_name': 'COUNTY COMMISSIONER', 'election_date': '2024-11-05', 'dem_votes': 500,
+                 'oppo_votes': 1500, 'vote_gap': 1001, 'dva_pct_needed': 200.2, 'assessment': STRETCH_GOAL,
+                 'dem_margin': -1000},
+            ]
+    
+    def test_precinct_races_own_county(self, client, county_user, flippable_table):
+        """Test that county users can drill into their own county."""
+        login_user(client, county_user.username, 'county_password_unique')
+        
+        response = client.get('/api/flippable-analysis/races?county=Wake&precinct=1')
+        assert response.status_code == 200
+        assert [race['contest_name'] for race in response.get_json()['races']] == ['NC SENATE 18']
+
+
+class TestFlippableAnalysisRollup:
+    """Test the precinct, county and statewide rollups of /flippable-analysis."""
+    
+    def test_admin_statewide_rollup(self, app, client, admin_user, flippable_table):
+        """Test that admins get every county plus statewide totals."""
+        login_user(client, admin_user.username, 'admin_password_unique')
+        
+        with captured_analysis(app) as captured:
+            response = client.get('/flippable-analysis')
+        assert response.status_code == 200
+        context = captured[0]
+        
+        assert set(context['county_summaries']) == {'WAKE', 'FORSYTH'}
+        assert context['county_summaries']['WAKE']['total_races'] == 3
+        assert sum(context['total_assessment_counts'].values()) == len(FLIPPABLE_RACES)
+        precincts = [key for key, _ in context['precinct_summaries']]
+        assert precincts[:2] == ['FORSYTH-074', 'WAKE-001']
+        assert sorted(precincts[2:]) == ['WAKE-012', 'WAKE-12']
+    
+    def test_county_user_rollup(self, app, client, county_user, flippable_table):
+        """Test that county users only get their own county."""
+        login_user(client, county_user.username, 'county_password_unique')
+        
+        with captured_analysis(app) as captured:
+            response = client.get('/flippable-analysis')
+        assert response.status_code == 200
+        context = captured[0]
+        
+        assert set(context['county_summaries']) == {'WAKE'}
+        assert sum(context['total_assessment_counts'].values()) == 3
+        assert all(summary['county'] == 'WAKE' for _, summary in context['precinct_summaries'])
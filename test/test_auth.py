@@ -11,6 +11,7 @@ Tests cover:
 """
 
 import pytest
+from datetime import datetime, timedelta
 from flask import session, url_for
 from models import User
 
@@ -203,6 +204,51 @@ class TestSessionManagement:
         response = client.post('/api/extend-session')
         assert response.status_code in [401, 302]  # Accept redirects
 
+    
+    def test_activity_write_is_throttled(self, app, authenticated_client):
+        """Test that requests within the granularity window don't rewrite the session."""
+        response = authenticated_client.get('/about')
+        assert response.status_code == 200
+        assert 'Set-Cookie' not in response.headers
+        
+        # Once the timestamp is older than the granularity it is refreshed
+        granularity = app.config['SESSION_ACTIVITY_GRANULARITY_SECONDS']
+        stale = datetime.utcnow() - timedelta(seconds=granularity + 5)
+        with authenticated_client.session_transaction() as sess:
+            sess['last_activity'] = stale.isoformat()
+        
+        response = authenticated_client.get('/about')
+        assert response.status_code == 200
+        assert 'Set-Cookie' in response.headers
+        with authenticated_client.session_transaction() as sess:
+            assert datetime.fromisoformat(sess['last_activity']) > stale
+    
+    def test_session_status_is_read_only(self, app, authenticated_client, count_queries):
+        """Test that status polls neither load the user nor touch the session."""
+        stale = (datetime.utcnow() - timedelta(minutes=10)).isoformat()
+        with authenticated_client.session_transaction() as sess:
+            sess['last_activity'] = stale
+        
+        with app.app_context(), count_queries() as statements:
+            response = authenticated_client.get('/api/session-status')
+        
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'active'
+        assert 'Set-Cookie' not in response.headers
+        assert statements == []
+        with authenticated_client.session_transaction() as sess:
+            assert sess['last_activity'] == stale
+    
+    def test_session_status_reports_expiry(self, app, authenticated_client):
+        """Test that a poll after the inactivity timeout reports the session as expired."""
+        timeout_minutes = app.config['SESSION_TIMEOUT_MINUTES']
+        with authenticated_client.session_transaction() as sess:
+            sess['last_activity'] = (datetime.utcnow() - timedelta(minutes=timeout_minutes + 1)).isoformat()
+        
+        response = authenticated_client.get('/api/session-status')
+        assert response.status_code == 401
+        assert response.get_json()['status'] == 'expired'
+
 
 class TestPasswordSecurity:
     """Test password handling and security."""
@@ -0,0 +1,185 @@
+"""
+Benchmarks of the hot endpoints against synthetic NC-scale data.
+
+Opt-in: the suite is skipped unless pytest-benchmark is installed and one of
+these is set:
+- BENCHMARK_DATABASE_URL: a database filled by
+  app_administration/generate_synthetic_data.py (PostgreSQL for production
+  parity; on SQLite /flippable-analysis runs its UNION ALL rollup instead of
+  GROUPING SETS).
+  BENCHMARK_CLUSTERING_CSV points at the CSV that run wrote (default: the
+  script's default path).
+- BENCHMARK_SCALE: generate data at that scale into a temporary SQLite file.
+
+BENCHMARK_SEED (default 2024) selects the data set. Each benchmark records
+p95_ms and throughput_rps in extra_info. Compare commits with:
+    pytest test/test_benchmarks.py --benchmark-autosave
+    pytest test/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Tests cover:
+- /flippable for a precinct leader and for admin drill-down
+- /flippable-analysis and its per-precinct races API
+- Map raw endpoints (static-content-raw, user-map-raw, my-map-raw)
+- /website-users
+- Clustering page, chart data API and CSV download
+"""
+
+import itertools
+import math
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from config import TestingConfig
+from main import create_app
+from models import db, User
+from synthetic_data_utils import build_precincts, benchmark_targets, load_synthetic_data
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL')
+SCALE = float(os.environ.get('BENCHMARK_SCALE') or 1.0)
+SEED = int(os.environ.get('BENCHMARK_SEED') or 2024)
+ROUNDS = 30
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.slow,
+    pytest.mark.skipif(not DATABASE_URL and not os.environ.get('BENCHMARK_SCALE'),
+                       reason='set BENCHMARK_DATABASE_URL or BENCHMARK_SCALE to run benchmarks'),
+]
+
+
+@pytest.fixture(scope='module')
+def bench_app(tmp_path_factory):
+    """App bound to the synthetic database, with clustering results from the same data set."""
+    import services.clustering_service as clustering_service
+
+    tmp_dir = tmp_path_factory.mktemp('benchmarks')
+    database_url = DATABASE_URL or f"sqlite:///{tmp_dir / 'bench.db'}"
+    clustering_csv = (os.environ.get('BENCHMARK_CLUSTERING_CSV')
+                      or os.path.join(PROJECT_ROOT, 'synthetic_clustering_results.csv'))
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('FLASK_ENV', 'testing')
+        patch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database_url)
+        app = create_app()
+        app.config.update(RATELIMIT_ENABLED=False, WTF_CSRF_ENABLED=False)
+
+        with app.app_context():
+            if not DATABASE_URL:
+                clustering_csv = str(tmp_dir / 'precinct_clustering_results.csv')
+                db.create_all()
+                with db.engine.begin() as conn:
+                    load_synthetic_data(conn, password_hash='unused', scale=SCALE, seed=SEED,
+                                        clustering_csv=clustering_csv)
+            if not os.path.exists(clustering_csv):
+                pytest.skip(f'clustering results not found: {clustering_csv}')
+
+            patch.setattr(clustering_service, 'precinct_clustering_dataset',
+                          clustering_service.ClusteringDataset(clustering_csv, county_column='county'))
+            yield app
+
+
+@pytest.fixture(scope='module')
+def targets():
+    """(county, precinct ids) of the county the benchmark accounts live in."""
+    return benchmark_targets(build_precincts(SCALE, SEED))
+
+
+def logged_in_client(app, username):
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+    assert user is not None, f'{username} missing: was the database built with generate_synthetic_data.py?'
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+    return client
+
+
+def run_benchmark(benchmark, client, requests):
+    """
+    Benchmark one request per round, cycling through requests.
+
+    Args:
+        benchmark: pytest-benchmark fixture
+        client: Logged-in test client
+        requests: List of (method, url, form data or None)
+    """
+    cycle = itertools.cycle(requests)
+
+    def request_once():
+        method, url, data = next(cycle)
+        response = client.open(url, method=method, data=data)
+        assert response.status_code == 200, f'{method} {url} -> {response.status_code}'
+        return response
+
+    benchmark.pedantic(request_once, rounds=ROUNDS, iterations=1, warmup_rounds=2)
+
+    timings = sorted(benchmark.stats.stats.data)
+    p95 = timings[min(len(timings) - 1, math.ceil(0.95 * len(timings)) - 1)]
+    benchmark.extra_info['p95_ms'] = round(p95 * 1000, 2)
+    benchmark.extra_info['throughput_rps'] = round(len(timings) / sum(timings), 1)
+
+
+class TestFlippable:
+    """Benchmark the flippable race pages."""
+
+    def test_flippable_own_precinct(self, benchmark, bench_app):
+        client = logged_in_client(bench_app, 'bench_county')
+        run_benchmark(benchmark, client, [('GET', '/flippable', None)])
+
+    def test_flippable_admin_drilldown(self, benchmark, bench_app, targets):
+        county, precincts = targets
+        client = logged_in_client(bench_app, 'bench_admin')
+        run_benchmark(benchmark, client, [
+            ('POST', '/flippable', {'analysis_county': county, 'analysis_precinct': precinct})
+            for precinct in precincts[:ROUNDS]
+        ])
+
+    def test_flippable_analysis(self, benchmark, bench_app):
+        client = logged_in_client(bench_app, 'bench_county')
+        run_benchmark(benchmark, client, [('GET', '/flippable-analysis', None)])
+
+    def test_flippable_analysis_races(self, benchmark, bench_app, targets):
+        county, precincts = targets
+        client = logged_in_client(bench_app, 'bench_county')
+        run_benchmark(benchmark, client, [
+            ('GET', f'/api/flippable-analysis/races?county={county}&precinct={precinct}', None)
+            for precinct in precincts[:ROUNDS]
+        ])
+
+
+class TestMaps:
+    """Benchmark the raw map endpoints (about 300 KB per map)."""
+
+    def test_static_content_raw(self, benchmark, bench_app, targets):
+        _, precincts = targets
+        client = logged_in_client(bench_app, 'bench_admin')
+        run_benchmark(benchmark, client, [('GET', f'/static-content-raw/{precinct}.html', None)
+                                          for precinct in precincts[:ROUNDS]])
+
+    def test_user_map_raw(self, benchmark, bench_app, targets):
+        _, precincts = targets
+        client = logged_in_client(bench_app, 'bench_admin')
+        run_benchmark(benchmark, client, [('GET', f'/user-map-raw/{precincts[0]}.html', None)])
+
+    def test_my_map_raw(self, benchmark, bench_app):
+        client = logged_in_client(bench_app, 'bench_county')
+        run_benchmark(benchmark, client, [('GET', '/my-map-raw', None)])
+
+
+class TestReports:
+    """Benchmark the website user report and clustering APIs."""
+
+    @pytest.mark.parametrize('username', ['bench_admin', 'bench_county'])
+    def test_website_users(self, benchmark, bench_app, username):
+        client = logged_in_client(bench_app, username)
+        run_benchmark(benchmark, client, [('GET', '/website-users', None)])
+
+    @pytest.mark.parametrize('url', ['/clustering', '/api/clustering/data', '/precinct_clustering_results.csv'])
+    def test_clustering(self, benchmark, bench_app, url):
+        client = logged_in_client(bench_app, 'bench_county')
+        run_benchmark(benchmark, client, [('GET', url, None)])
@@ -0,0 +1,67 @@
+"""
+Tests for worker boot cost.
+
+Tests cover:
+- create_app() does not import Dash, plotly, pandas or sklearn
+- create_app() does not create database tables
+- The init-db CLI command creates tables and the default admin
+- Import time report parsing
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'app_administration'))
+
+from boot_report import parse_importtime
+from models import User
+
+
+def test_create_app_is_light():
+    """Boot in a fresh interpreter so other tests' imports don't leak in."""
+    script = (
+        "import json, sys\n"
+        "from main import create_app\n"
+        "from models import db\n"
+        "app = create_app()\n"
+        "heavy = sorted(m for m in ('dash', 'plotly', 'pandas', 'sklearn') if m in sys.modules)\n"
+        "with app.app_context():\n"
+        "    tables = db.inspect(db.engine).get_table_names()\n"
+        "print(json.dumps({'heavy': heavy, 'tables': tables}))\n"
+    )
+    env = dict(os.environ, FLASK_ENV='testing')
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['heavy'] == []
+    # The testing config uses an in-memory database, so any table came from boot
+    assert report['tables'] == []
+
+
+def test_init_db_command(app, runner):
+    with app.app_context():
+        User.query.delete()
+        result = runner.invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        admin = User.query.filter_by(username=app.config['DEFAULT_ADMIN_USERNAME']).first()
+        assert admin is not None and admin.is_admin
+
+
+def test_parse_importtime():
+    stderr = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       301 |        301 |       _json',
+        'import time:       630 |      13445 |   json.decoder',
+        'import time:       538 |      14686 | json',
+        'import time:       120 |      90000 | flask',
+        'not an import line',
+    ])
+    assert parse_importtime(stderr) == [
+        {'module': 'flask', 'cumulative_ms': 90.0, 'self_ms': 0.1},
+        {'module': 'json', 'cumulative_ms': 14.7, 'self_ms': 0.5},
+    ]
+    assert len(parse_importtime(stderr, top=1)) == 1
@@ -0,0 +1,215 @@
+"""
+Tests for the per-county census clustering summary.
+
+Tests cover:
+- Cluster sizes, centroids and descriptions per dimension
+- High-opportunity counts and targeting strategies
+- Summary artifact loading and reloading
+- Demographic clustering page served from the artifact, scoped to the selected county
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+from flask import template_rendered
+
+from census_summary_utils import build_county_summaries, write_summary_artifact
+from services import clustering_service
+from services.clustering_service import ClusteringDataset, ClusteringSummary
+
+
+def tract(county, population, income, education_rate, clusters, remote_work=0.1, density=100.0):
+    """One census tract result row; clusters is (population, economic, education, geographic)."""
+    return {
+        'state': 'NC', 'county': county,
+        'total_population': population, 'median_income': income,
+        'education_rate': education_rate, 'remote_work_rate': remote_work,
+        'population_density': density, 'latitude': 36.0 + clusters[3] / 10,
+        'population_cluster': clusters[0], 'economic_cluster': clusters[1],
+        'education_cluster': clusters[2], 'geographic_cluster': clusters[3],
+    }
+
+
+ROWS = [
+    tract('FORSYTH', 1000, 30000, 0.10, (0, 0, 0, 0)),
+    tract('FORSYTH', 3000, 50000, 0.20, (0, 0, 0, 1)),
+    tract('FORSYTH', 5000, 90000, 0.50, (1, 1, 1, 1), remote_work=0.4, density=900.0),
+    tract('FORSYTH', 2000, 40000, 0.15, (0, 0, 0, 0)),
+    tract('FORSYTH', 6000, 110000, 0.60, (1, 1, 1, 1), remote_work=0.3, density=800.0),
+    tract('WAKE', 4000, 70000, 0.40, (0, 1, 1, 0)),
+]
+
+SCORES = {'FORSYTH': {'population_housing': 0.3, 'economic': 0.25, 'education': 0.45, 'geographic': 0.2}}
+
+
+@pytest.fixture
+def summaries():
+    return build_county_summaries(ROWS, SCORES, analysis_date=datetime(2025, 10, 21))
+
+
+class TestBuildCountySummaries:
+    """Test the summary built from clustering results."""
+
+    def test_overview(self, summaries):
+        assert sorted(summaries) == ['FORSYTH', 'WAKE']
+        overview = summaries['FORSYTH']['overview']
+        assert overview['total_tracts'] == 5
+        assert overview['county'] == 'Forsyth'
+        assert overview['state'] == 'North Carolina'
+        assert overview['population_range'] == {'min': 1000, 'max': 6000}
+        assert overview['income_range'] == {'min': 30000, 'max': 110000}
+        assert overview['analysis_date'] == 'October 21, 2025'
+
+    def test_dimension_clusters(self, summaries):
+        economic = summaries['FORSYTH']['economic']
+        assert economic['clusters'] == 2
+        assert economic['silhouette_score'] == 0.25
+        assert economic['distribution'] == [
+            {'id': 0, 'tracts': 3, 'avg_income': 40000, 'description': 'Lowest income (largest cluster)'},
+            {'id': 1, 'tracts': 2, 'avg_income': 100000, 'description': 'Highest income'},
+        ]
+        education = summaries['FORSYTH']['education']
+        assert [c['education_rate'] for c in education['distribution']] == [15.0, 55.0]
+
+    def test_best_dimension(self, summaries):
+        forsyth = summaries['FORSYTH']
+        assert forsyth['education']['best'] is True
+        assert not any(forsyth[d]['best'] for d in ('population_housing', 'economic', 'geographic'))
+
+    def test_missing_scores(self, summaries):
+        """Test that a county without scores still gets cluster sizes."""
+        wake = summaries['WAKE']
+        assert wake['economic']['silhouette_score'] is None
+        assert wake['economic']['best'] is False
+        assert wake['economic']['distribution'][0]['description'] == 'All tracts (largest cluster)'
+
+    def test_strategic_insights(self, summaries):
+        insights = summaries['FORSYTH']['strategic_insights']
+        assert insights['high_opportunity'] == {
+            'high_income_tracts': 1,
+            'remote_work_hotspots': 1,
+            'highly_educated_areas': 1,
+            'high_density_tracts': 1,
+        }
+        strategies = {s['category']: s for s in insights['targeting_strategies']}
+        assert strategies['High-Education Areas']['tracts'] == 2
+        assert strategies['High-Education Areas']['rate'] == 55.0
+        assert strategies['High-Income Areas']['income'] == 100000
+
+    def test_csv_string_values(self):
+        """Test rows read with csv.DictReader (all strings)."""
+        rows = [{key: str(value) for key, value in row.items()} for row in ROWS]
+        assert build_county_summaries(rows, SCORES, datetime(2025, 10, 21)) == \
+            build_county_summaries(ROWS, SCORES, datetime(2025, 10, 21))
+
+
+class TestClusteringSummary:
+    """Test the cached summary loader."""
+
+    def test_loads_and_reloads_on_change(self, tmp_path, summaries, monkeypatch):
+        path = tmp_path / 'summary.json'
+        write_summary_artifact(summaries, str(path))
+        os.utime(path, (1000, 1000))
+        loader = ClusteringSummary(str(path))
+
+        assert loader.counties() == ['FORSYTH', 'WAKE']
+        assert loader.get('Forsyth')['overview']['total_tracts'] == 5
+        assert loader.get('durham') is None
+
+        reads = []
+        original_load = json.load
+        monkeypatch.setattr(clustering_service.json, 'load', lambda f: reads.append(1) or original_load(f))
+        loader.get('FORSYTH')
+        assert reads == []
+
+        write_summary_artifact({'DURHAM': summaries['WAKE']}, str(path))
+        os.utime(path, (2000, 2000))
+        assert loader.counties() == ['DURHAM']
+        assert reads == [1]
+
+    def test_missing_artifact(self, tmp_path):
+        loader = ClusteringSummary(str(tmp_path / 'missing.json'))
+        assert loader.counties() == []
+        assert loader.get('FORSYTH') is None
+
+
+class TestDemographicClusteringPage:
+    """Test the page served from the summary artifact."""
+
+    @pytest.fixture
+    def summary_artifact(self, tmp_path, summaries, monkeypatch):
+        path = tmp_path / 'summary.json'
+        write_summary_artifact(summaries, str(path))
+        monkeypatch.setattr(clustering_service, 'census_clustering_summary', ClusteringSummary(str(path)))
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def test_county_user_sees_own_county(self, app, county_user, summary_artifact):
+        with app.test_client() as client:
+            self.login(client, county_user)
+            response = client.get('/demographic-clustering')
+        assert response.status_code == 200
+        # county_user is in Wake: one tract
+        assert b'No census tract clustering summary' not in response.data
+        assert b'Wake County' in response.data
+
+    def test_admin_selects_county(self, app, admin_user, summary_artifact):
+        with app.test_client() as client:
+            self.login(client, admin_user)
+            response = client.get('/demographic-clustering?county=Forsyth')
+        assert response.status_code == 200
+        assert b'Forsyth County' in response.data
+        assert b'Highest income' in response.data
+
+    def test_county_without_summary(self, app, admin_user, summary_artifact):
+        with app.test_client() as client:
+            self.login(client, admin_user)
+            response = client.get('/demographic-clustering?county=Durham')
+        assert response.status_code == 200
+        assert b'No census tract clustering summary' in response.data
+
+    def test_admin_precinct_distribution_follows_county(self, app, admin_user, summary_artifact, tmp_path,
+                                                         monkeypatch):
+        path = tmp_path / 'precinct_clustering_results.csv'
+        path.write_text('precinct,county,comprehensive_cluster,flippability_score,dem_pct\n'
+                        '012,FORSYTH,1,0.5,48.0\n'
+                        '074,FORSYTH,1,0.7,51.0\n'
+                        '001,WAKE,2,0.2,40.0\n')
+        monkeypatch.setattr(clustering_service, 'precinct_clustering_dataset',
+                            ClusteringDataset(str(path), county_column='county'))
+        monkeypatch.setattr(clustering_service, 'PARQUET_AVAILABLE', False)
+        captured = []
+
+        def record(sender, template, context, **extra):
+            captured.append(context['precinct_distribution'])
+
+        template_rendered.connect(record, app)
+        try:
+            with app.test_client() as client:
+                self.login(client, admin_user)
+                client.get('/demographic-clustering?county=Forsyth')
+                client.get('/demographic-clustering?county=Wake')
+        finally:
+            template_rendered.disconnect(record, app)
+
+        assert [{cluster: data['count'] for cluster, data in distribution.items()} for distribution in captured] == \
+            [{1: 2}, {2: 1}]
+
+    def test_summary_without_ranges(self, app, admin_user, tmp_path, summaries, monkeypatch):
+        for summary in summaries.values():
+            del summary['overview']['population_range']
+            del summary['overview']['income_range']
+        path = tmp_path / 'summary.json'
+        write_summary_artifact(summaries, str(path))
+        monkeypatch.setattr(clustering_service, 'census_clustering_summary', ClusteringSummary(str(path)))
+
+        with app.test_client() as client:
+            self.login(client, admin_user)
+            response = client.get('/demographic-clustering?county=Forsyth')
+        assert response.status_code == 200
+        assert b'Forsyth County' in response.data
@@ -0,0 +1,142 @@
+"""
+Tests for the shared clustering dataset cache.
+
+Tests cover:
+- Loading once and reusing the frame while the file is unchanged
+- Reloading when the file changes
+- Per-county pre-split slices
+- Missing files
+- Parquet sidecars matched to the exact CSV version, with CSV fallback
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from services import clustering_service
+from services.clustering_service import ClusteringDataset
+
+
+def write_results(path, rows, mtime):
+    """Write a small clustering results CSV with a pinned mtime."""
+    pd.DataFrame(rows, columns=['precinct', 'county', 'comprehensive_cluster']).to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def results_csv(tmp_path, monkeypatch):
+    """Clustering CSV in a temp dir (Parquet sidecars disabled for determinism)."""
+    monkeypatch.setattr(clustering_service, 'PARQUET_AVAILABLE', False)
+    path = tmp_path / 'precinct_clustering_results.csv'
+    write_results(path, [(12, 'FORSYTH', 1), (74, 'FORSYTH', 3), (1, 'WAKE', 2)], mtime=1000)
+    return path
+
+
+class TestClusteringDataset:
+    """Test ClusteringDataset caching and county slicing."""
+
+    def test_reuses_loaded_frame(self, results_csv, monkeypatch):
+        """Test that the CSV is parsed once while unchanged."""
+        dataset = ClusteringDataset(str(results_csv), county_column='county')
+        reads = []
+        original_read_csv = pd.read_csv
+        monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: reads.append(args) or original_read_csv(*args, **kwargs))
+
+        first = dataset.get()
+        assert dataset.get() is first
+        assert len(first) == 3
+        assert len(reads) == 1
+
+    def test_county_slices(self, results_csv):
+        """Test per-county slices and empty results for unknown counties."""
+        dataset = ClusteringDataset(str(results_csv), county_column='county')
+
+        forsyth = dataset.get('FORSYTH')
+        assert sorted(forsyth['precinct']) == [12, 74]
+        assert dataset.get('FORSYTH') is forsyth
+
+        unknown = dataset.get('DURHAM')
+        assert unknown.empty
+        assert list(unknown.columns) == list(forsyth.columns)
+
+    def test_reloads_when_file_changes(self, results_csv):
+        """Test that a new mtime reloads the data and changes the version."""
+        dataset = ClusteringDataset(str(results_csv), county_column='county')
+        old_version = dataset.version
+        assert len(dataset.get('WAKE')) == 1
+
+        write_results(results_csv, [(1, 'WAKE', 2), (2, 'WAKE', 4)], mtime=2000)
+        assert dataset.version != old_version
+        assert len(dataset.get('WAKE')) == 2
+        assert dataset.get('FORSYTH').empty
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing results file raises FileNotFoundError."""
+        dataset = ClusteringDataset(str(tmp_path / 'missing.csv'))
+        with pytest.raises(FileNotFoundError):
+            dataset.get()
+
+    def test_csv_bytes_cached_per_version(self, results_csv):
+        """Test that encoded CSV is reused until the dataset changes."""
+        dataset = ClusteringDataset(str(results_csv), county_column='county')
+
+        forsyth_csv = dataset.csv_bytes('FORSYTH')
+        assert forsyth_csv.decode('utf-8').splitlines()[0] == 'precinct,county,comprehensive_cluster'
+        assert len(forsyth_csv.decode('utf-8').splitlines()) == 3
+        assert dataset.csv_bytes('FORSYTH') is forsyth_csv
+
+        write_results(results_csv, [(12, 'FORSYTH', 5)], mtime=2000)
+        assert dataset.csv_bytes('FORSYTH') != forsyth_csv
+
+
+class TestParquetSidecar:
+    """Test the Parquet sidecar written next to the CSV."""
+
+    @pytest.fixture
+    def sidecar_csv(self, tmp_path, monkeypatch):
+        pytest.importorskip('pyarrow')
+        monkeypatch.setattr(clustering_service, 'PARQUET_AVAILABLE', True)
+        path = tmp_path / 'precinct_clustering_results.csv'
+        write_results(path, [(12, 'FORSYTH', 1), (1, 'WAKE', 2)], mtime=2000)
+        return path
+
+    def test_sidecar_reused_for_same_csv(self, sidecar_csv, monkeypatch):
+        """Test that a new process loads the sidecar instead of parsing the CSV."""
+        ClusteringDataset(str(sidecar_csv)).get()
+        assert os.path.exists(str(sidecar_csv.with_suffix('.parquet')))
+        assert not [name for name in os.listdir(sidecar_csv.parent) if name.endswith('.tmp')]
+
+        monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: pytest.fail('CSV parsed again'))
+        assert len(ClusteringDataset(str(sidecar_csv)).get()) == 2
+
+    def test_older_csv_copy_ignores_sidecar(self, sidecar_csv):
+        """Test that a CSV restored with an older mtime is not shadowed by the sidecar."""
+        ClusteringDataset(str(sidecar_csv)).get()
+        write_results(sidecar_csv, [(1, 'WAKE', 2), (2, 'WAKE', 4), (3, 'WAKE', 1)], mtime=1000)
+
+        assert len(ClusteringDataset(str(sidecar_csv)).get()) == 3
+
+    def test_corrupt_sidecar_falls_back_to_csv(self, sidecar_csv):
+        """Test that a truncated sidecar is ignored and rewritten."""
+        sidecar_csv.with_suffix('.parquet').write_bytes(b'PAR1 truncated')
+
+        assert len(ClusteringDataset(str(sidecar_csv)).get()) == 2
+        assert len(ClusteringDataset(str(sidecar_csv)).get()) == 2
+
+
+class TestClusteringCsvDownload:
+    """Test the streamed /precinct_clustering_results.csv download."""
+
+    def test_download_streams_csv(self, admin_client):
+        """Test that the download is a streamed CSV attachment."""
+        if not os.path.exists('precinct_clustering_results.csv'):
+            pytest.skip('Clustering results not available')
+
+        response = admin_client.get('/precinct_clustering_results.csv')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        assert response.data.startswith(b'precinct,county')
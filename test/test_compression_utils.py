@@ -0,0 +1,43 @@
+"""
+Tests for the HTTP compression helpers.
+"""
+
+import pytest
+from werkzeug.http import parse_accept_header
+
+from compression_utils import (
+    accepts_encoding,
+    available_encodings,
+    compress,
+    decompress,
+    preferred_encoding,
+)
+
+
+class TestCompressionUtils:
+    """Test compress/decompress round trips and Accept-Encoding checks."""
+
+    @pytest.mark.parametrize('encoding', available_encodings())
+    def test_round_trip(self, encoding):
+        """Test that every available encoding round-trips UTF-8 text."""
+        html = '<html><body>🎯 Precinct 074</body></html>' * 50
+        data = compress(html, encoding)
+        assert len(data) < len(html.encode('utf-8'))
+        assert decompress(data, encoding).decode('utf-8') == html
+
+    def test_gzip_always_available(self):
+        """Test that gzip is available without optional packages."""
+        assert 'gzip' in available_encodings()
+        assert preferred_encoding() == available_encodings()[0]
+
+    def test_unsupported_encoding(self):
+        """Test that unknown encodings raise ValueError."""
+        with pytest.raises(ValueError):
+            compress('data', 'deflate')
+
+    def test_accepts_encoding(self):
+        """Test Accept-Encoding matching including q=0 exclusions."""
+        accept = parse_accept_header('gzip, deflate, br;q=0')
+        assert accepts_encoding(accept, 'gzip')
+        assert not accepts_encoding(accept, 'br')
+        assert not accepts_encoding(accept, None)
@@ -0,0 +1,141 @@
+"""
+Tests for the data-version registry.
+
+Tests cover:
+- Version bumps inside the writer's transaction
+- Registry polling and change callbacks
+- Clustering caches invalidated by the app on a version bump
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from data_versions import (
+    CLUSTERING,
+    FLIPPABLE,
+    MAPS,
+    bump_data_version,
+    get_data_versions,
+)
+from models import db
+from services.data_version_registry import DataVersionRegistry, data_version_registry
+
+
+@pytest.fixture
+def engine():
+    """In-memory database without a data_versions table."""
+    return create_engine('sqlite:///:memory:')
+
+
+@pytest.fixture
+def registry(engine):
+    """Registry that polls on every check."""
+    registry = DataVersionRegistry(poll_interval=0)
+    registry.init_engine(engine)
+    return registry
+
+
+class TestBumpDataVersion:
+    """Test the writer side."""
+
+    def test_bump_creates_and_increments(self, engine):
+        with engine.begin() as conn:
+            assert bump_data_version(conn, FLIPPABLE) == 1
+            assert bump_data_version(conn, FLIPPABLE) == 2
+            assert bump_data_version(conn, MAPS) == 1
+            assert get_data_versions(conn) == {FLIPPABLE: 2, MAPS: 1}
+
+    def test_bump_rolls_back_with_writer(self, engine):
+        """Test that a failed writer leaves the version unchanged."""
+        with engine.begin() as conn:
+            bump_data_version(conn, FLIPPABLE)
+
+        with pytest.raises(RuntimeError):
+            with engine.begin() as conn:
+                bump_data_version(conn, FLIPPABLE)
+                raise RuntimeError('load failed')
+
+        with engine.connect() as conn:
+            assert get_data_versions(conn) == {FLIPPABLE: 1}
+
+    def test_unknown_dataset(self, engine):
+        with engine.begin() as conn:
+            with pytest.raises(ValueError):
+                bump_data_version(conn, 'voters')
+
+
+class TestDataVersionRegistry:
+    """Test the reader side."""
+
+    def test_missing_table(self, registry):
+        """Test that reads before any writer has run are harmless."""
+        assert registry.check() == []
+        assert registry.version(FLIPPABLE) == 0
+
+    def test_callbacks_fire_on_change(self, engine, registry):
+        calls = []
+        registry.on_change(MAPS, lambda dataset, version: calls.append((dataset, version)))
+
+        with engine.begin() as conn:
+            bump_data_version(conn, MAPS)
+        # The first read only records the current versions
+        assert registry.check() == []
+        assert registry.version(MAPS) == 1
+
+        with engine.begin() as conn:
+            bump_data_version(conn, MAPS)
+            bump_data_version(conn, FLIPPABLE)
+        assert sorted(registry.check()) == [FLIPPABLE, MAPS]
+        assert calls == [(MAPS, 2)]
+
+        # Unchanged versions don't fire again
+        assert registry.check() == []
+        assert calls == [(MAPS, 2)]
+
+    def test_poll_interval(self, engine, registry):
+        registry.poll_interval = 3600
+        registry.check(force=True)
+        with engine.begin() as conn:
+            bump_data_version(conn, MAPS)
+        assert registry.check() == []
+        assert registry.check(force=True) == [MAPS]
+
+    def test_failing_callback_does_not_block_others(self, engine, registry):
+        calls = []
+
+        def broken(dataset, version):
+            raise RuntimeError('broken cache')
+
+        registry.on_change(MAPS, broken)
+        registry.on_change(MAPS, lambda dataset, version: calls.append(version))
+        registry.check()
+        with engine.begin() as conn:
+            bump_data_version(conn, MAPS)
+        assert registry.check() == [MAPS]
+        assert calls == [1]
+
+
+class TestAppInvalidation:
+    """Test the caches registered by create_app."""
+
+    def test_clustering_bump_invalidates_datasets(self, app, monkeypatch):
+        from services import clustering_service
+
+        invalidated = []
+        monkeypatch.setattr(clustering_service.precinct_clustering_dataset, 'invalidate',
+                            lambda: invalidated.append('precinct'))
+        monkeypatch.setattr(clustering_service.census_clustering_dataset, 'invalidate',
+                            lambda: invalidated.append('census'))
+
+        with app.app_context():
+            # Other tests may have created apps with their own engines
+            data_version_registry.init_engine(db.engine)
+            data_version_registry.check(force=True)
+            with db.engine.begin() as conn:
+                bump_data_version(conn, CLUSTERING)
+            assert CLUSTERING in data_version_registry.check(force=True)
+            with db.engine.begin() as conn:
+                conn.execute(text('DELETE FROM data_versions'))
+            data_version_registry.check(force=True)
+
+        assert set(invalidated) == {'precinct', 'census'}
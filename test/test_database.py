@@ -13,6 +13,7 @@ Tests cover:
 import pytest
 from datetime import datetime
 from models import db, User, Map
+from sqlalchemy.exc import IntegrityError
 
 
 class TestUserModel:
@@ -272,8 +273,21 @@ class TestMapModel:
                 assert 'filename' in map_info
                 assert 'display_name' in map_info
                 assert 'precinct' in map_info
-                assert 'map_content' in map_info
+                assert 'has_content' in map_info
                 assert map_info['filename'].endswith('.html')
+                assert map_info['has_content'] is True
+                assert map_info['size'] > 0
+    
+    def test_map_listing_skips_html(self, app, db_session, multiple_maps, count_queries):
+        """Test that the county listing never selects the map HTML columns."""
+        with app.app_context():
+            with count_queries() as statements:
+                filenames = Map.get_map_filenames_for_county('Wake')
+            
+            assert len(filenames) == len(multiple_maps)
+            assert len(statements) == 1
+            assert 'maps.map ' not in statements[0] and 'maps.map,' not in statements[0]
+            assert 'map_compressed' not in statements[0]
 
 
 class TestDatabaseRelationships:
@@ -449,4 +463,43 @@ class TestDataValidation:
             db_session.add(user)
             db_session.commit()
             
-            assert user.precinct == '012'
\ No newline at end of file
+            assert user.precinct == '012'
+
+class TestMapPrecinctKey:
+    """Test the canonical precinct_key used for map lookups."""
+    
+    def test_precinct_key_maintained(self, app, db_session):
+        """Test that precinct_key follows precinct on insert and update."""
+        with app.app_context():
+            map_record = Map(state='NC', county='Wake', precinct='74', map='<html></html>')
+            db.session.add(map_record)
+            db.session.commit()
+            assert map_record.precinct_key == '074'
+            
+            map_record.precinct = '5'
+            db.session.commit()
+            assert map_record.precinct_key == '005'
+    
+    def test_unpadded_map_found_in_one_query(self, app, db_session, count_queries):
+        """Test that padded and unpadded lookups resolve with a single query."""
+        with app.app_context():
+            db.session.add(Map(state='NC', county='Wake', precinct='74', map='<html></html>'))
+            db.session.commit()
+            
+            with count_queries() as statements:
+                found = Map.get_map_by_location('NC', 'Wake', '074')
+            
+            assert found is not None
+            assert found.precinct == '74'
+            assert len(statements) == 1
+    
+    def test_duplicate_location_rejected(self, app, db_session):
+        """Test that the unique index rejects a second map for the same location."""
+        with app.app_context():
+            db.session.add(Map(state='NC', county='Wake', precinct='074'))
+            db.session.commit()
+            
+            db.session.add(Map(state='NC', county='Wake', precinct='74'))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
@@ -0,0 +1,160 @@
+"""
+Tests for the documentation catalog and search index.
+
+Tests cover:
+- Listing cached on the directory mtime, with periodic re-stat for in-place edits
+- Incremental index sync
+- Ranked search with highlighted, escaped snippets
+- Public visibility
+- In-place updates for edit, rename and delete
+"""
+
+import os
+
+import pytest
+
+from services.doc_catalog import DocCatalog
+
+
+def write_doc(doc_dir, filename, content):
+    (doc_dir / filename).write_text(content, encoding='utf-8')
+
+
+@pytest.fixture
+def doc_dir(tmp_path):
+    doc_dir = tmp_path / 'doc'
+    doc_dir.mkdir()
+    write_doc(doc_dir, 'VOTER_TURNOUT.md', '# Turnout\n\nCanvassing raises turnout in flippable precincts.')
+    write_doc(doc_dir, 'CANVASSING_GUIDE.md', '# Canvassing\n\nKnock on doors. Canvassing works best on weekends.')
+    write_doc(doc_dir, '_INTERNAL_PLAN.md', 'Private canvassing budget.')
+    write_doc(doc_dir, 'notes.csv', 'canvassing,1')
+    return doc_dir
+
+
+@pytest.fixture
+def catalog(doc_dir, tmp_path):
+    return DocCatalog(str(doc_dir), str(tmp_path / 'doc_search.db'))
+
+
+class TestCatalogListing:
+    """Test the cached file listing."""
+
+    def test_entries(self, catalog):
+        assert [e['filename'] for e in catalog.entries()] == \
+            ['CANVASSING_GUIDE.md', 'VOTER_TURNOUT.md', '_INTERNAL_PLAN.md']
+        assert [e['filename'] for e in catalog.entries(public_only=True)] == \
+            ['CANVASSING_GUIDE.md', 'VOTER_TURNOUT.md']
+        assert catalog.get('VOTER_TURNOUT.md')['display_name'] == 'Voter Turnout'
+
+    def test_listing_cached_on_directory_mtime(self, catalog, doc_dir, monkeypatch):
+        catalog.entries()
+        listed = []
+        original_listdir = os.listdir
+        monkeypatch.setattr(os, 'listdir', lambda path: listed.append(path) or original_listdir(path))
+
+        catalog.entries()
+        assert listed == []
+
+        write_doc(doc_dir, 'NEW_DOC.md', 'New')
+        os.utime(doc_dir, ns=(0, os.stat(doc_dir).st_mtime_ns + 1_000_000))
+        assert 'NEW_DOC.md' in [e['filename'] for e in catalog.entries()]
+        assert len(listed) == 1
+
+    def test_in_place_edit_picked_up_after_restat_interval(self, doc_dir, tmp_path):
+        catalog = DocCatalog(str(doc_dir), str(tmp_path / 'doc_search.db'), restat_interval=0)
+        catalog.search('canvassing')
+        dir_mtime = os.stat(doc_dir).st_mtime_ns
+
+        write_doc(doc_dir, 'VOTER_TURNOUT.md', 'Rewritten in place about absentee ballots')
+        assert os.stat(doc_dir).st_mtime_ns == dir_mtime
+        assert catalog.get('VOTER_TURNOUT.md')['size'] == len('Rewritten in place about absentee ballots')
+        assert [r['filename'] for r in catalog.search('absentee')] == ['VOTER_TURNOUT.md']
+
+
+class TestSearch:
+    """Test the FTS index and search results."""
+
+    def test_ranked_results(self, catalog):
+        results = catalog.search('canvassing')
+        # Title matches rank first; private docs are excluded
+        assert [r['filename'] for r in results] == ['CANVASSING_GUIDE.md', 'VOTER_TURNOUT.md']
+        assert '<mark>' in results[0]['snippet']
+
+    def test_private_docs_for_admin_search(self, catalog):
+        results = catalog.search('budget', public_only=False)
+        assert [r['filename'] for r in results] == ['_INTERNAL_PLAN.md']
+        assert catalog.search('budget') == []
+
+    def test_prefix_and_stemming(self, catalog):
+        assert [r['filename'] for r in catalog.search('weekend')] == ['CANVASSING_GUIDE.md']
+        assert [r['filename'] for r in catalog.search('flipp')] == ['VOTER_TURNOUT.md']
+
+    def test_query_syntax_is_ignored(self, catalog):
+        """Test that FTS operators in user input don't raise."""
+        assert catalog.search('"canvassing (') != []
+        assert catalog.search('***') == []
+        assert catalog.search('') == []
+
+    def test_snippet_is_escaped(self, catalog, doc_dir):
+        write_doc(doc_dir, 'XSS.md', '<script>alert(1)</script> canvassing')
+        catalog.refresh_file('XSS.md')
+        snippet = [r for r in catalog.search('alert') if r['filename'] == 'XSS.md'][0]['snippet']
+        assert '<script>' not in snippet
+        assert '&lt;script&gt;' in snippet
+
+    def test_sync_only_reindexes_changed_files(self, catalog, doc_dir):
+        assert catalog.sync_index() == 3
+        assert catalog.sync_index() == 0
+
+        # A new catalog in another process sees the existing index
+        other = DocCatalog(catalog.doc_dir, catalog.index_path, restat_interval=0)
+        assert other.sync_index() == 0
+
+        # Edited in place: the directory mtime doesn't change
+        write_doc(doc_dir, 'VOTER_TURNOUT.md', 'Rewritten about absentee ballots and more text')
+        assert other.sync_index() == 1
+        assert other.sync_index() == 0
+        assert [r['filename'] for r in other.search('absentee')] == ['VOTER_TURNOUT.md']
+
+
+class TestInPlaceUpdates:
+    """Test the admin edit, rename and delete hooks."""
+
+    def test_edit(self, catalog, doc_dir):
+        catalog.search('canvassing')
+        write_doc(doc_dir, 'CANVASSING_GUIDE.md', 'Phone banking only')
+        catalog.refresh_file('CANVASSING_GUIDE.md')
+        assert [r['filename'] for r in catalog.search('phone')] == ['CANVASSING_GUIDE.md']
+        assert catalog.get('CANVASSING_GUIDE.md')['size'] == len('Phone banking only')
+
+    def test_rename(self, catalog, doc_dir):
+        catalog.search('canvassing')
+        os.rename(doc_dir / 'CANVASSING_GUIDE.md', doc_dir / '_CANVASSING_GUIDE.md')
+        catalog.rename_file('CANVASSING_GUIDE.md', '_CANVASSING_GUIDE.md')
+        assert [r['filename'] for r in catalog.search('weekends')] == []
+        assert [r['filename'] for r in catalog.search('weekends', public_only=False)] == ['_CANVASSING_GUIDE.md']
+
+    def test_delete(self, catalog, doc_dir):
+        catalog.search('canvassing')
+        os.remove(doc_dir / 'VOTER_TURNOUT.md')
+        catalog.remove_file('VOTER_TURNOUT.md')
+        assert catalog.get('VOTER_TURNOUT.md') is None
+        assert catalog.search('turnout') == []
+
+
+class TestSearchEndpoint:
+    """Test /documentation/search."""
+
+    def test_returns_public_results(self, client):
+        response = client.get('/documentation/search?q=security')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['query'] == 'security'
+        for result in data['results']:
+            assert result['filename'][0].isupper()
+            assert result['url'] == f"/documentation/{result['filename']}"
+
+    def test_empty_query(self, client):
+        response = client.get('/documentation/search')
+        assert response.status_code == 200
+        assert response.get_json()['results'] == []
@@ -0,0 +1,71 @@
+"""
+Tests for the rendered-Markdown document cache.
+
+Tests cover:
+- Rendering and reuse of cached HTML
+- Re-rendering when the file changes on disk
+- Missing and empty files
+- Explicit invalidation
+"""
+
+import os
+
+from services.document_cache import DocumentCache
+
+EXTENSIONS = ('extra', 'nl2br', 'sane_lists')
+
+
+def write_markdown(path, content, mtime=None):
+    """Write a Markdown file and optionally pin its mtime."""
+    path.write_text(content, encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestDocumentCache:
+    """Test DocumentCache rendering and invalidation."""
+
+    def test_render_and_reuse(self, tmp_path):
+        """Test that a rendered document is served from the cache while unchanged."""
+        doc = tmp_path / 'motd.md'
+        write_markdown(doc, '# Hello', mtime=1000)
+        cache = DocumentCache()
+
+        html = cache.render(str(doc), EXTENSIONS)
+        assert '<h1>Hello</h1>' in html
+        assert cache.render(str(doc), EXTENSIONS) is html
+
+    def test_rerender_when_file_changes(self, tmp_path):
+        """Test that a changed mtime re-renders the document."""
+        doc = tmp_path / 'motd.md'
+        write_markdown(doc, '# Old', mtime=1000)
+        cache = DocumentCache()
+        assert 'Old' in cache.render(str(doc), EXTENSIONS)
+
+        write_markdown(doc, '# New', mtime=2000)
+        html = cache.render(str(doc), EXTENSIONS)
+        assert 'New' in html
+        assert 'Old' not in html
+
+    def test_missing_and_empty_files(self, tmp_path):
+        """Test that missing files render as None and whitespace-only files as ''."""
+        cache = DocumentCache()
+        assert cache.render(str(tmp_path / 'missing.md'), EXTENSIONS) is None
+
+        empty = tmp_path / 'empty.md'
+        write_markdown(empty, '   \n')
+        assert cache.render(str(empty), EXTENSIONS) == ''
+
+    def test_explicit_invalidate(self, tmp_path):
+        """Test that invalidate() forces a re-render even with an unchanged mtime."""
+        doc = tmp_path / 'motd.md'
+        write_markdown(doc, '# One', mtime=1000)
+        cache = DocumentCache()
+        cache.render(str(doc), EXTENSIONS)
+
+        # Same size and mtime, so only explicit invalidation notices the change
+        write_markdown(doc, '# Two', mtime=1000)
+        assert 'One' in cache.render(str(doc), EXTENSIONS)
+
+        cache.invalidate(str(doc))
+        assert 'Two' in cache.render(str(doc), EXTENSIONS)
@@ -0,0 +1,197 @@
+"""
+Tests for the persisted flippable assessment columns.
+
+Tests cover:
+- Adding the metric columns and indexes to an existing flippable table
+- SQL classification matching the original per-row Python rules
+- County-scoped refresh
+- Rollup aggregates used by /flippable-analysis, with and without GROUPING SETS
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from flippable_utils import (
+    ensure_flippable_metric_columns,
+    refresh_flippable_metrics,
+    empty_assessment_counts,
+    flippable_rollup_query,
+    flippable_rollup_summary,
+    FLIPPABLE_ROLLUP_COLUMNS,
+    FLIPPABLE_ROLLUP_PARAMS,
+    SLAM_DUNK,
+    HIGHLY_FLIPPABLE,
+    COMPETITIVE,
+    STRETCH_GOAL,
+)
+
+
+def classify_in_python(dem_votes, oppo_votes, gov_votes, dva_pct_needed):
+    """Reference implementation of the rules the views used to run per row."""
+    vote_gap = (oppo_votes + 1) - dem_votes
+    dem_absenteeism = gov_votes - dem_votes if gov_votes > dem_votes else 0
+
+    if vote_gap <= 25 or (dem_absenteeism > 0 and dva_pct_needed <= 15):
+        assessment = SLAM_DUNK
+    elif vote_gap <= 100 or (dem_absenteeism > 0 and dva_pct_needed <= 35):
+        assessment = HIGHLY_FLIPPABLE
+    elif vote_gap <= 300 or (dem_absenteeism > 0 and dva_pct_needed <= 60):
+        assessment = COMPETITIVE
+    else:
+        assessment = STRETCH_GOAL
+
+    if vote_gap <= 100 and dem_absenteeism > 0 and dva_pct_needed <= 50:
+        best_pathway = "DVA" if dva_pct_needed < (vote_gap / max(oppo_votes, 1) * 100) else "Traditional"
+    else:
+        best_pathway = "Traditional"
+
+    return vote_gap, dem_absenteeism, assessment, best_pathway
+
+
+RACES = [
+    # county, precinct, dem, oppo, gov, dva
+    ('FORSYTH', '074', 1000, 1010, 1200, 5.5),
+    ('FORSYTH', '074', 1000, 1080, 1000, 999.9),
+    ('FORSYTH', '012', 800, 900, 1100, 33.7),
+    ('FORSYTH', '012', 500, 1500, 1000, 200.2),
+    ('FORSYTH', '013', 500, 700, 560, 55.0),
+    ('WAKE', '001', 100, 180, 600, 16.2),
+    ('WAKE', '002', 1000, 1400, 1100, 401.0),
+]
+
+
+@pytest.fixture
+def flippable_engine():
+    """In-memory database with a legacy flippable table (no metric columns)."""
+    engine = create_engine('sqlite:///:memory:')
+    with engine.begin() as conn:
+        conn.execute(text('''
+            CREATE TABLE flippable (
+                id INTEGER PRIMARY KEY,
+                county VARCHAR(100), precinct VARCHAR(100),
+                contest_name VARCHAR(200), election_date DATE,
+                dem_votes INTEGER, oppo_votes INTEGER, gov_votes INTEGER,
+                dem_margin INTEGER, dva_pct_needed FLOAT
+            )
+        '''))
+        for county, precinct, dem, oppo, gov, dva in RACES:
+            conn.execute(text('''
+                INSERT INTO flippable (county, precinct, contest_name, election_date,
+                                       dem_votes, oppo_votes, gov_votes, dem_margin, dva_pct_needed)
+                VALUES (:county, :precinct, 'TEST CONTEST', '2024-11-05',
+                        :dem, :oppo, :gov, :margin, :dva)
+            '''), {'county': county, 'precinct': precinct, 'dem': dem, 'oppo': oppo,
+                   'gov': gov, 'margin': dem - oppo, 'dva': dva})
+    return engine
+
+
+class TestFlippableMetricColumns:
+    """Test schema changes for the persisted assessment columns."""
+
+    def test_columns_and_indexes_added(self, flippable_engine):
+        """Test that the metric columns and indexes are created once."""
+        with flippable_engine.begin() as conn:
+            assert ensure_flippable_metric_columns(conn) is True
+            # Second call is a no-op
+            assert ensure_flippable_metric_columns(conn) is False
+
+        inspector = inspect(flippable_engine)
+        columns = {col['name'] for col in inspector.get_columns('flippable')}
+        assert {'vote_gap', 'dem_absenteeism', 'assessment', 'best_pathway'} <= columns
+
+        indexes = {ix['name'] for ix in inspector.get_indexes('flippable')}
+        assert 'ix_flippable_assessment' in indexes
+        assert 'ix_flippable_county_assessment' in indexes
+
+
+class TestFlippableMetricRefresh:
+    """Test SQL classification against the original Python rules."""
+
+    def test_sql_matches_python_rules(self, flippable_engine):
+        """Test that every persisted metric matches the per-row Python rules."""
+        with flippable_engine.begin() as conn:
+            ensure_flippable_metric_columns(conn)
+            assert refresh_flippable_metrics(conn) == len(RACES)
+
+            rows = conn.execute(text('''
+                SELECT dem_votes, oppo_votes, gov_votes, dva_pct_needed,
+                       vote_gap, dem_absenteeism, assessment, best_pathway
+                FROM flippable ORDER BY id
+            ''')).fetchall()
+
+        for row in rows:
+            expected = classify_in_python(row[0], row[1], row[2], row[3])
+            assert tuple(row[4:]) == expected
+
+    def test_county_scoped_refresh(self, flippable_engine):
+        """Test that a county refresh leaves other counties untouched."""
+        with flippable_engine.begin() as conn:
+            ensure_flippable_metric_columns(conn)
+            assert refresh_flippable_metrics(conn, county='wake') == 2
+
+            unclassified = conn.execute(text(
+                "SELECT COUNT(*) FROM flippable WHERE assessment IS NULL"
+            )).scalar()
+        assert unclassified == len(RACES) - 2
+
+    def test_assessment_counts_in_sql(self, flippable_engine):
+        """Test that SQL counts cover every category in display order."""
+        with flippable_engine.begin() as conn:
+            ensure_flippable_metric_columns(conn)
+            refresh_flippable_metrics(conn)
+            counts = empty_assessment_counts()
+            for assessment, count in conn.execute(text(
+                "SELECT assessment, COUNT(*) FROM flippable GROUP BY assessment"
+            )):
+                counts[assessment] = count
+
+        assert list(counts) == [SLAM_DUNK, HIGHLY_FLIPPABLE, COMPETITIVE, STRETCH_GOAL]
+        assert sum(counts.values()) == len(RACES)
+
+
+class TestFlippableRollups:
+    """Test the shared rollup aggregate columns."""
+
+    def test_precinct_rollup_summary(self, flippable_engine):
+        """Test that rollup rows convert to the summary dicts the template reads."""
+        with flippable_engine.begin() as conn:
+            ensure_flippable_metric_columns(conn)
+            refresh_flippable_metrics(conn)
+            rows = conn.execute(text(f'''
+                SELECT county, precinct, {FLIPPABLE_ROLLUP_COLUMNS}
+                FROM flippable
+                GROUP BY county, precinct
+                ORDER BY county, precinct
+            '''), FLIPPABLE_ROLLUP_PARAMS).fetchall()
+
+        summaries = {(row.county, row.precinct): flippable_rollup_summary(row) for row in rows}
+        assert len(summaries) == 5
+
+        precinct_74 = summaries[('FORSYTH', '074')]
+        assert precinct_74['total_races'] == 2
+        assert precinct_74['total_vote_gap'] == (1010 + 1 - 1000) + (1080 + 1 - 1000)
+        # 999.9 (no absenteeism) is excluded from the DVA average
+        assert precinct_74['dva_count'] == 1
+        assert precinct_74['avg_dva'] == 5.5
+        assert sum(precinct_74[c] for c in empty_assessment_counts()) == 2
+
+    def test_rollup_query_without_grouping_sets(self, flippable_engine):
+        """Test the UNION ALL rollup used where GROUPING SETS isn't available."""
+        with flippable_engine.begin() as conn:
+            ensure_flippable_metric_columns(conn)
+            refresh_flippable_metrics(conn)
+            rows = conn.execute(text(flippable_rollup_query('', conn.dialect.name)),
+                                FLIPPABLE_ROLLUP_PARAMS).fetchall()
+            forsyth_rows = conn.execute(
+                text(flippable_rollup_query('WHERE UPPER(county) = UPPER(:county)', conn.dialect.name)),
+                dict(FLIPPABLE_ROLLUP_PARAMS, county='forsyth')).fetchall()
+
+        precincts = [row for row in rows if not row.is_county]
+        counties = {row.county: row for row in rows if row.is_county and not row.is_total}
+        totals = [row for row in rows if row.is_total]
+        assert len(precincts) == 5
+        assert counties['FORSYTH'].total_races == 5 and counties['WAKE'].total_races == 2
+        assert len(totals) == 1 and totals[0].total_races == len(RACES)
+
+        assert {row.county for row in forsyth_rows if not row.is_total} == {'FORSYTH'}
+        assert [row.total_races for row in forsyth_rows if row.is_total] == [5]
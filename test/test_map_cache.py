@@ -0,0 +1,58 @@
+"""
+Tests for the byte-budgeted map content cache.
+
+Tests cover:
+- Cache hits and misses
+- Least-recently-used eviction by total size
+- Oversized entries
+"""
+
+from services.map_cache import MapContentCache
+
+
+class TestMapContentCache:
+    """Test MapContentCache LRU behavior."""
+
+    def test_get_and_put(self):
+        """Test that cached content is returned and size is tracked."""
+        cache = MapContentCache(max_bytes=100)
+        assert cache.get('a') is None
+
+        cache.put('a', 'x' * 10)
+        assert cache.get('a') == 'x' * 10
+        assert cache.total_bytes == 10
+
+        # Replacing an entry doesn't double count it
+        cache.put('a', 'y' * 20)
+        assert cache.total_bytes == 20
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test that the byte budget evicts the least recently used entries first."""
+        cache = MapContentCache(max_bytes=30)
+        cache.put('a', 'a' * 10)
+        cache.put('b', 'b' * 10)
+        cache.put('c', 'c' * 10)
+
+        # Touch 'a' so 'b' becomes the oldest entry
+        cache.get('a')
+        cache.put('d', 'd' * 10)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('d') is not None
+        assert cache.total_bytes == 30
+
+    def test_size_counts_encoded_bytes(self):
+        """Test that non-ASCII content is charged by its UTF-8 size."""
+        cache = MapContentCache(max_bytes=100)
+        cache.put('a', '🎯' * 5)
+        assert cache.total_bytes == 20
+
+    def test_oversized_entry_not_cached(self):
+        """Test that a single entry larger than the budget is skipped."""
+        cache = MapContentCache(max_bytes=10)
+        cache.put('small', 'x' * 5)
+        assert cache.put('big', 'x' * 11) is False
+        assert cache.get('big') is None
+        assert cache.get('small') is not None
@@ -0,0 +1,41 @@
+"""
+Tests for the map view variants (injected close button, zoom controls and listeners).
+"""
+
+from services.map_variants import (
+    MAP_VIEW_INJECTIONS,
+    CLOSE_BUTTON_HTML,
+    MY_MAP_ZOOM_LISTENER_HTML,
+    build_map_variant,
+)
+
+MAP_HTML = '<html><head></head><body><div id="map"></div></body></html>'
+
+
+class TestBuildMapVariant:
+    """Test splicing controls into map HTML."""
+
+    def test_new_tab_after_body_open(self):
+        """Test that new tab controls follow the opening body tag."""
+        html = build_map_variant(MAP_HTML, 'new-tab')
+        assert html.startswith('<html><head></head><body>' + CLOSE_BUTTON_HTML)
+        assert html.endswith('<div id="map"></div></body></html>')
+
+    def test_listener_before_body_close(self):
+        """Test that zoom listeners precede the closing body tag."""
+        html = build_map_variant(MAP_HTML, 'my-map')
+        assert html.endswith(MY_MAP_ZOOM_LISTENER_HTML + '</body></html>')
+
+    def test_matches_previous_replace_behavior(self):
+        """Test that splicing matches the str.replace output for single-body documents."""
+        for variant, (position, injection) in MAP_VIEW_INJECTIONS.items():
+            if position == 'after_body_open':
+                expected = MAP_HTML.replace('<body>', '<body>' + injection)
+            else:
+                expected = MAP_HTML.replace('</body>', injection + '</body>')
+            assert build_map_variant(MAP_HTML, variant) == expected
+
+    def test_document_without_body(self):
+        """Test that fragments get controls prepended or appended."""
+        assert build_map_variant('<div></div>', 'new-tab').endswith('<div></div>')
+        assert build_map_variant('<div></div>', 'user-raw').startswith('<div></div>')
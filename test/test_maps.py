@@ -8,10 +8,26 @@ Tests cover:
 - Zoom control functionality
 - Error handling for missing maps
 - Iframe compatibility
+- Query budgets per map request
+- Compressed map variants cached per encoding
 """
 
+import gzip
+
 import pytest
 
+import main
+from models import db, Map
+from services import response_compression
+from compression_utils import preferred_encoding
+from services.map_variants import MAP_VARIANT_VERSIONS
+
+# Query budgets per request: the Flask-Login user load, the map lookup
+# (metadata columns only) and the deferred HTML load on a map cache miss
+MAP_VIEW_QUERIES = 3
+# The user load and one projection of the county's maps, however many there are
+MAP_LIBRARY_QUERIES = 2
+
 
 def login_user(client, username, password):
     """Helper function to login a user.""" 
@@ -51,7 +67,7 @@ class TestMapAccessControl:
             # With follow_redirects=True, we expect to land on login page (200) or get redirect (302)
             assert response.status_code in [200, 302] and (b'Sign In' in response.data or b'Login' in response.data)
     
-    def test_regular_user_map_access(self, client, regular_user, sample_map):
+    def test_regular_user_map_access(self, client, regular_user, sample_map, query_budget):
         """Test regular user map access permissions."""
         login_user(client, regular_user.username, 'user_password_unique')
         
@@ -60,14 +76,15 @@ class TestMapAccessControl:
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should access raw version of their map
-        response = client.get('/user-map-raw/012.html')
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/user-map-raw/012.html')
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should NOT access different precinct - redirects to profile with flash message
         response = client.get('/user-map/999.html', follow_redirects=True)
         assert response.status_code in [302, 403, 404, 200] and (b'Access denied' in response.data or b'Profile' in response.data)
     
-    def test_admin_map_access(self, client, admin_user, sample_map, multiple_maps):
+    def test_admin_map_access(self, client, admin_user, sample_map, multiple_maps, query_budget):
         """Test admin user map access permissions."""
         login_user(client, admin_user.username, 'admin_password_unique')
         
@@ -76,14 +93,15 @@ class TestMapAccessControl:
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should access map library
-        response = client.get('/static-content')
+        with query_budget(MAP_LIBRARY_QUERIES):
+            response = client.get('/static-content')
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should access any precinct in the library
         response = client.get('/static-content/001.html')
         assert response.status_code in [200, 429]  # Accept rate limiting
     
-    def test_county_user_map_access(self, client, county_user, multiple_maps):
+    def test_county_user_map_access(self, client, county_user, multiple_maps, query_budget):
         """Test county user map access permissions."""
         login_user(client, county_user.username, 'county_password_unique')
         
@@ -92,7 +110,8 @@ class TestMapAccessControl:
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should access maps in their county
-        response = client.get('/static-content/012.html')
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/static-content/012.html')
         assert response.status_code in [200, 429]  # Accept rate limiting
     
     def test_regular_user_denied_map_library(self, client, regular_user):
@@ -106,11 +125,12 @@ class TestMapAccessControl:
 class TestMapContentDelivery:
     """Test map content delivery and rendering."""
     
-    def test_map_content_from_database(self, client, regular_user, sample_map):
+    def test_map_content_from_database(self, client, regular_user, sample_map, query_budget):
         """Test that map content is served from database."""
         login_user(client, regular_user.username, 'user_password_unique')
         
-        response = client.get('/user-map-raw/012.html', follow_redirects=True)
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/user-map-raw/012.html', follow_redirects=True)
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should contain the HTML content from database (if not redirected or rate limited)
@@ -119,17 +139,30 @@ class TestMapContentDelivery:
             assert b'Test Precinct Map 012' in response.data
             assert b'Wake County, Precinct 012' in response.data
     
-    def test_map_with_navbar_wrapper(self, client, regular_user, sample_map):
+    def test_map_with_navbar_wrapper(self, client, regular_user, sample_map, query_budget):
         """Test map display with navbar wrapper."""
         login_user(client, regular_user.username, 'user_password_unique')
         
-        response = client.get('/user-map/012.html', follow_redirects=True)
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/user-map/012.html', follow_redirects=True)
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should use the static_viewer template (if not redirected or rate limited)
         if response.status_code == 200:
             assert b'iframe' in response.data or b'map-container' in response.data
     
+    def test_viewer_pages_skip_map_html(self, client, regular_user, sample_map, count_queries):
+        """Test that the navbar wrappers look the map up without loading its HTML."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        for url in ['/user-map/012.html', '/my-map']:
+            with count_queries() as statements:
+                response = client.get(url)
+            assert response.status_code == 200
+            assert b'iframe' in response.data
+            # Deferred map/map_compressed columns are only selected when the HTML is loaded
+            assert not any('maps_map' in statement for statement in statements), url
+    
     def test_map_error_handling_missing_map(self, client, regular_user):
         """Test error handling when map doesn't exist."""
         login_user(client, regular_user.username, 'user_password_unique')
@@ -155,7 +188,7 @@ class TestMapContentDelivery:
         if response.status_code == 200:
             assert b'window.addEventListener' in response.data
     
-    def test_my_map_functionality(self, client, regular_user, sample_map):
+    def test_my_map_functionality(self, client, regular_user, sample_map, query_budget):
         """Test /my-map endpoint functionality."""
         login_user(client, regular_user.username, 'user_password_unique')
         
@@ -164,7 +197,8 @@ class TestMapContentDelivery:
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Raw version should also work
-        response = client.get('/my-map-raw')
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/my-map-raw')
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         if response.status_code == 200:
             assert b'Test Map - Precinct 012' in response.data
@@ -173,11 +207,12 @@ class TestMapContentDelivery:
 class TestMapViewingModes:
     """Test different map viewing modes."""
     
-    def test_new_tab_view_with_controls(self, client, county_user, sample_map):
+    def test_new_tab_view_with_controls(self, client, county_user, sample_map, query_budget):
         """Test new tab view with close button and zoom controls."""
         login_user(client, county_user.username, 'county_password_unique')
         
-        response = client.get('/view/012.html', follow_redirects=True)
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/view/012.html', follow_redirects=True)
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should include close button and controls (if not redirected or rate limited)
@@ -190,11 +225,12 @@ class TestMapViewingModes:
             assert b'zoomOut()' in response.data
             assert b'resetZoom()' in response.data
     
-    def test_iframe_raw_view(self, client, regular_user, sample_map):
+    def test_iframe_raw_view(self, client, regular_user, sample_map, query_budget):
         """Test raw view for iframe embedding."""
         login_user(client, regular_user.username, 'user_password_unique')
         
-        response = client.get('/user-map-raw/012.html', follow_redirects=True)
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/user-map-raw/012.html', follow_redirects=True)
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should have proper iframe compatibility
@@ -206,11 +242,12 @@ class TestMapViewingModes:
         if response.status_code == 200:
             assert b'window.addEventListener(\'message\'' in response.data
     
-    def test_static_content_viewer(self, client, county_user, sample_map):
+    def test_static_content_viewer(self, client, county_user, sample_map, query_budget):
         """Test static content viewer with navbar."""
         login_user(client, county_user.username, 'county_password_unique')
         
-        response = client.get('/static-content/012.html', follow_redirects=True)
+        with query_budget(MAP_VIEW_QUERIES):
+            response = client.get('/static-content/012.html', follow_redirects=True)
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Should use static_viewer template
@@ -253,11 +290,12 @@ class TestZoomControlFunctionality:
 class TestMapLibraryFunctionality:
     """Test map library browsing functionality."""
     
-    def test_map_library_display(self, client, county_user, multiple_maps):
+    def test_map_library_display(self, client, county_user, multiple_maps, query_budget):
         """Test map library displays available maps."""
         login_user(client, county_user.username, 'county_password_unique')
         
-        response = client.get('/static-content', follow_redirects=True)
+        with query_budget(MAP_LIBRARY_QUERIES):
+            response = client.get('/static-content', follow_redirects=True)
         assert response.status_code in [200, 302, 429]  # Accept rate limiting and redirects
         
         # Should display list of maps (if not redirected or rate limited)
@@ -277,11 +315,12 @@ class TestMapLibraryFunctionality:
         # This depends on the implementation details
         assert response.status_code in [200, 429]  # Accept rate limiting  # Basic check
     
-    def test_map_library_admin_access(self, client, admin_user, multiple_maps):
+    def test_map_library_admin_access(self, client, admin_user, multiple_maps, query_budget):
         """Test admin access to map library."""
         login_user(client, admin_user.username, 'admin_password_unique')
         
-        response = client.get('/static-content', follow_redirects=True)
+        with query_budget(MAP_LIBRARY_QUERIES):
+            response = client.get('/static-content', follow_redirects=True)
         assert response.status_code in [200, 429]  # Accept rate limiting
         
         # Admin should see all maps
@@ -406,4 +445,153 @@ class TestMapResponseHeaders:
         
         # Should have proper content type for HTML
         content_type = response.headers.get('Content-Type', '')
-        assert 'text/html' in content_type or content_type == ''  # Flask default
\ No newline at end of file
+        assert 'text/html' in content_type or content_type == ''  # Flask default
+
+class TestMapConditionalRequests:
+    """Test ETag revalidation on raw map endpoints."""
+    
+    def test_map_etag_from_content_hash(self, client, regular_user, sample_map):
+        """Test that raw map responses carry a strong ETag built from the stored hash."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        assert sample_map.content_hash == Map.compute_content_hash(sample_map.map)
+        
+        response = client.get('/my-map-raw')
+        assert response.status_code == 200
+        etag, weak = response.get_etag()
+        assert not weak
+        assert etag.startswith(sample_map.content_hash)
+        assert 'no-cache' in response.headers.get('Cache-Control', '')
+    
+    def test_map_not_modified(self, client, regular_user, sample_map):
+        """Test that a matching If-None-Match returns 304 with no body."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        for url in ['/my-map-raw', '/user-map-raw/012.html']:
+            etag = client.get(url).headers['ETag']
+            response = client.get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 304
+            assert response.data == b''
+    
+    def test_map_etag_changes_with_content(self, client, app, regular_user, sample_map):
+        """Test that updating a map invalidates the old ETag."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        old_etag = client.get('/my-map-raw').headers['ETag']
+        
+        with app.app_context():
+            map_record = db.session.get(Map, sample_map.id)
+            map_record.map = sample_map.map.replace('Test Precinct Map 012', 'Updated Precinct Map 012')
+            db.session.commit()
+        
+        response = client.get('/my-map-raw', headers={'If-None-Match': old_etag})
+        assert response.status_code == 200
+        assert b'Updated Precinct Map 012' in response.data
+        assert response.headers['ETag'] != old_etag
+    
+    def test_map_etag_changes_with_injected_controls(self, client, regular_user, sample_map, monkeypatch):
+        """Test that a deploy changing the injected controls invalidates the old ETag."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        old_etag = client.get('/my-map-raw').headers['ETag']
+        assert MAP_VARIANT_VERSIONS['my-map'] in old_etag
+        
+        monkeypatch.setitem(MAP_VARIANT_VERSIONS, 'my-map', 'deployed')
+        response = client.get('/my-map-raw', headers={'If-None-Match': old_etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != old_etag
+
+
+@pytest.fixture
+def compressed_map(app, db_session, regular_user):
+    """Create a map stored in the precompressed storage mode."""
+    with app.app_context():
+        map_record = Map(state='NC', county='Wake', precinct='012')
+        map_record.set_content('<html><body><h1>Compressed Precinct Map 012</h1></body></html>')
+        db.session.add(map_record)
+        db.session.commit()
+        
+        db.session.refresh(map_record)
+        return map_record
+
+
+class TestCompressedMapStorage:
+    """Test serving maps stored precompressed."""
+    
+    def test_set_content_compresses(self, app, compressed_map):
+        """Test that compressed storage keeps the hash of the original HTML."""
+        assert compressed_map.map is None
+        assert compressed_map.content_encoding == preferred_encoding()
+        html = compressed_map.get_content()
+        assert 'Compressed Precinct Map 012' in html
+        assert compressed_map.content_hash == Map.compute_content_hash(html)
+    
+    def test_passthrough_when_encoding_accepted(self, client, regular_user, compressed_map):
+        """Test that the stored bytes are sent as-is to clients accepting the encoding."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        encoding = compressed_map.content_encoding
+        response = client.get('/static-content-raw/012.html', headers={'Accept-Encoding': encoding})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response.headers.get('Vary', '')
+        assert response.data == compressed_map.map_compressed
+        
+        # Revalidation of the encoded representation
+        response = client.get('/static-content-raw/012.html', headers={
+            'Accept-Encoding': encoding, 'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+    
+    def test_decompressed_for_other_clients(self, client, regular_user, compressed_map):
+        """Test that clients without the encoding get plain HTML."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        response = client.get('/static-content-raw/012.html', headers={'Accept-Encoding': 'identity'})
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert b'Compressed Precinct Map 012' in response.data
+        
+        # Endpoints that inject controls always work on the decompressed HTML
+        response = client.get('/my-map-raw', headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in response.headers
+        assert b'Compressed Precinct Map 012' in response.data
+        assert b"window.addEventListener('message'" in response.data
+
+
+class TestMapVariantCompression:
+    """Test caching of compressed map views with injected controls."""
+    
+    def test_variant_compressed_once(self, client, regular_user, sample_map, monkeypatch):
+        """Test that the compressed variant is cached and never recompressed per request."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        response = client.get('/my-map-raw', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers.get('Vary', '')
+        html = gzip.decompress(response.data)
+        assert b'Test Precinct Map 012' in html
+        assert b"window.addEventListener('message'" in html
+        etag, weak = response.get_etag()
+        assert not weak and etag.endswith('-gzip')
+        
+        def no_compression(*args, **kwargs):
+            raise AssertionError('cached map variant compressed again')
+        
+        monkeypatch.setattr(main, 'compress', no_compression)
+        monkeypatch.setattr(response_compression, 'compress', no_compression)
+        repeat = client.get('/my-map-raw', headers={'Accept-Encoding': 'gzip'})
+        assert repeat.status_code == 200
+        assert repeat.data == response.data
+        
+        revalidated = client.get('/my-map-raw', headers={'Accept-Encoding': 'gzip',
+                                                         'If-None-Match': response.headers['ETag']})
+        assert revalidated.status_code == 304
+    
+    def test_plain_and_compressed_tagged_apart(self, client, regular_user, sample_map):
+        """Test that plain and compressed renderings carry different ETags."""
+        login_user(client, regular_user.username, 'user_password_unique')
+        
+        plain = client.get('/my-map-raw')
+        compressed = client.get('/my-map-raw', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in plain.headers
+        assert plain.headers['ETag'] != compressed.headers['ETag']
+        assert gzip.decompress(compressed.data) == plain.data
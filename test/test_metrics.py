@@ -0,0 +1,155 @@
+"""
+Tests for the metrics registry and /metrics endpoint.
+
+Tests cover:
+- Counter and histogram Prometheus text output
+- Totals shared across processes through the SQLite file
+- Gauges of exited processes dropped
+- Request latency, rate limit rejection and cache hit/miss recording
+- Endpoint access for admins and localhost only
+"""
+
+import pytest
+
+from services.map_cache import MapContentCache
+from services.metrics import (MetricsRegistry, metrics, CACHE_REQUESTS, REQUEST_DURATION,
+                              RATE_LIMIT_REJECTIONS)
+
+
+def make_registry(path=None):
+    registry = MetricsRegistry(path, flush_interval=3600)
+    registry.counter('jobs_total', 'Jobs run.')
+    registry.histogram('job_seconds', 'Job duration.', (0.1, 1.0))
+    registry.gauge('workers', 'Busy workers.')
+    return registry
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with line_start."""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestRegistry:
+    """Test recording and rendering."""
+
+    def test_counter_and_histogram(self):
+        registry = make_registry()
+        registry.inc('jobs_total', {'queue': 'maps'})
+        registry.inc('jobs_total', {'queue': 'maps'}, amount=2)
+        for value in (0.05, 0.5, 3.0):
+            registry.observe('job_seconds', value, {'queue': 'maps'})
+
+        text = registry.render()
+        assert '# TYPE jobs_total counter' in text
+        assert sample(text, 'jobs_total{queue="maps"}') == 3
+        assert '# TYPE job_seconds histogram' in text
+        assert sample(text, 'job_seconds_bucket{queue="maps",le="0.1"}') == 1
+        assert sample(text, 'job_seconds_bucket{queue="maps",le="1.0"}') == 2
+        assert sample(text, 'job_seconds_bucket{queue="maps",le="+Inf"}') == 3
+        assert sample(text, 'job_seconds_count{queue="maps"}') == 3
+        assert sample(text, 'job_seconds_sum{queue="maps"}') == pytest.approx(3.55)
+
+    def test_label_escaping(self):
+        registry = make_registry()
+        registry.inc('jobs_total', {'queue': 'a"b\\c'})
+        assert 'jobs_total{queue="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_collector_gauges(self):
+        registry = make_registry()
+        registry.set_collector('busy', lambda: [('workers', {}, 4)])
+        assert sample(registry.render(), 'workers') == 4
+
+    def test_failing_collector_is_ignored(self):
+        registry = make_registry()
+        registry.set_collector('broken', lambda: 1 / 0)
+        registry.inc('jobs_total')
+        assert sample(registry.render(), 'jobs_total') == 1
+
+
+class TestMultiprocess:
+    """Test totals shared through the SQLite file."""
+
+    def test_totals_summed_across_registries(self, tmp_path):
+        path = str(tmp_path / 'metrics.db')
+        worker_a, worker_b = make_registry(path), make_registry(path)
+        worker_a.inc('jobs_total')
+        worker_b.inc('jobs_total', amount=4)
+        worker_a.observe('job_seconds', 0.5)
+        worker_b.flush()
+
+        text = worker_a.render()
+        assert sample(text, 'jobs_total') == 5
+        assert sample(text, 'job_seconds_count') == 1
+        # Flushed deltas are not added twice
+        assert sample(worker_a.render(), 'jobs_total') == 5
+
+    def test_gauges_of_exited_processes_dropped(self, tmp_path):
+        path = str(tmp_path / 'metrics.db')
+        registry = make_registry(path)
+        registry.set_collector('busy', lambda: [('workers', {}, 2)])
+        with registry._connection() as conn:
+            conn.execute('INSERT INTO metric_gauges VALUES (?, ?, ?, ?)', ('workers', '{}', 999999999, 7))
+
+        assert sample(registry.render(), 'workers') == 2
+        remaining = registry._connection().execute('SELECT COUNT(*) FROM metric_gauges').fetchone()[0]
+        assert remaining == 1
+
+
+class TestRequestMetrics:
+    """Test metrics recorded by the app and the /metrics endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_request_duration_recorded(self, client):
+        client.get('/login')
+        client.get('/login')
+        text = metrics.render()
+        assert sample(text, f'{REQUEST_DURATION}_count{{endpoint="login",method="GET",status="2xx"}}') == 2
+
+    def test_rate_limit_rejection_counted(self, app):
+        # Rate limiting is disabled in tests; run a 429 through the response hooks
+        with app.test_request_context('/login'):
+            app.preprocess_request()
+            app.process_response(app.make_response(('slow down', 429)))
+        text = metrics.render()
+        assert sample(text, f'{RATE_LIMIT_REJECTIONS}{{endpoint="login"}}') == 1
+        assert sample(text, f'{REQUEST_DURATION}_count{{endpoint="login",method="GET",status="4xx"}}') == 1
+
+    def test_cache_hits_and_misses(self):
+        cache = MapContentCache(1024)
+        cache.get('a')
+        cache.put('a', 'html')
+        cache.get('a')
+        text = metrics.render()
+        assert sample(text, f'{CACHE_REQUESTS}{{cache="map",result="hit"}}') == 1
+        assert sample(text, f'{CACHE_REQUESTS}{{cache="map",result="miss"}}') == 1
+
+    def test_localhost_scrape(self, client):
+        client.get('/login')
+        response = client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert f'# TYPE {REQUEST_DURATION} histogram' in response.get_data(as_text=True)
+
+    def test_proxied_request_is_not_local(self, client):
+        response = client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'},
+                              headers={'X-Forwarded-For': '203.0.113.9'})
+        assert response.status_code == 403
+
+    def test_remote_anonymous_forbidden(self, client):
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 403
+
+    def test_remote_regular_user_forbidden(self, authenticated_client):
+        response = authenticated_client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'})
+        assert response.status_code == 403
+
+    def test_remote_admin_allowed(self, admin_client):
+        response = admin_client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'})
+        assert response.status_code == 200
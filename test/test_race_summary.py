@@ -0,0 +1,176 @@
+"""
+Tests for the precomputed precinct race summary.
+
+Tests cover:
+- Precinct key normalization
+- Race and win counts against the per-view CTE they replace
+- County-limited refresh
+- ClusteringService insights reading the summary
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from models import db
+from race_summary_utils import (
+    ensure_precinct_race_summary_table,
+    race_summary_precinct_key,
+    refresh_precinct_race_summary,
+)
+from services.clustering_service import ClusteringService
+
+# county, precinct, contest, election_date, party, votes
+RESULTS = [
+    ('FORSYTH', '074', 'GOVERNOR', '2024-11-05', 'DEM', 500),
+    ('FORSYTH', '074', 'GOVERNOR', '2024-11-05', 'REP', 400),
+    # Same race reported under the unpadded precinct is part of the same race
+    ('FORSYTH', '74', 'GOVERNOR', '2024-11-05', 'REP', 200),
+    ('FORSYTH', '074', 'SENATE', '2024-11-05', 'DEM', 300),
+    ('FORSYTH', '74', 'SENATE', '2024-11-05', 'REP', 100),
+    ('FORSYTH', '074', 'MAYOR', '2020-11-03', 'DEM', 250),
+    ('FORSYTH', '074', 'MAYOR', '2020-11-03', 'REP', 250),
+    # Uncontested races don't count as races, but do extend the date range
+    ('FORSYTH', '074', 'SHERIFF', '2016-11-08', 'DEM', 900),
+    ('FORSYTH', '012', 'GOVERNOR', '2024-11-05', 'DEM', 100),
+    ('FORSYTH', '012', 'GOVERNOR', '2024-11-05', 'REP', 300),
+    ('WAKE', '01-A', 'GOVERNOR', '2022-11-08', 'DEM', 700),
+    ('WAKE', '01-A', 'GOVERNOR', '2022-11-08', 'REP', 100),
+]
+
+CREATE_RESULTS = '''
+    CREATE TABLE IF NOT EXISTS candidate_vote_results (
+        id INTEGER PRIMARY KEY,
+        county VARCHAR(100), precinct VARCHAR(100), contest_name VARCHAR(200),
+        election_date DATE, choice_party VARCHAR(10), total_votes INTEGER
+    )
+'''
+
+
+def load_results(conn):
+    """Load RESULTS into candidate_vote_results."""
+    conn.execute(text(CREATE_RESULTS))
+    for county, precinct, contest, election_date, party, votes in RESULTS:
+        conn.execute(text('''
+            INSERT INTO candidate_vote_results
+                (county, precinct, contest_name, election_date, choice_party, total_votes)
+            VALUES (:county, :precinct, :contest, :election_date, :party, :votes)
+        '''), {'county': county, 'precinct': precinct, 'contest': contest,
+               'election_date': election_date, 'party': party, 'votes': votes})
+
+
+@pytest.fixture
+def results_engine():
+    """In-memory database with candidate_vote_results and an empty summary table."""
+    engine = create_engine('sqlite:///:memory:')
+    with engine.begin() as conn:
+        load_results(conn)
+        ensure_precinct_race_summary_table(conn)
+    return engine
+
+
+def summary_rows(conn):
+    """Return the summary table as {(county, precinct_key): row}."""
+    rows = conn.execute(text('SELECT * FROM precinct_race_summary')).mappings().all()
+    return {(row['county'], row['precinct_key']): dict(row) for row in rows}
+
+
+class TestPrecinctKey:
+    """Test precinct key normalization."""
+
+    def test_numeric_precincts_are_padded(self):
+        assert race_summary_precinct_key('74') == '074'
+        assert race_summary_precinct_key(' 074 ') == '074'
+        assert race_summary_precinct_key('0074') == '074'
+        assert race_summary_precinct_key(74) == '074'
+        assert race_summary_precinct_key('1234') == '1234'
+
+    def test_other_values(self):
+        assert race_summary_precinct_key('01-A') == '01-A'
+        assert race_summary_precinct_key('') is None
+        assert race_summary_precinct_key(None) is None
+
+
+class TestRefreshPrecinctRaceSummary:
+    """Test the summary rollup."""
+
+    def test_counts_and_date_range(self, results_engine):
+        """Test race counts, wins and date range per precinct."""
+        with results_engine.begin() as conn:
+            assert refresh_precinct_race_summary(conn) == 3
+            rows = summary_rows(conn)
+
+        precinct_74 = rows[('FORSYTH', '074')]
+        # GOVERNOR 500-600 (REP), SENATE 300-100 (DEM), MAYOR tied, SHERIFF uncontested
+        assert precinct_74['total_races'] == 3
+        assert precinct_74['dem_wins'] == 1
+        assert precinct_74['rep_wins'] == 1
+        assert str(precinct_74['first_election_date']) == '2016-11-08'
+        assert str(precinct_74['last_election_date']) == '2024-11-05'
+
+        assert rows[('FORSYTH', '012')]['rep_wins'] == 1
+        assert rows[('WAKE', '01-A')]['dem_wins'] == 1
+
+    def test_refresh_replaces_rows(self, results_engine):
+        """Test that a second refresh rebuilds instead of appending."""
+        with results_engine.begin() as conn:
+            refresh_precinct_race_summary(conn)
+            conn.execute(text("DELETE FROM candidate_vote_results WHERE precinct = '012'"))
+            assert refresh_precinct_race_summary(conn) == 2
+            assert ('FORSYTH', '012') not in summary_rows(conn)
+
+    def test_county_refresh(self, results_engine):
+        """Test that a county refresh leaves other counties alone."""
+        with results_engine.begin() as conn:
+            refresh_precinct_race_summary(conn)
+            conn.execute(text("DELETE FROM candidate_vote_results WHERE county = 'WAKE'"))
+            conn.execute(text("UPDATE candidate_vote_results SET total_votes = 1000 "
+                              "WHERE county = 'FORSYTH' AND precinct = '012' AND choice_party = 'DEM'"))
+
+            assert refresh_precinct_race_summary(conn, county='forsyth') == 2
+            rows = summary_rows(conn)
+
+        assert rows[('FORSYTH', '012')]['dem_wins'] == 1
+        assert ('WAKE', '01-A') in rows
+
+
+class TestClusteringInsightsFromSummary:
+    """Test ClusteringService reading the summary table."""
+
+    @pytest.fixture
+    def summary_tables(self, app):
+        with app.app_context():
+            with db.engine.begin() as conn:
+                load_results(conn)
+                ensure_precinct_race_summary_table(conn)
+                refresh_precinct_race_summary(conn)
+            yield
+            with db.engine.begin() as conn:
+                conn.execute(text('DROP TABLE precinct_race_summary'))
+                conn.execute(text('DROP TABLE candidate_vote_results'))
+
+    def test_race_win_percentage(self, app, summary_tables):
+        """Test the win percentage for padded and unpadded user precincts."""
+        service = ClusteringService()
+        with app.app_context():
+            for precinct in ('74', '074'):
+                user = SimpleNamespace(county='Forsyth', precinct=precinct)
+                assert service._calculate_race_win_percentage(user) == pytest.approx(100 / 3)
+
+            missing = SimpleNamespace(county='Forsyth', precinct='999')
+            assert service._calculate_race_win_percentage(missing) is None
+
+    def test_election_date_range(self, app, summary_tables):
+        """Test the overall election year range."""
+        with app.app_context():
+            assert ClusteringService()._get_election_date_range() == 'Elections from 2016-2024'
+
+    def test_missing_summary_table(self, app, caplog):
+        """Test the fallbacks before the summary table has been created."""
+        service = ClusteringService()
+        with app.app_context():
+            user = SimpleNamespace(county='Forsyth', precinct='074')
+            assert service._calculate_race_win_percentage(user) is None
+            assert 'refresh_precinct_race_summary.py' in caplog.text
+            assert service._get_election_date_range() == 'All elections'
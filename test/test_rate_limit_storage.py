@@ -0,0 +1,133 @@
+"""
+Tests for the shared SQLite rate limit storage.
+
+Tests cover:
+- Registration as the sqlite:// limits storage scheme
+- Fixed-window and sliding-window limits shared between storage instances
+- Window expiry and eviction of idle keys
+- The security.rate_limit decorator using the configured storage
+"""
+
+import time
+
+import pytest
+from flask import Flask
+from limits import RateLimitItemPerMinute, RateLimitItemPerSecond
+from limits.errors import ConfigurationError
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from security import rate_limit
+from services.rate_limit_storage import SQLiteRateLimitStorage
+
+
+@pytest.fixture
+def storage_url(tmp_path):
+    """URL of a fresh rate limit database file."""
+    return f"sqlite:///{tmp_path / 'ratelimit.db'}"
+
+
+class TestSQLiteRateLimitStorage:
+    """Test SQLiteRateLimitStorage as a limits backend."""
+
+    def test_scheme_registered(self, storage_url, tmp_path):
+        """Test that storage_from_string resolves sqlite:// URLs to the shared storage."""
+        storage = storage_from_string(storage_url)
+        assert isinstance(storage, SQLiteRateLimitStorage)
+        assert storage.path == str(tmp_path / 'ratelimit.db')
+        assert storage.check()
+
+    def test_memory_path_rejected(self):
+        """Test that a per-connection in-memory database is refused."""
+        with pytest.raises(ConfigurationError):
+            SQLiteRateLimitStorage('sqlite:///:memory:')
+
+    def test_fixed_window_shared_between_workers(self, storage_url):
+        """Test that two storage instances on one file enforce a single limit."""
+        worker_a = FixedWindowRateLimiter(SQLiteRateLimitStorage(storage_url))
+        worker_b = FixedWindowRateLimiter(SQLiteRateLimitStorage(storage_url))
+        item = RateLimitItemPerMinute(3)
+
+        assert worker_a.hit(item, '10.0.0.1')
+        assert worker_b.hit(item, '10.0.0.1')
+        assert worker_a.hit(item, '10.0.0.1')
+        assert not worker_b.hit(item, '10.0.0.1')
+        assert not worker_a.hit(item, '10.0.0.1')
+
+        # Other clients are counted separately
+        assert worker_b.hit(item, '10.0.0.2')
+
+    def test_sliding_window_shared_between_workers(self, storage_url):
+        """Test the sliding window counter strategy across storage instances."""
+        worker_a = SlidingWindowCounterRateLimiter(SQLiteRateLimitStorage(storage_url))
+        worker_b = SlidingWindowCounterRateLimiter(SQLiteRateLimitStorage(storage_url))
+        item = RateLimitItemPerMinute(2)
+
+        assert worker_a.hit(item, 'client')
+        assert worker_b.hit(item, 'client')
+        assert not worker_a.hit(item, 'client')
+        assert worker_b.get_window_stats(item, 'client').remaining == 0
+
+        worker_a.clear(item, 'client')
+        assert worker_b.hit(item, 'client')
+
+    def test_window_restarts_after_expiry(self, storage_url):
+        """Test that a counter starts over once its window has ended."""
+        storage = SQLiteRateLimitStorage(storage_url)
+        assert storage.incr('key', 0.05) == 1
+        assert storage.incr('key', 0.05) == 2
+        time.sleep(0.1)
+        assert storage.get('key') == 0
+        assert storage.incr('key', 60) == 1
+
+    def test_cleanup_removes_expired_keys(self, storage_url):
+        """Test that the sweep deletes idle keys."""
+        storage = SQLiteRateLimitStorage(storage_url)
+        for i in range(5):
+            storage.incr(f'idle-{i}', 10)
+        storage.incr('active', 1000)
+
+        assert storage.cleanup(now=time.time() + 100) == 5
+        assert len(storage) == 1
+        assert storage.get('active') == 1
+
+    def test_cleanup_bounds_key_count(self, storage_url):
+        """Test that keys above max_keys are evicted, soonest expiry first."""
+        storage = SQLiteRateLimitStorage(storage_url, max_keys=3)
+        for i in range(6):
+            storage.incr(f'key-{i}', 100 + i)
+
+        storage.cleanup()
+        assert len(storage) == 3
+        assert [storage.get(f'key-{i}') for i in range(6)] == [0, 0, 0, 1, 1, 1]
+
+    def test_incr_sweeps_periodically(self, storage_url):
+        """Test that writes trigger the sweep without an explicit cleanup call."""
+        storage = SQLiteRateLimitStorage(storage_url, max_keys=2, cleanup_interval=0)
+        for i in range(10):
+            storage.incr(f'key-{i}', 100)
+        # The sweep runs before each insert, so at most one key over the bound
+        assert len(storage) <= 3
+
+
+class TestRateLimitDecorator:
+    """Test security.rate_limit with the shared storage."""
+
+    def test_decorator_enforces_shared_limit(self, storage_url):
+        """Test that the decorator counts requests in the configured storage."""
+        app = Flask(__name__)
+        app.config['RATELIMIT_STORAGE_URL'] = storage_url
+
+        @app.route('/limited')
+        @rate_limit(max_requests=2, window=60)
+        def limited():
+            return 'ok'
+
+        client = app.test_client()
+        assert client.get('/limited').status_code == 200
+        assert client.get('/limited').status_code == 200
+        assert client.get('/limited').status_code == 429
+
+        # A second storage instance (another worker) sees the same counters
+        other = SlidingWindowCounterRateLimiter(SQLiteRateLimitStorage(storage_url))
+        assert not other.hit(RateLimitItemPerSecond(2, 60), 'rate_limit', 'limited', '127.0.0.1')
@@ -0,0 +1,202 @@
+"""
+Tests for the on-demand request profiler and its admin view.
+
+Tests cover:
+- Signed single-use profile tokens (tampered, expired, reused and wrong-path tokens ignored)
+- Sampling and cProfile profiles saved with request metadata
+- Bounded profile ring and safe artifact lookup
+- Hottest-frame summary of collapsed stacks
+- Admin-only browsing, link issuing and downloads
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.request_profiler import (ProfileStore, StackSampler, make_profile_token, profile_store,
+                                       read_profile_token, top_frames, PROFILE_HEADER)
+
+
+@pytest.fixture
+def profiler_config(app, tmp_path):
+    """Profile into a temp directory for one test."""
+    keys = ('PROFILER_ENABLED', 'PROFILER_DIR', 'PROFILER_MAX_PROFILES', 'PROFILER_SAMPLE_INTERVAL_MS')
+    saved = {key: app.config.get(key) for key in keys}
+    app.config.update(PROFILER_ENABLED=True, PROFILER_DIR=str(tmp_path / 'profiles'),
+                      PROFILER_MAX_PROFILES=50, PROFILER_SAMPLE_INTERVAL_MS=0.5)
+    yield app.config
+    app.config.update(saved)
+
+
+def login(client, user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+
+
+def token_for(app, path, mode='sample'):
+    return make_profile_token(app.secret_key, path, mode, 'test_admin')
+
+
+class TestTokens:
+    """Test signing and checking profile tokens."""
+
+    def test_round_trip(self):
+        token = make_profile_token('secret', '/flippable-analysis', 'cprofile', 'admin')
+        claims = read_profile_token('secret', token, max_age=60)
+        assert claims['nonce'] != read_profile_token('secret', make_profile_token('secret', '/', 'sample', 'admin'),
+                                                     max_age=60)['nonce']
+        del claims['nonce']
+        assert claims == {'path': '/flippable-analysis', 'mode': 'cprofile', 'by': 'admin'}
+
+    def test_rejected_tokens(self):
+        token = make_profile_token('secret', '/flippable', 'sample', 'admin')
+        assert read_profile_token('other-secret', token, max_age=60) is None
+        assert read_profile_token('secret', token[:-2] + 'xx', max_age=60) is None
+        assert read_profile_token('secret', token, max_age=-1) is None
+        assert read_profile_token('secret', make_profile_token('secret', '/', 'strace', 'admin'), max_age=60) is None
+
+
+class TestProfileStore:
+    """Test the on-disk profile ring."""
+
+    def test_ring_keeps_newest(self, tmp_path):
+        store = ProfileStore(str(tmp_path), max_profiles=3)
+        ids = [store.save({'path': f'/page/{i}'}, {'folded': b'main 1\n'}) for i in range(5)]
+        assert [profile['id'] for profile in store.list()] == ids[:1:-1]
+        assert store.get(ids[0]) is None
+        assert not (tmp_path / f'{ids[0]}.folded').exists()
+
+    def test_token_claimed_once(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        assert store.claim_token('0123456789abcdef', max_age=60) is True
+        assert store.claim_token('0123456789abcdef', max_age=60) is False
+        assert store.claim_token('../../etc/passwd', max_age=60) is False
+        assert store.list() == []
+
+    def test_artifact_lookup_is_safe(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        profile_id = store.save({'path': '/'}, {'txt': b'summary'})
+        assert store.artifact_path(profile_id, 'txt') == str(tmp_path / f'{profile_id}.txt')
+        assert store.artifact_path(profile_id, 'prof') is None
+        assert store.get('../../etc/passwd') is None
+        assert store.delete('../secrets') is False
+        assert store.delete(profile_id) is True
+        assert store.list() == []
+
+
+def test_top_frames():
+    collapsed = 'main (app.py:1);view (app.py:5);query (db.py:9) 6\nmain (app.py:1);view (app.py:5) 2\n'
+    frames = top_frames(collapsed)
+    assert frames[0] == ('query (db.py:9)', 6, 6)
+    assert ('view (app.py:5)', 2, 8) in frames
+
+
+def test_stack_sampler_records_busy_thread():
+    done = threading.Event()
+
+    def busy_wait_for_profile_test():
+        while not done.is_set():
+            time.sleep(0.001)
+
+    worker = threading.Thread(target=busy_wait_for_profile_test)
+    worker.start()
+    sampler = StackSampler(worker.ident, 0.001)
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    done.set()
+    worker.join()
+
+    assert sampler.samples > 0
+    assert 'busy_wait_for_profile_test' in sampler.collapsed()
+
+
+class TestProfiledRequests:
+    """Test which requests are profiled and what is saved."""
+
+    def test_sampled_request_saved(self, app, client, profiler_config):
+        response = client.get('/login', query_string={'next': '/', '_profile': token_for(app, '/login')})
+        assert response.status_code == 200
+
+        profiles = profile_store(app).list()
+        assert len(profiles) == 1
+        profile = profiles[0]
+        assert profile['mode'] == 'sample'
+        assert profile['method'] == 'GET' and profile['path'] == '/login'
+        assert profile['query'] == 'next=/'
+        assert profile['endpoint'] == 'login' and profile['status'] == 200
+        assert profile['issued_by'] == 'test_admin'
+        assert profile['artifacts'] == ['folded']
+
+    def test_cprofile_request_from_header(self, app, client, profiler_config):
+        client.get('/login', headers={PROFILE_HEADER: token_for(app, '/login', 'cprofile')})
+
+        profile = profile_store(app).list()[0]
+        store = profile_store(app)
+        if profile['mode'] == 'cprofile':
+            assert profile['artifacts'] == ['prof', 'txt']
+            with open(store.artifact_path(profile['id'], 'txt')) as f:
+                assert 'cumulative' in f.read()
+        else:
+            # Another profiler (e.g. coverage) held cProfile; the request was sampled instead
+            assert profile['artifacts'] == ['folded']
+
+    def test_unprofiled_requests(self, app, client, profiler_config):
+        client.get('/login')
+        client.get('/login', query_string={'_profile': 'not-a-token'})
+        client.get('/login', query_string={'_profile': token_for(app, '/about')})
+        assert profile_store(app).list() == []
+
+    def test_token_profiles_one_request(self, app, client, profiler_config):
+        token = token_for(app, '/login')
+        client.get('/login', query_string={'_profile': token})
+        client.get('/login', query_string={'_profile': token})
+        client.get('/login', headers={PROFILE_HEADER: token})
+        assert len(profile_store(app).list()) == 1
+
+    def test_disabled(self, app, client, profiler_config):
+        profiler_config['PROFILER_ENABLED'] = False
+        client.get('/login', query_string={'_profile': token_for(app, '/login')})
+        assert profile_store(app).list() == []
+
+
+class TestProfileAdminView:
+    """Test the Flask-Admin profiles view."""
+
+    def test_requires_admin(self, app, regular_user, profiler_config):
+        with app.test_client() as client:
+            assert client.get('/admin/profile_admin/').status_code == 302
+            login(client, regular_user)
+            assert client.get('/admin/profile_admin/').status_code == 302
+
+    def test_issue_link_and_download(self, app, admin_user, profiler_config):
+        with app.test_client() as client:
+            login(client, admin_user)
+            response = client.post('/admin/profile_admin/', data={'path': '/login?next=/', 'mode': 'sample'})
+            assert response.status_code == 200
+            html = response.get_data(as_text=True)
+            assert '/login?next=%2F&amp;_profile=' in html
+
+            link = html.split('<code style="word-break: break-all;">', 1)[1].split('</code>', 1)[0]
+            client.get(link.replace('&amp;', '&'))
+
+            profile = profile_store(app).list()[0]
+            assert profile['user'] == admin_user.username
+            assert profile['id'] in client.get('/admin/profile_admin/').get_data(as_text=True)
+            assert client.get(f"/admin/profile_admin/view/{profile['id']}").status_code == 200
+
+            download = client.get(f"/admin/profile_admin/download/{profile['id']}/folded")
+            assert download.status_code == 200
+            assert 'attachment' in download.headers['Content-Disposition']
+            assert client.get(f"/admin/profile_admin/download/{profile['id']}/prof").status_code == 404
+
+            client.post(f"/admin/profile_admin/delete/{profile['id']}")
+            assert profile_store(app).list() == []
+
+    def test_rejects_external_targets(self, app, admin_user, profiler_config):
+        with app.test_client() as client:
+            login(client, admin_user)
+            response = client.post('/admin/profile_admin/', data={'path': 'https://evil.example/', 'mode': 'sample'})
+            assert '_profile=' not in response.get_data(as_text=True)
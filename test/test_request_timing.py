@@ -0,0 +1,83 @@
+"""
+Tests for per-request SQL timing and the slow-query log.
+
+Tests cover:
+- Server-Timing header with query count, db, render and total time
+- Disabled and unsampled requests
+- Slow statements logged with their endpoint, without parameters
+"""
+
+import re
+
+import pytest
+
+from services.request_timing import server_timing_header, slow_query_logger
+
+SERVER_TIMING = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r'render;dur=(?P<render>[\d.]+), total;dur=(?P<total>[\d.]+)$'
+)
+
+
+@pytest.fixture
+def timing_config(app, tmp_path):
+    """Enable request timing for one test, logging slow queries to a temp file."""
+    keys = ('REQUEST_TIMING_ENABLED', 'REQUEST_TIMING_SAMPLE_RATE', 'SLOW_QUERY_THRESHOLD_MS', 'SLOW_QUERY_LOG_PATH')
+    saved = {key: app.config.get(key) for key in keys}
+    handlers = list(slow_query_logger.handlers)
+    app.config.update(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SAMPLE_RATE=1.0,
+                      SLOW_QUERY_THRESHOLD_MS=10_000, SLOW_QUERY_LOG_PATH=str(tmp_path / 'slow.log'))
+    yield app.config
+    app.config.update(saved)
+    for handler in slow_query_logger.handlers:
+        if handler not in handlers:
+            slow_query_logger.removeHandler(handler)
+            handler.close()
+
+
+def login(client, user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+
+
+def test_server_timing_header_format():
+    header = server_timing_header({'db': 0.0123, 'queries': 4, 'render': 0.002}, 0.05)
+    assert header == 'db;dur=12.3;desc="4 queries", render;dur=2.0, total;dur=50.0'
+
+
+def test_server_timing_on_page(app, admin_user, timing_config):
+    with app.test_client() as client:
+        login(client, admin_user)
+        response = client.get('/')
+    assert response.status_code == 200
+    match = SERVER_TIMING.match(response.headers['Server-Timing'])
+    assert match
+    # Loading the logged-in user is at least one query
+    assert int(match['queries']) >= 1
+    assert float(match['render']) > 0
+    assert float(match['total']) >= float(match['db'])
+
+
+def test_disabled(app, client, timing_config):
+    timing_config['REQUEST_TIMING_ENABLED'] = False
+    assert 'Server-Timing' not in client.get('/login').headers
+
+
+def test_unsampled(app, client, timing_config):
+    timing_config['REQUEST_TIMING_SAMPLE_RATE'] = 0.0
+    assert 'Server-Timing' not in client.get('/login').headers
+
+
+def test_slow_query_log(app, admin_user, timing_config, tmp_path):
+    timing_config['SLOW_QUERY_THRESHOLD_MS'] = 0
+    with app.test_client() as client:
+        login(client, admin_user)
+        client.get('/')
+    for handler in slow_query_logger.handlers:
+        handler.flush()
+
+    log = (tmp_path / 'slow.log').read_text()
+    assert 'endpoint=index GET / | SELECT' in log
+    # Bound parameters (here the user id) are not written out
+    assert f"'{admin_user.id}'" not in log and '(1,)' not in log
@@ -0,0 +1,166 @@
+"""
+Tests for response compression and precompressed static assets.
+
+Tests cover:
+- Accept-Encoding negotiation
+- Dynamic compression threshold, content types and skipped responses
+- Precompressed static variants and the asset manifest
+- Compressed pages and static files served by the app
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+from flask import Flask, Response
+from werkzeug.http import parse_accept_header
+from werkzeug.datastructures import Accept
+
+from compression_utils import negotiate_encoding
+from services.response_compression import (MANIFEST_FILENAME, StaticAssets, build_static_assets,
+                                           compress_response)
+
+
+def accept(value):
+    return parse_accept_header(value, Accept)
+
+
+BODY = '<html><body>' + '<p>Precinct turnout table row</p>' * 200 + '</body></html>'
+
+
+class TestNegotiateEncoding:
+    """Test picking an encoding from Accept-Encoding."""
+
+    def test_client_quality_wins(self):
+        assert negotiate_encoding(accept('gzip;q=1.0, br;q=0.5'), ['br', 'gzip']) == 'gzip'
+
+    def test_server_order_breaks_ties(self):
+        assert negotiate_encoding(accept('gzip, br'), ['br', 'gzip']) == 'br'
+
+    def test_none_acceptable(self):
+        assert negotiate_encoding(accept('identity'), ['br', 'gzip']) is None
+        assert negotiate_encoding(accept('gzip;q=0'), ['gzip']) is None
+        assert negotiate_encoding(accept(''), ['gzip']) is None
+
+
+class TestCompressResponse:
+    """Test per-request compression."""
+
+    def test_compresses_html(self):
+        response = Response(BODY, mimetype='text/html')
+        response.set_etag('abc')
+        assert compress_response(response, accept('gzip')) == 'gzip'
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.vary
+        assert gzip.decompress(response.get_data()).decode() == BODY
+        assert int(response.headers['Content-Length']) == len(response.get_data())
+        assert response.get_etag() == ('abc', True)
+
+    def test_below_threshold(self):
+        response = Response('<p>short</p>', mimetype='text/html')
+        assert compress_response(response, accept('gzip')) is None
+        assert response.get_data() == b'<p>short</p>'
+
+    def test_client_without_gzip_gets_vary(self):
+        response = Response(BODY, mimetype='text/html')
+        assert compress_response(response, accept('')) is None
+        assert 'Accept-Encoding' in response.vary
+        assert 'Content-Encoding' not in response.headers
+
+    def test_skips_already_encoded(self):
+        """Test the precompressed map path."""
+        response = Response(gzip.compress(BODY.encode()), mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+        assert compress_response(response, accept('gzip, br')) is None
+
+    @pytest.mark.parametrize('kwargs', [
+        {'mimetype': 'image/png'},
+        {'mimetype': 'text/html', 'status': 304},
+        {'mimetype': 'text/html', 'headers': {'Cache-Control': 'no-transform'}},
+    ])
+    def test_skipped_responses(self, kwargs):
+        response = Response(BODY, **kwargs)
+        assert compress_response(response, accept('gzip')) is None
+
+    def test_skips_file_responses(self, tmp_path):
+        path = tmp_path / 'page.html'
+        path.write_text(BODY)
+        app = Flask(__name__)
+        with app.test_request_context():
+            from flask import send_file
+            response = send_file(str(path))
+            assert compress_response(response, accept('gzip')) is None
+            response.close()
+
+
+class TestStaticAssets:
+    """Test the precompress build step and manifest lookups."""
+
+    @pytest.fixture
+    def static_dir(self, tmp_path):
+        static_dir = tmp_path / 'static'
+        (static_dir / 'js').mkdir(parents=True)
+        (static_dir / 'js' / 'app.js').write_text('var precinct = 1;\n' * 200)
+        (static_dir / 'js' / 'tiny.js').write_text('var a;')
+        (static_dir / 'logo.png').write_bytes(b'\x89PNG' + os.urandom(4000))
+        return static_dir
+
+    def test_build(self, static_dir):
+        manifest = build_static_assets(str(static_dir), encodings=['gzip'])
+        assert sorted(manifest) == ['js/app.js', 'js/tiny.js', 'logo.png']
+        assert manifest['js/app.js']['encodings'] == ['gzip']
+        assert manifest['js/tiny.js']['encodings'] == []
+        assert manifest['logo.png']['encodings'] == []
+        assert gzip.decompress((static_dir / 'js' / 'app.js.gz').read_bytes()) == \
+            (static_dir / 'js' / 'app.js').read_bytes()
+        with open(static_dir / MANIFEST_FILENAME) as f:
+            assert json.load(f)['files'] == manifest
+
+    def test_rebuild_removes_stale_variants(self, static_dir):
+        build_static_assets(str(static_dir), encodings=['gzip'])
+        (static_dir / 'js' / 'app.js').write_text('x')
+        build_static_assets(str(static_dir), encodings=['gzip'])
+        assert not (static_dir / 'js' / 'app.js.gz').exists()
+
+    def test_variant_and_version(self, static_dir):
+        manifest = build_static_assets(str(static_dir), encodings=['gzip'])
+        assets = StaticAssets(str(static_dir))
+        assert assets.version('js/app.js') == manifest['js/app.js']['hash']
+        assert assets.variant('js/app.js', accept('gzip, br')) == ('js/app.js.gz', 'gzip')
+        assert assets.variant('js/app.js', accept('br')) == (None, None)
+        assert assets.variant('logo.png', accept('gzip')) == (None, None)
+        assert assets.version('missing.js') is None
+
+    def test_changed_file_is_not_trusted(self, static_dir):
+        build_static_assets(str(static_dir), encodings=['gzip'])
+        assets = StaticAssets(str(static_dir))
+        (static_dir / 'js' / 'app.js').write_text('var edited = true;\n' * 300)
+        assert assets.version('js/app.js') is None
+        assert assets.variant('js/app.js', accept('gzip')) == (None, None)
+
+    def test_without_manifest(self, tmp_path):
+        assets = StaticAssets(str(tmp_path))
+        assert assets.version('js/app.js') is None
+
+
+class TestAppCompression:
+    """Test compression on real app responses."""
+
+    def test_page_compressed_when_accepted(self, client):
+        response = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert b'<form' in gzip.decompress(response.data)
+
+    def test_page_plain_without_accept_encoding(self, client):
+        response = client.get('/login')
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert b'<form' in response.data
+
+    def test_static_without_manifest(self, client):
+        response = client.get('/static/img/index.html', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        response.close()
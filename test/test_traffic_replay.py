@@ -0,0 +1,149 @@
+"""
+Tests for the access-log traffic replay harness.
+
+Tests cover:
+- Parsing werkzeug and gunicorn access log lines
+- Request mix per route and inferred user role
+- Seeded replay plans limited to the roles with accounts
+- Concurrent replay and per-endpoint latency/error summaries
+"""
+
+import threading
+
+from traffic_replay_utils import (build_traffic_mix, endpoint_role, format_mix, format_summary, parse_log_line,
+                                  percentile, plan_requests, run_replay, summarize_results)
+
+WERKZEUG_LINE = '127.0.0.1 - - [16/Oct/2025 10:22:33] "GET /flippable?year=2024 HTTP/1.1" 200 -'
+GUNICORN_LINE = ('10.0.0.5 - - [16/Oct/2025:10:22:33 +0000] "GET /admin/user/ HTTP/1.1" 200 5120 '
+                 '"https://example.org/" "Mozilla/5.0 (X11)"')
+
+
+def entry(client, target, status=200, method='GET'):
+    return {'client': client, 'method': method, 'target': target, 'status': status}
+
+
+class TestLogParsing:
+    """Test parsing access log lines."""
+
+    def test_werkzeug_line(self):
+        assert parse_log_line(WERKZEUG_LINE) == {
+            'client': '127.0.0.1', 'method': 'GET', 'target': '/flippable?year=2024', 'status': 200,
+        }
+
+    def test_gunicorn_combined_line(self):
+        parsed = parse_log_line(GUNICORN_LINE)
+        assert parsed['client'] == '10.0.0.5 Mozilla/5.0 (X11)'
+        assert parsed['target'] == '/admin/user/' and parsed['status'] == 200
+
+    def test_other_lines_ignored(self):
+        assert parse_log_line('Traceback (most recent call last):') is None
+        assert parse_log_line('INFO:waitress:Serving on http://0.0.0.0:8080') is None
+
+
+class TestTrafficMix:
+    """Test building the request mix from parsed entries."""
+
+    def test_roles_inferred_per_client(self, app):
+        entries = [
+            entry('admin-client', '/admin/user/'),
+            entry('admin-client', '/flippable'),
+            entry('county-client', '/flippable-analysis'),
+            entry('county-client', '/flippable'),
+            entry('county-client', '/flippable'),
+            entry('user-client', '/flippable'),
+            entry('user-client', '/flippable-analysis', status=302),  # Bounced: not a county user
+            entry('anonymous-client', '/flippable', status=302),
+            entry('anonymous-client', '/login'),
+        ]
+        mix = build_traffic_mix(entries, app.url_map)
+        groups = {(group['endpoint'], group['role']): group for group in mix['groups']}
+
+        assert mix['requests'] == 9 and mix['clients'] == 4
+        assert groups[('flippable_races', 'county')]['count'] == 2
+        assert groups[('flippable_races', 'admin')]['targets'] == {'/flippable': 1}
+        assert ('flippable_analysis', 'user') in groups
+        assert ('flippable_races', 'anonymous') in groups
+        assert mix['groups'][0]['count'] == 2
+
+    def test_unreplayable_requests_skipped(self, app):
+        entries = [
+            entry('client', '/login', method='POST'),
+            entry('client', '/logout', status=302),
+            entry('client', '/about'),
+        ]
+        mix = build_traffic_mix(entries, app.url_map)
+        assert mix['requests'] == 1
+        assert mix['skipped'] == {'method POST': 1, 'excluded logout': 1}
+        assert '100.0%' in format_mix(mix)
+
+    def test_endpoint_roles(self):
+        assert endpoint_role('user.index_view', '/admin/user/') == 'admin'
+        assert endpoint_role('website_user_report', '/website-users') == 'county'
+        assert endpoint_role('documentation', '/documentation') == 'anonymous'
+        assert endpoint_role('view_my_map', '/my-map') == 'user'
+
+
+MIX = {
+    'requests': 4,
+    'clients': 2,
+    'skipped': {},
+    'groups': [
+        {'endpoint': 'flippable_races', 'rule': '/flippable', 'role': 'user', 'count': 3,
+         'targets': {'/flippable': 2, '/flippable?year=2022': 1}},
+        {'endpoint': 'website_user_report', 'rule': '/website-users', 'role': 'county', 'count': 1,
+         'targets': {'/website-users': 1}},
+    ],
+}
+
+
+class TestReplay:
+    """Test planning, replaying and summarizing."""
+
+    def test_plan_is_seeded_and_role_limited(self):
+        plan = plan_requests(MIX, 50, seed=3)
+        assert plan == plan_requests(MIX, 50, seed=3)
+        assert {role for _, role, _ in plan} == {'user', 'county'}
+
+        user_only = plan_requests(MIX, 20, seed=3, roles=['anonymous', 'user'])
+        assert len(user_only) == 20
+        assert {endpoint for endpoint, _, _ in user_only} == {'flippable_races'}
+        assert plan_requests(MIX, 5, roles=['admin']) == []
+
+    def test_run_replay_sends_plan_concurrently(self):
+        workers = set()
+        lock = threading.Lock()
+
+        def send(worker, role, target):
+            with lock:
+                workers.add(worker)
+            if target == '/website-users':
+                raise ConnectionError('refused')
+            return 500 if 'year' in target else 200
+
+        plan = plan_requests(MIX, 40, seed=1)
+        results, elapsed = run_replay(plan, send, concurrency=4)
+        assert len(results) == 40 and elapsed > 0
+        assert workers <= {0, 1, 2, 3}
+
+        summary = summarize_results(results, elapsed)
+        rows = {row['endpoint']: row for row in summary['endpoints']}
+        assert rows['website_user_report']['error_rate'] == 1.0
+        assert rows['website_user_report']['statuses'] == {'failed': rows['website_user_report']['requests']}
+        expected_errors = sum(1 for _, _, target in plan if target != '/flippable')
+        assert summary['total']['errors'] == expected_errors
+        assert summary['transport_errors'] == {'ConnectionError: refused': rows['website_user_report']['requests']}
+        assert 'TOTAL' in format_summary(summary)
+
+    def test_run_replay_for_duration(self):
+        results, elapsed = run_replay([('flippable_races', 'user', '/flippable')], lambda *args: 200,
+                                      concurrency=2, duration=0.05)
+        assert len(results) > 1 and elapsed >= 0.05
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 95) == 0.0
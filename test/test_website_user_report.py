@@ -0,0 +1,199 @@
+"""
+Tests for the /website-users report.
+
+Tests cover:
+- Role, activity and recent-signup counts
+- Monthly signup buckets
+- Precinct distribution matching (exact, zero-padded, unknown precincts)
+- Constant query count regardless of the number of users, within a query budget
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+from flask import template_rendered
+from sqlalchemy import event, text
+
+from models import db, User
+
+_user_ids = count(1)
+
+
+@pytest.fixture
+def precinct_tables(app, db_session):
+    """Create the precincts and candidate_vote_results tables the report reads."""
+    with app.app_context():
+        db.session.execute(text('CREATE TABLE IF NOT EXISTS precincts (county VARCHAR(100), precinct VARCHAR(100))'))
+        db.session.execute(text('CREATE TABLE IF NOT EXISTS candidate_vote_results (county VARCHAR(100), precinct VARCHAR(100))'))
+        db.session.commit()
+        yield
+        db.session.execute(text('DROP TABLE precincts'))
+        db.session.execute(text('DROP TABLE candidate_vote_results'))
+        db.session.commit()
+
+
+def add_precincts(table, county, precincts):
+    """Insert known precincts for a county."""
+    for precinct in precincts:
+        db.session.execute(text(f'INSERT INTO {table} (county, precinct) VALUES (:county, :precinct)'),
+                           {'county': county, 'precinct': precinct})
+    db.session.commit()
+
+
+def add_users(how_many, precinct='001', county='Wake', created_at=None, **kwargs):
+    """Add regular users in NC."""
+    for _ in range(how_many):
+        user_id = next(_user_ids)
+        user = User(
+            username=f'report_user_{user_id}',
+            email=f'report{user_id}@test.com',
+            password=f'report_password_{user_id}',
+            phone='555-0100',
+            role='voter',
+            precinct=precinct,
+            state='NC',
+            county=county,
+            **kwargs
+        )
+        if created_at is not None:
+            user.created_at = created_at
+        db.session.add(user)
+    db.session.commit()
+
+
+@contextmanager
+def captured_report(app):
+    """Capture the user_stats passed to the report template."""
+    captured = []
+
+    def record(sender, template, context, **extra):
+        if template.name == 'website_user_report.html':
+            captured.append(context['user_stats'])
+
+    template_rendered.connect(record, app)
+    try:
+        yield captured
+    finally:
+        template_rendered.disconnect(record, app)
+
+
+def get_report(app, user):
+    """Request the report as user and return (user_stats, statements executed)."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+        with captured_report(app) as captured:
+            event.listen(db.engine, 'before_cursor_execute', capture)
+            try:
+                response = client.get('/website-users')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == 200
+    assert len(captured) == 1
+    return captured[0], statements
+
+
+class TestWebsiteUserReport:
+    """Test the aggregate queries behind the website user report."""
+
+    def test_role_and_activity_counts(self, app, admin_user, county_user, regular_user,
+                                      inactive_user, precinct_tables):
+        """Test the role, activity and recent counts for an admin."""
+        with app.app_context():
+            add_users(2, created_at=datetime.utcnow() - timedelta(days=90))
+
+            stats, _ = get_report(app, admin_user)
+
+            assert stats['total'] == 6
+            assert stats['admin'] == 1
+            assert stats['county'] == 1
+            assert stats['regular'] == 4
+            assert stats['active'] == 5
+            assert stats['inactive'] == 1
+            assert stats['recent'] == 4
+            assert stats['scope_description'] == 'All NC Users'
+
+    def test_monthly_signups(self, app, admin_user, precinct_tables):
+        """Test that signups are bucketed into the last 12 calendar months."""
+        with app.app_context():
+            now = datetime.utcnow()
+            add_users(3, created_at=now.replace(day=1) - timedelta(days=1))
+            add_users(2, created_at=datetime(now.year - 2, 1, 15))
+
+            stats, _ = get_report(app, admin_user)
+
+            labels = stats['monthly_signups']['labels']
+            data = stats['monthly_signups']['data']
+            previous_month = now.replace(day=1) - timedelta(days=1)
+            assert len(labels) == len(data) == 12
+            assert len(set(labels)) == 12
+            assert labels[-1] == now.strftime('%b %Y')
+            assert labels[-2] == previous_month.strftime('%b %Y')
+            # The admin signed up this month; users older than a year are left out
+            assert data[-1] == 1
+            assert data[-2] == 3
+            assert sum(data) == 4
+
+    def test_precinct_distribution_matching(self, app, admin_user, precinct_tables):
+        """Test exact, zero-padded and unknown precinct matching."""
+        with app.app_context():
+            add_precincts('precincts', 'WAKE', ['001', '07', '074', '100'])
+            add_users(2, precinct='74')      # padded match -> '074'
+            add_users(1, precinct='07')      # exact match wins over padding
+            add_users(1, precinct=' 100 ')   # whitespace is ignored
+            add_users(1, precinct='X1')      # unknown precinct is listed as-is
+
+            stats, _ = get_report(app, admin_user)
+
+            assert stats['precinct_distribution'] == {
+                '001': 1, '07': 1, '074': 2, '100': 1, 'X1': 1,
+            }
+            assert list(stats['precinct_distribution']) == sorted(stats['precinct_distribution'])
+
+    def test_precinct_fallback_to_vote_results(self, app, county_user, precinct_tables):
+        """Test that candidate_vote_results supplies precincts when precincts has none."""
+        with app.app_context():
+            add_precincts('precincts', 'DURHAM', ['050'])
+            add_precincts('candidate_vote_results', 'Wake', ['000', '002', '002'])
+            add_users(1, precinct='002', county='Durham')
+
+            stats, _ = get_report(app, county_user)
+
+            # County users only see users in their own county
+            assert stats['precinct_distribution'] == {'000': 1, '002': 0}
+            assert stats['total'] == 1
+
+    def test_query_count_is_constant(self, app, admin_user, precinct_tables):
+        """Test that the report costs the same number of queries for any user count."""
+        with app.app_context():
+            add_precincts('precincts', 'WAKE', ['001', '002'])
+            _, few = get_report(app, admin_user)
+
+            add_users(25, precinct='002')
+            add_users(25, precinct='2')
+            stats, many = get_report(app, admin_user)
+
+            assert stats['total'] == 51
+            assert stats['precinct_distribution'] == {'001': 1, '002': 50}
+            assert len(many) == len(few)
+            # Everything else is the Flask-Login user load
+            report_queries = [s for s in many if 'count(' in s.lower()]
+            assert len(report_queries) == 3
+
+    def test_query_budget(self, app, admin_user, precinct_tables, query_budget):
+        """Test that the report stays within its query budget: user load plus three aggregates."""
+        with app.app_context():
+            add_precincts('precincts', 'WAKE', ['001', '002'])
+            add_users(30, precinct='002')
+            with query_budget(4):
+                get_report(app, admin_user)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Traffic Replay Utilities
+========================
+
+Turns the app's own access logs (the werkzeug request lines in flask.log and
+gunicorn access logs in the default or combined format) into a request mix
+per route and user role, replays that mix concurrently, and summarizes
+throughput, latency percentiles and error rates per endpoint.
+
+Access logs don't record who made a request, so each client (IP address plus
+user agent, where the log has one) gets the most privileged role its
+successful requests needed: admin for /admin pages, county for the county
+coordinator pages, user for any other page behind the login, and anonymous
+otherwise. All of a client's requests are replayed under that role. Behind a
+proxy that hides client addresses every request looks like one client, and
+the whole mix is replayed as its most privileged role.
+
+Usage:
+    from traffic_replay_utils import build_traffic_mix, plan_requests, run_replay, summarize_results
+
+    mix = build_traffic_mix(read_access_logs(['flask.log']), app.url_map)
+    plan = plan_requests(mix, count=1000, seed=7)
+    results, elapsed = run_replay(plan, send, concurrency=8)
+    summary = summarize_results(results, elapsed)
+"""
+
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+
+# Least to most privileged
+ROLES = ('anonymous', 'user', 'county', 'admin')
+
+# Served without logging in; a 200 here says nothing about the client
+PUBLIC_ENDPOINTS = {
+    'static', 'login', 'session_status', 'documentation', 'search_documentation', 'show_documentation',
+    'maintenance', 'metrics_endpoint', 'dash_analytics_view', 'catch_all_files',
+}
+
+# Only admins and county coordinators get a 200 from these
+COUNTY_ENDPOINTS = {
+    'flippable_analysis', 'flippable_analysis_races', 'demographic_clustering', 'website_user_report',
+    'static_content',
+}
+
+# Replaying these would end the replay session
+DEFAULT_EXCLUDED_ENDPOINTS = {'logout'}
+
+# Methods replayed; everything else changes data or needs a form token
+REPLAY_METHODS = ('GET', 'HEAD')
+
+# Werkzeug:  127.0.0.1 - - [16/Oct/2025 10:22:33] "GET /flippable HTTP/1.1" 200 -
+# Gunicorn:  10.0.0.5 - - [16/Oct/2025:10:22:33 +0000] "GET /flippable HTTP/1.1" 200 5120 "-" "Mozilla/5.0"
+LOG_LINE = re.compile(
+    r'(?P<ip>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<target>\S+) HTTP/[\d.]+" (?P<status>\d{3}) \S+'
+    r'(?: "(?P<referrer>[^"]*)" "(?P<agent>[^"]*)")?'
+)
+
+
+def parse_log_line(line: str) -> Optional[Dict]:
+    """
+    Parse one werkzeug or gunicorn access log line.
+
+    Args:
+        line: Log line; other log output (tracebacks, app messages) is ignored
+
+    Returns:
+        Dict with client, method, target and status, or None if the line isn't a request
+    """
+    match = LOG_LINE.search(line)
+    if match is None:
+        return None
+    agent = match.group('agent')
+    return {
+        'client': f"{match.group('ip')} {agent}" if agent else match.group('ip'),
+        'method': match.group('method'),
+        'target': match.group('target'),
+        'status': int(match.group('status')),
+    }
+
+
+def read_access_logs(paths: Iterable[str]) -> Iterable[Dict]:
+    """Yield the parsed request lines of each log file, in order."""
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                entry = parse_log_line(line)
+                if entry is not None:
+                    yield entry
+
+
+def route_for(url_adapter, method: str, target: str) -> Optional[Tuple[str, str]]:
+    """
+    Route a logged request target through the app's URL map.
+
+    Args:
+        url_adapter: app.url_map.bind(...)
+        method: HTTP method
+        target: Path and query string as logged
+
+    Returns:
+        (endpoint, rule) or None if no route matches
+    """
+    path = unquote(urlsplit(target).path) or '/'
+    try:
+        rule, _ = url_adapter.match(path, method=method, return_rule=True)
+    except RequestRedirect:
+        # Missing trailing slash; the app answers with a redirect to the real route
+        return None
+    except HTTPException:
+        return None
+    return rule.endpoint, rule.rule
+
+
+def endpoint_role(endpoint: str, rule: str) -> str:
+    """Least privileged role that gets a successful response from an endpoint."""
+    if rule.startswith('/admin'):
+        return 'admin'
+    if endpoint in COUNTY_ENDPOINTS:
+        return 'county'
+    if endpoint in PUBLIC_ENDPOINTS:
+        return 'anonymous'
+    return 'user'
+
+
+def build_traffic_mix(entries: Iterable[Dict], url_map, exclude_endpoints=DEFAULT_EXCLUDED_ENDPOINTS,
+                      max_targets: int = 500) -> Dict:
+    """
+    Build the request mix per route and user role from parsed log entries.
+
+    Args:
+        entries: Parsed log lines (see read_access_logs)
+        url_map: The app's werkzeug URL map
+        exclude_endpoints: Endpoints never replayed
+        max_targets: Distinct paths kept per group (the most requested)
+
+    Returns:
+        Dict with the number of requests kept, skipped counts by reason and
+        groups of {endpoint, rule, role, count, targets: {target: count}}
+    """
+    url_adapter = url_map.bind('localhost')
+    client_roles = {}
+    client_requests = defaultdict(Counter)
+    skipped = Counter()
+
+    for entry in entries:
+        if entry['method'] not in REPLAY_METHODS:
+            skipped[f"method {entry['method']}"] += 1
+            continue
+        route = route_for(url_adapter, entry['method'], entry['target'])
+        if route is None:
+            skipped['no route'] += 1
+            continue
+        endpoint, rule = route
+        if endpoint in exclude_endpoints:
+            skipped[f'excluded {endpoint}'] += 1
+            continue
+
+        client = entry['client']
+        role = client_roles.get(client, 'anonymous')
+        if entry['status'] < 300 or entry['status'] == 304:
+            needed = endpoint_role(endpoint, rule)
+            if ROLES.index(needed) > ROLES.index(role):
+                role = needed
+        client_roles[client] = role
+        client_requests[client][(endpoint, rule, entry['target'])] += 1
+
+    groups = {}
+    for client, requests in client_requests.items():
+        role = client_roles[client]
+        for (endpoint, rule, target), count in requests.items():
+            group = groups.setdefault((endpoint, role), {
+                'endpoint': endpoint, 'rule': rule, 'role': role, 'count': 0, 'targets': Counter(),
+            })
+            group['count'] += count
+            group['targets'][target] += count
+
+    mix_groups = []
+    for group in sorted(groups.values(), key=lambda g: (-g['count'], g['endpoint'], g['role'])):
+        group['targets'] = dict(group['targets'].most_common(max_targets))
+        mix_groups.append(group)
+
+    return {
+        'requests': sum(group['count'] for group in mix_groups),
+        'clients': len(client_roles),
+        'skipped': dict(skipped),
+        'groups': mix_groups,
+    }
+
+
+def plan_requests(mix: Dict, count: int, seed: int = 0, roles: Iterable[str] = ROLES) -> List[Tuple[str, str, str]]:
+    """
+    Draw a replay plan from a traffic mix.
+
+    Each request is drawn with the weight it had in the logs, so the plan
+    keeps both the endpoint mix and the spread of paths within an endpoint.
+
+    Args:
+        mix: Output of build_traffic_mix
+        count: Requests to draw
+        seed: Random seed (the same seed and mix give the same plan)
+        roles: Roles that can be replayed; other groups are left out
+
+    Returns:
+        List of (endpoint, role, target)
+    """
+    roles = set(roles)
+    choices = []
+    weights = []
+    for group in mix['groups']:
+        if group['role'] not in roles:
+            continue
+        for target, weight in group['targets'].items():
+            choices.append((group['endpoint'], group['role'], target))
+            weights.append(weight)
+    if not choices:
+        return []
+    return random.Random(seed).choices(choices, weights=weights, k=count)
+
+
+def run_replay(plan: List[Tuple[str, str, str]], send: Callable[[int, str, str], int], concurrency: int = 8,
+               duration: Optional[float] = None) -> Tuple[List[Dict], float]:
+    """
+    Replay a plan with a fixed number of concurrent workers.
+
+    Each worker sends its next request as soon as the previous one finished
+    (a closed loop), so throughput is what the server sustains at this
+    concurrency.
+
+    Args:
+        plan: Output of plan_requests
+        send: send(worker, role, target) -> HTTP status; raises on transport errors
+        concurrency: Concurrent workers
+        duration: Seconds to run, cycling through the plan; None sends the plan once
+
+    Returns:
+        (results, elapsed seconds); one result dict per request sent
+    """
+    results = []
+    lock = threading.Lock()
+    position = [0]
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_request():
+        with lock:
+            if deadline is None and position[0] >= len(plan):
+                return None
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            item = plan[position[0] % len(plan)]
+            position[0] += 1
+            return item
+
+    def worker(index):
+        while True:
+            item = next_request()
+            if item is None:
+                return
+            endpoint, role, target = item
+            status, error = None, None
+            started = time.perf_counter()
+            try:
+                status = send(index, role, target)
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+            latency = time.perf_counter() - started
+            with lock:
+                results.append({'endpoint': endpoint, 'role': role, 'target': target,
+                                'status': status, 'error': error, 'latency': latency})
+
+    if plan:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summary_row(endpoint: str, role: str, results: List[Dict], elapsed: float) -> Dict:
+    latencies = sorted(result['latency'] * 1000 for result in results)
+    errors = sum(1 for result in results if result['status'] is None or result['status'] >= 400)
+    return {
+        'endpoint': endpoint,
+        'role': role,
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': errors / len(results),
+        'throughput_rps': len(results) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1],
+        'statuses': dict(Counter(str(result['status'] or 'failed') for result in results)),
+    }
+
+
+def summarize_results(results: List[Dict], elapsed: float) -> Dict:
+    """
+    Throughput, latency percentiles and error rates per endpoint and role.
+
+    A request is an error when it got no response or a 4xx/5xx status.
+    Redirects count as successes, as in the logs they were replayed from.
+
+    Returns:
+        Dict with elapsed seconds, a total row, endpoint rows (busiest first)
+        and a sample of transport error messages
+    """
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[(result['endpoint'], result['role'])].append(result)
+    rows = [_summary_row(endpoint, role, group, elapsed) for (endpoint, role), group in by_endpoint.items()]
+    rows.sort(key=lambda row: (-row['requests'], row['endpoint'], row['role']))
+    return {
+        'elapsed_s': elapsed,
+        'total': _summary_row('TOTAL', '-', results, elapsed) if results else None,
+        'endpoints': rows,
+        'transport_errors': dict(Counter(result['error'] for result in results if result['error']).most_common(5)),
+    }
+
+
+def format_mix(mix: Dict) -> str:
+    """Text table of a traffic mix."""
+    lines = [f"{mix['requests']} replayable requests from {mix['clients']} clients",
+             f"{'Share':>7}  {'Requests':>8}  {'Role':<9}  Endpoint (rule)"]
+    for group in mix['groups']:
+        share = 100.0 * group['count'] / mix['requests']
+        lines.append(f"{share:>6.1f}%  {group['count']:>8}  {group['role']:<9}  {group['endpoint']} ({group['rule']})")
+    for reason, count in sorted(mix['skipped'].items(), key=lambda item: -item[1]):
+        lines.append(f"skipped: {count} ({reason})")
+    return '\n'.join(lines)
+
+
+def format_summary(summary: Dict) -> str:
+    """Text table of a replay summary."""
+    header = (f"{'Endpoint':<32} {'Role':<9} {'Reqs':>6} {'Req/s':>7} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'Errors':>7}")
+    lines = [header, '-' * len(header)]
+    rows = summary['endpoints'] + ([summary['total']] if summary['total'] else [])
+    for row in rows:
+        lines.append(f"{row['endpoint'][:32]:<32} {row['role']:<9} {row['requests']:>6} "
+                     f"{row['throughput_rps']:>7.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                     f"{row['p99_ms']:>8.1f} {100.0 * row['error_rate']:>6.1f}%")
+    return '\n'.join(lines)
@@ -23,6 +23,8 @@ import argparse
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 from datetime import datetime
+from flippable_utils import ensure_flippable_metric_columns, refresh_flippable_metrics
+from data_versions import bump_data_version, FLIPPABLE
 
 class FlippableUpdater:
     """Updates the flippable table with newly discovered close races."""
@@ -186,8 +188,12 @@ class FlippableUpdater:
         try:
             with self.engine.connect() as conn:
                 with conn.begin():  # Transaction
+                    ensure_flippable_metric_columns(conn)
                     for record in insert_data:
                         conn.execute(text(insert_query), record)
+                    # Fill in the persisted assessment columns for the new races
+                    refresh_flippable_metrics(conn)
+                    bump_data_version(conn, FLIPPABLE)
                     
             print(f"✅ Successfully added {len(new_races)} races to flippable table")
             return len(new_races)